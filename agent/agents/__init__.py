@@ -1,6 +1,11 @@
 """Agent factory and coordinator exports."""
 
-from .control_plane import build_control_plane_agent
+from .control_plane import (
+    build_control_plane_agent,
+    control_plane_change_feed,
+    control_plane_warmup_steps,
+    resolve_control_plane_dependencies,
+)
 from .coordinator import (
     AgentCoordinator,
     ControlPlaneDependencies,
@@ -10,6 +15,9 @@ from .coordinator import (
 
 __all__ = [
     "build_control_plane_agent",
+    "control_plane_change_feed",
+    "control_plane_warmup_steps",
+    "resolve_control_plane_dependencies",
     "AgentCoordinator",
     "ControlPlaneDependencies",
     "CoordinatorDependencies",
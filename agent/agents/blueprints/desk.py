@@ -9,13 +9,14 @@ from typing import Any, Mapping, MutableMapping
 from agent.schemas.envelope import stash_last_envelope
 from agent.services import (
     append_queue_item,
+    append_queue_items,
     ensure_desk_state,
     ensure_guardrail_state,
     seed_queue,
     set_approval_modal,
 )
 from agent.services.objectives import Objective
-from agent.services.outbox import OutboxRecord
+from agent.services.outbox import OutboxRecord, OutboxRecordSummary
 from agent.services.catalog import ToolCatalogEntry
 
 
@@ -54,7 +55,7 @@ class DeskBlueprint:
         state: MutableMapping[str, Any],
         *,
         objectives: Sequence[Objective],
-        pending: Sequence[OutboxRecord] = (),
+        pending: Sequence[OutboxRecordSummary] = (),
     ) -> None:
         """Idempotently seed state when invoked by the callback pipeline."""
 
@@ -66,9 +67,9 @@ class DeskBlueprint:
         self,
         state: MutableMapping[str, Any],
         *,
-        pending: Sequence[OutboxRecord],
+        pending: Sequence[OutboxRecordSummary],
     ) -> None:
-        """Merge pending outbox records into the desk queue."""
+        """Merge pending outbox summaries (or full records) into the desk queue."""
 
         if not pending:
             return
@@ -81,9 +82,10 @@ class DeskBlueprint:
             if isinstance(item, Mapping)
         }
         for record in pending:
-            if record.envelope.envelope_id in seen_ids:
+            item = record.to_shared_state()
+            if item["id"] in seen_ids:
                 continue
-            append_queue_item(state, record.to_shared_state())
+            append_queue_item(state, item)
 
     def guardrail_block_message(self, result) -> str:
         reason = result.reason or f"Request blocked by {result.name} guardrail."
@@ -147,6 +149,35 @@ class DeskBlueprint:
         )
         stash_last_envelope(state, record.envelope)
 
+    def register_envelopes(
+        self,
+        state: MutableMapping[str, Any],
+        *,
+        records: Sequence[OutboxRecord],
+        required_scopes,
+        proposal: Mapping[str, Any] | None,
+    ) -> None:
+        """Persist metadata for a batch of queued envelopes with one commit per state slice."""
+
+        if not records:
+            return
+
+        append_queue_items(state, [record.to_shared_state() for record in records])
+
+        if proposal is None:
+            proposal = {
+                "summary": f"{len(records)} autonomous envelopes queued",
+                "evidence": ["No additional evidence provided"],
+            }
+        last = records[-1]
+        set_approval_modal(
+            state,
+            envelope=last.envelope,
+            required_scopes=list(required_scopes or []),
+            proposal=proposal,
+        )
+        stash_last_envelope(state, last.envelope)
+
     def post_model(self, state: MutableMapping[str, Any], *, response) -> None:  # noqa: D401 - behaviour documented inline
         """Hook for after-model modifier (reserved for future summarisation)."""
 
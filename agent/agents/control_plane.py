@@ -19,27 +19,44 @@ from agent.agents.coordinator import (
     CoordinatorDependencies,
     SurfaceRegistration,
 )
+from agent.guardrails.engine import GuardrailConfig, GuardrailEngine
 from agent.schemas.envelope import Envelope
+from agent.warmup import WarmupStep
 from agent.services import (
     AppSettings,
     AuditLogger,
     CatalogService,
+    CatalogSnapshot,
+    ChangeFeed,
     ComposioCatalogService,
+    GuardrailConfigService,
     InMemoryCatalogService,
+    InMemoryGuardrailConfigService,
+    InMemoryTrustLedgerService,
+    InvalidationBus,
+    EnvelopeScreener,
     InMemoryObjectivesService,
     InMemoryOutboxService,
     ObjectivesService,
     OutboxService,
     SupabaseAuditLogger,
+    SnapshotCatalogService,
     SupabaseCatalogService,
+    SupabaseGuardrailConfigService,
     SupabaseObjectivesService,
     SupabaseOutboxService,
+    SupabasePolicyService,
+    SupabaseTrustLedgerService,
     SupabaseNotConfiguredError,
     StructlogAuditLogger,
     ToolCatalogEntry,
     DEFAULT_OBJECTIVES,
+    build_change_feed,
+    build_payload_offloader,
+    get_composio_client,
     get_settings,
     get_supabase_client,
+    register_cache_handlers,
 )
 
 
@@ -48,7 +65,8 @@ logger = structlog.get_logger(__name__)
 DESK_SURFACE_KEY = "desk"
 CONTROL_PLANE_INSTRUCTION = (
     "You are the control plane agent coordinating tenants' SaaS actions via Composio.\n"
-    "Use the `enqueue_envelope` tool to stage actions for the Outbox worker."
+    "Use the `enqueue_envelope` tool to stage actions for the Outbox worker, or "
+    "`enqueue_envelopes` when a plan produces several actions at once."
 )
 
 
@@ -59,17 +77,23 @@ def build_control_plane_agent(
     objectives_service: ObjectivesService | None = None,
     outbox_service: OutboxService | None = None,
     audit_logger: AuditLogger | None = None,
+    dependencies: CoordinatorDependencies | None = None,
 ) -> Any:
-    """Create an ADKAgent wired with Composio-aware callbacks and tools."""
+    """Create an ADKAgent wired with Composio-aware callbacks and tools.
+
+    Construction performs no remote I/O; pair it with `control_plane_warmup_steps` to
+    hydrate catalogs in the background.
+    """
 
     app_settings = settings or get_settings()
-    dependencies = _resolve_dependencies(
-        app_settings,
-        catalog_service=catalog_service,
-        objectives_service=objectives_service,
-        outbox_service=outbox_service,
-        audit_logger=audit_logger,
-    )
+    if dependencies is None:
+        dependencies = _resolve_dependencies(
+            app_settings,
+            catalog_service=catalog_service,
+            objectives_service=objectives_service,
+            outbox_service=outbox_service,
+            audit_logger=audit_logger,
+        )
 
     coordinator = AgentCoordinator(dependencies)
     coordinator.register_surface(
@@ -85,6 +109,94 @@ def build_control_plane_agent(
     return coordinator.build_adk_agent(DESK_SURFACE_KEY)
 
 
+def resolve_control_plane_dependencies(
+    settings: Optional[AppSettings] = None,
+    *,
+    catalog_service: CatalogService | None = None,
+    objectives_service: ObjectivesService | None = None,
+    outbox_service: OutboxService | None = None,
+    audit_logger: AuditLogger | None = None,
+) -> CoordinatorDependencies:
+    """Resolve the services shared by the agent and the startup warmup."""
+
+    return _resolve_dependencies(
+        settings or get_settings(),
+        catalog_service=catalog_service,
+        objectives_service=objectives_service,
+        outbox_service=outbox_service,
+        audit_logger=audit_logger,
+    )
+
+
+def control_plane_warmup_steps(dependencies: CoordinatorDependencies) -> list[WarmupStep]:
+    """Return the background warmup steps for the API process.
+
+    Reading the catalog and objectives primes the pooled Supabase connection and proves
+    the tables are reachable. The in-memory catalog has no other way to pick up
+    Composio tools, so it is hydrated here. The Supabase catalog is synced by the
+    scheduled `catalog_sync` job and is only synced here when
+    `catalog_sync_on_startup` is enabled. Composio sync steps are optional, so an
+    outage there does not hold readiness. The policy and guardrail steps prime those
+    caches for the default tenant so the first tool call does not pay for them.
+
+    A catalog served from the shared snapshot was warmed by the process that wrote it
+    (see `agent.app.prepare_catalog_snapshot`), so multi-worker API workers skip the
+    catalog steps.
+    """
+
+    settings = dependencies.settings
+    tenant_id = settings.tenant_id
+    catalog = dependencies.catalog_service
+    prewarmed = isinstance(catalog, SnapshotCatalogService)
+    steps = [] if prewarmed else [WarmupStep("catalog", lambda: catalog.list_tools(tenant_id))]
+    steps.append(WarmupStep("objectives", lambda: dependencies.objectives_service.list_objectives(tenant_id)))
+    policy_service = dependencies.policy_service
+    if policy_service is not None:
+        steps.append(
+            WarmupStep(
+                "policies",
+                lambda: policy_service.get_effective_policies(
+                    tenant_id=tenant_id, tool_slugs=[entry.slug for entry in catalog.list_tools(tenant_id)]
+                ),
+            )
+        )
+    guardrail_engine = dependencies.guardrail_engine
+    if guardrail_engine is not None:
+        steps.append(WarmupStep("guardrails", lambda: guardrail_engine.plan_for(tenant_id)))
+    if not prewarmed and settings.composio_api_key and (
+        isinstance(catalog, InMemoryCatalogService) or settings.catalog_sync_on_startup
+    ):
+        steps.append(
+            WarmupStep("catalog_sync", lambda: _sync_catalog_from_composio(settings, catalog), required=False)
+        )
+    return steps
+
+
+def control_plane_change_feed(dependencies: CoordinatorDependencies) -> Optional[ChangeFeed]:
+    """Return the cache invalidation feed for the API process, or None without Supabase.
+
+    Subscribes the policy, guardrail, catalog, and objectives caches, plus the
+    process-wide settings and Supabase client caches. The caller starts and stops it.
+    """
+
+    settings = dependencies.settings
+    client = None
+    if settings.supabase_enabled():
+        try:
+            client = get_supabase_client(settings)
+        except SupabaseNotConfiguredError:
+            return None
+    bus = register_cache_handlers(
+        InvalidationBus(),
+        catalog=dependencies.catalog_service,
+        policy=dependencies.policy_service,
+        guardrails=dependencies.guardrail_engine,
+        objectives=dependencies.objectives_service,
+        process_caches=True,
+    )
+    return build_change_feed(settings, bus, client=client)
+
+
 def _resolve_dependencies(
     settings: AppSettings,
     *,
@@ -101,29 +213,50 @@ def _resolve_dependencies(
             logger.warning("Supabase misconfigured; falling back to in-memory services", exc_info=exc)
 
     if supabase_client is not None:
-        resolved_catalog = catalog_service or SupabaseCatalogService(
-            supabase_client, schema=settings.supabase_schema
+        resolved_catalog = catalog_service or _with_snapshot(
+            settings, SupabaseCatalogService(supabase_client, schema=settings.supabase_schema)
         )
         resolved_objectives = objectives_service or SupabaseObjectivesService(
             supabase_client, schema=settings.supabase_schema
         )
         resolved_outbox = outbox_service or SupabaseOutboxService(
-            supabase_client, schema=settings.supabase_schema
+            supabase_client,
+            schema=settings.supabase_schema,
+            dedup_cache_size=settings.outbox_dedup_cache_size,
+            payloads=build_payload_offloader(settings, supabase_client),
         )
         resolved_audit = audit_logger or SupabaseAuditLogger(
             supabase_client, schema=settings.supabase_schema
         )
-        _sync_catalog_from_composio(settings, resolved_catalog)
-
+        guardrail_configs = SupabaseGuardrailConfigService(
+            supabase_client,
+            defaults=GuardrailConfig.from_settings(settings),
+            schema=settings.supabase_schema,
+            ttl_seconds=settings.guardrail_config_ttl_seconds,
+        )
         return CoordinatorDependencies(
             settings=settings,
             catalog_service=resolved_catalog,
             objectives_service=resolved_objectives,
             outbox_service=resolved_outbox,
             audit_logger=resolved_audit,
+            guardrail_engine=_build_guardrail_engine(settings, guardrail_configs),
+            policy_service=SupabasePolicyService(
+                supabase_client,
+                schema=settings.supabase_schema,
+                ttl_seconds=settings.tool_policy_ttl_seconds,
+            ),
+            trust_ledger=SupabaseTrustLedgerService(
+                supabase_client,
+                schema=settings.supabase_schema,
+                ttl_seconds=settings.trust_score_ttl_seconds,
+            ),
         )
 
-    resolved_catalog = catalog_service or _resolve_in_memory_catalog(settings)
+    resolved_catalog = catalog_service or _with_snapshot(
+        settings,
+        InMemoryCatalogService(entries_by_tenant={settings.tenant_id: _build_demo_catalog_entries()}),
+    )
     resolved_objectives = objectives_service or InMemoryObjectivesService(
         objectives_by_tenant={settings.tenant_id: DEFAULT_OBJECTIVES}
     )
@@ -136,6 +269,28 @@ def _resolve_dependencies(
         objectives_service=resolved_objectives,
         outbox_service=resolved_outbox,
         audit_logger=resolved_audit,
+        guardrail_engine=_build_guardrail_engine(settings, InMemoryGuardrailConfigService()),
+        trust_ledger=InMemoryTrustLedgerService(half_life_seconds=settings.trust_half_life_days * 86400),
+    )
+
+
+def _build_guardrail_engine(settings: AppSettings, configs: GuardrailConfigService) -> GuardrailEngine:
+    return GuardrailEngine(
+        defaults=GuardrailConfig.from_settings(settings),
+        source=configs,
+        ttl_seconds=settings.guardrail_config_ttl_seconds,
+    )
+
+
+def _with_snapshot(settings: AppSettings, catalog: CatalogService) -> CatalogService:
+    """Serve catalog reads from the shared multi-worker snapshot when one is configured."""
+
+    if not settings.catalog_snapshot_path:
+        return catalog
+    return SnapshotCatalogService(
+        CatalogSnapshot(settings.catalog_snapshot_path),
+        source=catalog,
+        refresh_interval=settings.catalog_snapshot_refresh_seconds,
     )
 
 
@@ -143,7 +298,10 @@ def _desk_tools_factory(
     dependencies: CoordinatorDependencies,
     blueprint: DeskBlueprint,
 ) -> Sequence[Any]:
-    return (_build_enqueue_envelope_tool(dependencies, blueprint),)
+    return (
+        _build_enqueue_envelope_tool(dependencies, blueprint),
+        _build_enqueue_envelopes_tool(dependencies, blueprint),
+    )
 
 
 def _build_enqueue_envelope_tool(
@@ -181,6 +339,14 @@ def _build_enqueue_envelope_tool(
                 default_risk=catalog_entry.risk,
             )
             record = outbox_service.enqueue(normalised_envelope)
+            if record.envelope.envelope_id != normalised_envelope.envelope_id:
+                # Replayed tool call: the external_id is already queued, nothing else to record.
+                return {
+                    "status": "queued",
+                    "envelopeId": record.envelope.envelope_id,
+                    "risk": record.envelope.risk,
+                    "deduplicated": True,
+                }
             audit_logger.log_envelope(
                 tenant_id=settings.tenant_id,
                 envelope_id=record.envelope.envelope_id,
@@ -211,26 +377,102 @@ def _build_enqueue_envelope_tool(
     return enqueue_envelope
 
 
-def _resolve_in_memory_catalog(settings: AppSettings) -> CatalogService:
-    if settings.composio_api_key:
+def _build_enqueue_envelopes_tool(
+    dependencies: CoordinatorDependencies,
+    blueprint: DeskBlueprint,
+):
+    outbox_service = dependencies.outbox_service
+    audit_logger = dependencies.audit_logger
+    settings = dependencies.settings
+    screener = EnvelopeScreener(
+        catalog_service=dependencies.catalog_service,
+        guardrail_engine=dependencies.guardrail_engine
+        or GuardrailEngine(defaults=GuardrailConfig.from_settings(settings)),
+        policy_service=dependencies.policy_service,
+        rate_horizon_seconds=settings.outbox_screen_rate_horizon_seconds,
+    )
+
+    def enqueue_envelopes(
+        tool_context: ToolContext,
+        envelopes: Sequence[Mapping[str, Any]],
+        proposal: Mapping[str, Any] | None = None,
+    ) -> Mapping[str, Any]:
+        """Screen and queue a batch of envelopes with one write per stage.
+
+        Envelopes failing schema, policy, rate-bucket, or guardrail screening are
+        reported in `errors` and never reach the outbox.
+        """
+
         try:
-            remote_service = ComposioCatalogService(
-                api_key=settings.composio_api_key,
-                client_id=settings.composio_client_id,
-                client_secret=settings.composio_client_secret,
-                redirect_url=settings.composio_redirect_url,
-                toolkits=settings.default_toolkits,
+            verdicts = screener.screen(
+                settings.tenant_id,
+                list(envelopes or ()),
+                state=tool_context.state,
+                proposal=proposal,
             )
-            entries = remote_service.list_tools(settings.tenant_id)
-            if entries:
-                return InMemoryCatalogService(entries_by_tenant={settings.tenant_id: entries})
-        except RuntimeError as exc:
-            logger.warning("Composio SDK unavailable; using demo catalog", exc_info=exc)
-        except Exception as exc:  # pragma: no cover - defensive logging
-            logger.warning("Failed to hydrate catalog from Composio", exc_info=exc)
+            accepted: list[Envelope] = []
+            scopes: list[str] = []
+            errors: list[Mapping[str, Any]] = []
+
+            for verdict in verdicts:
+                if not verdict.allowed or verdict.envelope is None or verdict.catalog_entry is None:
+                    errors.append({"index": verdict.index, "message": verdict.message(), "checks": list(verdict.reasons)})
+                    continue
+                accepted.append(verdict.envelope)
+                for scope in verdict.catalog_entry.required_scopes:
+                    if scope not in scopes:
+                        scopes.append(scope)
+
+            records = tuple(outbox_service.enqueue_many(accepted)) if accepted else ()
+            # Records whose external_id was already queued come back with their original id.
+            fresh_ids = {envelope.envelope_id for envelope in accepted}
+            fresh = tuple(record for record in records if record.envelope.envelope_id in fresh_ids)
+            if fresh:
+                audit_logger.log_envelopes(
+                    tenant_id=settings.tenant_id,
+                    entries=[
+                        {
+                            "envelope_id": record.envelope.envelope_id,
+                            "tool_slug": record.envelope.tool_slug,
+                            "status": record.status,
+                        }
+                        for record in fresh
+                    ],
+                )
+
+                for default_scope in settings.composio_default_scopes:
+                    if default_scope not in scopes:
+                        scopes.append(default_scope)
+                blueprint.register_envelopes(
+                    tool_context.state,
+                    records=fresh,
+                    required_scopes=scopes,
+                    proposal=proposal,
+                )
+
+            if errors and not records:
+                status = "error"
+            elif errors:
+                status = "partial"
+            else:
+                status = "queued"
+            return {
+                "status": status,
+                "queued": [
+                    {
+                        "envelopeId": record.envelope.envelope_id,
+                        "risk": record.envelope.risk,
+                        "deduplicated": record.envelope.envelope_id not in fresh_ids,
+                    }
+                    for record in records
+                ],
+                "errors": errors,
+            }
+        except Exception as exc:  # pragma: no cover - defensive path
+            return {"status": "error", "message": str(exc)}
 
-    entries = _build_demo_catalog_entries()
-    return InMemoryCatalogService(entries_by_tenant={settings.tenant_id: entries})
+    enqueue_envelopes.__name__ = "enqueue_envelopes"
+    return enqueue_envelopes
 
 
 def _sync_catalog_from_composio(settings: AppSettings, catalog_service: CatalogService) -> None:
@@ -240,19 +482,18 @@ def _sync_catalog_from_composio(settings: AppSettings, catalog_service: CatalogS
     if not hasattr(catalog_service, "sync_entries"):
         return
 
-    try:
-        remote_service = ComposioCatalogService(
-            api_key=settings.composio_api_key,
-            client_id=settings.composio_client_id,
-            client_secret=settings.composio_client_secret,
-            redirect_url=settings.composio_redirect_url,
-            toolkits=settings.default_toolkits,
-        )
-        entries = remote_service.list_tools(settings.tenant_id)
-        if entries:
-            catalog_service.sync_entries(settings.tenant_id, entries)  # type: ignore[attr-defined]
-    except Exception as exc:  # pragma: no cover - defensive logging
-        logger.warning("Failed to sync catalog from Composio", exc_info=exc)
+    # Failures propagate to the warmup step, which logs them without blocking readiness.
+    remote_service = ComposioCatalogService(
+        api_key=settings.composio_api_key,
+        client_id=settings.composio_client_id,
+        client_secret=settings.composio_client_secret,
+        redirect_url=settings.composio_redirect_url,
+        toolkits=settings.default_toolkits,
+        client=get_composio_client(settings),
+    )
+    entries = remote_service.list_tools(settings.tenant_id)
+    if entries:
+        catalog_service.sync_entries(settings.tenant_id, entries)  # type: ignore[attr-defined]
 
 
 def _build_demo_catalog_entries() -> Sequence[ToolCatalogEntry]:
@@ -18,6 +18,7 @@ from agent.callbacks import (
     build_before_model_modifier,
     build_on_before_agent,
 )
+from agent.guardrails.engine import GuardrailEngine
 from agent.services import (
     AppSettings,
     AuditLogger,
@@ -25,6 +26,8 @@ from agent.services import (
     InMemoryOutboxService,
     ObjectivesService,
     OutboxService,
+    PolicyService,
+    TrustLedgerService,
 )
 
 
@@ -62,6 +65,15 @@ class BlueprintProtocol:
         proposal: Mapping[str, Any] | None,
     ) -> None: ...
 
+    def register_envelopes(
+        self,
+        state: MutableMapping[str, Any],
+        *,
+        records: Sequence[Any],
+        required_scopes: Sequence[str] | None,
+        proposal: Mapping[str, Any] | None,
+    ) -> None: ...
+
     def post_model(self, state: MutableMapping[str, Any], *, response: Any) -> None: ...
 
 
@@ -74,6 +86,9 @@ class CoordinatorDependencies:
     objectives_service: ObjectivesService
     outbox_service: OutboxService
     audit_logger: AuditLogger
+    guardrail_engine: GuardrailEngine | None = None
+    policy_service: PolicyService | None = None
+    trust_ledger: TrustLedgerService | None = None
 
 
 # Backwards compatibility alias for existing imports.
@@ -151,6 +166,8 @@ class AgentCoordinator:
             objectives_service=deps.objectives_service,
             audit_logger=deps.audit_logger,
             outbox_service=deps.outbox_service,
+            guardrail_engine=deps.guardrail_engine,
+            trust_ledger=deps.trust_ledger,
         )
         after_model = build_after_model_modifier(blueprint=blueprint)
 
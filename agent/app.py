@@ -2,38 +2,72 @@
 
 from __future__ import annotations
 
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from typing import Any, AsyncIterator
+
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from ag_ui_adk import add_adk_fastapi_endpoint
 
-from .agents import build_control_plane_agent
+from .agents import (
+    build_control_plane_agent,
+    control_plane_change_feed,
+    control_plane_warmup_steps,
+    resolve_control_plane_dependencies,
+)
 from .analytics import router as analytics_router
-from .services.settings import get_settings
+from .services.settings import AppSettings, get_settings
+from .services.snapshot import SnapshotCatalogService, write_catalog_snapshot
+from .warmup import StartupWarmup
 
 
 load_dotenv()
 
 settings = get_settings()
 
-app = FastAPI(title="AI Employee Control Plane")
+# Resolving dependencies and building the agent is local-only; remote catalog reads
+# and Composio hydration run in the warmup thread started by the lifespan below.
+dependencies = resolve_control_plane_dependencies(settings)
+warmup = StartupWarmup(control_plane_warmup_steps(dependencies))
+# Evicts policy/guardrail/catalog cache entries when the database reports a change.
+change_feed = control_plane_change_feed(dependencies)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    warmup.start()
+    if change_feed is not None:
+        change_feed.start()
+    yield
+    warmup.stop()
+    if change_feed is not None:
+        change_feed.stop()
 
-adk_agent = build_control_plane_agent(settings=settings)
+
+app = FastAPI(title="AI Employee Control Plane", lifespan=lifespan)
+
+adk_agent = build_control_plane_agent(settings=settings, dependencies=dependencies)
 add_adk_fastapi_endpoint(app, adk_agent, path="/")
 app.include_router(analytics_router)
 
 
 @app.get("/healthz")
 def healthz() -> dict[str, str]:
-    """Basic readiness probe for the control plane."""
+    """Liveness probe: returns ok as soon as the app is serving requests."""
 
     return {"status": "ok"}
 
 
 @app.get("/readyz")
-def readyz() -> dict[str, str]:
-    """Liveness probe: returns ok when the app is serving requests."""
+def readyz() -> Any:
+    """Readiness probe: 503 with warmup progress until catalog caches are warm."""
 
-    return {"status": "ok"}
+    snapshot = warmup.snapshot()
+    return JSONResponse(snapshot, status_code=200 if warmup.ready else 503)
 
 
 @app.get("/metrics", response_class=None)
@@ -45,10 +79,27 @@ def metrics() -> str:
 
 
 def main() -> None:
-    """Serve the ASGI app with Uvicorn."""
+    """Serve the ASGI app with Uvicorn.
+
+    With `api_workers > 1` the parent process warms the catalog once, writes the shared
+    snapshot, and exports its path so every worker serves from it instead of warming
+    on its own.
+    """
 
     import uvicorn
 
+    if settings.api_workers > 1:
+        snapshot_path = prepare_catalog_snapshot(settings)
+        os.environ["AI_EMPLOYEE_CATALOG_SNAPSHOT_PATH"] = snapshot_path
+        uvicorn.run(
+            "agent.app:app",
+            host=settings.api_host,
+            port=settings.api_port,
+            workers=settings.api_workers,
+            log_level="info",
+        )
+        return
+
     uvicorn.run(
         app,
         host=settings.api_host,
@@ -57,5 +108,20 @@ def main() -> None:
     )
 
 
+def prepare_catalog_snapshot(app_settings: AppSettings) -> str:
+    """Run the warmup in this process and write the catalog snapshot workers will map."""
+
+    path = app_settings.catalog_snapshot_path or os.path.join(
+        tempfile.gettempdir(), f"ai-employee-catalog-{app_settings.api_port}.json"
+    )
+    catalog = dependencies.catalog_service
+    if isinstance(catalog, SnapshotCatalogService):
+        catalog = catalog.source
+    # Warm the source catalog itself: steps built for a snapshot-served catalog skip it.
+    StartupWarmup(control_plane_warmup_steps(replace(dependencies, catalog_service=catalog))).run()
+    write_catalog_snapshot(path, catalog, [app_settings.tenant_id])
+    return path
+
+
 if __name__ == "__main__":  # pragma: no cover - convenience entrypoint
     main()
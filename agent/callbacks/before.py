@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from typing import Sequence
+from typing import Any, Mapping, MutableMapping, Sequence
+
+import structlog
 
 try:  # pragma: no cover - fail fast when google-adk is missing
     from google.adk.agents.callback_context import CallbackContext
@@ -15,16 +17,25 @@ except ImportError as exc:  # pragma: no cover
     ) from exc
 
 from agent.callbacks.guardrails import GuardrailResult, run_guardrails
+from agent.guardrails.engine import GuardrailEngine
 from agent.services import (
     AuditLogger,
     CatalogService,
     ObjectivesService,
     OutboxService,
+    OutboxStatus,
+    TrustEventKind,
+    TrustLedgerService,
+    mark_approval_decision_recorded,
+    pending_approval_decision,
     write_guardrail_results,
 )
 from agent.services.settings import AppSettings
 
 
+logger = structlog.get_logger(__name__)
+
+
 def build_on_before_agent(
     *,
     blueprint,
@@ -36,7 +47,9 @@ def build_on_before_agent(
 
     def on_before_agent(callback_context: CallbackContext) -> None:
         objectives = objectives_service.list_objectives(settings.tenant_id)
-        pending = outbox_service.list_pending(tenant_id=settings.tenant_id, limit=25)
+        pending = outbox_service.list_summaries(
+            status=OutboxStatus.PENDING, tenant_id=settings.tenant_id, limit=25
+        )
         blueprint.ensure_shared_state(
             callback_context.state,
             objectives=objectives,
@@ -54,13 +67,22 @@ def build_before_model_modifier(
     objectives_service: ObjectivesService,
     audit_logger: AuditLogger,
     outbox_service: OutboxService,
+    guardrail_engine: GuardrailEngine | None = None,
+    trust_ledger: TrustLedgerService | None = None,
 ):
-    """Return the before-model modifier bound to the configured dependencies."""
+    """Return the before-model modifier bound to the configured dependencies.
+
+    With a `guardrail_engine`, guardrails use the tenant's cached configuration instead
+    of the global settings. With a `trust_ledger`, approval decisions are recorded and
+    the trust guardrail reads the ledger score.
+    """
 
     def before_model_modifier(
         callback_context: CallbackContext, llm_request: LlmRequest
     ) -> LlmResponse | None:
-        evaluations = run_guardrails(callback_context, settings=settings)
+        if trust_ledger is not None:
+            _sync_trust_ledger(callback_context.state, trust_ledger, tenant_id=settings.tenant_id)
+        evaluations = run_guardrails(callback_context, settings=settings, engine=guardrail_engine)
         write_guardrail_results(callback_context.state, evaluations=evaluations)
 
         for evaluation in evaluations:
@@ -79,7 +101,9 @@ def build_before_model_modifier(
 
         objectives = objectives_service.list_objectives(settings.tenant_id)
         entries = catalog_service.list_tools(settings.tenant_id)
-        pending = outbox_service.list_pending(tenant_id=settings.tenant_id, limit=25)
+        pending = outbox_service.list_summaries(
+            status=OutboxStatus.PENDING, tenant_id=settings.tenant_id, limit=25
+        )
         prompt_prefix = blueprint.prompt_prefix(objectives=objectives, catalog_entries=entries)
         if prompt_prefix:
             _prepend_instruction(llm_request, prompt_prefix)
@@ -94,6 +118,40 @@ def build_before_model_modifier(
     return before_model_modifier
 
 
+def _sync_trust_ledger(state: MutableMapping[str, Any], ledger: TrustLedgerService, *, tenant_id: str) -> None:
+    """Record a fresh approval decision and expose the ledger score to the trust guardrail.
+
+    Ledger errors are logged and never block the turn; an unrecorded decision stays
+    pending and is retried on the next turn.
+    """
+
+    employee_id = state.get("employee_id")
+    employee_id = str(employee_id) if employee_id else None
+    decision = pending_approval_decision(state)
+    if decision is not None:
+        envelope_id, approval_state = decision
+        kind = TrustEventKind.APPROVED if approval_state == "authorized" else TrustEventKind.REJECTED
+        try:
+            ledger.record_event(tenant_id, kind, employee_id=employee_id, envelope_id=envelope_id)
+        except Exception:
+            logger.warning("callbacks.trust_ledger_failed", envelope_id=envelope_id, kind=kind)
+        else:
+            mark_approval_decision_recorded(state, envelope_id)
+
+    try:
+        score = ledger.get_score(tenant_id, employee_id=employee_id)
+    except Exception:
+        logger.warning("callbacks.trust_score_unavailable", tenant_id=tenant_id)
+        return
+    if score is None or score.score is None:
+        return
+    current = state.get("trust")
+    current = current if isinstance(current, Mapping) else {}
+    value = round(score.score, 4)
+    if current.get("score") != value or current.get("source") != "ledger":
+        state["trust"] = {**current, "score": value, "source": "ledger"}
+
+
 def _find_blocking_guardrail(evaluations: Sequence[GuardrailResult]) -> GuardrailResult | None:
     return next((result for result in evaluations if not result.allowed), None)
 
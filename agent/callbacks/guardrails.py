@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Optional, Tuple
+from typing import Tuple
 
 try:  # pragma: no cover - fail fast when google-adk is missing
     from google.adk.agents.callback_context import CallbackContext
@@ -15,12 +15,17 @@ except ImportError as exc:  # pragma: no cover
 
 from ..services.settings import AppSettings, get_settings
 
-from ..guardrails import resolve_quiet_hours_window
-from ..guardrails.evidence import check as evidence_check
-from ..guardrails.quiet_hours import check as quiet_hours_check
-from ..guardrails.scopes import check as scopes_check
+from ..guardrails.engine import (
+    EVIDENCE_REQUIREMENT,
+    QUIET_HOURS,
+    SCOPE_VALIDATION,
+    TRUST_THRESHOLD,
+    GuardrailConfig,
+    GuardrailEngine,
+    GuardrailInput,
+    compile_plan,
+)
 from ..guardrails.shared import GuardrailResult
-from ..guardrails.trust import check as trust_check
 
 
 def enforce_quiet_hours(
@@ -30,17 +35,7 @@ def enforce_quiet_hours(
 ) -> GuardrailResult:
     """Evaluate quiet hours against the configured window."""
 
-    active_settings = settings or get_settings()
-    window, reason = resolve_quiet_hours_window(
-        active_settings.quiet_hours_start_hour,
-        active_settings.quiet_hours_end_hour,
-    )
-    return quiet_hours_check(
-        callback_context,
-        quiet_window=window,
-        clock=_utc_now,
-        configuration_message=reason,
-    )
+    return _evaluate_rule(QUIET_HOURS, callback_context, settings)
 
 
 def enforce_trust_threshold(
@@ -50,23 +45,7 @@ def enforce_trust_threshold(
 ) -> GuardrailResult:
     """Evaluate trust signals against the configured threshold."""
 
-    active_settings = settings or get_settings()
-    tenant_state = getattr(callback_context, "state", {}) or {}
-    trust_state = tenant_state.get("trust") if isinstance(tenant_state, dict) else None
-
-    approvals_ratio = None
-    source = None
-
-    if isinstance(trust_state, dict):
-        approvals_ratio = trust_state.get("score")
-        source = trust_state.get("source")
-
-    return trust_check(
-        callback_context,
-        approvals_ratio=approvals_ratio,
-        threshold=active_settings.trust_threshold,
-        source=source,
-    )
+    return _evaluate_rule(TRUST_THRESHOLD, callback_context, settings)
 
 
 def enforce_scope_validation(
@@ -76,31 +55,7 @@ def enforce_scope_validation(
 ) -> GuardrailResult:
     """Ensure requested scopes are enabled when enforcement is active."""
 
-    active_settings = settings or get_settings()
-    if not active_settings.enforce_scope_validation:
-        return GuardrailResult(
-            "scope_validation",
-            allowed=True,
-            reason="scope validation disabled via settings",
-            metadata={
-                "requestedScopes": [],
-                "enabledScopes": [],
-                "missingScopes": [],
-            },
-        )
-
-    state = getattr(callback_context, "state", {})
-    requested = None
-    enabled = None
-    if isinstance(state, dict):
-        requested = state.get("requested_scopes")
-        enabled = state.get("enabled_scopes")
-
-    return scopes_check(
-        callback_context,
-        requested_scopes=requested,
-        enabled_scopes=enabled,
-    )
+    return _evaluate_rule(SCOPE_VALIDATION, callback_context, settings)
 
 
 def ensure_evidence_present(
@@ -110,43 +65,40 @@ def ensure_evidence_present(
 ) -> GuardrailResult:
     """Ensure a proposal contains usable supporting evidence when required."""
 
-    active_settings = settings or get_settings()
-    if not active_settings.require_evidence:
-        return GuardrailResult(
-            "evidence_requirement",
-            allowed=True,
-            reason="evidence requirement disabled via settings",
-            metadata={"required": False, "missingEvidence": []},
-        )
-
-    state = getattr(callback_context, "state", {})
-    proposal = state.get("proposal") if isinstance(state, dict) else None
-
-    if proposal is None:
-        return GuardrailResult(
-            "evidence_requirement",
-            allowed=True,
-            reason="no proposal to evaluate; allowing",
-            metadata={"required": True, "missingEvidence": []},
-        )
-
-    return evidence_check(callback_context, proposal)
+    return _evaluate_rule(EVIDENCE_REQUIREMENT, callback_context, settings)
 
 
 def run_guardrails(
     callback_context: CallbackContext,
     *,
     settings: AppSettings | None = None,
+    engine: GuardrailEngine | None = None,
+    short_circuit: bool = False,
 ) -> Tuple[GuardrailResult, ...]:
-    """Evaluate all guardrails for the current invocation."""
-
-    evaluations: Tuple[GuardrailResult, ...] = (
-        enforce_quiet_hours(callback_context, settings=settings),
-        enforce_trust_threshold(callback_context, settings=settings),
-        enforce_scope_validation(callback_context, settings=settings),
-        ensure_evidence_present(callback_context, settings=settings),
-    )
-    return evaluations
+    """Evaluate all guardrails for the current invocation.
+
+    With an `engine` the tenant's compiled plan is used; otherwise the plan compiled
+    from the global settings (memoised by configuration value).
+    """
+
+    active_settings = settings or get_settings()
+    facts = GuardrailInput.from_state(getattr(callback_context, "state", None))
+    if engine is not None:
+        return engine.evaluate(active_settings.tenant_id, facts, now=_utc_now(), short_circuit=short_circuit)
+    plan = compile_plan(GuardrailConfig.from_settings(active_settings))
+    return plan.evaluate(facts, now=_utc_now(), short_circuit=short_circuit)
+
+
+def _evaluate_rule(
+    name: str,
+    callback_context: CallbackContext,
+    settings: AppSettings | None,
+) -> GuardrailResult:
+    """Evaluate one rule of the settings-compiled plan that `run_guardrails` uses."""
+
+    plan = compile_plan(GuardrailConfig.from_settings(settings or get_settings()))
+    facts = GuardrailInput.from_state(getattr(callback_context, "state", None))
+    return plan.evaluate_rule(name, facts, now=_utc_now())
 
 
 def _utc_now() -> datetime:
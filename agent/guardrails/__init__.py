@@ -1,11 +1,18 @@
 """Guardrail helpers and implementations for the agent control plane."""
 
-from . import evidence, quiet_hours, scopes, trust
+from . import engine, evidence, quiet_hours, scopes, trust
+from .engine import GuardrailConfig, GuardrailEngine, GuardrailInput, GuardrailPlan, compile_plan
 from .shared import GuardrailResult, resolve_quiet_hours_window
 
 __all__ = [
+    "GuardrailConfig",
+    "GuardrailEngine",
+    "GuardrailInput",
+    "GuardrailPlan",
+    "compile_plan",
     "GuardrailResult",
     "resolve_quiet_hours_window",
+    "engine",
     "evidence",
     "quiet_hours",
     "scopes",
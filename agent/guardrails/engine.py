@@ -0,0 +1,432 @@
+"""Compiled guardrail evaluation plans.
+
+A tenant's guardrail configuration (a `guardrails` row, or the global settings when no
+row exists) is normalised into a hashable `GuardrailConfig` and compiled once into a
+`GuardrailPlan`: rules that are disabled or misconfigured collapse to a shared constant
+result, thresholds and quiet windows are validated up front, and rules that depend only
+on the clock are evaluated once per batch. Plans evaluate a single invocation or a whole
+batch of envelopes, optionally stopping at the first blocking rule.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time as _time
+from dataclasses import dataclass
+from datetime import datetime, time, timezone
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Mapping, Optional, Protocol, Sequence, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import structlog
+
+from . import evidence, quiet_hours, scopes, trust
+from .shared import GuardrailResult, resolve_quiet_hours_window
+
+
+logger = structlog.get_logger("guardrails.engine")
+
+QUIET_HOURS = "quiet_hours"
+TRUST_THRESHOLD = "trust_threshold"
+SCOPE_VALIDATION = "scope_validation"
+EVIDENCE_REQUIREMENT = "evidence_requirement"
+
+
+@dataclass(frozen=True, slots=True)
+class GuardrailConfig:
+    """Normalised, hashable guardrail configuration for one tenant."""
+
+    quiet_start_hour: Optional[int] = None
+    quiet_end_hour: Optional[int] = None
+    timezone: str = "UTC"
+    trust_threshold: float = 0.8
+    enforce_scopes: bool = True
+    enabled_scopes: frozenset[str] = frozenset()
+    require_evidence: bool = True
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "GuardrailConfig":
+        return cls(
+            quiet_start_hour=settings.quiet_hours_start_hour,
+            quiet_end_hour=settings.quiet_hours_end_hour,
+            timezone=settings.quiet_hours_timezone or "UTC",
+            trust_threshold=float(settings.trust_threshold),
+            enforce_scopes=bool(settings.enforce_scope_validation),
+            require_evidence=bool(settings.require_evidence),
+        )
+
+    @classmethod
+    def from_record(cls, record: Mapping[str, Any], *, defaults: "GuardrailConfig") -> "GuardrailConfig":
+        """Build a config from a `guardrails` row, falling back to `defaults` per column.
+
+        `quiet_hours` accepts `{"start_hour": 22, "end_hour": 6}` or `{"start": "22:00",
+        "end": "06:00"}`, with an optional IANA `"timezone"` the hours are local to; keys
+        that are missing keep the default. `scopes` accepts `{"enforce": bool, "enabled":
+        [...]}`. A non-numeric `trust_threshold` is logged and ignored.
+        """
+
+        start, end = defaults.quiet_start_hour, defaults.quiet_end_hour
+        zone = defaults.timezone
+        quiet = record.get("quiet_hours")
+        if isinstance(quiet, Mapping):
+            if "start_hour" in quiet or "start" in quiet:
+                start = _parse_hour(quiet.get("start_hour", quiet.get("start")))
+            if "end_hour" in quiet or "end" in quiet:
+                end = _parse_hour(quiet.get("end_hour", quiet.get("end")))
+            zone = str(quiet.get("timezone") or zone)
+
+        threshold = _parse_threshold(record.get("trust_threshold"))
+        scope_config = record.get("scopes")
+        enforce = defaults.enforce_scopes
+        enabled = defaults.enabled_scopes
+        if isinstance(scope_config, Mapping):
+            if "enforce" in scope_config:
+                enforce = bool(scope_config["enforce"])
+            raw_enabled = scope_config.get("enabled")
+            if isinstance(raw_enabled, Iterable) and not isinstance(raw_enabled, (str, bytes)):
+                enabled = frozenset(str(scope).strip().lower() for scope in raw_enabled if scope)
+
+        require_evidence = record.get("require_evidence")
+        return cls(
+            quiet_start_hour=start,
+            quiet_end_hour=end,
+            timezone=zone,
+            trust_threshold=defaults.trust_threshold if threshold is None else float(threshold),
+            enforce_scopes=enforce,
+            enabled_scopes=enabled,
+            require_evidence=defaults.require_evidence if require_evidence is None else bool(require_evidence),
+        )
+
+
+@dataclass(slots=True)
+class GuardrailInput:
+    """Facts a plan evaluates: one per invocation, or one per envelope in a batch."""
+
+    trust_score: Optional[float] = None
+    trust_source: Optional[str] = None
+    requested_scopes: Optional[Iterable[str]] = None
+    enabled_scopes: Optional[Iterable[str]] = None
+    proposal: Optional[Mapping[str, Any]] = None
+
+    @classmethod
+    def from_state(cls, state: Any) -> "GuardrailInput":
+        """Read the guardrail inputs the callbacks keep in session state."""
+
+        if not isinstance(state, Mapping) and not hasattr(state, "get"):
+            return cls()
+        trust_state = state.get("trust")
+        score = source = None
+        if isinstance(trust_state, Mapping):
+            score = trust_state.get("score")
+            source = trust_state.get("source")
+        return cls(
+            trust_score=score,
+            trust_source=source,
+            requested_scopes=state.get("requested_scopes"),
+            enabled_scopes=state.get("enabled_scopes"),
+            proposal=state.get("proposal"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class _CompiledRule:
+    name: str
+    evaluate: Callable[[GuardrailInput, datetime], GuardrailResult]
+    # Clock-only rules give the same answer for every input in a batch.
+    clock_only: bool = False
+
+
+class GuardrailPlan:
+    """An immutable, pre-validated sequence of guardrail rules."""
+
+    __slots__ = ("_rules", "config")
+
+    def __init__(self, config: GuardrailConfig, rules: Sequence[_CompiledRule]) -> None:
+        self.config = config
+        self._rules = tuple(rules)
+
+    @property
+    def rule_names(self) -> tuple[str, ...]:
+        return tuple(rule.name for rule in self._rules)
+
+    def evaluate(
+        self,
+        facts: GuardrailInput,
+        *,
+        now: Optional[datetime] = None,
+        short_circuit: bool = False,
+    ) -> Tuple[GuardrailResult, ...]:
+        """Evaluate every rule (or stop after the first blocking one with `short_circuit`)."""
+
+        moment = now or _utc_now()
+        results: list[GuardrailResult] = []
+        for rule in self._rules:
+            result = rule.evaluate(facts, moment)
+            results.append(result)
+            if short_circuit and not result.allowed:
+                break
+        return tuple(results)
+
+    def evaluate_rule(
+        self,
+        name: str,
+        facts: GuardrailInput,
+        *,
+        now: Optional[datetime] = None,
+    ) -> GuardrailResult:
+        """Evaluate the single rule called `name` (raises `KeyError` for unknown names)."""
+
+        for rule in self._rules:
+            if rule.name == name:
+                return rule.evaluate(facts, now or _utc_now())
+        raise KeyError(name)
+
+    def evaluate_many(
+        self,
+        batch: Sequence[GuardrailInput],
+        *,
+        now: Optional[datetime] = None,
+        short_circuit: bool = True,
+    ) -> list[Tuple[GuardrailResult, ...]]:
+        """Evaluate a batch against one clock reading, sharing clock-only rule results."""
+
+        moment = now or _utc_now()
+        shared = {rule.name: rule.evaluate(GuardrailInput(), moment) for rule in self._rules if rule.clock_only}
+
+        # A block from a leading clock-only rule (e.g. quiet hours) decides the whole batch.
+        prefix: list[GuardrailResult] = []
+        for rule in self._rules:
+            if not rule.clock_only:
+                break
+            prefix.append(shared[rule.name])
+            if short_circuit and not prefix[-1].allowed:
+                decided = tuple(prefix)
+                return [decided for _ in batch]
+
+        outcomes: list[Tuple[GuardrailResult, ...]] = []
+        for facts in batch:
+            results: list[GuardrailResult] = []
+            for rule in self._rules:
+                result = shared[rule.name] if rule.clock_only else rule.evaluate(facts, moment)
+                results.append(result)
+                if short_circuit and not result.allowed:
+                    break
+            outcomes.append(tuple(results))
+        return outcomes
+
+
+@lru_cache(maxsize=256)
+def compile_plan(config: GuardrailConfig) -> GuardrailPlan:
+    """Compile (and memoise by value) the evaluation plan for a configuration."""
+
+    return GuardrailPlan(
+        config,
+        (
+            _compile_quiet_hours(config),
+            _compile_trust(config),
+            _compile_scopes(config),
+            _compile_evidence(config),
+        ),
+    )
+
+
+class GuardrailConfigSource(Protocol):
+    """Anything that can return a tenant's `GuardrailConfig` (or `None` for defaults)."""
+
+    def get_config(self, tenant_id: str) -> Optional[GuardrailConfig]:
+        ...
+
+
+class GuardrailEngine:
+    """Per-tenant plan cache in front of a configuration source.
+
+    Plans are looked up at most once per `ttl_seconds` per tenant; because compilation is
+    memoised by configuration value, tenants sharing a configuration share one plan.
+    `plan_for` never raises: a source error or a configuration that cannot be compiled
+    is logged and the tenant gets the default plan until its entry expires.
+    """
+
+    def __init__(
+        self,
+        *,
+        defaults: GuardrailConfig,
+        source: GuardrailConfigSource | None = None,
+        ttl_seconds: float = 60.0,
+        clock: Callable[[], float] = _time.monotonic,
+    ) -> None:
+        self._defaults = defaults
+        self._source = source
+        self._ttl = max(0.0, ttl_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._plans: dict[str, tuple[float, GuardrailPlan]] = {}
+
+    def plan_for(self, tenant_id: str) -> GuardrailPlan:
+        now = self._clock()
+        with self._lock:
+            cached = self._plans.get(tenant_id)
+            if cached is not None and now - cached[0] < self._ttl:
+                return cached[1]
+        config: Optional[GuardrailConfig] = None
+        if self._source is not None:
+            try:
+                config = self._source.get_config(tenant_id)
+            except Exception as exc:
+                logger.warning("guardrails.config_unavailable", tenant_id=tenant_id, error=str(exc))
+        try:
+            plan = compile_plan(config or self._defaults)
+        except Exception as exc:
+            logger.warning("guardrails.config_invalid", tenant_id=tenant_id, error=str(exc))
+            plan = compile_plan(self._defaults)
+        with self._lock:
+            self._plans[tenant_id] = (now, plan)
+        return plan
+
+    def evaluate(
+        self,
+        tenant_id: str,
+        facts: GuardrailInput,
+        *,
+        now: Optional[datetime] = None,
+        short_circuit: bool = False,
+    ) -> Tuple[GuardrailResult, ...]:
+        return self.plan_for(tenant_id).evaluate(facts, now=now, short_circuit=short_circuit)
+
+    def evaluate_many(
+        self,
+        tenant_id: str,
+        batch: Sequence[GuardrailInput],
+        *,
+        now: Optional[datetime] = None,
+        short_circuit: bool = True,
+    ) -> list[Tuple[GuardrailResult, ...]]:
+        return self.plan_for(tenant_id).evaluate_many(batch, now=now, short_circuit=short_circuit)
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        """Drop cached plans (and the source's cached config) after a config change."""
+
+        source_invalidate = getattr(self._source, "invalidate", None)
+        if callable(source_invalidate):
+            source_invalidate(tenant_id)
+        with self._lock:
+            if tenant_id is None:
+                self._plans.clear()
+            else:
+                self._plans.pop(tenant_id, None)
+
+
+def _compile_quiet_hours(config: GuardrailConfig) -> _CompiledRule:
+    try:
+        zone = ZoneInfo(config.timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        constant = quiet_hours.check(None, None, configuration_message="invalid quiet hours timezone; allowing")
+        return _CompiledRule(QUIET_HOURS, lambda _facts, _now: constant, clock_only=True)
+
+    window, message = resolve_quiet_hours_window(config.quiet_start_hour, config.quiet_end_hour, zone)
+    if window is None:
+        constant = quiet_hours.check(None, None, configuration_message=message)
+        return _CompiledRule(QUIET_HOURS, lambda _facts, _now: constant, clock_only=True)
+
+    def _evaluate(_facts: GuardrailInput, now: datetime) -> GuardrailResult:
+        return quiet_hours.check(None, window, clock=lambda: now)
+
+    return _CompiledRule(QUIET_HOURS, _evaluate, clock_only=True)
+
+
+def _compile_trust(config: GuardrailConfig) -> _CompiledRule:
+    threshold = config.trust_threshold
+    if not 0.0 <= threshold <= 1.0:
+        # Fail closed: nothing auto-runs until the threshold is fixed.
+        logger.warning("guardrails.trust_threshold_invalid", threshold=threshold)
+        constant = GuardrailResult(
+            TRUST_THRESHOLD,
+            allowed=False,
+            reason=f"invalid trust threshold {threshold!r} (expected 0-1); blocking",
+            metadata={"threshold": threshold, "invalidThreshold": True},
+        )
+        return _CompiledRule(TRUST_THRESHOLD, lambda _facts, _now: constant)
+
+    def _evaluate(facts: GuardrailInput, _now: datetime) -> GuardrailResult:
+        return trust.check(None, approvals_ratio=facts.trust_score, threshold=threshold, source=facts.trust_source)
+
+    return _CompiledRule(TRUST_THRESHOLD, _evaluate)
+
+
+def _compile_scopes(config: GuardrailConfig) -> _CompiledRule:
+    if not config.enforce_scopes:
+        constant = GuardrailResult(
+            SCOPE_VALIDATION,
+            allowed=True,
+            reason="scope validation disabled via settings",
+            metadata={"requestedScopes": [], "enabledScopes": [], "missingScopes": []},
+        )
+        return _CompiledRule(SCOPE_VALIDATION, lambda _facts, _now: constant)
+
+    tenant_enabled = config.enabled_scopes
+
+    def _evaluate(facts: GuardrailInput, _now: datetime) -> GuardrailResult:
+        enabled = facts.enabled_scopes
+        if tenant_enabled:
+            enabled = tenant_enabled.union(enabled or ())
+        return scopes.check(None, requested_scopes=facts.requested_scopes, enabled_scopes=enabled)
+
+    return _CompiledRule(SCOPE_VALIDATION, _evaluate)
+
+
+def _compile_evidence(config: GuardrailConfig) -> _CompiledRule:
+    if not config.require_evidence:
+        constant = GuardrailResult(
+            EVIDENCE_REQUIREMENT,
+            allowed=True,
+            reason="evidence requirement disabled via settings",
+            metadata={"required": False, "missingEvidence": []},
+        )
+        return _CompiledRule(EVIDENCE_REQUIREMENT, lambda _facts, _now: constant)
+
+    no_proposal = GuardrailResult(
+        EVIDENCE_REQUIREMENT,
+        allowed=True,
+        reason="no proposal to evaluate; allowing",
+        metadata={"required": True, "missingEvidence": []},
+    )
+
+    def _evaluate(facts: GuardrailInput, _now: datetime) -> GuardrailResult:
+        if facts.proposal is None:
+            return no_proposal
+        return evidence.check(None, facts.proposal)  # type: ignore[arg-type]
+
+    return _CompiledRule(EVIDENCE_REQUIREMENT, _evaluate)
+
+
+def _parse_threshold(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        threshold = float(value)
+    except (TypeError, ValueError):
+        threshold = math.nan
+    if math.isnan(threshold):
+        logger.warning("guardrails.trust_threshold_unparseable", value=str(value))
+        return None
+    return threshold
+
+
+def _parse_hour(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, time):
+        return value.hour
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        return int(text.split(":", 1)[0])
+    except ValueError:
+        return None
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
@@ -15,6 +15,7 @@ from .shared import (
     ensure_aware,
     format_quiet_window,
     in_quiet_window,
+    window_zone,
 )
 
 
@@ -40,12 +41,13 @@ def check(
             metadata={"configured": False},
         )
 
-    now = ensure_aware((clock or _utc_now)())
+    zone = window_zone(quiet_window)
+    now = ensure_aware((clock or _utc_now)()).astimezone(zone)
     window_label = format_quiet_window(quiet_window)
 
     if in_quiet_window(now, quiet_window):
         reason = (
-            f"Quiet hours active ({window_label}); current time {now.strftime('%H:%M UTC')}"
+            f"Quiet hours active ({window_label}); current time {now:%H:%M} {zone}"
         )
         return GuardrailResult(
             "quiet_hours",
@@ -54,12 +56,12 @@ def check(
             metadata={
                 "configured": True,
                 "window": window_label,
-                "currentTime": now.strftime("%H:%M:%S UTC"),
+                "currentTime": f"{now:%H:%M:%S} {zone}",
             },
         )
 
     reason = (
-        f"Outside quiet hours ({window_label}); current time {now.strftime('%H:%M UTC')}"
+        f"Outside quiet hours ({window_label}); current time {now:%H:%M} {zone}"
     )
     return GuardrailResult(
         "quiet_hours",
@@ -68,7 +70,7 @@ def check(
         metadata={
             "configured": True,
             "window": window_label,
-            "currentTime": now.strftime("%H:%M:%S UTC"),
+            "currentTime": f"{now:%H:%M:%S} {zone}",
         },
     )
 
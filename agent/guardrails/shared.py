@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime, time, timezone
+from datetime import datetime, time, timezone, tzinfo
 from typing import Any, Mapping, Optional, Tuple
 
 
@@ -20,8 +20,12 @@ class GuardrailResult:
 def resolve_quiet_hours_window(
     start_hour: Optional[int],
     end_hour: Optional[int],
+    zone: tzinfo = timezone.utc,
 ) -> Tuple[Optional[Tuple[time, time]], Optional[str]]:
-    """Normalise quiet hours configuration and capture validation errors."""
+    """Normalise quiet hours configuration and capture validation errors.
+
+    The window's hours are wall-clock hours in `zone` (the tenant timezone).
+    """
 
     if start_hour is None or end_hour is None:
         return None, "quiet hours not configured; allowing"
@@ -32,8 +36,8 @@ def resolve_quiet_hours_window(
     if start_hour == end_hour:
         return None, "quiet hours start and end match; allowing"
 
-    start = time(start_hour, tzinfo=timezone.utc)
-    end = time(end_hour, tzinfo=timezone.utc)
+    start = time(start_hour, tzinfo=zone)
+    end = time(end_hour, tzinfo=zone)
     return (start, end), None
 
 
@@ -47,17 +51,23 @@ def ensure_aware(moment: datetime) -> datetime:
 
 def format_quiet_window(window: Tuple[time, time]) -> str:
     start, end = window
-    label = f"{start.hour:02d}:00-{end.hour:02d}:00 UTC"
+    label = f"{start.hour:02d}:00-{end.hour:02d}:00 {window_zone(window)}"
     if start.hour > end.hour:
         return f"{label} (overnight)"
     return label
 
 
+def window_zone(window: Tuple[time, time]) -> tzinfo:
+    """Return the timezone the quiet window's hours are expressed in."""
+
+    return window[0].tzinfo or timezone.utc
+
+
 def in_quiet_window(moment: datetime, window: Tuple[time, time]) -> bool:
     """Check whether the provided moment falls within the quiet window."""
 
     start, end = window
-    hour = moment.hour
+    hour = ensure_aware(moment).astimezone(window_zone(window)).hour
     if start.hour < end.hour:
         return start.hour <= hour < end.hour
     return hour >= start.hour or hour < end.hour
@@ -0,0 +1,136 @@
+"""Fast encoding helpers shared by envelope and outbox (de)serialisation.
+
+The worker decodes every row it touches, so this module keeps the per-row cost low:
+ISO timestamps are parsed once per distinct string (pending rows are re-read on every
+poll and `updated_at` usually equals `created_at`), JSON goes through orjson, and jsonb
+columns that already arrive as plain dicts are used as-is instead of being copied.
+
+Envelope payloads (`arguments`, `trust_context`, `metadata`) are held as `FrozenMapping`
+views: wrapping is O(1), the envelope cannot be mutated through them, and serialisers
+unwrap them back to the underlying dict, so a payload is only copied where a consumer
+needs its own mutable dict (the Composio call).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Iterator, Mapping, Optional
+
+import orjson
+
+
+_UTC = timezone.utc
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+@lru_cache(maxsize=8192)
+def _parse_iso(text: str) -> datetime:
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=_UTC)
+    return parsed.astimezone(_UTC)
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Return `value` as an aware UTC datetime (`None` for empty or unknown values)."""
+
+    if isinstance(value, str):
+        return _parse_iso(value) if value else None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            return value.replace(tzinfo=_UTC)
+        return value.astimezone(_UTC)
+    return None
+
+
+class FrozenMapping(Mapping[str, Any]):
+    """Read-only view over a dict that nobody else mutates.
+
+    Only the top level is frozen; nested values are shared with the wrapped dict.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        self._data = data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenMapping):
+            return self._data == other._data
+        if isinstance(other, Mapping):
+            return self._data == dict(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"FrozenMapping({self._data!r})"
+
+
+EMPTY_MAPPING = FrozenMapping({})
+
+
+def freeze(value: Any) -> FrozenMapping:
+    """Wrap a freshly decoded dict without copying it (other mappings are copied once)."""
+
+    # Exact type checks first: `isinstance` against an ABC is slow on the per-row path.
+    kind = type(value)
+    if kind is dict:
+        return FrozenMapping(value) if value else EMPTY_MAPPING
+    if kind is FrozenMapping or value is None:
+        return value or EMPTY_MAPPING
+    if isinstance(value, Mapping):
+        return FrozenMapping(dict(value))
+    return EMPTY_MAPPING
+
+
+def plain_mapping(value: Any) -> dict[str, Any]:
+    """Return a JSON-ready dict, reusing `value` (or the dict behind a `FrozenMapping`).
+
+    The result may be shared with an envelope, so callers must treat it as read-only.
+    """
+
+    kind = type(value)
+    if kind is dict:
+        return value
+    if kind is FrozenMapping:
+        return value._data
+    if isinstance(value, Mapping):
+        return dict(value)
+    return {}
+
+
+def dumps(value: Any) -> bytes:
+    """Serialise `value` with orjson (datetimes as RFC 3339, mappings as objects)."""
+
+    return orjson.dumps(value, default=_default, option=_OPTIONS)
+
+
+def loads(data: bytes | bytearray | memoryview | str) -> Any:
+    return orjson.loads(data)
+
+
+def _default(value: Any) -> Any:
+    if type(value) is FrozenMapping:
+        return value._data
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
@@ -7,6 +7,8 @@ from datetime import datetime, timezone
 from typing import Any, Mapping, MutableMapping, Optional
 from uuid import uuid4
 
+from .codec import EMPTY_MAPPING, FrozenMapping, freeze, parse_timestamp, plain_mapping
+
 
 def _as_utc(timestamp: Optional[datetime] = None) -> datetime:
     """Return a timezone-aware UTC timestamp."""
@@ -20,7 +22,11 @@ def _as_utc(timestamp: Optional[datetime] = None) -> datetime:
 
 @dataclass(slots=True)
 class Envelope:
-    """Represents a unit of work to be executed by the Outbox worker."""
+    """Represents a unit of work to be executed by the Outbox worker.
+
+    `arguments`, `trust_context` and `metadata` are read-only views; copy them with
+    `dict(...)` before handing them to code that mutates its input.
+    """
 
     envelope_id: str
     tenant_id: str
@@ -29,8 +35,8 @@ class Envelope:
     connected_account_id: Optional[str]
     risk: str
     external_id: str
-    trust_context: Mapping[str, Any] = field(default_factory=dict)
-    metadata: Mapping[str, Any] = field(default_factory=dict)
+    trust_context: Mapping[str, Any] = field(default_factory=lambda: EMPTY_MAPPING)
+    metadata: Mapping[str, Any] = field(default_factory=lambda: EMPTY_MAPPING)
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
 
     def to_record(self) -> dict[str, Any]:
@@ -40,12 +46,12 @@ class Envelope:
             "id": self.envelope_id,
             "tenant_id": self.tenant_id,
             "tool_slug": self.tool_slug,
-            "arguments": dict(self.arguments),
+            "arguments": plain_mapping(self.arguments),
             "connected_account_id": self.connected_account_id,
             "risk": self.risk,
             "external_id": self.external_id,
-            "trust_context": dict(self.trust_context),
-            "metadata": dict(self.metadata),
+            "trust_context": plain_mapping(self.trust_context),
+            "metadata": plain_mapping(self.metadata),
             "created_at": self.created_at.isoformat(),
         }
 
@@ -53,22 +59,20 @@ class Envelope:
     def from_record(cls, record: Mapping[str, Any]) -> "Envelope":
         """Instantiate an envelope from a Supabase row."""
 
-        created_at = record.get("created_at")
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-        elif created_at is None:
-            created_at = datetime.now(timezone.utc)
+        # Positional construction: this runs for every row the worker reads. The jsonb
+        # columns were just decoded for this row, so they are wrapped rather than copied.
+        get = record.get
         return cls(
-            envelope_id=str(record.get("id") or record.get("envelope_id") or uuid4()),
-            tenant_id=str(record.get("tenant_id") or ""),
-            tool_slug=str(record.get("tool_slug") or ""),
-            arguments=record.get("arguments") or {},
-            connected_account_id=record.get("connected_account_id"),
-            risk=str(record.get("risk") or "medium"),
-            external_id=str(record.get("external_id") or uuid4()),
-            trust_context=record.get("trust_context") or {},
-            metadata=record.get("metadata") or {},
-            created_at=_as_utc(created_at),
+            str(get("id") or get("envelope_id") or uuid4()),
+            str(get("tenant_id") or ""),
+            str(get("tool_slug") or ""),
+            freeze(get("arguments")),
+            get("connected_account_id"),
+            str(get("risk") or "medium"),
+            str(get("external_id") or uuid4()),
+            freeze(get("trust_context")),
+            freeze(get("metadata")),
+            parse_timestamp(get("created_at")) or datetime.now(timezone.utc),
         )
 
     @classmethod
@@ -122,12 +126,12 @@ class Envelope:
             envelope_id=envelope_id,
             tenant_id=tenant_id,
             tool_slug=slug,
-            arguments=dict(arguments),
+            arguments=FrozenMapping(dict(arguments)),
             connected_account_id=connected_account_id,
             risk=risk,
             external_id=external_id,
-            trust_context=dict(trust_context),
-            metadata=dict(metadata),
+            trust_context=FrozenMapping(dict(trust_context)),
+            metadata=FrozenMapping(dict(metadata)),
             created_at=timestamp,
         )
 
@@ -1,44 +1,176 @@
-"""Service layer exports for the agent control plane."""
+"""Service layer exports for the agent control plane.
 
-from .audit import AuditLogger, StructlogAuditLogger, SupabaseAuditLogger
-from .catalog import (
-    CatalogService,
-    ComposioCatalogService,
-    InMemoryCatalogService,
-    SupabaseCatalogService,
-    ToolCatalogEntry,
-)
-from .catalog_sync import CatalogSyncError, sync_catalog
-from .objectives import (
-    DEFAULT_OBJECTIVES,
-    InMemoryObjectivesService,
-    Objective,
-    ObjectivesService,
-    SupabaseObjectivesService,
-)
-from .outbox import (
-    InMemoryOutboxService,
-    OutboxRecord,
-    OutboxService,
-    OutboxStatus,
-    SupabaseOutboxService,
-)
-from .policy import EffectiveToolPolicy, PolicyService, SupabasePolicyService
-from .actions import ActionsService, SupabaseActionsService
-from .settings import AppSettings, get_settings, reset_settings_cache
-from .state import (
-    APPROVAL_MODAL_KEY,
-    DESK_STATE_KEY,
-    GUARDRAIL_STATE_KEY,
-    append_queue_item,
-    ensure_approval_modal,
-    ensure_desk_state,
-    ensure_guardrail_state,
-    seed_queue,
-    set_approval_modal,
-    write_guardrail_results,
-)
-from .supabase import SupabaseNotConfiguredError, get_supabase_client, reset_supabase_client_cache
+Exports resolve lazily through module `__getattr__` so importing one service (for
+example the outbox from the worker CLI) does not pull in the Composio SDK, Google ADK,
+or jsonschema that other services depend on.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover - imports for type checkers only
+    from .audit import AuditLogger, StructlogAuditLogger, SupabaseAuditLogger
+    from .catalog import (
+        CatalogService,
+        ComposioCatalogService,
+        InMemoryCatalogService,
+        SupabaseCatalogService,
+        ToolCatalogEntry,
+    )
+    from .catalog_sync import CatalogSyncError, sync_catalog
+    from .guardrails import (
+        GuardrailConfigService,
+        InMemoryGuardrailConfigService,
+        SupabaseGuardrailConfigService,
+    )
+    from .clients import get_composio_client, get_http_client, reset_client_caches
+    from .invalidation import (
+        ChangeEvent,
+        ChangeFeed,
+        ChangeLogPoller,
+        InvalidationBus,
+        PgNotifyListener,
+        build_change_feed,
+        register_cache_handlers,
+    )
+    from .objectives import (
+        DEFAULT_OBJECTIVES,
+        InMemoryObjectivesService,
+        Objective,
+        ObjectivesService,
+        SupabaseObjectivesService,
+    )
+    from .outbox import (
+        InMemoryOutboxService,
+        OutboxEnqueueError,
+        OutboxRecord,
+        OutboxRecordSummary,
+        OutboxService,
+        OutboxStatus,
+        SupabaseOutboxService,
+    )
+    from .payloads import (
+        LocalPayloadStore,
+        PayloadOffloader,
+        PayloadStore,
+        PayloadIntegrityError,
+        PayloadStoreError,
+        SupabaseStoragePayloadStore,
+        build_payload_offloader,
+    )
+    from .policy import EffectiveToolPolicy, PolicyService, SupabasePolicyService
+    from .screening import EnvelopeScreener, ScreeningVerdict
+    from .actions import ActionsService, SupabaseActionsService
+    from .settings import AppSettings, get_settings, reset_settings_cache
+    from .snapshot import CatalogSnapshot, SnapshotCatalogService, write_catalog_snapshot
+    from .state import (
+        APPROVAL_MODAL_KEY,
+        DESK_STATE_KEY,
+        GUARDRAIL_STATE_KEY,
+        append_queue_item,
+        append_queue_items,
+        ensure_approval_modal,
+        mark_approval_decision_recorded,
+        pending_approval_decision,
+        ensure_desk_state,
+        ensure_guardrail_state,
+        seed_queue,
+        set_approval_modal,
+        write_guardrail_results,
+    )
+    from .supabase import SupabaseNotConfiguredError, get_supabase_client, reset_supabase_client_cache
+    from .tenants import InMemoryTenantPlanService, SupabaseTenantPlanService, TenantPlanService
+    from .trust import (
+        InMemoryTrustLedgerService,
+        SupabaseTrustLedgerService,
+        TrustEventKind,
+        TrustLedgerService,
+        TrustScore,
+    )
+
+_EXPORTS = {
+    "AuditLogger": "audit",
+    "StructlogAuditLogger": "audit",
+    "SupabaseAuditLogger": "audit",
+    "CatalogService": "catalog",
+    "ComposioCatalogService": "catalog",
+    "InMemoryCatalogService": "catalog",
+    "SupabaseCatalogService": "catalog",
+    "ToolCatalogEntry": "catalog",
+    "CatalogSyncError": "catalog_sync",
+    "sync_catalog": "catalog_sync",
+    "GuardrailConfigService": "guardrails",
+    "InMemoryGuardrailConfigService": "guardrails",
+    "SupabaseGuardrailConfigService": "guardrails",
+    "get_composio_client": "clients",
+    "get_http_client": "clients",
+    "reset_client_caches": "clients",
+    "ChangeEvent": "invalidation",
+    "ChangeFeed": "invalidation",
+    "ChangeLogPoller": "invalidation",
+    "InvalidationBus": "invalidation",
+    "PgNotifyListener": "invalidation",
+    "build_change_feed": "invalidation",
+    "register_cache_handlers": "invalidation",
+    "DEFAULT_OBJECTIVES": "objectives",
+    "InMemoryObjectivesService": "objectives",
+    "Objective": "objectives",
+    "ObjectivesService": "objectives",
+    "SupabaseObjectivesService": "objectives",
+    "InMemoryOutboxService": "outbox",
+    "OutboxEnqueueError": "outbox",
+    "OutboxRecord": "outbox",
+    "OutboxRecordSummary": "outbox",
+    "OutboxService": "outbox",
+    "OutboxStatus": "outbox",
+    "SupabaseOutboxService": "outbox",
+    "LocalPayloadStore": "payloads",
+    "PayloadOffloader": "payloads",
+    "PayloadStore": "payloads",
+    "PayloadIntegrityError": "payloads",
+    "PayloadStoreError": "payloads",
+    "SupabaseStoragePayloadStore": "payloads",
+    "build_payload_offloader": "payloads",
+    "EffectiveToolPolicy": "policy",
+    "PolicyService": "policy",
+    "SupabasePolicyService": "policy",
+    "EnvelopeScreener": "screening",
+    "ScreeningVerdict": "screening",
+    "ActionsService": "actions",
+    "SupabaseActionsService": "actions",
+    "AppSettings": "settings",
+    "get_settings": "settings",
+    "reset_settings_cache": "settings",
+    "CatalogSnapshot": "snapshot",
+    "SnapshotCatalogService": "snapshot",
+    "write_catalog_snapshot": "snapshot",
+    "APPROVAL_MODAL_KEY": "state",
+    "DESK_STATE_KEY": "state",
+    "GUARDRAIL_STATE_KEY": "state",
+    "append_queue_item": "state",
+    "append_queue_items": "state",
+    "mark_approval_decision_recorded": "state",
+    "pending_approval_decision": "state",
+    "ensure_approval_modal": "state",
+    "ensure_desk_state": "state",
+    "ensure_guardrail_state": "state",
+    "seed_queue": "state",
+    "set_approval_modal": "state",
+    "write_guardrail_results": "state",
+    "SupabaseNotConfiguredError": "supabase",
+    "get_supabase_client": "supabase",
+    "reset_supabase_client_cache": "supabase",
+    "InMemoryTenantPlanService": "tenants",
+    "SupabaseTenantPlanService": "tenants",
+    "TenantPlanService": "tenants",
+    "InMemoryTrustLedgerService": "trust",
+    "SupabaseTrustLedgerService": "trust",
+    "TrustEventKind": "trust",
+    "TrustLedgerService": "trust",
+    "TrustScore": "trust",
+}
 
 __all__ = [
     "AppSettings",
@@ -52,8 +184,21 @@ __all__ = [
     "InMemoryCatalogService",
     "SupabaseCatalogService",
     "ToolCatalogEntry",
+    "CatalogSnapshot",
+    "SnapshotCatalogService",
+    "write_catalog_snapshot",
     "sync_catalog",
     "CatalogSyncError",
+    "GuardrailConfigService",
+    "InMemoryGuardrailConfigService",
+    "SupabaseGuardrailConfigService",
+    "ChangeEvent",
+    "ChangeFeed",
+    "ChangeLogPoller",
+    "InvalidationBus",
+    "PgNotifyListener",
+    "build_change_feed",
+    "register_cache_handlers",
     "ObjectivesService",
     "InMemoryObjectivesService",
     "SupabaseObjectivesService",
@@ -62,11 +207,22 @@ __all__ = [
     "OutboxService",
     "InMemoryOutboxService",
     "SupabaseOutboxService",
+    "OutboxEnqueueError",
     "OutboxRecord",
+    "OutboxRecordSummary",
     "OutboxStatus",
+    "PayloadStore",
+    "LocalPayloadStore",
+    "SupabaseStoragePayloadStore",
+    "PayloadOffloader",
+    "PayloadStoreError",
+    "PayloadIntegrityError",
+    "build_payload_offloader",
     "PolicyService",
     "SupabasePolicyService",
     "EffectiveToolPolicy",
+    "EnvelopeScreener",
+    "ScreeningVerdict",
     "ActionsService",
     "SupabaseActionsService",
     "DESK_STATE_KEY",
@@ -75,11 +231,38 @@ __all__ = [
     "ensure_desk_state",
     "seed_queue",
     "append_queue_item",
+    "append_queue_items",
     "ensure_guardrail_state",
     "write_guardrail_results",
     "ensure_approval_modal",
+    "pending_approval_decision",
+    "mark_approval_decision_recorded",
     "set_approval_modal",
     "get_supabase_client",
+    "get_http_client",
+    "get_composio_client",
+    "reset_client_caches",
     "reset_supabase_client_cache",
     "SupabaseNotConfiguredError",
+    "TenantPlanService",
+    "InMemoryTenantPlanService",
+    "SupabaseTenantPlanService",
+    "TrustLedgerService",
+    "InMemoryTrustLedgerService",
+    "SupabaseTrustLedgerService",
+    "TrustEventKind",
+    "TrustScore",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,15 +1,22 @@
 """Actions history projection for executed envelopes (universal envelope).
 
 On successful execution by the worker, we persist a row in the `actions` table
-for analytics and history views.
+for analytics and history views. `actions` is partitioned by `created_at` (migration
+006), so its only unique key is `(external_id, created_at)`; deduplication relies on
+writing the envelope's `created_at`, which is the same on every retry.
 """
 
 from __future__ import annotations
 
-from typing import Any, Mapping, Optional
+from typing import TYPE_CHECKING, Any, Mapping, Optional
+
+from agent.schemas.codec import plain_mapping
 
 from .outbox import OutboxRecord
 
+if TYPE_CHECKING:  # pragma: no cover - imports for type checkers only
+    from .payloads import PayloadOffloader
+
 
 class ActionsService:
     def record_success(self, *, tenant_id: str, record: OutboxRecord, result: Mapping[str, Any] | None) -> None:  # pragma: no cover - interface
@@ -17,10 +24,18 @@ class ActionsService:
 
 
 class SupabaseActionsService(ActionsService):
-    def __init__(self, client, *, schema: str = "public", table: str = "actions") -> None:
+    def __init__(
+        self,
+        client,
+        *,
+        schema: str = "public",
+        table: str = "actions",
+        payloads: Optional["PayloadOffloader"] = None,
+    ) -> None:
         self._client = client
         self._schema = schema
         self._table = table
+        self._payloads = payloads
 
     def record_success(self, *, tenant_id: str, record: OutboxRecord, result: Mapping[str, Any] | None) -> None:
         tool = {
@@ -34,16 +49,25 @@ class SupabaseActionsService(ActionsService):
             "external_id": record.envelope.external_id,
             "type": "mcp.exec",
             "tool": tool,
-            "args": dict(record.envelope.arguments),
+            "args": plain_mapping(record.envelope.arguments),
             "risk": record.envelope.risk,
             "approval": "granted",
             "constraints": {},
-            "result": dict(result or {"status": "sent"}),
+            "result": self._result_payload(result),
+            # Partition key of `actions`; part of the idempotency key (migration 006).
+            "created_at": record.envelope.created_at.isoformat(),
         }
         try:
             table = self._client.table(self._table, schema=self._schema)
         except TypeError:  # pragma: no cover
             table = self._client.table(self._table)
-        # Upsert on external_id to preserve idempotency
-        table.upsert(payload, on_conflict="external_id").execute()
+        # Upsert on (external_id, created_at) to preserve idempotency; both are fixed
+        # per envelope, so retries land on the same row and partition.
+        table.upsert(payload, on_conflict="external_id,created_at").execute()
+
+    def _result_payload(self, result: Mapping[str, Any] | None) -> Mapping[str, Any]:
+        payload = plain_mapping(result) if result else {"status": "sent"}
+        if self._payloads is not None:
+            return self._payloads.offload(payload) or payload
+        return payload
 
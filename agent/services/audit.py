@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any, Mapping, Optional, Protocol
+from typing import Any, Mapping, Optional, Protocol, Sequence
 
 import structlog
 
@@ -31,6 +31,18 @@ class AuditLogger(Protocol):
     ) -> None:
         ...
 
+    def log_envelopes(
+        self,
+        *,
+        tenant_id: str,
+        entries: Sequence[Mapping[str, Any]],
+    ) -> None:
+        """Record several envelope events at once.
+
+        Each entry carries `envelope_id`, `tool_slug`, `status`, and optional `metadata`.
+        """
+        ...
+
 
 class StructlogAuditLogger(AuditLogger):
     """Audit logger backed by structlog."""
@@ -67,6 +79,20 @@ class StructlogAuditLogger(AuditLogger):
             metadata=dict(metadata or {}),
         )
 
+    def log_envelopes(
+        self,
+        *,
+        tenant_id: str,
+        entries: Sequence[Mapping[str, Any]],
+    ) -> None:
+        if not entries:
+            return
+        self._logger.bind(tenant_id=tenant_id).info(
+            "outbox.envelopes",
+            count=len(entries),
+            envelopes=[_envelope_payload(entry) for entry in entries],
+        )
+
 
 class SupabaseAuditLogger(AuditLogger):
     """Persist audit trail entries to Supabase."""
@@ -126,18 +152,44 @@ class SupabaseAuditLogger(AuditLogger):
             payload=payload,
         )
 
+    def log_envelopes(
+        self,
+        *,
+        tenant_id: str,
+        entries: Sequence[Mapping[str, Any]],
+    ) -> None:
+        if not entries:
+            return
+        records = [
+            self._build_record(tenant_id=tenant_id, category="outbox", payload=_envelope_payload(entry))
+            for entry in entries
+        ]
+        self._table_ref().insert(records).execute()
+
     def _insert(self, *, tenant_id: str, category: str, payload: Mapping[str, Any]) -> None:
-        record = {
+        record = self._build_record(tenant_id=tenant_id, category=category, payload=payload)
+        self._table_ref().insert(record).execute()
+
+    def _build_record(self, *, tenant_id: str, category: str, payload: Mapping[str, Any]) -> dict[str, Any]:
+        return {
             "tenant_id": tenant_id,
             "category": category,
             "payload": dict(payload),
             "actor_type": self._actor_type,
             "actor_id": self._actor_id,
         }
-        self._table_ref().insert(record).execute()
 
     def _table_ref(self):
         try:
             return self._client.table(self._table, schema=self._schema)
         except TypeError:  # pragma: no cover
             return self._client.table(self._table)
+
+
+def _envelope_payload(entry: Mapping[str, Any]) -> dict[str, Any]:
+    return {
+        "envelope_id": entry.get("envelope_id"),
+        "tool_slug": entry.get("tool_slug"),
+        "status": entry.get("status"),
+        "metadata": dict(entry.get("metadata") or {}),
+    }
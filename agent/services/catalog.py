@@ -3,13 +3,10 @@
 from __future__ import annotations
 
 import json
-from dataclasses import dataclass
-from functools import lru_cache
+import threading
+from dataclasses import dataclass, field
 from typing import Any, Iterable, Mapping, Optional, Protocol, Sequence
 
-import jsonschema
-from composio import Composio
-from composio_google_adk import GoogleAdkProvider
 
 
 @dataclass(slots=True)
@@ -23,15 +20,21 @@ class ToolCatalogEntry:
     schema: Mapping[str, Any]
     required_scopes: Sequence[str]
     risk: str = "medium"
+    # Pre-rendered `prompt_snippet`, populated when entries are loaded from a snapshot.
+    cached_prompt: Optional[str] = field(default=None, compare=False, repr=False)
 
     def validate_arguments(self, arguments: Mapping[str, Any]) -> None:
         """Validate tool arguments against the stored JSON schema."""
 
+        import jsonschema  # deferred: only needed once arguments are validated
+
         jsonschema.validate(instance=arguments, schema=self.schema)
 
     def prompt_snippet(self) -> str:
         """Return a human-readable snippet embedded in the system prompt."""
 
+        if self.cached_prompt is not None:
+            return self.cached_prompt
         scope_label = ", ".join(self.required_scopes) or "none"
         schema_excerpt = json.dumps(self.schema.get("properties", {}), sort_keys=True)[:400]
         return (
@@ -121,6 +124,11 @@ class InMemoryCatalogService:
             entries.append(entry)
         self._entries_by_tenant[tenant_id] = entries
 
+    def sync_entries(self, tenant_id: str, entries: Sequence[ToolCatalogEntry]) -> None:
+        if not entries:
+            return
+        self._entries_by_tenant[tenant_id] = list(entries)
+
 
 class ComposioCatalogService(CatalogService):
     """Catalog implementation backed by the Composio SDK."""
@@ -133,13 +141,20 @@ class ComposioCatalogService(CatalogService):
         client_secret: Optional[str] = None,
         redirect_url: Optional[str] = None,
         toolkits: Sequence[str] = (),
+        client: Any | None = None,
     ) -> None:
-        self._provider = GoogleAdkProvider()
-        self._client = Composio(provider=self._provider, api_key=api_key)
+        if client is None:
+            from composio import Composio
+            from composio_google_adk import GoogleAdkProvider
+
+            client = Composio(provider=GoogleAdkProvider(), api_key=api_key)
+        self._client = client
         self._toolkits = tuple(toolkits)
         self._client_id = client_id
         self._client_secret = client_secret
         self._redirect_url = redirect_url
+        self._tools_by_tenant: dict[str, Sequence[Any]] = {}
+        self._tools_lock = threading.Lock()
 
     def list_tools(self, tenant_id: str) -> Sequence[ToolCatalogEntry]:
         entries = [_normalise_tool(tool) for tool in self._fetch_tools(tenant_id)]
@@ -152,18 +167,35 @@ class ComposioCatalogService(CatalogService):
                 return entry
         return None
 
-    @lru_cache(maxsize=32)
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        """Drop the cached Composio response for `tenant_id` (or every tenant)."""
+
+        with self._tools_lock:
+            if tenant_id is None:
+                self._tools_by_tenant.clear()
+            else:
+                self._tools_by_tenant.pop(tenant_id, None)
+
     def _fetch_tools(self, tenant_id: str) -> Sequence[Any]:
         """Retrieve tools from Composio and cache the response per tenant."""
 
+        with self._tools_lock:
+            cached = self._tools_by_tenant.get(tenant_id)
+        if cached is not None:
+            return cached
+
         user_id = tenant_id
         toolkits = list(self._toolkits) if self._toolkits else None
         response = self._client.tools.get(user_id=user_id, toolkits=toolkits)
         if isinstance(response, Mapping) and "tools" in response:
-            return list(response["tools"])  # type: ignore[index]
-        if isinstance(response, Iterable):
-            return list(response)
-        return []
+            tools: Sequence[Any] = list(response["tools"])  # type: ignore[index]
+        elif isinstance(response, Iterable):
+            tools = list(response)
+        else:
+            tools = []
+        with self._tools_lock:
+            self._tools_by_tenant[tenant_id] = tools
+        return tools
 
 
 class SupabaseCatalogService(CatalogService):
@@ -14,7 +14,9 @@ from .catalog import (
     ComposioCatalogService,
     ToolCatalogEntry,
 )
+from .clients import get_composio_client
 from .settings import AppSettings, get_settings
+from .snapshot import CatalogSnapshot
 from .supabase import SupabaseNotConfiguredError, get_supabase_client
 
 
@@ -62,6 +64,7 @@ def sync_catalog(
             client_secret=active_settings.composio_client_secret,
             redirect_url=active_settings.composio_redirect_url,
             toolkits=active_settings.default_toolkits,
+            client=get_composio_client(active_settings),
         )
 
     start = time.perf_counter()
@@ -78,6 +81,9 @@ def sync_catalog(
         return {"synced": 0, "skipped": False, "duration_seconds": round(time.perf_counter() - start, 3)}
 
     _persist_entries(target_service, active_settings.tenant_id, entries)
+    if active_settings.catalog_snapshot_path:
+        # API workers serving from the shared snapshot reload it on their next refresh.
+        CatalogSnapshot(active_settings.catalog_snapshot_path).update_tenant(active_settings.tenant_id, entries)
     duration = round(time.perf_counter() - start, 3)
 
     bound_logger.info(
@@ -103,14 +109,14 @@ def _build_supabase_catalog_service(client, settings: AppSettings) -> CatalogSer
     reraise=True,
 )
 def _fetch_entries(source: CatalogService, tenant_id: str) -> Sequence[ToolCatalogEntry]:
-    _clear_remote_cache(source)
+    _clear_remote_cache(source, tenant_id)
     return tuple(source.list_tools(tenant_id))
 
 
-def _clear_remote_cache(source: CatalogService) -> None:
-    fetcher = getattr(source, "_fetch_tools", None)
-    if fetcher is not None and hasattr(fetcher, "cache_clear"):
-        fetcher.cache_clear()
+def _clear_remote_cache(source: CatalogService, tenant_id: str) -> None:
+    invalidate = getattr(source, "invalidate", None)
+    if callable(invalidate):
+        invalidate(tenant_id)
 
 
 def _persist_entries(
@@ -0,0 +1,110 @@
+"""Shared, pooled network clients for Supabase and Composio.
+
+Every service in a process should reuse the same transports so TLS sessions and
+keep-alive connections are established once rather than per service or per call.
+Clients are cached on the handful of settings that shape them (AppSettings itself is
+not hashable), and `reset_client_caches` closes and drops them for tests and shutdown.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import threading
+from typing import Any, Optional
+
+import httpx
+import structlog
+
+from .settings import AppSettings
+
+
+logger = structlog.get_logger(__name__)
+
+_lock = threading.Lock()
+_http_clients: dict[tuple[Any, ...], httpx.Client] = {}
+_composio_clients: dict[tuple[Any, ...], Any] = {}
+
+
+def http2_available() -> bool:
+    """Return `True` when the `h2` package needed for HTTP/2 is installed.
+
+    It ships with the `httpx[http2]` dependency; environments without it fall back to
+    HTTP/1.1 instead of failing when the client is built.
+    """
+
+    return importlib.util.find_spec("h2") is not None
+
+
+def _http_key(settings: AppSettings) -> tuple[Any, ...]:
+    return (
+        settings.http_max_connections,
+        settings.http_max_keepalive_connections,
+        settings.http_keepalive_expiry_seconds,
+        settings.http_timeout_seconds,
+        settings.http_connect_timeout_seconds,
+        settings.http2_enabled and http2_available(),
+    )
+
+
+def get_http_client(settings: AppSettings) -> httpx.Client:
+    """Return the process-wide pooled httpx client for the given transport settings."""
+
+    key = _http_key(settings)
+    with _lock:
+        client = _http_clients.get(key)
+        if client is None or client.is_closed:
+            max_connections, max_keepalive, keepalive_expiry, timeout, connect_timeout, http2 = key
+            client = httpx.Client(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            )
+            _http_clients[key] = client
+            if settings.http2_enabled and not http2:
+                logger.warning("clients.http2_unavailable", reason="h2 is not installed; using HTTP/1.1")
+            logger.debug("clients.http_created", http2=http2, max_connections=max_connections)
+        return client
+
+
+def get_composio_client(settings: AppSettings) -> Optional[Any]:
+    """Return a cached Composio SDK client, or `None` when Composio is not configured.
+
+    The SDK builds its own httpx transport internally, so pooling comes from reusing one
+    instance per API key instead of constructing a fresh client for every service.
+    """
+
+    if not settings.composio_api_key:
+        return None
+
+    key = (settings.composio_api_key, settings.http_timeout_seconds)
+    with _lock:
+        client = _composio_clients.get(key)
+        if client is None:
+            # Deferred: the SDK pulls in Google ADK and takes seconds to import.
+            try:
+                from composio import Composio
+                from composio_google_adk import GoogleAdkProvider
+            except ImportError:  # pragma: no cover - graceful degradation when Composio not available
+                logger.warning("clients.composio_not_installed")
+                return None
+            client = Composio(
+                provider=GoogleAdkProvider(),
+                api_key=settings.composio_api_key,
+                timeout=settings.http_timeout_seconds,
+            )
+            _composio_clients[key] = client
+        return client
+
+
+def reset_client_caches() -> None:
+    """Close and forget cached clients (primarily for tests and process shutdown)."""
+
+    with _lock:
+        for client in _http_clients.values():
+            client.close()
+        _http_clients.clear()
+        _composio_clients.clear()
@@ -0,0 +1,99 @@
+"""Per-tenant guardrail configuration read from the `guardrails` table."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Mapping, Optional, Protocol
+
+from agent.guardrails.engine import GuardrailConfig
+
+
+class GuardrailConfigService(Protocol):
+    """Contract for resolving a tenant's guardrail configuration.
+
+    `get_config` returns `None` when the tenant has no row, in which case callers fall
+    back to the process-wide defaults. `invalidate` is the hook for change notifications.
+    """
+
+    def get_config(self, tenant_id: str) -> Optional[GuardrailConfig]:
+        ...
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        ...
+
+
+class InMemoryGuardrailConfigService:
+    """Static guardrail configuration for local development and unit tests."""
+
+    def __init__(self, *, configs_by_tenant: Optional[Mapping[str, GuardrailConfig]] = None) -> None:
+        self._configs = dict(configs_by_tenant or {})
+
+    def get_config(self, tenant_id: str) -> Optional[GuardrailConfig]:
+        return self._configs.get(tenant_id)
+
+    def set_config(self, tenant_id: str, config: GuardrailConfig) -> None:
+        self._configs[tenant_id] = config
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        return None
+
+
+class SupabaseGuardrailConfigService(GuardrailConfigService):
+    """Reads `guardrails` rows and caches the parsed config for `ttl_seconds`.
+
+    Missing rows are cached too, so tenants on the defaults do not cost a read per model
+    call. Columns left null fall back to `defaults` (normally the global settings).
+    """
+
+    def __init__(
+        self,
+        client,
+        *,
+        defaults: GuardrailConfig,
+        schema: str = "public",
+        table: str = "guardrails",
+        ttl_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._client = client
+        self._defaults = defaults
+        self._schema = schema
+        self._table = table
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._cache: dict[str, tuple[float, Optional[GuardrailConfig]]] = {}
+        self._lock = threading.Lock()
+
+    def get_config(self, tenant_id: str) -> Optional[GuardrailConfig]:
+        now = self._clock()
+        with self._lock:
+            cached = self._cache.get(tenant_id)
+            if cached is not None and now - cached[0] < self._ttl:
+                return cached[1]
+
+        response = (
+            self._table_ref()
+            .select("quiet_hours, trust_threshold, scopes, require_evidence")
+            .eq("tenant_id", tenant_id)
+            .limit(1)
+            .execute()
+        )
+        rows = getattr(response, "data", []) or []
+        config = GuardrailConfig.from_record(rows[0], defaults=self._defaults) if rows else None
+        with self._lock:
+            self._cache[tenant_id] = (now, config)
+        return config
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        with self._lock:
+            if tenant_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(tenant_id, None)
+
+    def _table_ref(self):
+        try:
+            return self._client.table(self._table, schema=self._schema)
+        except TypeError:  # pragma: no cover
+            return self._client.table(self._table)
@@ -0,0 +1,311 @@
+"""Cross-process cache invalidation driven by the database change feed.
+
+Migration 009 records every write to `tool_catalog`, `tool_policies`, `guardrails`, and
+`objectives` in `change_log` and sends the same event on `NOTIFY cache_invalidation`.
+An `InvalidationBus` fans those events out to handlers that evict exactly the affected
+cache entries, so the TTL caches only bound staleness when the feed is down.
+
+Events arrive through one of two feeds: `PgNotifyListener` LISTENs on a direct Postgres
+connection (requires `psycopg`, installed with the `listen` extra), and `ChangeLogPoller` tails `change_log` by id through
+PostgREST. Either publishes a `RESYNC` event when it (re)connects, since changes made
+while it was away were missed, and handlers respond by clearing everything.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping, Optional, Protocol
+
+import structlog
+
+from .settings import AppSettings, reset_settings_cache
+from .supabase import reset_supabase_client_cache
+
+
+logger = structlog.get_logger("cache.invalidation")
+
+CHANNEL = "cache_invalidation"
+# Delivered to every handler; `tenant_id` is None, so handlers clear their whole cache.
+RESYNC = "*"
+# Operator-published source (`select publish_cache_invalidation('settings')`).
+SETTINGS_SOURCE = "settings"
+
+
+@dataclass(frozen=True, slots=True)
+class ChangeEvent:
+    """One committed change: the source table, and the tenant and key it touched."""
+
+    source: str
+    tenant_id: Optional[str] = None
+    key: Optional[str] = None
+    op: str = "UPDATE"
+    id: Optional[int] = None
+
+    @classmethod
+    def from_record(cls, record: Mapping[str, Any]) -> "ChangeEvent":
+        tenant_id = record.get("tenant_id")
+        key = record.get("key")
+        event_id = record.get("id")
+        return cls(
+            source=str(record.get("source") or RESYNC),
+            tenant_id=str(tenant_id) if tenant_id else None,
+            key=str(key) if key else None,
+            op=str(record.get("op") or "UPDATE"),
+            id=int(event_id) if event_id is not None else None,
+        )
+
+
+Handler = Callable[[ChangeEvent], None]
+
+
+class InvalidationBus:
+    """In-process fan-out of change events to per-source handlers."""
+
+    def __init__(self) -> None:
+        self._handlers: dict[str, list[Handler]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, source: str, handler: Handler) -> None:
+        with self._lock:
+            self._handlers[source].append(handler)
+
+    def publish(self, event: ChangeEvent) -> int:
+        """Run the handlers for `event.source` and return how many ran.
+
+        A failing handler is logged and skipped so it cannot block the others.
+        """
+
+        with self._lock:
+            if event.source == RESYNC:
+                handlers = list(dict.fromkeys(h for hs in self._handlers.values() for h in hs))
+            else:
+                handlers = list(self._handlers.get(event.source, ()))
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.warning("invalidation.handler_failed", source=event.source, error=str(exc))
+        return len(handlers)
+
+
+def register_cache_handlers(
+    bus: InvalidationBus,
+    *,
+    catalog: Any | None = None,
+    policy: Any | None = None,
+    guardrails: Any | None = None,
+    objectives: Any | None = None,
+    process_caches: bool = False,
+) -> InvalidationBus:
+    """Subscribe the `invalidate` hooks of the given services to their sources.
+
+    Services without an `invalidate` method are skipped. Catalog writes also evict the
+    policy entry, because effective policies merge catalog defaults. With
+    `process_caches`, a `settings` event resets the settings and Supabase client caches,
+    so the next lookup rebuilds them (services already holding a client keep it).
+    """
+
+    catalog_evict = getattr(catalog, "invalidate", None)
+    policy_evict = getattr(policy, "invalidate", None)
+    if callable(policy_evict):
+        bus.subscribe("tool_policies", lambda event: policy_evict(event.tenant_id, event.key))
+        bus.subscribe("tool_catalog", lambda event: policy_evict(event.tenant_id, event.key))
+    if callable(catalog_evict):
+        bus.subscribe("tool_catalog", lambda event: catalog_evict(event.tenant_id))
+    for source, service in (("guardrails", guardrails), ("objectives", objectives)):
+        evict = getattr(service, "invalidate", None)
+        if callable(evict):
+            bus.subscribe(source, lambda event, evict=evict: evict(event.tenant_id))
+    if process_caches:
+        bus.subscribe(SETTINGS_SOURCE, _reset_process_caches)
+    return bus
+
+
+def _reset_process_caches(event: ChangeEvent) -> None:
+    if event.source == RESYNC:
+        return  # reconnects say nothing about the environment
+    reset_settings_cache()
+    reset_supabase_client_cache()
+
+
+def listen_available() -> bool:
+    """Return `True` when `psycopg`, which `PgNotifyListener` needs, is installed."""
+
+    return importlib.util.find_spec("psycopg") is not None
+
+
+class ChangeFeed(Protocol):
+    """A background subscriber feeding an `InvalidationBus`."""
+
+    def start(self) -> None:
+        ...
+
+    def stop(self) -> None:
+        ...
+
+
+class _FeedThread:
+    """Daemon-thread lifecycle shared by the feeds."""
+
+    _name = "change-feed"
+
+    def __init__(self) -> None:
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+
+class ChangeLogPoller(_FeedThread):
+    """Tails `change_log` by id and publishes each new row.
+
+    The first poll only records the newest id (plus a `RESYNC`), so history from before
+    the process started is never replayed. A full batch is followed by another poll
+    immediately, so bursts (a catalog sync) drain without waiting out the interval. A
+    transaction that commits after a later id has been read is skipped; the cache TTLs
+    still bound how long that entry stays stale.
+    """
+
+    _name = "change-log-poller"
+
+    def __init__(
+        self,
+        client,
+        bus: InvalidationBus,
+        *,
+        schema: str = "public",
+        table: str = "change_log",
+        interval_seconds: float = 5.0,
+        batch_size: int = 500,
+    ) -> None:
+        super().__init__()
+        self._client = client
+        self._bus = bus
+        self._schema = schema
+        self._table = table
+        self._interval = max(interval_seconds, 0.1)
+        self._batch_size = max(1, batch_size)
+        self._cursor: Optional[int] = None
+
+    def poll_once(self) -> int:
+        if self._cursor is None:
+            response = self._table_ref().select("id").order("id", desc=True).limit(1).execute()
+            rows = getattr(response, "data", []) or []
+            self._cursor = int(rows[0]["id"]) if rows else 0
+            self._bus.publish(ChangeEvent(source=RESYNC))
+            return 0
+
+        response = (
+            self._table_ref()
+            .select("id, source, tenant_id, key, op")
+            .gt("id", self._cursor)
+            .order("id")
+            .limit(self._batch_size)
+            .execute()
+        )
+        rows = getattr(response, "data", []) or []
+        for row in rows:
+            event = ChangeEvent.from_record(row)
+            self._bus.publish(event)
+            if event.id is not None:
+                self._cursor = max(self._cursor, event.id)
+        return len(rows)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                while self.poll_once() >= self._batch_size and not self._stop.is_set():
+                    pass
+            except Exception as exc:  # pragma: no cover - network failures
+                logger.warning("invalidation.poll_failed", error=str(exc))
+            self._stop.wait(self._interval)
+
+    def _table_ref(self):
+        try:
+            return self._client.table(self._table, schema=self._schema)
+        except TypeError:  # pragma: no cover
+            return self._client.table(self._table)
+
+
+class PgNotifyListener(_FeedThread):  # pragma: no cover - needs a live Postgres
+    """LISTENs on `cache_invalidation` over a direct connection (requires `psycopg`).
+
+    Reconnects after `retry_seconds` when the connection drops, publishing a `RESYNC`
+    on every (re)connect.
+    """
+
+    _name = "change-feed-listener"
+
+    def __init__(
+        self,
+        dsn: str,
+        bus: InvalidationBus,
+        *,
+        channel: str = CHANNEL,
+        timeout_seconds: float = 5.0,
+        retry_seconds: float = 5.0,
+    ) -> None:
+        super().__init__()
+        self._dsn = dsn
+        self._bus = bus
+        self._channel = channel
+        self._timeout = timeout_seconds
+        self._retry = retry_seconds
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                import psycopg  # deferred: optional dependency, only needed for LISTEN
+
+                with psycopg.connect(self._dsn, autocommit=True) as conn:
+                    conn.execute(f"listen {self._channel}")
+                    self._bus.publish(ChangeEvent(source=RESYNC))
+                    while not self._stop.is_set():
+                        for notify in conn.notifies(timeout=self._timeout):
+                            self._bus.publish(ChangeEvent.from_record(json.loads(notify.payload)))
+            except Exception as exc:
+                logger.warning("invalidation.listen_failed", error=str(exc))
+                self._stop.wait(self._retry)
+
+
+def build_change_feed(settings: AppSettings, bus: InvalidationBus, *, client=None) -> Optional[ChangeFeed]:
+    """Return the configured feed: LISTEN with a database URL, else polling via `client`.
+
+    Without `psycopg` a database URL is ignored (with a warning) in favour of polling.
+    Returns None when `change_feed_poll_seconds` is 0 or there is nothing to poll.
+    """
+
+    if settings.change_feed_database_url:
+        if listen_available():
+            return PgNotifyListener(settings.change_feed_database_url, bus)
+        logger.warning(
+            "invalidation.listen_unavailable",
+            reason="psycopg is not installed; install the `listen` extra",
+            fallback="poll" if client is not None and settings.change_feed_poll_seconds > 0 else None,
+        )
+    if client is None or settings.change_feed_poll_seconds <= 0:
+        return None
+    return ChangeLogPoller(
+        client,
+        bus,
+        schema=settings.supabase_schema,
+        interval_seconds=settings.change_feed_poll_seconds,
+    )
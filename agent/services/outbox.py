@@ -2,13 +2,21 @@
 
 from __future__ import annotations
 
-from collections import OrderedDict
-from dataclasses import dataclass, field
+import heapq
+import itertools
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta, timezone
-from typing import Any, Iterable, Mapping, MutableMapping, Optional, Protocol, Sequence
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Mapping, MutableMapping, Optional, Protocol, Sequence
 
+from agent.schemas.codec import EMPTY_MAPPING, parse_timestamp, plain_mapping
 from agent.schemas.envelope import Envelope
 
+if TYPE_CHECKING:  # pragma: no cover - imports for type checkers only
+    from .payloads import PayloadOffloader
+
 
 class OutboxStatus:
     """Enumeration of outbox statuses used across the control plane."""
@@ -21,6 +29,9 @@ class OutboxStatus:
     DLQ = "dlq"
 
 
+_TERMINAL_STATUSES = frozenset({OutboxStatus.SUCCESS, OutboxStatus.CONFLICT, OutboxStatus.FAILED})
+
+
 def _utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
@@ -43,6 +54,27 @@ class OutboxRecord:
     def tenant_id(self) -> str:
         return self.envelope.tenant_id
 
+    def result(self, payloads: Optional["PayloadOffloader"] = None) -> dict[str, Any]:
+        """Return the execution result stored under `metadata["result"]`.
+
+        The stored value is either the result itself or a payload reference (see
+        `mark_success`); pass the offloader to load referenced results. Successful rows
+        written before results were nested have them merged into `metadata` key by key,
+        so for those the whole mapping is returned.
+        """
+
+        from .payloads import PayloadStoreError, is_payload_ref
+
+        metadata = self.metadata if isinstance(self.metadata, Mapping) else {}
+        stored = metadata.get("result")
+        if not isinstance(stored, Mapping):
+            return dict(metadata) if self.status == OutboxStatus.SUCCESS else {}
+        if payloads is not None:
+            return payloads.resolve(stored)
+        if is_payload_ref(stored):
+            raise PayloadStoreError("result was offloaded; pass the payload offloader to load it")
+        return dict(stored)
+
     def mark_attempt(self, *, error: Optional[str] = None, retry_at: Optional[datetime] = None) -> None:
         self.attempts += 1
         self.last_error = error
@@ -51,57 +83,114 @@ class OutboxRecord:
 
     @classmethod
     def from_record(cls, record: Mapping[str, Any]) -> "OutboxRecord":
-        envelope = Envelope.from_record(record.get("envelope") or record)
-        status = str(record.get("status") or OutboxStatus.PENDING)
-        attempts = int(record.get("attempts") or 0)
-        last_error = record.get("last_error")
-        queued_at = record.get("queued_at") or record.get("created_at")
-        updated_at = record.get("updated_at") or queued_at
-        next_run_at = record.get("next_run_at")
-        metadata = record.get("metadata") or {}
-        dlq = str(record.get("status") or "").lower() == OutboxStatus.DLQ or bool(record.get("dlq"))
-
-        def _parse(value: Any) -> datetime:
-            if isinstance(value, datetime):
-                return value.astimezone(timezone.utc)
-            if isinstance(value, str) and value:
-                return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
-            return _utc_now()
+        get = record.get
+        envelope_row = get("envelope") or record
+        envelope = Envelope.from_record(envelope_row)
+        status = str(get("status") or OutboxStatus.PENDING)
+        raw_queued = get("queued_at") or get("created_at")
+        if raw_queued and raw_queued == envelope_row.get("created_at"):
+            queued_at = envelope.created_at
+        else:
+            queued_at = parse_timestamp(raw_queued) or _utc_now()
+        raw_updated = get("updated_at")
+        updated_at = queued_at if not raw_updated or raw_updated == raw_queued else parse_timestamp(raw_updated)
+        # Positional construction (field order): this runs for every row the worker reads.
+        return cls(
+            envelope,
+            status,
+            int(get("attempts") or 0),
+            get("last_error"),
+            queued_at,
+            updated_at or queued_at,
+            parse_timestamp(get("next_run_at")),
+            get("metadata") or {},
+            status.lower() == OutboxStatus.DLQ or bool(get("dlq")),
+        )
+
+    @classmethod
+    def from_records(cls, rows: Iterable[Mapping[str, Any]]) -> tuple["OutboxRecord", ...]:
+        """Decode a batch of Supabase rows (e.g. a whole `list_pending` page)."""
+
+        from_record = cls.from_record
+        return tuple([from_record(row) for row in rows])
+
+    def summary(self) -> "OutboxRecordSummary":
+        title = self.metadata.get("title") if isinstance(self.metadata, Mapping) else None
+        return OutboxRecordSummary(
+            envelope_id=self.envelope.envelope_id,
+            tenant_id=self.envelope.tenant_id,
+            tool_slug=self.envelope.tool_slug,
+            status=self.status,
+            risk=self.envelope.risk,
+            attempts=self.attempts,
+            last_error=self.last_error,
+            title=str(title) if title else None,
+            queued_at=self.queued_at,
+            next_run_at=self.next_run_at,
+        )
+
+    def to_shared_state(self) -> Mapping[str, Any]:
+        return self.summary().to_shared_state()
+
+
+# Columns behind `OutboxRecordSummary`: no jsonb payloads, only the title from metadata.
+SUMMARY_COLUMNS = (
+    "id, tenant_id, tool_slug, status, risk, attempts, last_error, created_at, next_run_at, "
+    "title:metadata->>title"
+)
+# `outbox_dlq` has no `next_run_at`; dead-lettered envelopes are never scheduled.
+DLQ_SUMMARY_COLUMNS = (
+    "id, tenant_id, tool_slug, status, risk, attempts, last_error, created_at, "
+    "title:metadata->>title"
+)
 
+
+@dataclass(slots=True)
+class OutboxRecordSummary:
+    """Scalar projection of an outbox row for listings, counts, and desk hydration."""
+
+    envelope_id: str
+    tenant_id: str
+    tool_slug: str
+    status: str
+    risk: str = "medium"
+    attempts: int = 0
+    last_error: Optional[str] = None
+    title: Optional[str] = None
+    queued_at: datetime = field(default_factory=_utc_now)
+    next_run_at: Optional[datetime] = None
+
+    @classmethod
+    def from_record(cls, record: Mapping[str, Any]) -> "OutboxRecordSummary":
+        get = record.get
+        title = get("title")
         return cls(
-            envelope=envelope,
-            status=status,
-            attempts=attempts,
-            last_error=last_error,
-            queued_at=_parse(queued_at),
-            updated_at=_parse(updated_at),
-            next_run_at=_parse(next_run_at) if next_run_at else None,
-            metadata=metadata,
-            dlq=dlq,
+            str(get("id") or get("envelope_id") or ""),
+            str(get("tenant_id") or ""),
+            str(get("tool_slug") or ""),
+            str(get("status") or OutboxStatus.PENDING),
+            str(get("risk") or "medium"),
+            int(get("attempts") or 0),
+            get("last_error"),
+            str(title) if title else None,
+            parse_timestamp(get("queued_at") or get("created_at")) or _utc_now(),
+            parse_timestamp(get("next_run_at")),
         )
 
     def to_shared_state(self) -> Mapping[str, Any]:
         evidence: list[str] = []
-        evidence.append(f"Tool: {self.envelope.tool_slug}")
-        evidence.append(f"Risk: {self.envelope.risk}")
+        evidence.append(f"Tool: {self.tool_slug}")
+        evidence.append(f"Risk: {self.risk}")
         evidence.append(f"Queued: {self.queued_at.isoformat()}")
         if self.attempts:
             evidence.append(f"Attempts: {self.attempts}")
         if self.last_error:
             evidence.append(f"Error: {self.last_error}")
 
-        status = _map_outbox_status(self.status)
-
-        title = (
-            str(self.metadata.get("title"))
-            if isinstance(self.metadata, Mapping) and self.metadata.get("title")
-            else _humanise_slug(self.envelope.tool_slug)
-        )
-
         return {
-            "id": self.envelope.envelope_id,
-            "title": title,
-            "status": status,
+            "id": self.envelope_id,
+            "title": self.title or _humanise_slug(self.tool_slug),
+            "status": _map_outbox_status(self.status),
             "evidence": evidence,
         }
 
@@ -127,10 +216,98 @@ def _humanise_slug(slug: str) -> str:
     return slug.replace(".", " ").replace("_", " ").title() or "Queued Envelope"
 
 
+def _failure_status(*, retry_in: Optional[int], move_to_dlq: bool) -> str:
+    if move_to_dlq:
+        return OutboxStatus.DLQ
+    if retry_in is not None:
+        return OutboxStatus.PENDING
+    return OutboxStatus.FAILED
+
+
+def _dedup_key(row: Mapping[str, Any]) -> tuple[str, str]:
+    return str(row.get("tenant_id")), str(row.get("external_id"))
+
+
+def _interleave(groups: Iterable[Sequence[OutboxRecord]], limit: int) -> tuple[OutboxRecord, ...]:
+    """Round-robin across per-tenant groups, mirroring `outbox_pending_fair`."""
+
+    ordered = [group for group in groups if group]
+    selected: list[OutboxRecord] = []
+    rank = 0
+    while len(selected) < limit:
+        tier = [group[rank] for group in ordered if rank < len(group)]
+        if not tier:
+            break
+        selected.extend(tier[: limit - len(selected)])
+        rank += 1
+    return tuple(selected)
+
+
+class OutboxEnqueueError(RuntimeError):
+    """Raised when an enqueued envelope has no outbox row to return."""
+
+
+class ExternalIdCache:
+    """Thread-safe LRU mapping `(tenant_id, external_id)` to the queued envelope id.
+
+    Lets replayed agent turns skip the insert and re-read the queued row by primary key.
+    Only ids are cached, so callers always see the row's current state.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self._maxsize = max(0, maxsize)
+        self._entries: "OrderedDict[tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id: str, external_id: str) -> Optional[str]:
+        key = (tenant_id, external_id)
+        with self._lock:
+            envelope_id = self._entries.get(key)
+            if envelope_id is not None:
+                self._entries.move_to_end(key)
+            return envelope_id
+
+    def put(self, tenant_id: str, external_id: str, envelope_id: str) -> None:
+        if self._maxsize == 0:
+            return
+        key = (tenant_id, external_id)
+        with self._lock:
+            self._entries[key] = envelope_id
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, tenant_id: str, external_id: str) -> None:
+        with self._lock:
+            self._entries.pop((tenant_id, external_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
 class OutboxService(Protocol):
     """Interface for queueing envelopes and tracking their lifecycle."""
 
     def enqueue(self, envelope: Envelope, *, metadata: Mapping[str, Any] | None = None) -> OutboxRecord:
+        """Queue an envelope, returning the existing record when `external_id` is known."""
+        ...
+
+    def enqueue_many(
+        self,
+        envelopes: Sequence[Envelope],
+        *,
+        metadata: Mapping[str, Any] | None = None,
+    ) -> Sequence[OutboxRecord]:
+        """Queue several envelopes in one operation.
+
+        Envelopes whose `external_id` is already queued are not inserted again; the
+        existing record is returned in their place. Results follow input order.
+        """
         ...
 
     def get(self, envelope_id: str) -> Optional[OutboxRecord]:
@@ -139,9 +316,42 @@ class OutboxService(Protocol):
     def list_pending(self, *, tenant_id: str | None = None, limit: int = 50) -> Sequence[OutboxRecord]:
         ...
 
+    def list_pending_fair(self, *, per_tenant: int, limit: int) -> Sequence[OutboxRecord]:
+        """Return due envelopes with at most `per_tenant` rows for any single tenant.
+
+        Rows are interleaved round-robin across tenants so a large backlog from one
+        tenant cannot crowd everyone else out of the claim window.
+        """
+        ...
+
     def list_dlq(self, *, tenant_id: str | None = None, limit: int = 50) -> Sequence[OutboxRecord]:
         ...
 
+    def list_summaries(
+        self,
+        *,
+        status: str,
+        tenant_id: str | None = None,
+        limit: int = 50,
+        tool_slug: str | None = None,
+        error_contains: str | None = None,
+        queued_after: datetime | None = None,
+        queued_before: datetime | None = None,
+    ) -> Sequence[OutboxRecordSummary]:
+        """Return scalar projections of envelopes in `status`, oldest first.
+
+        Unlike `list_pending`, this does not filter on `next_run_at`: scheduled retries
+        are still pending work. Use it wherever payloads are not needed (desk hydration,
+        DLQ draining) so arguments and metadata never leave the database. Optional
+        filters narrow by tool slug, a case-insensitive `last_error` substring, and a
+        `[queued_after, queued_before)` window on the queue time.
+        """
+        ...
+
+    def count(self, *, status: str, tenant_id: str | None = None) -> int:
+        """Return the number of envelopes in `status` without fetching any rows."""
+        ...
+
     def mark_in_progress(self, envelope_id: str) -> None:
         ...
 
@@ -156,6 +366,12 @@ class OutboxService(Protocol):
         retry_in: Optional[int] = None,
         move_to_dlq: bool = False,
     ) -> None:
+        """Record a failed attempt and increment the persisted `attempts` counter.
+
+        With `retry_in` the envelope stays `pending` and becomes due again after the delay,
+        so retries are scheduled by the queue rather than by sleeping in the worker. Without
+        it the envelope is marked `failed`, or `dlq` when `move_to_dlq` is set.
+        """
         ...
 
     def mark_conflict(self, envelope_id: str, *, reason: str) -> None:
@@ -164,6 +380,19 @@ class OutboxService(Protocol):
     def requeue_from_dlq(self, envelope_id: str) -> Optional[OutboxRecord]:
         ...
 
+    def requeue_many_from_dlq(
+        self,
+        envelope_ids: Sequence[str],
+        *,
+        run_at: Sequence[Optional[datetime]] | None = None,
+    ) -> int:
+        """Requeue several DLQ envelopes at once, returning how many were requeued.
+
+        `run_at`, aligned with `envelope_ids`, becomes each envelope's `next_run_at` so a
+        replay can be spread out instead of landing in the queue all at once.
+        """
+        ...
+
     def defer(self, envelope_id: str, *, retry_in: int) -> None:
         """Reschedule a pending envelope without marking it as a failure.
 
@@ -174,46 +403,146 @@ class OutboxService(Protocol):
 
 
 class InMemoryOutboxService(OutboxService):
-    """Queues envelopes in memory for local development and unit tests."""
+    """Queues envelopes in memory for local development, load tests, and unit tests.
 
-    def __init__(self) -> None:
-        self._records: "OrderedDict[str, OutboxRecord]" = OrderedDict()
+    Records are indexed by status and tenant, and deferred envelopes wait in a
+    `next_run_at` min-heap until they are due, so polling cost tracks the ready backlog
+    rather than every envelope ever enqueued. A re-entrant lock guards all mutations so
+    one instance can back several worker threads. Terminal records (success, conflict,
+    failed) can optionally be compacted by age or count.
+
+    Like the database, an `external_id` belongs to the tenant that first enqueued it;
+    reusing it from another tenant raises `OutboxEnqueueError`. Compaction keeps a
+    tombstone (the record without arguments or metadata) per `external_id`, so a late
+    retry resolves to the finished envelope instead of running again.
+    """
+
+    def __init__(
+        self,
+        *,
+        terminal_retention: Optional[timedelta] = None,
+        max_terminal_records: Optional[int] = None,
+        clock: Callable[[], datetime] = _utc_now,
+    ) -> None:
+        self._lock = threading.RLock()
+        self._clock = clock
+        self._terminal_retention = terminal_retention
+        self._max_terminal_records = max_terminal_records
+        self._records: dict[str, OutboxRecord] = {}
+        self._external_ids: dict[tuple[str, str], str] = {}
+        self._external_tenants: dict[str, str] = {}
+        self._tombstones: dict[str, OutboxRecord] = {}
+        self._status_index: dict[str, dict[str, None]] = defaultdict(dict)
+        self._tenant_index: dict[str, dict[str, dict[str, None]]] = defaultdict(lambda: defaultdict(dict))
+        # Pending envelopes that are due, in the order they became ready.
+        self._ready: dict[str, None] = {}
+        self._ready_by_tenant: dict[str, dict[str, None]] = defaultdict(dict)
+        # Deferred pending envelopes keyed by next_run_at; stale entries are skipped lazily.
+        self._schedule: list[tuple[datetime, int, str]] = []
+        self._scheduled: dict[str, int] = {}
+        self._sequence = itertools.count()
+        # Terminal envelopes ordered by the time they became terminal.
+        self._terminal_since: dict[str, datetime] = {}
 
     def enqueue(self, envelope: Envelope, *, metadata: Mapping[str, Any] | None = None) -> OutboxRecord:
-        record = OutboxRecord(envelope=envelope, metadata=dict(metadata or {}))
-        self._records[record.envelope.envelope_id] = record
+        with self._lock:
+            existing = self._find_external_id(envelope)
+            if existing is not None:
+                return existing
+            record = OutboxRecord(envelope=envelope, metadata=dict(metadata or {}))
+            self._insert(record)
         return record
 
+    def enqueue_many(
+        self,
+        envelopes: Sequence[Envelope],
+        *,
+        metadata: Mapping[str, Any] | None = None,
+    ) -> Sequence[OutboxRecord]:
+        records: list[OutboxRecord] = []
+        with self._lock:
+            for envelope in envelopes:
+                existing = self._find_external_id(envelope)
+                if existing is not None:
+                    records.append(existing)
+                    continue
+                record = OutboxRecord(envelope=envelope, metadata=dict(metadata or {}))
+                self._insert(record)
+                records.append(record)
+        return tuple(records)
+
     def get(self, envelope_id: str) -> Optional[OutboxRecord]:
-        return self._records.get(envelope_id)
+        with self._lock:
+            return self._records.get(envelope_id)
 
     def list_pending(self, *, tenant_id: str | None = None, limit: int = 50) -> Sequence[OutboxRecord]:
-        items = [
-            record
-            for record in self._records.values()
-            if record.status == OutboxStatus.PENDING and (tenant_id is None or record.tenant_id == tenant_id)
-        ]
-        return tuple(items[:limit])
+        with self._lock:
+            self._promote_due()
+            self._expire_terminal()
+            source = self._ready if tenant_id is None else self._ready_by_tenant.get(tenant_id, {})
+            return tuple(self._records[envelope_id] for envelope_id in islice(source, max(limit, 0)))
+
+    def list_pending_fair(self, *, per_tenant: int, limit: int) -> Sequence[OutboxRecord]:
+        with self._lock:
+            self._promote_due()
+            groups = [
+                [self._records[envelope_id] for envelope_id in islice(ids, max(per_tenant, 0))]
+                for ids in self._ready_by_tenant.values()
+            ]
+            return _interleave(groups, limit)
 
     def list_dlq(self, *, tenant_id: str | None = None, limit: int = 50) -> Sequence[OutboxRecord]:
-        items = [
-            record
-            for record in self._records.values()
-            if record.dlq and (tenant_id is None or record.tenant_id == tenant_id)
-        ]
-        return tuple(items[:limit])
+        with self._lock:
+            source = self._status_source(OutboxStatus.DLQ, tenant_id)
+            return tuple(self._records[envelope_id] for envelope_id in islice(source, max(limit, 0)))
+
+    def list_summaries(
+        self,
+        *,
+        status: str,
+        tenant_id: str | None = None,
+        limit: int = 50,
+        tool_slug: str | None = None,
+        error_contains: str | None = None,
+        queued_after: datetime | None = None,
+        queued_before: datetime | None = None,
+    ) -> Sequence[OutboxRecordSummary]:
+        needle = error_contains.lower() if error_contains else None
+
+        def matches(record: OutboxRecord) -> bool:
+            if tool_slug is not None and record.envelope.tool_slug != tool_slug:
+                return False
+            if needle is not None and needle not in (record.last_error or "").lower():
+                return False
+            if queued_after is not None and record.queued_at < queued_after:
+                return False
+            return queued_before is None or record.queued_at < queued_before
+
+        with self._lock:
+            records = (self._records[envelope_id] for envelope_id in self._status_source(status, tenant_id))
+            return tuple(record.summary() for record in islice(filter(matches, records), max(limit, 0)))
+
+    def count(self, *, status: str, tenant_id: str | None = None) -> int:
+        with self._lock:
+            return len(self._status_source(status, tenant_id))
 
     def mark_in_progress(self, envelope_id: str) -> None:
-        record = self._require(envelope_id)
-        record.status = OutboxStatus.IN_PROGRESS
-        record.updated_at = _utc_now()
+        with self._lock:
+            record = self._require(envelope_id)
+            previous = record.status
+            record.status = OutboxStatus.IN_PROGRESS
+            record.updated_at = self._clock()
+            self._reindex(record, previous_status=previous)
 
     def mark_success(self, envelope_id: str, *, result: Mapping[str, Any] | None = None) -> None:
-        record = self._require(envelope_id)
-        record.status = OutboxStatus.SUCCESS
-        record.metadata = {**record.metadata, "result": dict(result or {})}
-        record.updated_at = _utc_now()
-        record.next_run_at = None
+        with self._lock:
+            record = self._require(envelope_id)
+            previous = record.status
+            record.status = OutboxStatus.SUCCESS
+            record.metadata = {**record.metadata, "result": dict(result or {})}
+            record.updated_at = self._clock()
+            record.next_run_at = None
+            self._reindex(record, previous_status=previous)
 
     def mark_failure(
         self,
@@ -223,52 +552,231 @@ class InMemoryOutboxService(OutboxService):
         retry_in: Optional[int] = None,
         move_to_dlq: bool = False,
     ) -> None:
-        record = self._require(envelope_id)
-        record.status = OutboxStatus.DLQ if move_to_dlq else OutboxStatus.FAILED
-        record.mark_attempt(error=error, retry_at=self._retry_time(retry_in))
-        record.dlq = move_to_dlq
+        with self._lock:
+            record = self._require(envelope_id)
+            previous = record.status
+            record.status = _failure_status(retry_in=retry_in, move_to_dlq=move_to_dlq)
+            record.mark_attempt(error=error, retry_at=None if move_to_dlq else self._retry_time(retry_in))
+            record.dlq = move_to_dlq
+            self._reindex(record, previous_status=previous)
 
     def mark_conflict(self, envelope_id: str, *, reason: str) -> None:
-        record = self._require(envelope_id)
-        record.status = OutboxStatus.CONFLICT
-        record.last_error = reason
-        record.updated_at = _utc_now()
+        with self._lock:
+            record = self._require(envelope_id)
+            previous = record.status
+            record.status = OutboxStatus.CONFLICT
+            record.last_error = reason
+            record.updated_at = self._clock()
+            self._reindex(record, previous_status=previous)
+
+    def requeue_from_dlq(self, envelope_id: str) -> Optional[OutboxRecord]:
+        with self._lock:
+            record = self._records.get(envelope_id)
+            if record is None:
+                return None
+            previous = record.status
+            record.status = OutboxStatus.PENDING
+            record.dlq = False
+            record.last_error = None
+            record.next_run_at = None
+            record.attempts = 0
+            record.updated_at = self._clock()
+            self._reindex(record, previous_status=previous)
+            return record
+
+    def requeue_many_from_dlq(
+        self,
+        envelope_ids: Sequence[str],
+        *,
+        run_at: Sequence[Optional[datetime]] | None = None,
+    ) -> int:
+        schedule = run_at if run_at is not None else [None] * len(envelope_ids)
+        requeued = 0
+        with self._lock:
+            for envelope_id, next_run_at in zip(envelope_ids, schedule):
+                record = self.requeue_from_dlq(envelope_id)
+                if record is None:
+                    continue
+                requeued += 1
+                if next_run_at is not None:
+                    record.next_run_at = next_run_at
+                    self._reindex(record, previous_status=record.status)
+        return requeued
+
+    def defer(self, envelope_id: str, *, retry_in: int) -> None:
+        with self._lock:
+            record = self._require(envelope_id)
+            previous = record.status
+            # Keep status pending; set next attempt after the delay
+            record.next_run_at = self._clock() + timedelta(seconds=retry_in)
+            record.updated_at = self._clock()
+            self._reindex(record, previous_status=previous)
+
+    def compact(self) -> int:
+        """Drop terminal records beyond the retention window or count cap."""
+
+        with self._lock:
+            return self._expire_terminal()
 
     def clear(self) -> None:
-        self._records.clear()
+        with self._lock:
+            self._records.clear()
+            self._external_ids.clear()
+            self._external_tenants.clear()
+            self._tombstones.clear()
+            self._status_index.clear()
+            self._tenant_index.clear()
+            self._ready.clear()
+            self._ready_by_tenant.clear()
+            self._schedule.clear()
+            self._scheduled.clear()
+            self._terminal_since.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def _status_source(self, status: str, tenant_id: str | None) -> Mapping[str, None]:
+        if tenant_id is None:
+            return self._status_index.get(status, {})
+        return self._tenant_index.get(tenant_id, {}).get(status, {})
 
     def _require(self, envelope_id: str) -> OutboxRecord:
         if envelope_id not in self._records:
             raise KeyError(f"Envelope {envelope_id} not found in outbox")
         return self._records[envelope_id]
 
-    @staticmethod
-    def _retry_time(retry_in: Optional[int]) -> Optional[datetime]:
+    def _retry_time(self, retry_in: Optional[int]) -> Optional[datetime]:
         if retry_in is None:
             return None
-        return _utc_now() + timedelta(seconds=retry_in)
-
-    def requeue_from_dlq(self, envelope_id: str) -> Optional[OutboxRecord]:
-        record = self._records.get(envelope_id)
-        if record is None:
+        return self._clock() + timedelta(seconds=retry_in)
+
+    def _find_external_id(self, envelope: Envelope) -> Optional[OutboxRecord]:
+        owner = self._external_tenants.get(envelope.external_id)
+        if owner is not None and owner != envelope.tenant_id:
+            raise OutboxEnqueueError(
+                f"external_id {envelope.external_id!r} is already used by another tenant"
+            )
+        envelope_id = self._external_ids.get((envelope.tenant_id, envelope.external_id))
+        if envelope_id is None:
             return None
-        record.status = OutboxStatus.PENDING
-        record.dlq = False
-        record.last_error = None
-        record.next_run_at = None
-        record.attempts = 0
-        record.updated_at = _utc_now()
-        return record
-
-    def defer(self, envelope_id: str, *, retry_in: int) -> None:
-        record = self._require(envelope_id)
-        # Keep status pending; set next attempt after the delay
-        record.next_run_at = _utc_now() + timedelta(seconds=retry_in)
-        record.updated_at = _utc_now()
+        return self._records.get(envelope_id) or self._tombstones.get(envelope_id)
+
+    def _insert(self, record: OutboxRecord) -> None:
+        envelope_id = record.envelope.envelope_id
+        if envelope_id in self._records:
+            self._remove(envelope_id)
+        self._records[envelope_id] = record
+        self._external_ids[(record.tenant_id, record.envelope.external_id)] = envelope_id
+        self._external_tenants[record.envelope.external_id] = record.tenant_id
+        self._reindex(record, previous_status=None)
+
+    def _reindex(self, record: OutboxRecord, *, previous_status: Optional[str]) -> None:
+        envelope_id = record.envelope.envelope_id
+        tenant_id = record.tenant_id
+        if previous_status is not None and previous_status != record.status:
+            self._status_index[previous_status].pop(envelope_id, None)
+            self._tenant_index[tenant_id][previous_status].pop(envelope_id, None)
+        self._status_index[record.status][envelope_id] = None
+        self._tenant_index[tenant_id][record.status][envelope_id] = None
+
+        self._unready(envelope_id, tenant_id)
+        self._scheduled.pop(envelope_id, None)
+        if record.status == OutboxStatus.PENDING:
+            if record.next_run_at is None or record.next_run_at <= self._clock():
+                self._ready[envelope_id] = None
+                self._ready_by_tenant[tenant_id][envelope_id] = None
+            else:
+                sequence = next(self._sequence)
+                self._scheduled[envelope_id] = sequence
+                heapq.heappush(self._schedule, (record.next_run_at, sequence, envelope_id))
+
+        if record.status in _TERMINAL_STATUSES:
+            self._terminal_since.pop(envelope_id, None)
+            self._terminal_since[envelope_id] = self._clock()
+            if self._max_terminal_records is not None and len(self._terminal_since) > self._max_terminal_records:
+                self._expire_terminal()
+        else:
+            self._terminal_since.pop(envelope_id, None)
+
+    def _unready(self, envelope_id: str, tenant_id: str) -> None:
+        if envelope_id not in self._ready:
+            return
+        del self._ready[envelope_id]
+        tenant_ready = self._ready_by_tenant.get(tenant_id)
+        if tenant_ready is not None:
+            tenant_ready.pop(envelope_id, None)
+            if not tenant_ready:
+                del self._ready_by_tenant[tenant_id]
+
+    def _promote_due(self) -> None:
+        now = self._clock()
+        while self._schedule and self._schedule[0][0] <= now:
+            _, sequence, envelope_id = heapq.heappop(self._schedule)
+            if self._scheduled.get(envelope_id) != sequence:
+                continue  # rescheduled or no longer pending
+            del self._scheduled[envelope_id]
+            record = self._records[envelope_id]
+            self._ready[envelope_id] = None
+            self._ready_by_tenant[record.tenant_id][envelope_id] = None
+
+    def _expire_terminal(self) -> int:
+        if self._terminal_retention is None and self._max_terminal_records is None:
+            return 0
+
+        removed = 0
+        cutoff = self._clock() - self._terminal_retention if self._terminal_retention is not None else None
+        while self._terminal_since:
+            envelope_id, since = next(iter(self._terminal_since.items()))
+            over_cap = self._max_terminal_records is not None and len(self._terminal_since) > self._max_terminal_records
+            expired = cutoff is not None and since <= cutoff
+            if not (over_cap or expired):
+                break
+            self._remove(envelope_id, tombstone=True)
+            removed += 1
+        return removed
+
+    def _remove(self, envelope_id: str, *, tombstone: bool = False) -> None:
+        record = self._records.pop(envelope_id, None)
+        if record is None:
+            return
+        key = (record.tenant_id, record.envelope.external_id)
+        if tombstone:
+            # The dedup key outlives the record; keep only what a retry needs to see.
+            self._tombstones[envelope_id] = replace(
+                record,
+                envelope=replace(
+                    record.envelope,
+                    arguments=EMPTY_MAPPING,
+                    trust_context=EMPTY_MAPPING,
+                    metadata=EMPTY_MAPPING,
+                ),
+                metadata={},
+            )
+        elif self._external_ids.get(key) == envelope_id:
+            del self._external_ids[key]
+            self._external_tenants.pop(record.envelope.external_id, None)
+        self._status_index[record.status].pop(envelope_id, None)
+        tenant_statuses = self._tenant_index.get(record.tenant_id)
+        if tenant_statuses is not None:
+            tenant_statuses[record.status].pop(envelope_id, None)
+        self._unready(envelope_id, record.tenant_id)
+        self._scheduled.pop(envelope_id, None)
+        self._terminal_since.pop(envelope_id, None)
+
+
+# Ids per bulk RPC call; keeps request bodies bounded for very large drains.
+_RPC_ID_BATCH = 1000
 
 
 class SupabaseOutboxService(OutboxService):
-    """Supabase-backed outbox implementation."""
+    """Supabase-backed outbox implementation.
+
+    With a `payloads` offloader, oversized `arguments` and execution results are kept
+    in the payload store and the rows hold references (see `agent.services.payloads`).
+    """
+
+    _payloads: Optional["PayloadOffloader"] = None
 
     def __init__(
         self,
@@ -277,23 +785,121 @@ class SupabaseOutboxService(OutboxService):
         schema: str = "public",
         table: str = "outbox",
         dlq_table: str = "outbox_dlq",
+        dedup_cache_size: int = 4096,
+        payloads: Optional["PayloadOffloader"] = None,
     ) -> None:
         self._client = client
         self._schema = schema
         self._table = table
         self._dlq_table = dlq_table
+        self._recent = ExternalIdCache(dedup_cache_size)
+        self._payloads = payloads
 
     def enqueue(self, envelope: Envelope, *, metadata: Mapping[str, Any] | None = None) -> OutboxRecord:
-        record = {
-            **envelope.to_record(),
-            "status": OutboxStatus.PENDING,
-            "attempts": 0,
-            "metadata": dict(metadata or {}),
-            "dlq": False,
-        }
-        response = self._table_ref().insert(record).execute()
-        inserted = (getattr(response, "data", None) or [record])[0]
-        return OutboxRecord.from_record(inserted)
+        envelope_id = self._recent.get(envelope.tenant_id, envelope.external_id)
+        if envelope_id is not None:
+            current = self.get(envelope_id)
+            if current is not None:
+                return current
+            # Archived or deleted since it was cached; enqueue it again.
+            self._recent.discard(envelope.tenant_id, envelope.external_id)
+
+        record = self._pending_row(envelope, metadata)
+        # Insert-or-ignore keeps retried tool calls from tripping the external_id unique index.
+        response = (
+            self._table_ref()
+            .upsert(record, on_conflict="external_id", ignore_duplicates=True)
+            .execute()
+        )
+        rows = getattr(response, "data", None) or []
+        if not rows:
+            existing = (
+                self._table_ref()
+                .select("*")
+                .eq("tenant_id", envelope.tenant_id)
+                .eq("external_id", envelope.external_id)
+                .limit(1)
+                .execute()
+            )
+            rows = getattr(existing, "data", None) or []
+        if not rows:
+            # Archived external_ids stay reserved (migration 006); resolve the retry to
+            # the archived row instead of running it again.
+            key = (envelope.tenant_id, envelope.external_id)
+            rows = [row for row in self._archived_rows([envelope.external_id]) if _dedup_key(row) == key]
+        if not rows:
+            # The insert was ignored but the tenant has no such row: another tenant owns
+            # the external_id.
+            raise OutboxEnqueueError(
+                f"No outbox row for external_id {envelope.external_id!r} in tenant {envelope.tenant_id}"
+            )
+        queued = OutboxRecord.from_record(rows[0])
+        self._recent.put(envelope.tenant_id, envelope.external_id, queued.envelope.envelope_id)
+        return queued
+
+    def enqueue_many(
+        self,
+        envelopes: Sequence[Envelope],
+        *,
+        metadata: Mapping[str, Any] | None = None,
+    ) -> Sequence[OutboxRecord]:
+        if not envelopes:
+            return ()
+
+        queued: dict[tuple[str, str], OutboxRecord] = {}
+        hits: dict[str, tuple[str, str]] = {}
+        for envelope in envelopes:
+            key = (envelope.tenant_id, envelope.external_id)
+            envelope_id = self._recent.get(*key)
+            if envelope_id is not None:
+                hits[envelope_id] = key
+        if hits:
+            current = self._table_ref().select("*").in_("id", list(hits)).execute()
+            for row in getattr(current, "data", None) or []:
+                record = OutboxRecord.from_record(row)
+                if record.envelope.envelope_id in hits:
+                    queued[hits[record.envelope.envelope_id]] = record
+            for key in set(hits.values()) - queued.keys():
+                self._recent.discard(*key)
+
+        rows: dict[tuple[str, str], dict[str, Any]] = {}
+        for envelope in envelopes:
+            key = (envelope.tenant_id, envelope.external_id)
+            if key not in queued and key not in rows:
+                rows[key] = self._pending_row(envelope, metadata)
+
+        if rows:
+            response = (
+                self._table_ref()
+                .upsert(list(rows.values()), on_conflict="external_id", ignore_duplicates=True)
+                .execute()
+            )
+            found = {_dedup_key(row): row for row in (getattr(response, "data", None) or [])}
+
+            # Duplicates are skipped by the insert; fetch the rows that already existed.
+            missing = [key for key in rows if key not in found]
+            if missing:
+                external_ids = sorted({external_id for _, external_id in missing})
+                existing = self._table_ref().select("*").in_("external_id", external_ids).execute()
+                for row in getattr(existing, "data", None) or []:
+                    found.setdefault(_dedup_key(row), row)
+            archived = sorted({key[1] for key in missing if key not in found})
+            if archived:
+                for row in self._archived_rows(archived):
+                    found.setdefault(_dedup_key(row), row)
+
+            for key in rows:
+                row = found.get(key)
+                if row is None:
+                    raise OutboxEnqueueError(f"No outbox row for external_id {key[1]!r} in tenant {key[0]}")
+                record = OutboxRecord.from_record(row)
+                self._recent.put(*key, record.envelope.envelope_id)
+                queued[key] = record
+        return tuple(queued[(envelope.tenant_id, envelope.external_id)] for envelope in envelopes)
+
+    def _archived_rows(self, external_ids: Sequence[str]) -> list[dict[str, Any]]:
+        response = self._client.rpc("outbox_archived_lookup", {"p_external_ids": list(external_ids)}).execute()
+        return list(getattr(response, "data", None) or [])
 
     def get(self, envelope_id: str) -> Optional[OutboxRecord]:
         response = self._table_ref().select("*").eq("id", envelope_id).limit(1).execute()
@@ -303,25 +909,22 @@ class SupabaseOutboxService(OutboxService):
         return OutboxRecord.from_record(rows[0])
 
     def list_pending(self, *, tenant_id: str | None = None, limit: int = 50) -> Sequence[OutboxRecord]:
-        now_iso = _utc_now().isoformat()
-        query = (
-            self._table_ref()
-            .select("*")
-            .eq("status", OutboxStatus.PENDING)
-        )
-        if tenant_id:
-            query = query.eq("tenant_id", tenant_id)
+        # `outbox_pending_due` orders by `coalesce(next_run_at, created_at)`, which
+        # PostgREST filters cannot express; the expression is what the claim index covers.
+        response = self._client.rpc(
+            "outbox_pending_due",
+            {"p_tenant_id": tenant_id, "p_limit": limit},
+        ).execute()
+        rows = getattr(response, "data", []) or []
+        return OutboxRecord.from_records(rows)
 
-        query = (
-            query
-            .or_(f"next_run_at.is.null,next_run_at.lte.{now_iso}")
-            .order("next_run_at", nullsfirst=True)
-            .order("created_at")
-            .limit(limit)
-        )
-        response = query.execute()
+    def list_pending_fair(self, *, per_tenant: int, limit: int) -> Sequence[OutboxRecord]:
+        response = self._client.rpc(
+            "outbox_pending_fair",
+            {"p_per_tenant": per_tenant, "p_limit": limit},
+        ).execute()
         rows = getattr(response, "data", []) or []
-        return tuple(OutboxRecord.from_record(row) for row in rows)
+        return OutboxRecord.from_records(rows)
 
     def list_dlq(self, *, tenant_id: str | None = None, limit: int = 50) -> Sequence[OutboxRecord]:
         query = self._dlq_table_ref().select("*")
@@ -329,7 +932,42 @@ class SupabaseOutboxService(OutboxService):
             query = query.eq("tenant_id", tenant_id)
         response = query.order("created_at", desc=True).limit(limit).execute()
         rows = getattr(response, "data", []) or []
-        return tuple(OutboxRecord.from_record(row) for row in rows)
+        return OutboxRecord.from_records(rows)
+
+    def list_summaries(
+        self,
+        *,
+        status: str,
+        tenant_id: str | None = None,
+        limit: int = 50,
+        tool_slug: str | None = None,
+        error_contains: str | None = None,
+        queued_after: datetime | None = None,
+        queued_before: datetime | None = None,
+    ) -> Sequence[OutboxRecordSummary]:
+        columns = DLQ_SUMMARY_COLUMNS if status == OutboxStatus.DLQ else SUMMARY_COLUMNS
+        query = self._status_table_ref(status).select(columns).eq("status", status)
+        if tenant_id:
+            query = query.eq("tenant_id", tenant_id)
+        if tool_slug:
+            query = query.eq("tool_slug", tool_slug)
+        if error_contains:
+            query = query.ilike("last_error", f"*{error_contains}*")
+        if queued_after is not None:
+            query = query.gte("created_at", queued_after.isoformat())
+        if queued_before is not None:
+            query = query.lt("created_at", queued_before.isoformat())
+        response = query.order("created_at").limit(limit).execute()
+        rows = getattr(response, "data", []) or []
+        return tuple(OutboxRecordSummary.from_record(row) for row in rows)
+
+    def count(self, *, status: str, tenant_id: str | None = None) -> int:
+        # HEAD request with an exact count: PostgREST returns only the Content-Range header.
+        query = self._status_table_ref(status).select("id", count="exact", head=True).eq("status", status)
+        if tenant_id:
+            query = query.eq("tenant_id", tenant_id)
+        response = query.execute()
+        return int(getattr(response, "count", None) or 0)
 
     def mark_in_progress(self, envelope_id: str) -> None:
         self._update(envelope_id, {"status": OutboxStatus.IN_PROGRESS, "updated_at": _utc_now().isoformat()})
@@ -340,7 +978,10 @@ class SupabaseOutboxService(OutboxService):
         if record is not None and isinstance(record.metadata, Mapping):
             metadata.update(dict(record.metadata))
         if result is not None:
-            metadata.update(dict(result))
+            # Always under `result`, inline or as a payload reference; read it back with
+            # `OutboxRecord.result`.
+            inline = plain_mapping(result)
+            metadata["result"] = self._payloads.offload(inline) if self._payloads is not None else inline
 
         payload = {
             "status": OutboxStatus.SUCCESS,
@@ -359,6 +1000,11 @@ class SupabaseOutboxService(OutboxService):
         retry_in: Optional[int] = None,
         move_to_dlq: bool = False,
     ) -> None:
+        if move_to_dlq:
+            # One transaction server-side: bump attempts, copy into outbox_dlq, flag the row.
+            self._client.rpc("outbox_move_to_dlq", {"p_id": envelope_id, "p_error": error}).execute()
+            return
+
         record = self.get(envelope_id)
         attempts = 1
         metadata: dict[str, Any] = {}
@@ -368,28 +1014,17 @@ class SupabaseOutboxService(OutboxService):
                 metadata.update(dict(record.metadata))
 
         payload = {
-            "status": OutboxStatus.DLQ if move_to_dlq else OutboxStatus.FAILED,
+            "status": _failure_status(retry_in=retry_in, move_to_dlq=False),
             "last_error": error,
             "attempts": attempts,
             "metadata": metadata,
             "updated_at": _utc_now().isoformat(),
         }
-        if retry_in is not None and not move_to_dlq:
+        if retry_in is not None:
             payload["next_run_at"] = (_utc_now() + timedelta(seconds=retry_in)).isoformat()
         else:
             payload["next_run_at"] = None
 
-        if move_to_dlq and record is not None:
-            self._dlq_table_ref().upsert(
-                {
-                    **record.envelope.to_record(),
-                    "status": OutboxStatus.DLQ,
-                    "last_error": error,
-                    "attempts": attempts,
-                    "metadata": metadata,
-                }
-            ).execute()
-
         self._update(envelope_id, payload)
 
     def mark_conflict(self, envelope_id: str, *, reason: str) -> None:
@@ -403,27 +1038,42 @@ class SupabaseOutboxService(OutboxService):
         )
 
     def requeue_from_dlq(self, envelope_id: str) -> Optional[OutboxRecord]:
-        dlq_response = (
-            self._dlq_table_ref()
-            .select("*")
-            .eq("id", envelope_id)
-            .limit(1)
-            .execute()
-        )
-        dlq_rows = getattr(dlq_response, "data", []) or []
-        self._update(
-            envelope_id,
-            {
-                "status": OutboxStatus.PENDING,
-                "attempts": 0,
-                "last_error": None,
-                "next_run_at": None,
-                "updated_at": _utc_now().isoformat(),
-            },
-        )
-        if dlq_rows:
-            self._dlq_table_ref().delete().eq("id", envelope_id).execute()
-        return self.get(envelope_id)
+        response = self._client.rpc("outbox_requeue", {"p_id": envelope_id}).execute()
+        rows = getattr(response, "data", []) or []
+        return OutboxRecord.from_record(rows[0]) if rows else None
+
+    def requeue_many_from_dlq(
+        self,
+        envelope_ids: Sequence[str],
+        *,
+        run_at: Sequence[Optional[datetime]] | None = None,
+    ) -> int:
+        requeued = 0
+        for start in range(0, len(envelope_ids), _RPC_ID_BATCH):
+            chunk = list(envelope_ids[start : start + _RPC_ID_BATCH])
+            if run_at is None:
+                response = self._client.rpc("outbox_requeue_many", {"p_ids": chunk}).execute()
+            else:
+                times = [value.isoformat() if value else None for value in run_at[start : start + _RPC_ID_BATCH]]
+                response = self._client.rpc(
+                    "outbox_requeue_scheduled", {"p_ids": chunk, "p_run_at": times}
+                ).execute()
+            requeued += len(getattr(response, "data", []) or [])
+        return requeued
+
+    def _status_table_ref(self, status: str):
+        return self._dlq_table_ref() if status == OutboxStatus.DLQ else self._table_ref()
+
+    def _pending_row(self, envelope: Envelope, metadata: Mapping[str, Any] | None) -> dict[str, Any]:
+        row = {
+            **envelope.to_record(),
+            "status": OutboxStatus.PENDING,
+            "attempts": 0,
+            "metadata": dict(metadata or {}),
+        }
+        if self._payloads is not None:
+            row["arguments"] = self._payloads.offload(row["arguments"])
+        return row
 
     def _update(self, envelope_id: str, payload: Mapping[str, Any]) -> None:
         self._table_ref().update(payload).eq("id", envelope_id).execute()
@@ -0,0 +1,169 @@
+"""Content-addressed store for large outbox arguments and tool results.
+
+Multi-megabyte payloads (base64 attachments, long message bodies, whole Composio
+results) would otherwise live in the hot `outbox` jsonb columns, slow every
+`select("*")` the worker issues, and be copied again into `outbox_dlq` and `actions`.
+`PayloadOffloader` swaps any mapping whose encoded size exceeds the threshold for a
+small reference (`{"$payload": "sha256:<hex>", "bytes": n}`); rows keep the reference
+and only the consumer that needs the full payload (the Composio call) resolves it.
+Identical payloads share one object, so retries and DLQ copies cost nothing extra.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Mapping, Optional, Protocol
+
+import structlog
+
+from agent.schemas import codec
+
+from .settings import AppSettings
+
+
+logger = structlog.get_logger(__name__)
+
+PAYLOAD_REF_KEY = "$payload"
+_DIGEST_PREFIX = "sha256:"
+
+
+class PayloadStoreError(RuntimeError):
+    """Raised when a referenced payload cannot be stored or loaded."""
+
+
+class PayloadIntegrityError(PayloadStoreError):
+    """Raised when a payload reference or its stored bytes can never be decoded."""
+
+
+class PayloadStore(Protocol):
+    """Byte storage keyed by content digest."""
+
+    def put(self, digest: str, data: bytes) -> None:
+        ...
+
+    def get(self, digest: str) -> bytes:
+        ...
+
+
+def _object_path(digest: str) -> str:
+    return f"{digest[:2]}/{digest}.json"
+
+
+class LocalPayloadStore(PayloadStore):
+    """Filesystem backend used in tests and single-host deployments."""
+
+    def __init__(self, root: str | os.PathLike[str]) -> None:
+        self._root = Path(root)
+
+    def put(self, digest: str, data: bytes) -> None:
+        target = self._root / _object_path(digest)
+        if target.exists():
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent writers of the same digest never expose a
+        # partial file; the content is identical, so the last rename wins harmlessly.
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".payload-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp, target)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def get(self, digest: str) -> bytes:
+        try:
+            return (self._root / _object_path(digest)).read_bytes()
+        except FileNotFoundError as exc:
+            raise PayloadStoreError(f"payload {digest} not found") from exc
+
+
+class SupabaseStoragePayloadStore(PayloadStore):
+    """Object-store backend on a Supabase Storage bucket."""
+
+    def __init__(self, client, *, bucket: str, prefix: str = "outbox") -> None:
+        self._client = client
+        self._bucket = bucket
+        self._prefix = prefix.strip("/")
+
+    def put(self, digest: str, data: bytes) -> None:
+        # Content-addressed keys never change meaning, so overwriting is safe and avoids
+        # a round trip to check for an existing object.
+        self._bucket_ref().upload(
+            self._path(digest),
+            data,
+            {"content-type": "application/json", "upsert": "true"},
+        )
+
+    def get(self, digest: str) -> bytes:
+        try:
+            return self._bucket_ref().download(self._path(digest))
+        except Exception as exc:
+            raise PayloadStoreError(f"payload {digest} could not be downloaded") from exc
+
+    def _path(self, digest: str) -> str:
+        path = _object_path(digest)
+        return f"{self._prefix}/{path}" if self._prefix else path
+
+    def _bucket_ref(self):
+        return self._client.storage.from_(self._bucket)
+
+
+def is_payload_ref(value: Any) -> bool:
+    return isinstance(value, Mapping) and isinstance(value.get(PAYLOAD_REF_KEY), str)
+
+
+class PayloadOffloader:
+    """Moves oversized mappings into a `PayloadStore` and resolves references back."""
+
+    def __init__(self, store: PayloadStore, *, threshold_bytes: int = 64 * 1024) -> None:
+        self._store = store
+        self._threshold = threshold_bytes
+
+    def offload(self, value: Mapping[str, Any] | None) -> Mapping[str, Any] | None:
+        """Return `value` unchanged, or a reference when its encoding exceeds the threshold."""
+
+        if value is None or is_payload_ref(value):
+            return value
+        data = codec.dumps(value)
+        if len(data) <= self._threshold:
+            return value
+        digest = hashlib.sha256(data).hexdigest()
+        self._store.put(digest, data)
+        logger.debug("payloads.offloaded", digest=digest, bytes=len(data))
+        return {PAYLOAD_REF_KEY: f"{_DIGEST_PREFIX}{digest}", "bytes": len(data)}
+
+    def resolve(self, value: Mapping[str, Any] | None) -> dict[str, Any]:
+        """Return a fresh dict for `value`, loading it from the store if it is a reference."""
+
+        if value is None:
+            return {}
+        if not is_payload_ref(value):
+            return dict(value)
+        reference = str(value[PAYLOAD_REF_KEY])
+        if not reference.startswith(_DIGEST_PREFIX):
+            raise PayloadIntegrityError(f"unsupported payload reference {reference!r}")
+        digest = reference[len(_DIGEST_PREFIX):]
+        data = self._store.get(digest)
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise PayloadIntegrityError(f"payload {digest} failed its integrity check")
+        decoded = codec.loads(data)
+        if not isinstance(decoded, dict):
+            raise PayloadIntegrityError(f"payload {digest} is not a JSON object")
+        return decoded
+
+
+def build_payload_offloader(settings: AppSettings, client=None) -> Optional[PayloadOffloader]:
+    """Create the configured offloader: a Storage bucket, a local directory, or none."""
+
+    store: PayloadStore | None = None
+    if settings.payload_store_bucket and client is not None:
+        store = SupabaseStoragePayloadStore(client, bucket=settings.payload_store_bucket)
+    elif settings.payload_store_path:
+        store = LocalPayloadStore(settings.payload_store_path)
+    if store is None:
+        return None
+    return PayloadOffloader(store, threshold_bytes=settings.payload_offload_threshold_bytes)
@@ -1,12 +1,31 @@
 """Policy service for effective tool write permissions and rate buckets.
 
-Backed by the `catalog_tools_view` created in the universal initial migration.
+Backed by the trigger-maintained `tool_effective_policy` table (migration 008), keyed
+by `(tenant_id, tool_slug)`, so every lookup is a primary-key hit.
 """
 
 from __future__ import annotations
 
+import threading
+import time
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+
+# Rate buckets are human-readable identifiers (e.g. 'slack.minute', 'email.daily') that
+# translate into conservative minimum gaps, in seconds, between sends.
+RATE_BUCKET_MIN_GAP_SECONDS: Mapping[str, float] = {
+    "slack.minute": 5.0,
+    "tickets.api": 2.0,
+    "email.daily": 60.0,
+}
+DEFAULT_RATE_BUCKET_GAP_SECONDS = 1.0
+
+
+def rate_bucket_gap_seconds(bucket: str) -> float:
+    """Return the minimum gap between sends for a rate bucket."""
+
+    return RATE_BUCKET_MIN_GAP_SECONDS.get(bucket, DEFAULT_RATE_BUCKET_GAP_SECONDS)
 
 
 @dataclass(slots=True)
@@ -21,37 +40,107 @@ class PolicyService:
     def get_effective_policy(self, *, tenant_id: str, tool_slug: str) -> EffectiveToolPolicy | None:  # pragma: no cover - interface
         raise NotImplementedError
 
+    def get_effective_policies(
+        self, *, tenant_id: str, tool_slugs: Iterable[str]
+    ) -> Mapping[str, EffectiveToolPolicy]:
+        """Return policies keyed by tool slug; tools without a policy are omitted."""
+
+        policies: dict[str, EffectiveToolPolicy] = {}
+        for slug in dict.fromkeys(tool_slugs):
+            policy = self.get_effective_policy(tenant_id=tenant_id, tool_slug=slug)
+            if policy is not None:
+                policies[slug] = policy
+        return policies
+
 
 class SupabasePolicyService(PolicyService):
-    def __init__(self, client, *, schema: str = "public", view: str = "catalog_tools_view") -> None:
+    """Reads `tool_effective_policy` rows and caches them for `ttl_seconds`.
+
+    Misses are cached too (`None`), so tools without a catalog entry do not cost a
+    round trip per envelope.
+    """
+
+    def __init__(
+        self,
+        client,
+        *,
+        schema: str = "public",
+        view: str = "tool_effective_policy",
+        ttl_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
         self._client = client
         self._schema = schema
         self._view = view
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._cache: dict[tuple[str, str], tuple[float, Optional[EffectiveToolPolicy]]] = {}
+        self._lock = threading.Lock()
 
     def get_effective_policy(self, *, tenant_id: str, tool_slug: str) -> EffectiveToolPolicy | None:
-        try:
-            table = self._client.table(self._view, schema=self._schema)
-        except TypeError:  # pragma: no cover - compat with older client
-            table = self._client.table(self._view)
+        return self.get_effective_policies(tenant_id=tenant_id, tool_slugs=(tool_slug,)).get(tool_slug)
+
+    def get_effective_policies(
+        self, *, tenant_id: str, tool_slugs: Iterable[str]
+    ) -> Mapping[str, EffectiveToolPolicy]:
+        now = self._clock()
+        resolved: dict[str, EffectiveToolPolicy] = {}
+        missing: list[str] = []
+        with self._lock:
+            for slug in dict.fromkeys(tool_slugs):
+                cached = self._cache.get((tenant_id, slug))
+                if cached is not None and now - cached[0] < self._ttl:
+                    if cached[1] is not None:
+                        resolved[slug] = cached[1]
+                else:
+                    missing.append(slug)
+        if not missing:
+            return resolved
 
-        resp = (
-            table.select(
-                "effective_write_allowed, effective_rate_bucket, effective_risk, effective_approval"
+        query = (
+            self._table_ref()
+            .select(
+                "tool_slug, effective_write_allowed, effective_rate_bucket, effective_risk, effective_approval"
             )
             .eq("tenant_id", tenant_id)
-            .eq("tool_slug", tool_slug)
-            .limit(1)
-            .execute()
         )
+        if len(missing) == 1:
+            query = query.eq("tool_slug", missing[0]).limit(1)
+        else:
+            query = query.in_("tool_slug", missing)
+        resp = query.execute()
         rows = getattr(resp, "data", []) or []
-        if not rows:
-            return None
-
-        row = rows[0]
-        return EffectiveToolPolicy(
-            write_allowed=bool(row.get("effective_write_allowed", False)),
-            rate_bucket=row.get("effective_rate_bucket"),
-            risk=row.get("effective_risk"),
-            approval=row.get("effective_approval"),
-        )
+        fetched = {str(row.get("tool_slug")): _policy_from_row(row) for row in rows}
+        with self._lock:
+            for slug in missing:
+                policy = fetched.get(slug)
+                self._cache[(tenant_id, slug)] = (now, policy)
+                if policy is not None:
+                    resolved[slug] = policy
+        return resolved
+
+    def invalidate(self, tenant_id: str | None = None, tool_slug: str | None = None) -> None:
+        with self._lock:
+            if tenant_id is None:
+                self._cache.clear()
+            elif tool_slug is not None:
+                self._cache.pop((tenant_id, tool_slug), None)
+            else:
+                for key in [key for key in self._cache if key[0] == tenant_id]:
+                    del self._cache[key]
+
+    def _table_ref(self):
+        try:
+            return self._client.table(self._view, schema=self._schema)
+        except TypeError:  # pragma: no cover - compat with older client
+            return self._client.table(self._view)
+
+
+def _policy_from_row(row: Mapping[str, Any]) -> EffectiveToolPolicy:
+    return EffectiveToolPolicy(
+        write_allowed=bool(row.get("effective_write_allowed", False)),
+        rate_bucket=row.get("effective_rate_bucket"),
+        risk=row.get("effective_risk"),
+        approval=row.get("effective_approval"),
+    )
 
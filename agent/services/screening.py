@@ -0,0 +1,184 @@
+"""Batch pre-screening of planned envelopes before they reach the outbox.
+
+A plan of N envelopes is screened in one pass: the catalog is listed once, effective
+policies are fetched once for every tool in the batch, and guardrails are evaluated
+through the tenant's compiled plan with a single clock reading. Each envelope gets a
+`ScreeningVerdict`; only allowed envelopes should be enqueued, so failures surface to
+the agent at planning time rather than one by one in the worker.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Mapping, Optional, Sequence
+
+from agent.guardrails.engine import (
+    EVIDENCE_REQUIREMENT,
+    QUIET_HOURS,
+    SCOPE_VALIDATION,
+    GuardrailEngine,
+    GuardrailInput,
+)
+from agent.schemas.envelope import Envelope
+
+from .catalog import CatalogService, ToolCatalogEntry
+from .policy import EffectiveToolPolicy, PolicyService, rate_bucket_gap_seconds
+
+
+# Guardrails that depend on the envelope or the clock. Trust is gated per invocation by
+# the before-model callback, so it is not re-checked per envelope.
+SCREENED_GUARDRAILS = frozenset({QUIET_HOURS, SCOPE_VALIDATION, EVIDENCE_REQUIREMENT})
+
+
+@dataclass(slots=True)
+class ScreeningVerdict:
+    """Outcome of screening one candidate envelope; `reasons` maps check → message."""
+
+    index: int
+    envelope: Optional[Envelope] = None
+    catalog_entry: Optional[ToolCatalogEntry] = None
+    policy: Optional[EffectiveToolPolicy] = None
+    reasons: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def allowed(self) -> bool:
+        return self.envelope is not None and not self.reasons
+
+    def message(self) -> str:
+        return "; ".join(self.reasons.values())
+
+
+class EnvelopeScreener:
+    """Screens candidate envelopes against schema, policy, rate buckets, and guardrails.
+
+    Scope validation only applies when enabled scopes are known (from session state or
+    the tenant's guardrail row); otherwise missing scopes are left to the approval modal.
+    Rate-bucket headroom is the number of sends a bucket's minimum gap permits within
+    `rate_horizon_seconds`; envelopes beyond it are rejected instead of being deferred
+    repeatedly by the worker.
+    """
+
+    def __init__(
+        self,
+        *,
+        catalog_service: CatalogService,
+        guardrail_engine: GuardrailEngine,
+        policy_service: PolicyService | None = None,
+        rate_horizon_seconds: float = 300.0,
+    ) -> None:
+        self._catalog = catalog_service
+        self._guardrails = guardrail_engine
+        self._policy = policy_service
+        self._rate_horizon = max(0.0, rate_horizon_seconds)
+
+    def screen(
+        self,
+        tenant_id: str,
+        payloads: Sequence[Any],
+        *,
+        state: Any = None,
+        proposal: Mapping[str, Any] | None = None,
+        now: Optional[datetime] = None,
+    ) -> list[ScreeningVerdict]:
+        catalog = {entry.slug.lower(): entry for entry in self._catalog.list_tools(tenant_id)}
+        verdicts = [self._validate(tenant_id, index, payload, catalog) for index, payload in enumerate(payloads)]
+
+        candidates = [verdict for verdict in verdicts if verdict.allowed]
+        if not candidates:
+            return verdicts
+
+        self._apply_policies(tenant_id, candidates)
+        self._apply_guardrails(tenant_id, candidates, state=state, proposal=proposal, now=now)
+        self._apply_rate_headroom(candidates)
+        return verdicts
+
+    def _validate(
+        self,
+        tenant_id: str,
+        index: int,
+        payload: Any,
+        catalog: Mapping[str, ToolCatalogEntry],
+    ) -> ScreeningVerdict:
+        verdict = ScreeningVerdict(index=index)
+        try:
+            if not isinstance(payload, Mapping):
+                raise TypeError("Envelope payload must be a mapping")
+            slug = str(payload.get("tool_slug") or payload.get("slug") or "").strip()
+            if not slug:
+                raise ValueError("tool_slug is required to enqueue an envelope")
+
+            entry = catalog.get(slug.lower())
+            if entry is None:
+                verdict.reasons["catalog"] = f"Tool {slug!r} not found in catalog"
+                return verdict
+            verdict.catalog_entry = entry
+
+            arguments = payload.get("arguments")
+            if not isinstance(arguments, Mapping):
+                raise TypeError("Envelope arguments must be a mapping")
+            entry.validate_arguments(arguments)
+
+            verdict.envelope = Envelope.from_payload(payload=payload, tenant_id=tenant_id, default_risk=entry.risk)
+        except Exception as exc:
+            verdict.reasons["schema"] = str(exc)
+        return verdict
+
+    def _apply_policies(self, tenant_id: str, candidates: Sequence[ScreeningVerdict]) -> None:
+        if self._policy is None:
+            return
+        slugs = [verdict.catalog_entry.slug for verdict in candidates if verdict.catalog_entry is not None]
+        policies = self._policy.get_effective_policies(tenant_id=tenant_id, tool_slugs=slugs)
+        for verdict in candidates:
+            policy = policies.get(verdict.catalog_entry.slug) if verdict.catalog_entry is not None else None
+            verdict.policy = policy
+            if policy is not None and not policy.write_allowed:
+                verdict.reasons["write_allowed"] = "writes_disabled_by_policy"
+
+    def _apply_guardrails(
+        self,
+        tenant_id: str,
+        candidates: Sequence[ScreeningVerdict],
+        *,
+        state: Any,
+        proposal: Mapping[str, Any] | None,
+        now: Optional[datetime],
+    ) -> None:
+        plan = self._guardrails.plan_for(tenant_id)
+        base = GuardrailInput.from_state(state)
+        check_scopes = base.enabled_scopes is not None or bool(plan.config.enabled_scopes)
+
+        batch = [
+            GuardrailInput(
+                trust_score=base.trust_score,
+                trust_source=base.trust_source,
+                requested_scopes=(
+                    verdict.catalog_entry.required_scopes if check_scopes and verdict.catalog_entry else None
+                ),
+                enabled_scopes=base.enabled_scopes,
+                proposal=proposal if proposal is not None else base.proposal,
+            )
+            for verdict in candidates
+        ]
+
+        for verdict, results in zip(candidates, plan.evaluate_many(batch, now=now, short_circuit=False)):
+            for result in results:
+                if result.name in SCREENED_GUARDRAILS and not result.allowed:
+                    verdict.reasons[result.name] = result.reason or "blocked by guardrail"
+
+    def _apply_rate_headroom(self, candidates: Sequence[ScreeningVerdict]) -> None:
+        used: dict[str, int] = {}
+        for verdict in candidates:
+            bucket = verdict.policy.rate_bucket if verdict.policy is not None else None
+            if not bucket or verdict.reasons:
+                continue
+            bucket = str(bucket)
+            headroom = math.floor(self._rate_horizon / rate_bucket_gap_seconds(bucket)) + 1
+            if used.get(bucket, 0) >= headroom:
+                verdict.reasons["rate_bucket"] = (
+                    f"rate bucket {bucket!r} has headroom for {headroom} envelopes "
+                    f"in the next {int(self._rate_horizon)}s"
+                )
+                continue
+            used[bucket] = used.get(bucket, 0) + 1
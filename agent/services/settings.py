@@ -12,6 +12,7 @@ from pydantic_settings.sources import DotEnvSettingsSource, EnvSettingsSource
 
 
 CSV_FIELDS = {"default_toolkits", "default_scopes"}
+WEIGHT_FIELDS = {"outbox_plan_weights"}
 
 
 class AppSettings(BaseSettings):
@@ -40,12 +41,22 @@ class AppSettings(BaseSettings):
 
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    api_workers: int = 1
 
     quiet_hours_start_hour: Optional[int] = None
     quiet_hours_end_hour: Optional[int] = None
+    quiet_hours_timezone: str = "UTC"
     trust_threshold: float = 0.8
     enforce_scope_validation: bool = True
     require_evidence: bool = True
+    guardrail_config_ttl_seconds: float = 60.0
+    trust_half_life_days: float = 30.0
+    trust_score_ttl_seconds: float = 30.0
+    tool_policy_ttl_seconds: float = 30.0
+    # Cache invalidation feed (migration 009): LISTEN when a direct database URL is set,
+    # otherwise poll `change_log` every `change_feed_poll_seconds` (0 disables).
+    change_feed_database_url: Optional[str] = None
+    change_feed_poll_seconds: float = 5.0
 
     composio_api_key: Optional[str] = Field(
         default=None,
@@ -106,9 +117,47 @@ class AppSettings(BaseSettings):
     )
     supabase_schema: str = "public"
 
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry_seconds: float = 30.0
+    http_timeout_seconds: float = 30.0
+    http_connect_timeout_seconds: float = 5.0
+    http2_enabled: bool = True
+
+    catalog_sync_on_startup: bool = False
+    catalog_snapshot_path: Optional[str] = None
+    catalog_snapshot_refresh_seconds: float = 5.0
+
+    payload_store_path: Optional[str] = None
+    payload_store_bucket: Optional[str] = None
+    payload_offload_threshold_bytes: int = 64 * 1024
+
     outbox_poll_interval_seconds: int = 5
     outbox_batch_size: int = 5
     outbox_max_attempts: int = 3
+    outbox_retry_base_seconds: int = 2
+    outbox_retry_max_seconds: int = 300
+    outbox_screen_rate_horizon_seconds: float = 300.0
+    outbox_circuit_breaker_enabled: bool = True
+    outbox_circuit_failure_threshold: int = 5
+    outbox_circuit_reset_seconds: int = 30
+    outbox_adaptive_batching: bool = True
+    outbox_batch_min: int = 1
+    outbox_batch_max: int = 50
+    outbox_aimd_increase_step: int = 1
+    outbox_aimd_decrease_factor: float = 0.5
+    outbox_latency_target_seconds: float = 5.0
+    outbox_error_rate_threshold: float = 0.2
+    outbox_defer_ratio_threshold: float = 0.5
+    outbox_poll_interval_max_seconds: int = 60
+    outbox_metrics_log_interval_seconds: int = 60
+    outbox_dedup_cache_size: int = 4096
+    outbox_fair_share_enabled: bool = True
+    outbox_fair_share_by_employee: bool = False
+    outbox_fair_share_window: int = 4
+    outbox_plan_weights: dict[str, float] = Field(
+        default_factory=lambda: {"free": 1.0, "demo": 1.0, "pro": 2.0, "enterprise": 4.0}
+    )
 
     @field_validator("default_toolkits", "default_scopes", mode="before")
     @classmethod
@@ -122,6 +171,21 @@ class AppSettings(BaseSettings):
             return tuple(str(item).strip() for item in value if str(item).strip())
         return value
 
+    @field_validator("outbox_plan_weights", mode="before")
+    @classmethod
+    def _parse_plan_weights(cls, value):
+        if value is None or value == "":
+            return {}
+        if isinstance(value, str):
+            weights: dict[str, float] = {}
+            for part in value.split(","):
+                plan, sep, weight = part.partition("=")
+                if not sep or not plan.strip():
+                    continue
+                weights[plan.strip().lower()] = float(weight)
+            return weights
+        return value
+
     @property
     def composio_default_scopes(self) -> tuple[str, ...]:
         return self.default_scopes
@@ -151,13 +215,13 @@ class AppSettings(BaseSettings):
 
         class LenientEnvSource(EnvSettingsSource):
             def decode_complex_value(self, field_name, field, value):
-                if field_name in CSV_FIELDS:
+                if field_name in CSV_FIELDS or field_name in WEIGHT_FIELDS:
                     return value
                 return super().decode_complex_value(field_name, field, value)
 
         class LenientDotEnvSource(DotEnvSettingsSource):
             def decode_complex_value(self, field_name, field, value):
-                if field_name in CSV_FIELDS:
+                if field_name in CSV_FIELDS or field_name in WEIGHT_FIELDS:
                     return value
                 return super().decode_complex_value(field_name, field, value)
 
@@ -0,0 +1,282 @@
+"""Read-only catalog snapshots shared by multiple API worker processes.
+
+In multi-worker serving the parent process warms the catalog once and writes it, with
+pre-rendered prompt snippets, to a local snapshot file. Each uvicorn worker memory-maps
+that file read-only instead of repeating the Supabase/Composio warmup, and re-reads it
+when the file is replaced (the catalog sync job rewrites it atomically), so a catalog
+change is picked up without restarting workers.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import mmap
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator, Mapping, Optional, Sequence
+
+import orjson
+import structlog
+
+from .catalog import CatalogService, ToolCatalogEntry
+
+
+logger = structlog.get_logger(__name__)
+
+SNAPSHOT_FORMAT = 1
+
+SnapshotVersion = tuple[int, int, int]
+
+
+class CatalogSnapshot:
+    """Atomic writer and mmap-backed reader for a catalog snapshot file.
+
+    Writers serialise on an exclusive `flock` of a sidecar `<name>.lock` file, so
+    per-tenant updates from sibling workers never drop each other's tenants; readers
+    never lock, since every write replaces the file atomically.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self._path = Path(path)
+        self._lock_path = self._path.with_name(f"{self._path.name}.lock")
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def version(self) -> Optional[SnapshotVersion]:
+        """Return a cheap change token (inode, mtime, size), or `None` when absent."""
+
+        try:
+            stat = self._path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def write(self, entries_by_tenant: Mapping[str, Sequence[ToolCatalogEntry]]) -> None:
+        """Replace the snapshot atomically so readers never observe a partial file."""
+
+        with self._write_lock():
+            self._replace(entries_by_tenant)
+
+    def read(self) -> Optional[dict[str, list[ToolCatalogEntry]]]:
+        """Load the snapshot, or return `None` when it is missing, empty, or unreadable."""
+
+        try:
+            with self._path.open("rb") as handle:
+                if os.fstat(handle.fileno()).st_size == 0:
+                    return None
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    with memoryview(mapped) as view:
+                        payload = orjson.loads(view)
+        except FileNotFoundError:
+            return None
+        except (OSError, orjson.JSONDecodeError) as exc:
+            logger.warning("catalog_snapshot.read_failed", path=str(self._path), error=str(exc))
+            return None
+
+        if not isinstance(payload, Mapping) or payload.get("format") != SNAPSHOT_FORMAT:
+            return None
+        tenants = payload.get("tenants") or {}
+        return {
+            str(tenant_id): [_entry_from_payload(item) for item in items]
+            for tenant_id, items in tenants.items()
+        }
+
+    def update_tenant(self, tenant_id: str, entries: Sequence[ToolCatalogEntry]) -> None:
+        """Rewrite one tenant's entries, keeping the rest of the snapshot intact."""
+
+        self.update_tenants({tenant_id: entries})
+
+    def update_tenants(self, entries_by_tenant: Mapping[str, Sequence[ToolCatalogEntry]]) -> None:
+        """Rewrite the given tenants' entries in one write, keeping the others intact."""
+
+        with self._write_lock():
+            current = self.read() or {}
+            for tenant_id, entries in entries_by_tenant.items():
+                current[tenant_id] = list(entries)
+            self._replace(current)
+
+    def _replace(self, entries_by_tenant: Mapping[str, Sequence[ToolCatalogEntry]]) -> None:
+        payload = {
+            "format": SNAPSHOT_FORMAT,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "tenants": {
+                tenant_id: [_entry_payload(entry) for entry in entries]
+                for tenant_id, entries in entries_by_tenant.items()
+            },
+        }
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{self._path.name}.", dir=self._path.parent)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(orjson.dumps(payload))
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, self._path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._lock_path, "a+b") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+class SnapshotCatalogService(CatalogService):
+    """Serves catalog reads from a shared snapshot, falling back to a source catalog.
+
+    The snapshot file is re-checked at most every `refresh_interval` seconds; when it
+    has been replaced, the decoded entries are swapped in under a lock while in-flight
+    requests keep the list they already hold. Tenants missing from the snapshot are
+    read from `source`. Writes go to `source` and are mirrored into the snapshot so
+    sibling workers reload them; `invalidate` does the same for changes made elsewhere
+    (e.g. directly in the database), re-reading the tenant from `source`.
+    """
+
+    def __init__(
+        self,
+        snapshot: CatalogSnapshot,
+        *,
+        source: CatalogService,
+        refresh_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._snapshot = snapshot
+        self._source = source
+        self._refresh_interval = max(0.0, refresh_interval)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[str, list[ToolCatalogEntry]] = {}
+        self._version: Optional[SnapshotVersion] = None
+        self._checked_at: Optional[float] = None
+
+    @property
+    def source(self) -> CatalogService:
+        return self._source
+
+    def list_tools(self, tenant_id: str) -> Sequence[ToolCatalogEntry]:
+        self._maybe_reload()
+        entries = self._entries.get(tenant_id)
+        if entries is not None:
+            return list(entries)
+        return self._source.list_tools(tenant_id)
+
+    def get_tool(self, tenant_id: str, slug: str) -> Optional[ToolCatalogEntry]:
+        self._maybe_reload()
+        entries = self._entries.get(tenant_id)
+        if entries is None:
+            return self._source.get_tool(tenant_id, slug)
+        slug_lower = slug.lower()
+        return next((entry for entry in entries if entry.slug.lower() == slug_lower), None)
+
+    def upsert_tool(self, tenant_id: str, entry: ToolCatalogEntry) -> None:
+        upsert = getattr(self._source, "upsert_tool", None)
+        if callable(upsert):
+            upsert(tenant_id, entry)
+        entries = [existing for existing in self.list_tools(tenant_id) if existing.slug.lower() != entry.slug.lower()]
+        entries.append(entry)
+        self._publish(tenant_id, entries)
+
+    def sync_entries(self, tenant_id: str, entries: Sequence[ToolCatalogEntry]) -> None:
+        if not entries:
+            return
+        sync = getattr(self._source, "sync_entries", None)
+        if callable(sync):
+            sync(tenant_id, entries)
+        self._publish(tenant_id, list(entries))
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        """Re-read `tenant_id` (or every snapshot tenant) from `source` and republish it."""
+
+        source_invalidate = getattr(self._source, "invalidate", None)
+        if callable(source_invalidate):
+            source_invalidate(tenant_id)
+        if tenant_id is None:
+            self.reload()
+            tenant_ids = list(self._entries)
+        else:
+            tenant_ids = [tenant_id]
+        if not tenant_ids:
+            return
+        self._snapshot.update_tenants(
+            {tenant: list(self._source.list_tools(tenant)) for tenant in tenant_ids}
+        )
+        self.reload(force=True)
+        logger.info("catalog_snapshot.invalidated", path=str(self._snapshot.path), tenants=len(tenant_ids))
+
+    def reload(self, *, force: bool = False) -> bool:
+        """Re-read the snapshot if it changed (or unconditionally with `force`)."""
+
+        with self._lock:
+            self._checked_at = self._clock()
+            version = self._snapshot.version()
+            if not force and version == self._version:
+                return False
+            loaded = self._snapshot.read() if version is not None else None
+            self._entries = loaded or {}
+            self._version = version
+        logger.info(
+            "catalog_snapshot.reloaded",
+            path=str(self._snapshot.path),
+            tenants=len(self._entries),
+        )
+        return True
+
+    def _maybe_reload(self) -> None:
+        checked_at = self._checked_at
+        if checked_at is not None and self._clock() - checked_at < self._refresh_interval:
+            return
+        self.reload()
+
+    def _publish(self, tenant_id: str, entries: Sequence[ToolCatalogEntry]) -> None:
+        self._snapshot.update_tenant(tenant_id, entries)
+        self.reload(force=True)
+
+
+def write_catalog_snapshot(
+    path: str | os.PathLike[str],
+    catalog: CatalogService,
+    tenant_ids: Sequence[str],
+) -> CatalogSnapshot:
+    """Warm `catalog` for the given tenants and persist the result as a snapshot."""
+
+    snapshot = CatalogSnapshot(path)
+    snapshot.write({tenant_id: list(catalog.list_tools(tenant_id)) for tenant_id in tenant_ids})
+    return snapshot
+
+
+def _entry_payload(entry: ToolCatalogEntry) -> dict[str, Any]:
+    return {
+        "slug": entry.slug,
+        "name": entry.name,
+        "description": entry.description,
+        "version": entry.version,
+        "schema": entry.schema,
+        "required_scopes": list(entry.required_scopes),
+        "risk": entry.risk,
+        "prompt": entry.prompt_snippet(),
+    }
+
+
+def _entry_from_payload(payload: Mapping[str, Any]) -> ToolCatalogEntry:
+    return ToolCatalogEntry(
+        slug=str(payload.get("slug") or ""),
+        name=str(payload.get("name") or ""),
+        description=str(payload.get("description") or ""),
+        version=str(payload.get("version") or "latest"),
+        schema=dict(payload.get("schema") or {}),
+        required_scopes=list(payload.get("required_scopes") or []),
+        risk=str(payload.get("risk") or "medium"),
+        cached_prompt=payload.get("prompt"),
+    )
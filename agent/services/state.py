@@ -55,6 +55,24 @@ def append_queue_item(state: MutableMapping[str, Any], item: Mapping[str, Any])
     _commit_state_slice(state, DESK_STATE_KEY, desk)
 
 
+def append_queue_items(state: MutableMapping[str, Any], items: Sequence[Mapping[str, Any]]) -> None:
+    """Append several items to the desk queue with a single state commit."""
+
+    if not items:
+        return
+    desk = ensure_desk_state(state)
+    queue = desk.setdefault("queue", [])
+    if isinstance(queue, list):
+        seen_ids = {entry.get("id") for entry in queue if isinstance(entry, Mapping)}
+        for item in items:
+            if item.get("id") in seen_ids:
+                continue
+            queue.append(dict(item))
+            seen_ids.add(item.get("id"))
+    desk["lastUpdated"] = _utc_now()
+    _commit_state_slice(state, DESK_STATE_KEY, desk)
+
+
 def ensure_guardrail_state(state: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
     """Ensure guardrail outcomes are tracked within shared state."""
 
@@ -171,11 +189,38 @@ def set_approval_modal(
             "proposal": dict(proposal),
             "requiredScopes": list(required_scopes),
             "approvalState": "pending",
+            "decisionRecorded": False,
         }
     )
     _commit_state_slice(state, APPROVAL_MODAL_KEY, modal)
 
 
+def pending_approval_decision(state: MutableMapping[str, Any]) -> tuple[str, str] | None:
+    """Return `(envelope_id, approval_state)` for a decided, not yet recorded approval.
+
+    Callers report the decision (e.g. to the trust ledger) and then call
+    `mark_approval_decision_recorded`, so a failed report is retried on a later turn.
+    """
+
+    modal = state.get(APPROVAL_MODAL_KEY)
+    if not isinstance(modal, Mapping) or modal.get("decisionRecorded"):
+        return None
+    envelope_id = modal.get("envelopeId")
+    decision = modal.get("approvalState")
+    if not envelope_id or decision not in {"authorized", "denied"}:
+        return None
+    return str(envelope_id), str(decision)
+
+
+def mark_approval_decision_recorded(state: MutableMapping[str, Any], envelope_id: str) -> None:
+    """Mark the modal's decision as reported, unless it now shows another envelope."""
+
+    modal = state.get(APPROVAL_MODAL_KEY)
+    if not isinstance(modal, Mapping) or str(modal.get("envelopeId")) != envelope_id:
+        return
+    _commit_state_slice(state, APPROVAL_MODAL_KEY, {**modal, "decisionRecorded": True})
+
+
 def _utc_now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
@@ -2,15 +2,17 @@
 
 from __future__ import annotations
 
-from functools import lru_cache
-from typing import Optional
+import threading
+from typing import Any, Optional
 
 try:  # pragma: no cover - optional during unit tests without Supabase
-    from supabase import Client, create_client
+    from supabase import Client, ClientOptions, create_client
 except ImportError:  # pragma: no cover - fail fast when dependency missing
     Client = object  # type: ignore[misc, assignment]
+    ClientOptions = None  # type: ignore[assignment]
     create_client = None  # type: ignore[assignment]
 
+from .clients import get_http_client
 from .settings import AppSettings
 
 
@@ -18,9 +20,16 @@ class SupabaseNotConfiguredError(RuntimeError):
     """Raised when Supabase interactions are attempted without configuration."""
 
 
-@lru_cache(maxsize=1)
+_client_lock = threading.Lock()
+_clients: dict[tuple[str, str], Client] = {}
+
+
 def get_supabase_client(settings: AppSettings) -> Client:
-    """Instantiate and cache a Supabase client using the provided settings."""
+    """Instantiate and cache a Supabase client using the provided settings.
+
+    Clients are cached per project URL and key and share the pooled httpx transport
+    from `get_http_client`, so PostgREST calls reuse keep-alive (and HTTP/2) connections.
+    """
 
     if not settings.supabase_enabled():
         raise SupabaseNotConfiguredError("Supabase credentials are not configured.")
@@ -30,11 +39,29 @@ def get_supabase_client(settings: AppSettings) -> Client:
             "supabase client library is not installed. Add 'supabase' to dependencies."
         )
 
-    return create_client(settings.supabase_url, settings.supabase_service_key)
+    key = (str(settings.supabase_url), str(settings.supabase_service_key))
+    with _client_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = create_client(key[0], key[1], options=_client_options(settings))
+            _clients[key] = client
+        return client
 
 
-def reset_supabase_client_cache() -> None:
-    """Clear the cached Supabase client (primarily for tests)."""
+def _client_options(settings: AppSettings) -> Optional[Any]:
+    if ClientOptions is None:  # pragma: no cover - runtime guard when dependency missing
+        return None
+    try:
+        return ClientOptions(
+            httpx_client=get_http_client(settings),
+            postgrest_client_timeout=settings.http_timeout_seconds,
+        )
+    except TypeError:  # pragma: no cover - supabase releases without shared httpx clients
+        return ClientOptions(postgrest_client_timeout=settings.http_timeout_seconds)
+
 
-    get_supabase_client.cache_clear()
+def reset_supabase_client_cache() -> None:
+    """Clear the cached Supabase clients (primarily for tests)."""
 
+    with _client_lock:
+        _clients.clear()
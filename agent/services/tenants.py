@@ -0,0 +1,84 @@
+"""Tenant metadata lookups (plan tiers) used for scheduling decisions."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Iterable, Mapping, Optional, Protocol
+
+
+class TenantPlanService(Protocol):
+    """Contract for resolving the billing plan of tenants."""
+
+    def get_plans(self, tenant_ids: Iterable[str]) -> Mapping[str, str]:
+        ...
+
+
+class InMemoryTenantPlanService:
+    """Static tenant plans for local development and unit tests."""
+
+    def __init__(self, *, plans_by_tenant: Optional[Mapping[str, str]] = None) -> None:
+        self._plans = dict(plans_by_tenant or {})
+
+    def get_plans(self, tenant_ids: Iterable[str]) -> Mapping[str, str]:
+        return {tenant_id: self._plans[tenant_id] for tenant_id in tenant_ids if tenant_id in self._plans}
+
+    def set_plan(self, tenant_id: str, plan: str) -> None:
+        self._plans[tenant_id] = plan
+
+
+class SupabaseTenantPlanService(TenantPlanService):
+    """Reads `tenants.plan` and caches results for `ttl_seconds`."""
+
+    def __init__(
+        self,
+        client,
+        *,
+        schema: str = "public",
+        table: str = "tenants",
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._client = client
+        self._schema = schema
+        self._table = table
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._cache: dict[str, tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def get_plans(self, tenant_ids: Iterable[str]) -> Mapping[str, str]:
+        now = self._clock()
+        resolved: dict[str, str] = {}
+        missing: list[str] = []
+        with self._lock:
+            for tenant_id in dict.fromkeys(tenant_ids):
+                cached = self._cache.get(tenant_id)
+                if cached is not None and now - cached[0] < self._ttl:
+                    resolved[tenant_id] = cached[1]
+                else:
+                    missing.append(tenant_id)
+
+        if missing:
+            response = self._table_ref().select("id, plan").in_("id", missing).execute()
+            rows = getattr(response, "data", []) or []
+            with self._lock:
+                for row in rows:
+                    tenant_id = str(row.get("id") or "")
+                    plan = str(row.get("plan") or "free")
+                    self._cache[tenant_id] = (now, plan)
+                    resolved[tenant_id] = plan
+        return resolved
+
+    def invalidate(self, tenant_id: str | None = None) -> None:
+        with self._lock:
+            if tenant_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(tenant_id, None)
+
+    def _table_ref(self):
+        try:
+            return self._client.table(self._table, schema=self._schema)
+        except TypeError:  # pragma: no cover
+            return self._client.table(self._table)
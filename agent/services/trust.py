@@ -0,0 +1,219 @@
+"""Trust ledger: approval and outcome events folded into a per-tenant score.
+
+Events are appended to `trust_events`; a trigger (db/migrations/003_trust_ledger.sql)
+keeps `trust_scores` up to date incrementally, decaying older history with a fixed
+half-life. Because both totals decay by the same factor, the score is a plain ratio of
+the stored totals and a lookup is a single-row read, cached for `ttl_seconds`.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Protocol
+
+
+TENANT_SUBJECT = "*"
+
+
+class TrustEventKind:
+    """Enumeration of ledger event kinds."""
+
+    APPROVED = "approved"
+    REJECTED = "rejected"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+_POSITIVE_KINDS = frozenset({TrustEventKind.APPROVED, TrustEventKind.SUCCEEDED})
+_NEGATIVE_KINDS = frozenset({TrustEventKind.REJECTED, TrustEventKind.FAILED})
+
+
+@dataclass(slots=True)
+class TrustScore:
+    """Decayed positive/negative totals for a tenant or employee."""
+
+    positive: float
+    negative: float
+    events: int
+
+    @property
+    def score(self) -> Optional[float]:
+        total = self.positive + self.negative
+        if total <= 0:
+            return None
+        return self.positive / total
+
+
+class TrustLedgerService(Protocol):
+    """Contract for recording trust events and reading the aggregated score."""
+
+    def record_event(
+        self,
+        tenant_id: str,
+        kind: str,
+        *,
+        employee_id: Optional[str] = None,
+        envelope_id: Optional[str] = None,
+        weight: float = 1.0,
+    ) -> None:
+        ...
+
+    def get_score(self, tenant_id: str, *, employee_id: Optional[str] = None) -> Optional[TrustScore]:
+        ...
+
+
+class InMemoryTrustLedgerService:
+    """Applies the same decayed aggregation as the database trigger, in process."""
+
+    def __init__(
+        self,
+        *,
+        half_life_seconds: float = 30 * 86400,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._half_life = half_life_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._events: list[dict[str, object]] = []
+        self._scores: dict[tuple[str, str], tuple[float, TrustScore]] = {}
+
+    @property
+    def events(self) -> list[dict[str, object]]:
+        return list(self._events)
+
+    def record_event(
+        self,
+        tenant_id: str,
+        kind: str,
+        *,
+        employee_id: Optional[str] = None,
+        envelope_id: Optional[str] = None,
+        weight: float = 1.0,
+    ) -> None:
+        positive, negative = _split_weight(kind, weight)
+        now = self._clock()
+        subjects = [TENANT_SUBJECT] if employee_id is None else [TENANT_SUBJECT, employee_id]
+        with self._lock:
+            self._events.append(
+                {
+                    "tenant_id": tenant_id,
+                    "employee_id": employee_id,
+                    "envelope_id": envelope_id,
+                    "kind": kind,
+                    "weight": weight,
+                }
+            )
+            for subject in subjects:
+                key = (tenant_id, subject)
+                cached = self._scores.get(key)
+                if cached is None:
+                    self._scores[key] = (now, TrustScore(positive, negative, 1))
+                    continue
+                updated_at, current = cached
+                factor = 0.5 ** (max(0.0, now - updated_at) / self._half_life)
+                self._scores[key] = (
+                    max(now, updated_at),
+                    TrustScore(
+                        current.positive * factor + positive,
+                        current.negative * factor + negative,
+                        current.events + 1,
+                    ),
+                )
+
+    def get_score(self, tenant_id: str, *, employee_id: Optional[str] = None) -> Optional[TrustScore]:
+        with self._lock:
+            cached = self._scores.get((tenant_id, employee_id or TENANT_SUBJECT))
+        return cached[1] if cached is not None else None
+
+
+class SupabaseTrustLedgerService(TrustLedgerService):
+    """Appends to `trust_events` and reads cached rows from `trust_scores`."""
+
+    def __init__(
+        self,
+        client,
+        *,
+        schema: str = "public",
+        events_table: str = "trust_events",
+        scores_table: str = "trust_scores",
+        ttl_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._client = client
+        self._schema = schema
+        self._events_table = events_table
+        self._scores_table = scores_table
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._cache: dict[tuple[str, str], tuple[float, Optional[TrustScore]]] = {}
+        self._lock = threading.Lock()
+
+    def record_event(
+        self,
+        tenant_id: str,
+        kind: str,
+        *,
+        employee_id: Optional[str] = None,
+        envelope_id: Optional[str] = None,
+        weight: float = 1.0,
+    ) -> None:
+        _split_weight(kind, weight)
+        payload = {
+            "tenant_id": tenant_id,
+            "employee_id": employee_id,
+            "envelope_id": envelope_id,
+            "kind": kind,
+            "weight": weight,
+        }
+        self._table_ref(self._events_table).insert(payload).execute()
+        with self._lock:
+            self._cache.pop((tenant_id, TENANT_SUBJECT), None)
+            if employee_id is not None:
+                self._cache.pop((tenant_id, employee_id), None)
+
+    def get_score(self, tenant_id: str, *, employee_id: Optional[str] = None) -> Optional[TrustScore]:
+        key = (tenant_id, employee_id or TENANT_SUBJECT)
+        now = self._clock()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and now - cached[0] < self._ttl:
+                return cached[1]
+
+        response = (
+            self._table_ref(self._scores_table)
+            .select("positive, negative, events")
+            .eq("tenant_id", tenant_id)
+            .eq("subject", key[1])
+            .limit(1)
+            .execute()
+        )
+        rows = getattr(response, "data", []) or []
+        score = None
+        if rows:
+            row = rows[0]
+            score = TrustScore(
+                positive=float(row.get("positive") or 0.0),
+                negative=float(row.get("negative") or 0.0),
+                events=int(row.get("events") or 0),
+            )
+        with self._lock:
+            self._cache[key] = (now, score)
+        return score
+
+    def _table_ref(self, table: str):
+        try:
+            return self._client.table(table, schema=self._schema)
+        except TypeError:  # pragma: no cover
+            return self._client.table(table)
+
+
+def _split_weight(kind: str, weight: float) -> tuple[float, float]:
+    if weight <= 0:
+        raise ValueError("trust event weight must be positive")
+    if kind in _POSITIVE_KINDS:
+        return weight, 0.0
+    if kind in _NEGATIVE_KINDS:
+        return 0.0, weight
+    raise ValueError(f"unknown trust event kind: {kind!r}")
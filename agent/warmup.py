@@ -0,0 +1,172 @@
+"""Background startup warmup for the control plane API.
+
+The FastAPI lifespan starts a `StartupWarmup` so uvicorn binds immediately while
+catalog and objectives reads (and, optionally, a Composio catalog sync) run on a
+daemon thread. `/readyz` reports the snapshot and stays unready until every required
+step has finished. A failing required step is retried with capped exponential backoff
+while the warmup stays RUNNING, so a brief outage at boot delays readiness instead of
+failing it for the life of the process.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Sequence
+
+import structlog
+
+
+logger = structlog.get_logger(__name__)
+
+
+class WarmupStatus:
+    """Enumeration of warmup (and per-step) states."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    RETRYING = "retrying"
+    READY = "ready"
+    FAILED = "failed"
+
+
+@dataclass(slots=True)
+class WarmupStep:
+    """A named warmup action. Optional steps may fail (once) without blocking readiness."""
+
+    name: str
+    run: Callable[[], Any]
+    required: bool = True
+
+
+@dataclass(slots=True)
+class _StepResult:
+    status: str = WarmupStatus.PENDING
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+
+class StartupWarmup:
+    """Runs warmup steps once, in order, on a background thread.
+
+    Required steps are retried after `retry_initial_seconds`, doubling up to
+    `retry_max_seconds`; with `max_attempts` set, a step that keeps failing marks the
+    warmup FAILED. `stop()` abandons the retries (e.g. on shutdown).
+    """
+
+    def __init__(
+        self,
+        steps: Sequence[WarmupStep],
+        *,
+        retry_initial_seconds: float = 1.0,
+        retry_max_seconds: float = 30.0,
+        max_attempts: Optional[int] = None,
+    ) -> None:
+        self._steps = tuple(steps)
+        self._lock = threading.Lock()
+        self._status = WarmupStatus.PENDING
+        self._results = {step.name: _StepResult() for step in self._steps}
+        self._thread: Optional[threading.Thread] = None
+        self._retry_initial = max(0.0, retry_initial_seconds)
+        self._retry_max = max(self._retry_initial, retry_max_seconds)
+        self._max_attempts = max_attempts
+        self._stop = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return self._status == WarmupStatus.READY
+
+    def start(self) -> threading.Thread:
+        """Start warming in a daemon thread (idempotent) and return the thread."""
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="control-plane-warmup", daemon=True)
+                self._thread.start()
+            return self._thread
+
+    def stop(self) -> None:
+        """Stop retrying; a warmup still waiting on a required step ends FAILED."""
+
+        self._stop.set()
+
+    def run(self) -> None:
+        """Execute all steps synchronously; used by the background thread and tests."""
+
+        with self._lock:
+            if self._status != WarmupStatus.PENDING:
+                return
+            self._status = WarmupStatus.RUNNING
+
+        failed = False
+        for step in self._steps:
+            if not self._run_step(step):
+                failed = failed or step.required
+
+        with self._lock:
+            self._status = WarmupStatus.FAILED if failed else WarmupStatus.READY
+        logger.info("warmup.finished", status=self._status)
+
+    def _run_step(self, step: WarmupStep) -> bool:
+        delay = self._retry_initial
+        attempts = 0
+        while True:
+            attempts += 1
+            self._record(step.name, status=WarmupStatus.RUNNING, attempts=attempts)
+            started = time.perf_counter()
+            try:
+                step.run()
+            except Exception as exc:
+                elapsed = time.perf_counter() - started
+                retry = step.required and (self._max_attempts is None or attempts < self._max_attempts)
+                logger.warning(
+                    "warmup.step_failed",
+                    step=step.name,
+                    required=step.required,
+                    attempts=attempts,
+                    retry_in=delay if retry else None,
+                    error=str(exc),
+                )
+                if retry:
+                    self._record(
+                        step.name, status=WarmupStatus.RETRYING, seconds=elapsed, error=str(exc), attempts=attempts
+                    )
+                    if not self._stop.wait(delay):
+                        delay = min(self._retry_max, delay * 2)
+                        continue
+                self._record(step.name, status=WarmupStatus.FAILED, seconds=elapsed, error=str(exc), attempts=attempts)
+                return False
+            elapsed = time.perf_counter() - started
+            self._record(step.name, status=WarmupStatus.READY, seconds=elapsed, attempts=attempts)
+            logger.info("warmup.step_ready", step=step.name, seconds=round(elapsed, 3), attempts=attempts)
+            return True
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "status": self._status,
+                "steps": {
+                    name: {
+                        "status": result.status,
+                        "seconds": None if result.seconds is None else round(result.seconds, 3),
+                        "error": result.error,
+                        "attempts": result.attempts,
+                    }
+                    for name, result in self._results.items()
+                },
+            }
+
+    def _record(
+        self,
+        name: str,
+        *,
+        status: str,
+        seconds: Optional[float] = None,
+        error: Optional[str] = None,
+        attempts: int = 0,
+    ) -> None:
+        with self._lock:
+            self._results[name] = _StepResult(status=status, seconds=seconds, error=error, attempts=attempts)
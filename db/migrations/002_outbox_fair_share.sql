@@ -0,0 +1,31 @@
+-- 002_outbox_fair_share.sql
+-- Fair-share claim window for the Outbox worker.
+-- Returns due pending envelopes with at most `p_per_tenant` rows per tenant,
+-- interleaved round-robin (rank 1 of every tenant, then rank 2, ...) so a single
+-- tenant's backlog cannot starve the rest. Plan weights are applied by the worker.
+
+create or replace function public.outbox_pending_fair(p_per_tenant integer, p_limit integer)
+returns setof outbox
+language sql
+stable
+as $$
+    with ranked as (
+        select id,
+               row_number() over (
+                   partition by tenant_id
+                   order by next_run_at nulls first, created_at
+               ) as tenant_rank
+        from outbox
+        where status = 'pending'
+          and (next_run_at is null or next_run_at <= now())
+    )
+    select o.*
+    from ranked r
+    join outbox o on o.id = r.id
+    where r.tenant_rank <= greatest(p_per_tenant, 1)
+    order by r.tenant_rank, o.next_run_at nulls first, o.created_at
+    limit greatest(p_limit, 0)
+$$;
+
+revoke all on function public.outbox_pending_fair(integer, integer) from public;
+grant execute on function public.outbox_pending_fair(integer, integer) to service_role;
@@ -0,0 +1,84 @@
+-- 003_trust_ledger.sql
+-- Append-only trust ledger with an incrementally maintained score per tenant and
+-- per employee. Every approval decision and execution outcome is inserted into
+-- `trust_events`; an AFTER INSERT trigger folds it into `trust_scores`, decaying the
+-- previous totals with a 30-day half-life so old history fades. Readers fetch one
+-- `trust_scores` row instead of aggregating `actions`.
+-- Keep the half-life in sync with AI_EMPLOYEE_TRUST_HALF_LIFE_DAYS (in-memory ledger).
+
+create table if not exists trust_events (
+    id bigint generated always as identity primary key,
+    tenant_id uuid not null references tenants(id) on delete cascade,
+    employee_id uuid references employees(id) on delete set null,
+    envelope_id text,
+    kind text not null check (kind in ('approved', 'rejected', 'succeeded', 'failed')),
+    weight numeric not null default 1 check (weight > 0),
+    created_at timestamptz not null default now()
+);
+
+create index if not exists trust_events_tenant_created_idx
+    on trust_events(tenant_id, created_at desc);
+
+-- `subject` is '*' for the tenant-wide score, otherwise the employee id.
+create table if not exists trust_scores (
+    tenant_id uuid not null references tenants(id) on delete cascade,
+    subject text not null,
+    positive numeric not null default 0,
+    negative numeric not null default 0,
+    events bigint not null default 0,
+    score numeric generated always as (
+        case when positive + negative > 0 then positive / (positive + negative) end
+    ) stored,
+    updated_at timestamptz not null default now(),
+    primary key (tenant_id, subject)
+);
+
+create or replace function public.trust_events_apply()
+returns trigger
+language plpgsql
+as $$
+declare
+    half_life_seconds constant numeric := 30 * 86400;
+    pos numeric := case when new.kind in ('approved', 'succeeded') then new.weight else 0 end;
+    neg numeric := case when new.kind in ('rejected', 'failed') then new.weight else 0 end;
+    subjects text[] := array['*'];
+    subject_key text;
+begin
+    if new.employee_id is not null then
+        subjects := subjects || new.employee_id::text;
+    end if;
+
+    foreach subject_key in array subjects loop
+        insert into trust_scores as ts (tenant_id, subject, positive, negative, events, updated_at)
+        values (new.tenant_id, subject_key, pos, neg, 1, new.created_at)
+        on conflict (tenant_id, subject) do update
+        set positive = ts.positive * power(
+                0.5, greatest(extract(epoch from excluded.updated_at - ts.updated_at), 0) / half_life_seconds
+            ) + excluded.positive,
+            negative = ts.negative * power(
+                0.5, greatest(extract(epoch from excluded.updated_at - ts.updated_at), 0) / half_life_seconds
+            ) + excluded.negative,
+            events = ts.events + 1,
+            updated_at = greatest(ts.updated_at, excluded.updated_at);
+    end loop;
+    return new;
+end;
+$$;
+
+drop trigger if exists trust_events_apply on trust_events;
+create trigger trust_events_apply
+    after insert on trust_events
+    for each row execute function public.trust_events_apply();
+
+alter table trust_events enable row level security;
+alter table trust_scores enable row level security;
+
+create policy trust_events_service_role on trust_events
+    for all using (auth.role() = 'service_role') with check (auth.role() = 'service_role');
+create policy trust_scores_service_role on trust_scores
+    for all using (auth.role() = 'service_role') with check (auth.role() = 'service_role');
+
+create policy trust_scores_select_own on trust_scores
+    for select using (
+        auth.role() = 'service_role' or tenant_id = current_tenant_id_uuid()
+    );
@@ -0,0 +1,88 @@
+-- 004_outbox_dlq_functions.sql
+-- Atomic dead-letter moves and requeues for the Outbox worker.
+-- Each function is a single SQL statement (data-modifying CTEs), so the outbox row and
+-- its `outbox_dlq` copy change together or not at all, and a whole batch costs one
+-- RPC round trip. The `_many` variants take arrays of envelope ids (`worker drain`).
+
+create or replace function public.outbox_move_to_dlq_many(p_ids uuid[], p_error text)
+returns setof uuid
+language sql
+volatile
+as $$
+    with moved as (
+        update outbox
+        set status = 'dlq',
+            last_error = p_error,
+            attempts = attempts + 1,
+            next_run_at = null,
+            updated_at = now()
+        where id = any(p_ids)
+        returning *
+    )
+    insert into outbox_dlq as d (
+        id, tenant_id, tool_slug, arguments, connected_account_id, risk, external_id,
+        trust_context, metadata, status, attempts, last_error, created_at, moved_at
+    )
+    select id, tenant_id, tool_slug, arguments, connected_account_id, risk, external_id,
+           trust_context, metadata, 'dlq', attempts, last_error, created_at, now()
+    from moved
+    on conflict (id) do update
+    set arguments = excluded.arguments,
+        metadata = excluded.metadata,
+        status = 'dlq',
+        attempts = excluded.attempts,
+        last_error = excluded.last_error,
+        moved_at = excluded.moved_at
+    returning d.id
+$$;
+
+create or replace function public.outbox_move_to_dlq(p_id uuid, p_error text)
+returns boolean
+language sql
+volatile
+as $$
+    select exists (select 1 from public.outbox_move_to_dlq_many(array[p_id], p_error))
+$$;
+
+create or replace function public.outbox_requeue_many(p_ids uuid[])
+returns setof uuid
+language sql
+volatile
+as $$
+    with requeued as (
+        update outbox
+        set status = 'pending',
+            attempts = 0,
+            last_error = null,
+            next_run_at = null,
+            updated_at = now()
+        where id = any(p_ids)
+        returning id
+    ), cleared as (
+        delete from outbox_dlq
+        where id in (select id from requeued)
+    )
+    select id from requeued
+$$;
+
+-- Single-envelope requeue returning the refreshed row (`worker retry-dlq`). plpgsql so
+-- the final select runs with a fresh snapshot and sees the update.
+create or replace function public.outbox_requeue(p_id uuid)
+returns setof outbox
+language plpgsql
+volatile
+as $$
+begin
+    perform public.outbox_requeue_many(array[p_id]);
+    return query select * from outbox where id = p_id;
+end;
+$$;
+
+revoke all on function public.outbox_move_to_dlq_many(uuid[], text) from public;
+revoke all on function public.outbox_move_to_dlq(uuid, text) from public;
+revoke all on function public.outbox_requeue_many(uuid[]) from public;
+revoke all on function public.outbox_requeue(uuid) from public;
+grant execute on function public.outbox_move_to_dlq_many(uuid[], text) to service_role;
+grant execute on function public.outbox_move_to_dlq(uuid, text) to service_role;
+grant execute on function public.outbox_requeue_many(uuid[]) to service_role;
+grant execute on function public.outbox_requeue(uuid) to service_role;
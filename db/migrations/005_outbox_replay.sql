@@ -0,0 +1,34 @@
+-- 005_outbox_replay.sql
+-- Scheduled bulk requeue for DLQ replays (`worker replay`).
+-- Like `outbox_requeue_many`, but each envelope gets its own `next_run_at` so the
+-- replay trickles back into the queue at the rate its rate bucket allows instead of
+-- flooding the provider the moment it is requeued. `p_ids` and `p_run_at` are aligned;
+-- a null run time makes the envelope due immediately.
+
+create or replace function public.outbox_requeue_scheduled(p_ids uuid[], p_run_at timestamptz[])
+returns setof uuid
+language sql
+volatile
+as $$
+    with schedule as (
+        select s.id, s.run_at
+        from unnest(p_ids, p_run_at) as s(id, run_at)
+    ), requeued as (
+        update outbox o
+        set status = 'pending',
+            attempts = 0,
+            last_error = null,
+            next_run_at = s.run_at,
+            updated_at = now()
+        from schedule s
+        where o.id = s.id
+        returning o.id
+    ), cleared as (
+        delete from outbox_dlq
+        where id in (select id from requeued)
+    )
+    select id from requeued
+$$;
+
+revoke all on function public.outbox_requeue_scheduled(uuid[], timestamptz[]) from public;
+grant execute on function public.outbox_requeue_scheduled(uuid[], timestamptz[]) to service_role;
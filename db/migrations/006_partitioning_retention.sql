@@ -0,0 +1,495 @@
+-- 006_partitioning_retention.sql
+-- Keeps the hot tables small no matter how much history is retained.
+--   * `audit_log` and `actions` become monthly range partitions on `created_at`, so
+--     retention drops whole partitions instead of deleting row by row.
+--   * Terminal outbox rows older than the archive age move to `outbox_history` (also
+--     monthly partitions); `outbox` only holds live work plus a short terminal tail.
+--     Their external_ids stay reserved in `outbox_external_id_tombstones`: inserts that
+--     reuse one are skipped, so a late retry resolves to the archived row
+--     (`outbox_archived_lookup`) instead of running again.
+--   * `retention_policies` sets per-plan retention in days (`*` is the fallback row);
+--     `apply_retention()` enforces it per tenant.
+-- Existing rows are copied into the partitioned tables, so apply during a quiet window.
+-- Each partitioned table has a DEFAULT partition, so writes never fail when no monthly
+-- partition covers them (e.g. `pg_cron` is absent and nobody has run
+-- `ensure_monthly_partitions`); they are moved out when their month is created.
+-- `actions` keys become (id, created_at) / (external_id, created_at): Postgres requires
+-- the partition key in every unique constraint, so `external_id` alone is no longer
+-- unique and an upsert with `on_conflict=external_id` no longer deduplicates (it fails:
+-- no matching constraint). Writers must conflict on (external_id, created_at) with a
+-- stable `created_at`; the worker uses the envelope's, so retries hit the same row.
+
+-- Partition helpers -----------------------------------------------------------------
+
+create or replace function public.ensure_monthly_partitions(
+    p_parent text,
+    p_from date default current_date,
+    p_months_ahead integer default 3
+)
+returns integer
+language plpgsql
+as $$
+declare
+    month_start date := date_trunc('month', p_from)::date;
+    month_end date;
+    last_month date := (date_trunc('month', now()) + make_interval(months => greatest(p_months_ahead, 0)))::date;
+    partition_name text;
+    default_name text := p_parent || '_default';
+    has_parked boolean;
+    created integer := 0;
+begin
+    while month_start <= last_month loop
+        month_end := (month_start + interval '1 month')::date;
+        partition_name := format('%s_%s', p_parent, to_char(month_start, 'YYYY_MM'));
+        if to_regclass(format('public.%I', partition_name)) is null then
+            -- A partition cannot be created while the default partition holds rows in its
+            -- range, so park them, create the partition, and route them back through it.
+            has_parked := false;
+            if to_regclass(format('public.%I', default_name)) is not null then
+                execute format(
+                    'select exists (select 1 from public.%I where created_at >= %L and created_at < %L)',
+                    default_name, month_start, month_end
+                ) into has_parked;
+            end if;
+            if has_parked then
+                execute format('create temp table partition_parked (like public.%I) on commit drop', p_parent);
+                execute format(
+                    'with moved as (delete from public.%I where created_at >= %L and created_at < %L returning *)
+                     insert into partition_parked select * from moved',
+                    default_name, month_start, month_end
+                );
+            end if;
+            execute format(
+                'create table public.%I partition of public.%I for values from (%L) to (%L)',
+                partition_name, p_parent, month_start, month_end
+            );
+            if has_parked then
+                execute format(
+                    'insert into public.%I overriding system value select * from partition_parked',
+                    p_parent
+                );
+                drop table partition_parked;
+            end if;
+            created := created + 1;
+        end if;
+        month_start := month_end;
+    end loop;
+    return created;
+end;
+$$;
+
+-- Drops partitions whose whole month is older than `p_keep_days`.
+create or replace function public.drop_expired_partitions(p_parent text, p_keep_days integer)
+returns integer
+language plpgsql
+as $$
+declare
+    child record;
+    dropped integer := 0;
+begin
+    for child in
+        select c.relname
+        from pg_inherits i
+        join pg_class c on c.oid = i.inhrelid
+        join pg_class p on p.oid = i.inhparent
+        where p.relname = p_parent
+          and c.relname ~ ('^' || p_parent || '_\d{4}_\d{2}$')
+    loop
+        if to_date(right(child.relname, 7), 'YYYY_MM') + interval '1 month'
+                <= now() - make_interval(days => p_keep_days) then
+            execute format('drop table public.%I', child.relname);
+            dropped := dropped + 1;
+        end if;
+    end loop;
+    return dropped;
+end;
+$$;
+
+-- audit_log -------------------------------------------------------------------------
+
+alter table audit_log rename to audit_log_unpartitioned;
+alter index audit_log_pkey rename to audit_log_unpartitioned_pkey;
+alter index audit_log_tenant_created_idx rename to audit_log_unpartitioned_tenant_created_idx;
+alter sequence audit_log_id_seq rename to audit_log_unpartitioned_id_seq;
+
+create table audit_log (
+    id bigint generated always as identity,
+    tenant_id uuid references tenants(id) on delete cascade,
+    actor_type text,
+    actor_id text,
+    category text not null,
+    payload jsonb,
+    created_at timestamptz not null default now(),
+    primary key (id, created_at)
+) partition by range (created_at);
+
+create index if not exists audit_log_tenant_created_idx
+    on audit_log(tenant_id, created_at desc);
+
+create table if not exists audit_log_default partition of audit_log default;
+
+select public.ensure_monthly_partitions(
+    'audit_log', coalesce((select min(created_at) from audit_log_unpartitioned), now())::date
+);
+
+insert into audit_log (id, tenant_id, actor_type, actor_id, category, payload, created_at)
+overriding system value
+select id, tenant_id, actor_type, actor_id, category, payload, created_at
+from audit_log_unpartitioned;
+
+select setval(
+    pg_get_serial_sequence('public.audit_log', 'id'),
+    coalesce((select max(id) from audit_log), 0) + 1,
+    false
+);
+
+drop table audit_log_unpartitioned;
+
+alter table audit_log enable row level security;
+
+create policy audit_log_service_role on audit_log
+    for all using (auth.role() = 'service_role') with check (auth.role() = 'service_role');
+
+create policy audit_log_select_own on audit_log
+    for select using (
+        auth.role() = 'service_role' or tenant_id = current_tenant_id_uuid()
+    );
+
+-- actions ---------------------------------------------------------------------------
+
+alter table actions rename to actions_unpartitioned;
+alter index actions_pkey rename to actions_unpartitioned_pkey;
+alter index actions_external_id_uidx rename to actions_unpartitioned_external_id_uidx;
+
+create table actions (
+    id uuid not null default gen_random_uuid(),
+    tenant_id uuid not null references tenants(id) on delete cascade,
+    task_id uuid references tasks(id) on delete set null,
+    employee_id uuid references employees(id) on delete set null,
+    external_id text not null,
+    type text not null default 'mcp.exec',
+    tool jsonb not null,
+    args jsonb not null,
+    risk text not null default 'medium',
+    approval text not null default 'required',
+    constraints jsonb default '{}'::jsonb,
+    result jsonb default '{"status":"pending"}'::jsonb,
+    created_at timestamptz not null default now(),
+    sent_at timestamptz,
+    completed_at timestamptz,
+    updated_at timestamptz not null default now(),
+    primary key (id, created_at)
+) partition by range (created_at);
+
+create unique index if not exists actions_external_id_uidx on actions(external_id, created_at);
+create index if not exists actions_tenant_created_idx on actions(tenant_id, created_at desc);
+
+create table if not exists actions_default partition of actions default;
+
+select public.ensure_monthly_partitions(
+    'actions', coalesce((select min(created_at) from actions_unpartitioned), now())::date
+);
+
+insert into actions
+select id, tenant_id, task_id, employee_id, external_id, type, tool, args, risk, approval,
+       constraints, result, created_at, sent_at, completed_at, updated_at
+from actions_unpartitioned;
+
+drop table actions_unpartitioned;
+
+create trigger actions_set_updated_at
+    before update on actions
+    for each row execute function public.set_updated_at();
+
+alter table actions enable row level security;
+
+create policy actions_service_role on actions
+    for all using (auth.role() = 'service_role') with check (auth.role() = 'service_role');
+
+create policy actions_select_own on actions
+    for select using (
+        auth.role() = 'service_role' or tenant_id = current_tenant_id_uuid()
+    );
+
+-- outbox archive --------------------------------------------------------------------
+
+create table if not exists outbox_history (
+    id uuid not null,
+    tenant_id uuid not null references tenants(id) on delete cascade,
+    tool_slug text not null,
+    arguments jsonb not null,
+    connected_account_id text,
+    risk text not null default 'medium',
+    external_id text,
+    trust_context jsonb default '{}'::jsonb,
+    metadata jsonb default '{}'::jsonb,
+    status text not null,
+    attempts integer not null default 0,
+    rate_bucket text,
+    must_run_before timestamptz,
+    result jsonb,
+    next_run_at timestamptz,
+    last_error text,
+    created_at timestamptz not null,
+    updated_at timestamptz not null,
+    archived_at timestamptz not null default now(),
+    primary key (id, created_at)
+) partition by range (created_at);
+
+create index if not exists outbox_history_tenant_updated_idx
+    on outbox_history(tenant_id, updated_at desc);
+
+create table if not exists outbox_history_default partition of outbox_history default;
+
+select public.ensure_monthly_partitions(
+    'outbox_history', coalesce((select min(created_at) from outbox), now())::date
+);
+
+-- The terminal tail is found through its own partial index; the tenant/status index
+-- now covers only live rows, so it stops growing with history.
+create index if not exists outbox_terminal_updated_idx
+    on outbox(updated_at)
+    where status in ('success', 'failed', 'conflict', 'sent', 'skipped');
+
+drop index if exists outbox_tenant_status_idx;
+create index if not exists outbox_tenant_status_idx
+    on outbox(tenant_id, status)
+    where status not in ('success', 'failed', 'conflict', 'sent', 'skipped');
+
+-- Archived external_ids, kept as long as the tenant keeps outbox history.
+create table if not exists outbox_external_id_tombstones (
+    external_id text primary key,
+    tenant_id uuid not null references tenants(id) on delete cascade,
+    envelope_id uuid not null,
+    created_at timestamptz not null,
+    archived_at timestamptz not null default now()
+);
+
+create index if not exists outbox_external_id_tombstones_tenant_created_idx
+    on outbox_external_id_tombstones(tenant_id, created_at);
+
+-- `outbox.external_id` is only unique among live rows; this keeps archived ones taken.
+-- Skipping (rather than raising) lets `insert ... on conflict do nothing` callers treat
+-- the retry like any other duplicate.
+create or replace function public.outbox_skip_archived_external_id()
+returns trigger
+language plpgsql
+as $$
+begin
+    if new.external_id is not null and exists (
+        select 1 from outbox_external_id_tombstones t where t.external_id = new.external_id
+    ) then
+        return null;
+    end if;
+    return new;
+end;
+$$;
+
+drop trigger if exists outbox_skip_archived_external_id on outbox;
+create trigger outbox_skip_archived_external_id
+    before insert on outbox
+    for each row execute function public.outbox_skip_archived_external_id();
+
+-- Moves up to `p_batch` terminal rows older than `p_older_than` in one statement.
+create or replace function public.outbox_archive_terminal(
+    p_older_than interval default interval '7 days',
+    p_batch integer default 5000
+)
+returns integer
+language sql
+volatile
+as $$
+    with doomed as (
+        select id
+        from outbox
+        where status in ('success', 'failed', 'conflict', 'sent', 'skipped')
+          and updated_at < now() - p_older_than
+        order by updated_at
+        limit greatest(p_batch, 0)
+        for update skip locked
+    ), moved as (
+        delete from outbox o
+        using doomed d
+        where o.id = d.id
+        returning o.*
+    ), archived as (
+        insert into outbox_history (
+            id, tenant_id, tool_slug, arguments, connected_account_id, risk, external_id,
+            trust_context, metadata, status, attempts, rate_bucket, must_run_before, result,
+            next_run_at, last_error, created_at, updated_at
+        )
+        select id, tenant_id, tool_slug, arguments, connected_account_id, risk, external_id,
+               trust_context, metadata, status, attempts, rate_bucket, must_run_before, result,
+               next_run_at, last_error, created_at, updated_at
+        from moved
+        on conflict do nothing
+        returning 1
+    ), tombstoned as (
+        insert into outbox_external_id_tombstones (external_id, tenant_id, envelope_id, created_at)
+        select external_id, tenant_id, id, created_at
+        from moved
+        where external_id is not null
+        on conflict (external_id) do nothing
+    )
+    select count(*)::integer from archived
+$$;
+
+-- Archived rows for the given external_ids (callers check the tenant), found through
+-- the tombstones so each history lookup is a primary-key hit.
+create or replace function public.outbox_archived_lookup(p_external_ids text[])
+returns setof outbox_history
+language sql
+stable
+as $$
+    select h.*
+    from outbox_external_id_tombstones t
+    join outbox_history h on h.id = t.envelope_id and h.created_at = t.created_at
+    where t.external_id = any(p_external_ids)
+$$;
+
+-- Activity timelines read both tiers; callers order and limit (no whole-table sort).
+create or replace view public.outbox_history_view as
+select id, tenant_id, tool_slug, status, attempts, last_error, created_at, updated_at, result
+from outbox
+where status in ('sent', 'failed', 'conflict', 'skipped', 'success')
+union all
+select id, tenant_id, tool_slug, status, attempts, last_error, created_at, updated_at, result
+from outbox_history;
+
+alter table outbox_history enable row level security;
+alter table outbox_external_id_tombstones enable row level security;
+
+drop policy if exists outbox_external_id_tombstones_service_role on outbox_external_id_tombstones;
+create policy outbox_external_id_tombstones_service_role on outbox_external_id_tombstones
+    for all using (auth.role() = 'service_role') with check (auth.role() = 'service_role');
+
+create policy outbox_history_service_role on outbox_history
+    for all using (auth.role() = 'service_role') with check (auth.role() = 'service_role');
+
+create policy outbox_history_select_own on outbox_history
+    for select using (
+        auth.role() = 'service_role' or tenant_id = current_tenant_id_uuid()
+    );
+
+-- Retention -------------------------------------------------------------------------
+
+create table if not exists retention_policies (
+    plan text primary key,
+    audit_log_days integer not null check (audit_log_days > 0),
+    actions_days integer not null check (actions_days > 0),
+    outbox_history_days integer not null check (outbox_history_days > 0),
+    updated_at timestamptz not null default now()
+);
+
+insert into retention_policies (plan, audit_log_days, actions_days, outbox_history_days)
+values
+    ('*', 90, 180, 90),
+    ('free', 30, 90, 30),
+    ('demo', 30, 90, 30),
+    ('pro', 180, 365, 180),
+    ('enterprise', 730, 730, 365)
+on conflict (plan) do nothing;
+
+create trigger retention_policies_set_updated_at
+    before update on retention_policies
+    for each row execute function public.set_updated_at();
+
+alter table retention_policies enable row level security;
+
+create policy retention_policies_service_role on retention_policies
+    for all using (auth.role() = 'service_role') with check (auth.role() = 'service_role');
+
+-- Deletes rows past each tenant's plan retention (index range scans on
+-- (tenant_id, created_at)), then drops partitions older than the longest retention.
+create or replace function public.apply_retention()
+returns table (table_name text, deleted bigint)
+language plpgsql
+volatile
+as $$
+declare
+    longest record;
+begin
+    return query
+    with windows as (
+        select t.id as tenant_id,
+               coalesce(rp.audit_log_days, fallback.audit_log_days) as audit_log_days,
+               coalesce(rp.actions_days, fallback.actions_days) as actions_days,
+               coalesce(rp.outbox_history_days, fallback.outbox_history_days) as outbox_history_days
+        from tenants t
+        cross join (select * from retention_policies where plan = '*') as fallback
+        left join retention_policies rp on rp.plan = t.plan
+    ), audit as (
+        delete from audit_log a
+        using windows w
+        where a.tenant_id = w.tenant_id
+          and a.created_at < now() - make_interval(days => w.audit_log_days)
+        returning 1
+    ), acted as (
+        delete from actions a
+        using windows w
+        where a.tenant_id = w.tenant_id
+          and a.created_at < now() - make_interval(days => w.actions_days)
+        returning 1
+    ), history as (
+        delete from outbox_history h
+        using windows w
+        where h.tenant_id = w.tenant_id
+          and h.created_at < now() - make_interval(days => w.outbox_history_days)
+        returning 1
+    ), released as (
+        delete from outbox_external_id_tombstones t
+        using windows w
+        where t.tenant_id = w.tenant_id
+          and t.created_at < now() - make_interval(days => w.outbox_history_days)
+    )
+    select 'audit_log'::text, (select count(*) from audit)
+    union all
+    select 'actions'::text, (select count(*) from acted)
+    union all
+    select 'outbox_history'::text, (select count(*) from history);
+
+    select max(audit_log_days) as audit_log_days,
+           max(actions_days) as actions_days,
+           max(outbox_history_days) as outbox_history_days
+    into longest
+    from retention_policies;
+
+    perform public.drop_expired_partitions('audit_log', longest.audit_log_days);
+    perform public.drop_expired_partitions('actions', longest.actions_days);
+    perform public.drop_expired_partitions('outbox_history', longest.outbox_history_days);
+end;
+$$;
+
+revoke all on function public.ensure_monthly_partitions(text, date, integer) from public;
+revoke all on function public.drop_expired_partitions(text, integer) from public;
+revoke all on function public.outbox_archive_terminal(interval, integer) from public;
+revoke all on function public.apply_retention() from public;
+revoke all on function public.outbox_archived_lookup(text[]) from public;
+grant execute on function public.outbox_archived_lookup(text[]) to service_role;
+grant execute on function public.outbox_archive_terminal(interval, integer) to service_role;
+grant execute on function public.apply_retention() to service_role;
+
+-- Scheduled maintenance (skipped where pg_cron is not installed, e.g. plain local
+-- Postgres; run the functions by hand there).
+do $$
+begin
+    if exists (select 1 from pg_extension where extname = 'pg_cron') then
+        perform cron.schedule(
+            'outbox-archive-hourly',
+            '15 * * * *',
+            $job$select public.outbox_archive_terminal()$job$
+        );
+        perform cron.schedule(
+            'partitions-daily',
+            '0 1 * * *',
+            $job$select public.ensure_monthly_partitions(parent)
+                 from unnest(array['audit_log', 'actions', 'outbox_history']) as parent$job$
+        );
+        perform cron.schedule(
+            'retention-nightly',
+            '30 3 * * *',
+            $job$select * from public.apply_retention()$job$
+        );
+    end if;
+end;
+$$;
@@ -0,0 +1,96 @@
+-- 007_outbox_claim_index.sql
+-- Partial indexes for the worker's pending claim.
+-- An envelope is due once `coalesce(next_run_at, created_at)` has passed (fresh
+-- envelopes have no `next_run_at`), and the claim takes the longest-due first. Indexing
+-- that expression over pending rows only lets both the predicate and the order come
+-- from the index, so claiming 50 rows reads about 50 index entries however deep the
+-- backlog is, instead of sorting every pending row. Scheduled retries are ordered by
+-- their due time rather than behind every never-attempted envelope.
+
+create index if not exists outbox_pending_due_idx
+    on outbox ((coalesce(next_run_at, created_at)))
+    where status = 'pending';
+
+create index if not exists outbox_pending_tenant_due_idx
+    on outbox (tenant_id, (coalesce(next_run_at, created_at)))
+    where status = 'pending';
+
+-- Claim window for `list_pending`. Inlined by the planner, so a null `p_tenant_id`
+-- folds away and the matching index above is used.
+create or replace function public.outbox_pending_due(p_tenant_id uuid default null, p_limit integer default 50)
+returns setof outbox
+language sql
+stable
+as $$
+    select *
+    from outbox
+    where status = 'pending'
+      and coalesce(next_run_at, created_at) <= now()
+      and (p_tenant_id is null or tenant_id = p_tenant_id)
+    order by coalesce(next_run_at, created_at)
+    limit greatest(p_limit, 0)
+$$;
+
+-- Same predicate and order per tenant. The distinct due tenants are found with a
+-- skip scan over `outbox_pending_tenant_due_idx` (one index probe per tenant), and each
+-- tenant's window is a LATERAL index range scan stopped at `p_per_tenant` rows, so a
+-- deep backlog is never ranked in full.
+create or replace function public.outbox_pending_fair(p_per_tenant integer, p_limit integer)
+returns setof outbox
+language sql
+stable
+as $$
+    with recursive due_tenants(tenant_id) as (
+        (
+            select tenant_id
+            from outbox
+            where status = 'pending'
+              and coalesce(next_run_at, created_at) <= now()
+            order by tenant_id
+            limit 1
+        )
+        union all
+        select (
+            select o.tenant_id
+            from outbox o
+            where o.status = 'pending'
+              and coalesce(o.next_run_at, o.created_at) <= now()
+              and o.tenant_id > t.tenant_id
+            order by o.tenant_id
+            limit 1
+        )
+        from due_tenants t
+        where t.tenant_id is not null
+    )
+    select o.*
+    from due_tenants t
+    cross join lateral (
+        select *
+        from outbox
+        where status = 'pending'
+          and tenant_id = t.tenant_id
+          and coalesce(next_run_at, created_at) <= now()
+        order by coalesce(next_run_at, created_at)
+        limit greatest(p_per_tenant, 1)
+    ) o
+    where t.tenant_id is not null
+    order by row_number() over (
+                 partition by o.tenant_id
+                 order by coalesce(o.next_run_at, o.created_at)
+             ),
+             coalesce(o.next_run_at, o.created_at)
+    limit greatest(p_limit, 0)
+$$;
+
+-- `due_at` is appended (existing columns keep their positions); order by it to read
+-- the view through `outbox_pending_due_idx`.
+create or replace view public.outbox_pending_view as
+select id, tenant_id, tool_slug, arguments, connected_account_id, risk, external_id,
+       status, attempts, next_run_at, rate_bucket, must_run_before, created_at,
+       coalesce(next_run_at, created_at) as due_at
+from outbox
+where status = 'pending' and coalesce(next_run_at, created_at) <= now()
+  and (must_run_before is null or must_run_before > now());
+
+revoke all on function public.outbox_pending_due(uuid, integer) from public;
+grant execute on function public.outbox_pending_due(uuid, integer) to service_role;
@@ -0,0 +1,189 @@
+-- 008_tool_effective_policy.sql
+-- Precomputed effective tool policies.
+-- `catalog_tools_view` joined `tool_policies` on `composio_app || '.' || tool_key`,
+-- which no index can serve, and the worker resolves a policy for every envelope.
+-- `tool_effective_policy` holds the merged catalog + override row per
+-- (tenant_id, tool_slug), kept current by statement-level triggers on `tool_catalog`
+-- and `tool_policies`, so a lookup is a primary-key hit. When a slug has several
+-- catalog versions, the most recently updated one wins.
+
+alter table tool_policies
+    add column if not exists tool_slug text
+    generated always as (composio_app || '.' || tool_key) stored;
+
+-- Distinct (composio_app, tool_key) pairs can spell the same slug ('A.b' + 'c' and
+-- 'A' + 'b.c'), and only one override per slug can apply. Keep the most recently
+-- updated one so the unique index below can be built.
+delete from tool_policies tp
+using tool_policies newer
+where newer.tenant_id = tp.tenant_id
+  and newer.tool_slug = tp.tool_slug
+  and (newer.updated_at, newer.composio_app) > (tp.updated_at, tp.composio_app);
+
+create unique index if not exists tool_policies_tenant_slug_idx on tool_policies(tenant_id, tool_slug);
+
+create table if not exists tool_effective_policy (
+    tenant_id uuid not null references tenants(id) on delete cascade,
+    tool_slug text not null,
+    display_name text,
+    description text,
+    category text,
+    schema jsonb not null default '{}'::jsonb,
+    required_scopes text[] not null default array[]::text[],
+    effective_risk text,
+    effective_approval text,
+    effective_write_allowed boolean,
+    effective_rate_bucket text,
+    updated_at timestamptz not null default now(),
+    refreshed_at timestamptz not null default now(),
+    primary key (tenant_id, tool_slug)
+);
+
+-- Recomputes the given (tenant, slug) pairs from the source tables; pairs without a
+-- catalog row are removed.
+create or replace function public.refresh_tool_effective_policy(p_tenant_ids uuid[], p_tool_slugs text[])
+returns void
+language sql
+volatile
+as $$
+    with keys as (
+        select distinct tenant_id, tool_slug
+        from unnest(p_tenant_ids, p_tool_slugs) as k(tenant_id, tool_slug)
+    ), latest as (
+        select distinct on (tc.tenant_id, tc.tool_slug) tc.*
+        from tool_catalog tc
+        join keys k on k.tenant_id = tc.tenant_id and k.tool_slug = tc.tool_slug
+        order by tc.tenant_id, tc.tool_slug, tc.updated_at desc, tc.id desc
+    ), removed as (
+        delete from tool_effective_policy e
+        using keys k
+        where e.tenant_id = k.tenant_id
+          and e.tool_slug = k.tool_slug
+          and not exists (
+              select 1 from latest l where l.tenant_id = k.tenant_id and l.tool_slug = k.tool_slug
+          )
+    )
+    insert into tool_effective_policy (
+        tenant_id, tool_slug, display_name, description, category, schema, required_scopes,
+        effective_risk, effective_approval, effective_write_allowed, effective_rate_bucket,
+        updated_at, refreshed_at
+    )
+    select l.tenant_id,
+           l.tool_slug,
+           l.display_name,
+           l.description,
+           l.category,
+           l.schema,
+           l.required_scopes,
+           coalesce(tp.risk, l.risk_default),
+           coalesce(tp.approval, l.approval_default),
+           coalesce(tp.write_allowed, l.write_allowed),
+           coalesce(tp.rate_bucket, l.rate_bucket),
+           greatest(l.updated_at, tp.updated_at),
+           now()
+    from latest l
+    left join tool_policies tp on tp.tenant_id = l.tenant_id and tp.tool_slug = l.tool_slug
+    on conflict (tenant_id, tool_slug) do update
+    set display_name = excluded.display_name,
+        description = excluded.description,
+        category = excluded.category,
+        schema = excluded.schema,
+        required_scopes = excluded.required_scopes,
+        effective_risk = excluded.effective_risk,
+        effective_approval = excluded.effective_approval,
+        effective_write_allowed = excluded.effective_write_allowed,
+        effective_rate_bucket = excluded.effective_rate_bucket,
+        updated_at = excluded.updated_at,
+        refreshed_at = excluded.refreshed_at
+$$;
+
+-- Shared by both source tables (each exposes tenant_id and tool_slug). Statement-level
+-- with transition tables, so a catalog sync upserting hundreds of tools refreshes them
+-- in one pass.
+create or replace function public.tool_effective_policy_sync()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform public.refresh_tool_effective_policy(array_agg(tenant_id), array_agg(tool_slug))
+        from new_rows;
+    end if;
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform public.refresh_tool_effective_policy(array_agg(tenant_id), array_agg(tool_slug))
+        from old_rows;
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists tool_catalog_effective_policy_insert on tool_catalog;
+create trigger tool_catalog_effective_policy_insert
+    after insert on tool_catalog
+    referencing new table as new_rows
+    for each statement execute function public.tool_effective_policy_sync();
+
+drop trigger if exists tool_catalog_effective_policy_update on tool_catalog;
+create trigger tool_catalog_effective_policy_update
+    after update on tool_catalog
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function public.tool_effective_policy_sync();
+
+drop trigger if exists tool_catalog_effective_policy_delete on tool_catalog;
+create trigger tool_catalog_effective_policy_delete
+    after delete on tool_catalog
+    referencing old table as old_rows
+    for each statement execute function public.tool_effective_policy_sync();
+
+drop trigger if exists tool_policies_effective_policy_insert on tool_policies;
+create trigger tool_policies_effective_policy_insert
+    after insert on tool_policies
+    referencing new table as new_rows
+    for each statement execute function public.tool_effective_policy_sync();
+
+drop trigger if exists tool_policies_effective_policy_update on tool_policies;
+create trigger tool_policies_effective_policy_update
+    after update on tool_policies
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function public.tool_effective_policy_sync();
+
+drop trigger if exists tool_policies_effective_policy_delete on tool_policies;
+create trigger tool_policies_effective_policy_delete
+    after delete on tool_policies
+    referencing old table as old_rows
+    for each statement execute function public.tool_effective_policy_sync();
+
+-- Backfill.
+select public.refresh_tool_effective_policy(array_agg(tenant_id), array_agg(tool_slug))
+from (select distinct tenant_id, tool_slug from tool_catalog) as existing;
+
+alter table tool_effective_policy enable row level security;
+
+drop policy if exists tool_effective_policy_service_role on tool_effective_policy;
+create policy tool_effective_policy_service_role on tool_effective_policy
+    for all using (auth.role() = 'service_role') with check (auth.role() = 'service_role');
+
+drop policy if exists tool_effective_policy_select_own on tool_effective_policy;
+create policy tool_effective_policy_select_own on tool_effective_policy
+    for select using (
+        auth.role() = 'service_role' or tenant_id = current_tenant_id_uuid()
+    );
+
+-- Same columns as before, now one row per (tenant_id, tool_slug).
+create or replace view public.catalog_tools_view as
+select tenant_id,
+       tool_slug,
+       display_name,
+       description,
+       category,
+       schema,
+       required_scopes,
+       effective_risk,
+       effective_approval,
+       effective_write_allowed,
+       effective_rate_bucket,
+       updated_at
+from tool_effective_policy;
+
+revoke all on function public.refresh_tool_effective_policy(uuid[], text[]) from public;
+grant execute on function public.refresh_tool_effective_policy(uuid[], text[]) to service_role;
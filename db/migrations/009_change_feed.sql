@@ -0,0 +1,138 @@
+-- 009_change_feed.sql
+-- Change feed for cross-process cache invalidation.
+-- Every write to `tool_catalog`, `tool_policies`, `guardrails`, and `objectives` appends
+-- a row to `change_log` and sends `NOTIFY cache_invalidation` with the same event as
+-- JSON (`id`, `source`, `tenant_id`, `key`, `op`). Both are transactional, so subscribers
+-- only hear about committed changes. Processes holding a direct connection LISTEN; the
+-- rest tail `change_log` by id through PostgREST (`agent/services/invalidation.py`).
+-- `key` is the tool slug for catalog and policy rows and null for tenant-wide sources.
+
+create table if not exists change_log (
+    id bigint generated always as identity primary key,
+    source text not null,
+    tenant_id uuid,
+    key text,
+    op text not null,
+    created_at timestamptz not null default now()
+);
+
+create index if not exists change_log_created_idx on change_log(created_at);
+
+-- Also callable by operators for caches no table feeds, e.g.
+-- `select public.publish_cache_invalidation('settings');`
+create or replace function public.publish_cache_invalidation(
+    p_source text,
+    p_tenant_id uuid default null,
+    p_key text default null,
+    p_op text default 'UPDATE'
+)
+returns bigint
+language plpgsql
+volatile
+as $$
+declare
+    event_id bigint;
+begin
+    insert into change_log (source, tenant_id, key, op)
+    values (p_source, p_tenant_id, p_key, p_op)
+    returning id into event_id;
+
+    perform pg_notify(
+        'cache_invalidation',
+        json_build_object(
+            'id', event_id,
+            'source', p_source,
+            'tenant_id', p_tenant_id,
+            'key', p_key,
+            'op', p_op
+        )::text
+    );
+    return event_id;
+end;
+$$;
+
+-- Row trigger; the optional argument names the column used as the event key. A key
+-- change (e.g. a renamed slug) publishes the old key too so its entry is evicted.
+create or replace function public.change_log_publish()
+returns trigger
+language plpgsql
+as $$
+declare
+    current_row jsonb := case when tg_op = 'DELETE' then to_jsonb(old) else to_jsonb(new) end;
+    key_column text := case when tg_nargs > 0 then tg_argv[0] end;
+begin
+    perform public.publish_cache_invalidation(
+        tg_table_name,
+        (current_row ->> 'tenant_id')::uuid,
+        current_row ->> key_column,
+        tg_op
+    );
+    if tg_op = 'UPDATE' and key_column is not null
+            and (to_jsonb(old) ->> key_column) is distinct from (current_row ->> key_column) then
+        perform public.publish_cache_invalidation(
+            tg_table_name,
+            (to_jsonb(old) ->> 'tenant_id')::uuid,
+            to_jsonb(old) ->> key_column,
+            tg_op
+        );
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists tool_catalog_change_log on tool_catalog;
+create trigger tool_catalog_change_log
+    after insert or update or delete on tool_catalog
+    for each row execute function public.change_log_publish('tool_slug');
+
+drop trigger if exists tool_policies_change_log on tool_policies;
+create trigger tool_policies_change_log
+    after insert or update or delete on tool_policies
+    for each row execute function public.change_log_publish('tool_slug');
+
+drop trigger if exists guardrails_change_log on guardrails;
+create trigger guardrails_change_log
+    after insert or update or delete on guardrails
+    for each row execute function public.change_log_publish();
+
+drop trigger if exists objectives_change_log on objectives;
+create trigger objectives_change_log
+    after insert or update or delete on objectives
+    for each row execute function public.change_log_publish();
+
+-- Pollers only need recent events; a process that was down longer starts cold anyway.
+create or replace function public.prune_change_log(p_keep interval default interval '1 day')
+returns integer
+language sql
+volatile
+as $$
+    with pruned as (
+        delete from change_log
+        where created_at < now() - p_keep
+        returning 1
+    )
+    select count(*)::integer from pruned
+$$;
+
+alter table change_log enable row level security;
+
+drop policy if exists change_log_service_role on change_log;
+create policy change_log_service_role on change_log
+    for all using (auth.role() = 'service_role') with check (auth.role() = 'service_role');
+
+revoke all on function public.publish_cache_invalidation(text, uuid, text, text) from public;
+revoke all on function public.prune_change_log(interval) from public;
+grant execute on function public.publish_cache_invalidation(text, uuid, text, text) to service_role;
+grant execute on function public.prune_change_log(interval) to service_role;
+
+do $$
+begin
+    if exists (select 1 from pg_extension where extname = 'pg_cron') then
+        perform cron.schedule(
+            'change-log-prune-hourly',
+            '45 * * * *',
+            $job$select public.prune_change_log()$job$
+        );
+    end if;
+end;
+$$;
@@ -257,10 +257,10 @@ insert into actions (
     sent_at,
     completed_at
 )
-values (
-    '88888888-8888-8888-8888-888888888888',
-    '11111111-1111-1111-1111-111111111111',
-    '77777777-7777-7777-7777-777777777777',
+select
+    '88888888-8888-8888-8888-888888888888'::uuid,
+    '11111111-1111-1111-1111-111111111111'::uuid,
+    '77777777-7777-7777-7777-777777777777'::uuid,
     'env-seed-slack-001',
     'mcp.exec',
     jsonb_build_object(
@@ -275,8 +275,9 @@ values (
     now() - interval '2 minutes',
     now() - interval '90 seconds',
     now() - interval '60 seconds'
-)
-on conflict (id) do nothing;
+where not exists (
+    select 1 from actions where external_id = 'env-seed-slack-001'
+);
 
 -- Seed audit log snapshot ---------------------------------------------------
 insert into audit_log (
@@ -0,0 +1,94 @@
+"""Cold-start import benchmark for the outbox worker CLI.
+
+Each subcommand is measured in a fresh interpreter: the time to import the modules it
+needs and parse its arguments. Queue-management commands must stay clear of the
+Composio SDK and Google ADK; `start` is allowed to load them. Exits non-zero when a
+subcommand's median exceeds its budget or it imports a forbidden module.
+
+    uv run python scripts/bench_worker_imports.py --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Seconds, median of N cold starts.
+BUDGETS = {
+    "status": 1.5,
+    "drain": 1.5,
+    "retry-dlq": 1.5,
+    "replay": 1.5,
+    "start": 12.0,
+}
+
+SUBCOMMAND_ARGS = {
+    "status": ["status"],
+    "drain": ["drain", "--limit", "10"],
+    "retry-dlq": ["retry-dlq", "--tenant", "tenant-demo", "--envelope", "env-1"],
+    "replay": ["replay", "--tool", "GMAIL__drafts.create", "--since", "2025-01-01T00:00:00Z", "--dry-run"],
+    "start": ["start", "--once"],
+}
+
+HEAVY_MODULES = ("composio", "composio_google_adk", "google.adk", "jsonschema")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import worker.outbox as cli
+args = cli.parse_args({argv!r})
+if args.command == "start":
+    import composio, composio_google_adk  # start executes envelopes via the SDK
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure(command: str, runs: int) -> dict[str, object]:
+    samples: list[float] = []
+    heavy: list[str] = []
+    code = _PROBE.format(argv=SUBCOMMAND_ARGS[command], heavy=HEAVY_MODULES)
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        heavy = result["heavy"]
+    return {"median": statistics.median(samples), "heavy": heavy}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("commands", nargs="*", default=list(BUDGETS))
+    args = parser.parse_args(argv)
+
+    failed = False
+    for command in args.commands:
+        result = measure(command, max(1, args.runs))
+        budget = BUDGETS[command]
+        over_budget = result["median"] > budget
+        leaked = command != "start" and bool(result["heavy"])
+        failed = failed or over_budget or leaked
+        status = "FAIL" if over_budget or leaked else "ok"
+        print(
+            f"{command:<10} {result['median']:.3f}s (budget {budget:.1f}s) "
+            f"heavy={','.join(result['heavy']) or '-'} {status}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
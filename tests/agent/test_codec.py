@@ -0,0 +1,97 @@
+"""Tests for the shared envelope/outbox codec."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from agent.schemas import codec
+from agent.schemas.envelope import Envelope
+from agent.services.outbox import OutboxRecord, OutboxStatus
+
+
+def test_parse_timestamp_normalises_to_utc() -> None:
+    expected = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+
+    assert codec.parse_timestamp("2025-01-01T12:00:00Z") == expected
+    assert codec.parse_timestamp("2025-01-01T14:00:00+02:00") == expected
+    assert codec.parse_timestamp("2025-01-01T12:00:00") == expected
+    assert codec.parse_timestamp(expected.astimezone(timezone(timedelta(hours=-5)))) == expected
+    assert codec.parse_timestamp("") is None
+    assert codec.parse_timestamp(None) is None
+
+
+def test_parse_timestamp_reuses_parsed_values() -> None:
+    first = codec.parse_timestamp("2025-02-01T00:00:00Z")
+    second = codec.parse_timestamp("2025-02-01T00:00:00Z")
+
+    assert first is second
+
+
+def test_plain_mapping_reuses_dicts() -> None:
+    payload = {"to": "user@example.com"}
+
+    assert codec.plain_mapping(payload) is payload
+    assert codec.plain_mapping(None) == {}
+
+
+def test_from_records_round_trips_envelope_rows() -> None:
+    envelope = Envelope(
+        envelope_id="env-1",
+        tenant_id="tenant-demo",
+        tool_slug="GMAIL__drafts.create",
+        arguments={"to": "user@example.com"},
+        connected_account_id=None,
+        risk="medium",
+        external_id="ext-1",
+        trust_context={},
+        metadata={"title": "Compose renewal draft"},
+        created_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+    )
+    row = {
+        **envelope.to_record(),
+        "created_at": "2025-01-01T00:00:00Z",
+        "updated_at": "2025-01-01T00:00:00Z",
+        "status": OutboxStatus.DLQ,
+        "attempts": 3,
+    }
+
+    (record,) = OutboxRecord.from_records(codec.loads(codec.dumps([row])))
+
+    assert record.envelope.to_record() == envelope.to_record()
+    assert record.queued_at == envelope.created_at
+    assert record.updated_at == envelope.created_at
+    assert record.attempts == 3
+    assert record.dlq is True
+
+
+def test_dumps_handles_mappings_and_datetimes() -> None:
+    moment = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    decoded = codec.loads(codec.dumps({"at": moment, "tags": ("a",), 1: "x"}))
+
+    assert decoded == {"at": "2025-01-01T00:00:00+00:00", "tags": ["a"], "1": "x"}
+
+
+def test_from_record_wraps_payloads_without_copying() -> None:
+    arguments = {"to": "user@example.com", "body": "x" * 1024}
+    envelope = Envelope.from_record({"id": "env-1", "tool_slug": "GMAIL__drafts.create", "arguments": arguments})
+
+    assert envelope.arguments == arguments
+    assert codec.plain_mapping(envelope.arguments) is arguments
+    assert envelope.to_record()["arguments"] is arguments
+    with pytest.raises(TypeError):
+        envelope.arguments["to"] = "other@example.com"  # type: ignore[index]
+
+
+def test_from_payload_detaches_from_caller_payload() -> None:
+    arguments = {"to": "user@example.com"}
+    envelope = Envelope.from_payload(
+        payload={"tool_slug": "GMAIL__drafts.create", "arguments": arguments},
+        tenant_id="tenant-demo",
+    )
+    arguments["to"] = "changed@example.com"
+
+    assert envelope.arguments == {"to": "user@example.com"}
+    assert codec.loads(codec.dumps(envelope.arguments)) == {"to": "user@example.com"}
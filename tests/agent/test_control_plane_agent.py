@@ -6,14 +6,16 @@ from agent.agents.blueprints import DeskBlueprint
 from google.adk.sessions.state import State
 
 from agent.agents.coordinator import CoordinatorDependencies
-from agent.agents.control_plane import _build_enqueue_envelope_tool
+from agent.agents.control_plane import _build_enqueue_envelope_tool, _build_enqueue_envelopes_tool
 from agent.services import (
     APPROVAL_MODAL_KEY,
     DESK_STATE_KEY,
     AppSettings,
+    EffectiveToolPolicy,
     InMemoryCatalogService,
     InMemoryObjectivesService,
     InMemoryOutboxService,
+    PolicyService,
     StructlogAuditLogger,
     ToolCatalogEntry,
 )
@@ -117,3 +119,77 @@ def test_enqueue_envelope_emits_state_delta() -> None:
     assert DESK_STATE_KEY in state_delta
     assert APPROVAL_MODAL_KEY in state_delta
     assert "outbox" in state_delta
+
+
+def test_enqueue_envelopes_tool_queues_batch_with_single_state_commit() -> None:
+    deps, blueprint = _build_dependencies()
+    enqueue_many_tool = _build_enqueue_envelopes_tool(deps, blueprint)
+
+    state_delta: dict[str, object] = {}
+    state = State({}, state_delta)
+    tool_context = SimpleNamespace(state=state)
+    payloads = [
+        {
+            "tool_slug": "GMAIL__drafts.create",
+            "arguments": {"to": f"customer-{idx}@example.com"},
+            "external_id": f"plan-{idx}",
+        }
+        for idx in range(3)
+    ]
+    payloads.append({"tool_slug": "UNKNOWN__tool", "arguments": {}})
+
+    result = enqueue_many_tool(tool_context, payloads)
+
+    assert result["status"] == "partial"
+    assert len(result["queued"]) == 3
+    assert result["errors"][0]["index"] == 3
+    pending = tuple(deps.outbox_service.list_pending())
+    assert len(pending) == 3
+    desk = state_delta[DESK_STATE_KEY]
+    assert len(desk["queue"]) == 3
+    assert APPROVAL_MODAL_KEY in state_delta
+
+    # Replaying the same plan is idempotent on external_id.
+    enqueue_many_tool(tool_context, payloads[:3])
+    assert len(tuple(deps.outbox_service.list_pending())) == 3
+
+
+def test_enqueue_envelope_replay_is_deduplicated() -> None:
+    deps, blueprint = _build_dependencies()
+    enqueue_tool = _build_enqueue_envelope_tool(deps, blueprint)
+
+    tool_context = SimpleNamespace(state={})
+    payload = {
+        "tool_slug": "GMAIL__drafts.create",
+        "arguments": {"to": "customer@example.com"},
+        "external_id": "turn-42",
+    }
+    first = enqueue_tool(tool_context, payload)
+    replay = enqueue_tool(tool_context, payload)
+
+    assert first["status"] == "queued"
+    assert replay["status"] == "queued"
+    assert replay["deduplicated"] is True
+    assert replay["envelopeId"] == first["envelopeId"]
+    assert len(tuple(deps.outbox_service.list_pending())) == 1
+    assert len(tool_context.state[DESK_STATE_KEY]["queue"]) == 1
+
+
+def test_enqueue_envelopes_screens_policy_denials_before_outbox() -> None:
+    deps, blueprint = _build_dependencies()
+
+    class _DenyWrites(PolicyService):
+        def get_effective_policy(self, *, tenant_id: str, tool_slug: str) -> EffectiveToolPolicy:
+            return EffectiveToolPolicy(write_allowed=False, rate_bucket=None)
+
+    deps.policy_service = _DenyWrites()
+    enqueue_many_tool = _build_enqueue_envelopes_tool(deps, blueprint)
+
+    result = enqueue_many_tool(
+        SimpleNamespace(state={}),
+        [{"tool_slug": "GMAIL__drafts.create", "arguments": {"to": "customer@example.com"}}],
+    )
+
+    assert result["status"] == "error"
+    assert result["errors"] == [{"index": 0, "message": "writes_disabled_by_policy", "checks": ["write_allowed"]}]
+    assert not tuple(deps.outbox_service.list_pending())
@@ -31,3 +31,13 @@ def test_settings_cache_and_override(monkeypatch) -> None:
     assert override.default_model == "override-model"
     # cached instance remains unchanged
     assert get_settings().default_model == "gemini-3.0"
+
+
+def test_settings_parse_plan_weights(monkeypatch) -> None:
+    monkeypatch.setenv("AI_EMPLOYEE_OUTBOX_PLAN_WEIGHTS", "free=1, Pro=2.5")
+
+    reset_settings_cache()
+    settings = get_settings()
+
+    assert settings.outbox_plan_weights == {"free": 1.0, "pro": 2.5}
+    reset_settings_cache()
@@ -0,0 +1,148 @@
+"""Tests for background startup warmup and the readiness probe."""
+
+import threading
+from dataclasses import replace
+
+from fastapi.testclient import TestClient
+
+from agent.agents import control_plane_warmup_steps, resolve_control_plane_dependencies
+from agent.services import (
+    AppSettings,
+    CatalogSnapshot,
+    InMemoryCatalogService,
+    PolicyService,
+    SnapshotCatalogService,
+)
+from agent.warmup import StartupWarmup, WarmupStatus, WarmupStep
+
+
+def _boom() -> None:
+    raise RuntimeError("composio down")
+
+
+def test_optional_step_failure_does_not_block_readiness() -> None:
+    warmup = StartupWarmup(
+        [
+            WarmupStep("catalog", lambda: None),
+            WarmupStep("catalog_sync", _boom, required=False),
+        ]
+    )
+
+    warmup.run()
+
+    snapshot = warmup.snapshot()
+    assert warmup.ready
+    assert snapshot["steps"]["catalog"]["status"] == WarmupStatus.READY
+    assert snapshot["steps"]["catalog_sync"] == {
+        "status": WarmupStatus.FAILED,
+        "seconds": snapshot["steps"]["catalog_sync"]["seconds"],
+        "error": "composio down",
+        "attempts": 1,
+    }
+
+
+def test_required_step_failure_keeps_app_unready() -> None:
+    warmup = StartupWarmup([WarmupStep("catalog", _boom)], retry_initial_seconds=0, max_attempts=3)
+
+    warmup.run()
+
+    assert not warmup.ready
+    snapshot = warmup.snapshot()
+    assert snapshot["status"] == WarmupStatus.FAILED
+    assert snapshot["steps"]["catalog"]["attempts"] == 3
+
+
+def test_required_steps_are_retried_while_warming() -> None:
+    seen: list[str] = []
+
+    def _flaky() -> None:
+        seen.append(warmup.snapshot()["status"])
+        if len(seen) < 3:
+            raise RuntimeError("supabase timeout")
+
+    warmup = StartupWarmup([WarmupStep("catalog", _flaky)], retry_initial_seconds=0)
+
+    warmup.run()
+
+    assert warmup.ready
+    assert seen == [WarmupStatus.RUNNING] * 3
+    assert warmup.snapshot()["steps"]["catalog"]["attempts"] == 3
+
+
+def test_stop_abandons_retries() -> None:
+    warmup = StartupWarmup([WarmupStep("catalog", _boom)], retry_initial_seconds=60)
+    warmup.stop()
+
+    warmup.run()
+
+    assert warmup.snapshot()["status"] == WarmupStatus.FAILED
+
+
+def test_in_memory_catalog_is_hydrated_in_background_only_with_composio_key() -> None:
+    settings = AppSettings().model_copy(update={"supabase_url": None, "composio_api_key": None})
+    dependencies = resolve_control_plane_dependencies(settings)
+    assert isinstance(dependencies.catalog_service, InMemoryCatalogService)
+    assert dependencies.catalog_service.list_tools(settings.tenant_id)
+    assert [step.name for step in control_plane_warmup_steps(dependencies)][:2] == ["catalog", "objectives"]
+    assert "catalog_sync" not in [step.name for step in control_plane_warmup_steps(dependencies)]
+
+    keyed = AppSettings().model_copy(update={"supabase_url": None, "composio_api_key": "test-key"})
+    steps = control_plane_warmup_steps(resolve_control_plane_dependencies(keyed))
+    sync = [step for step in steps if step.name == "catalog_sync"]
+    assert len(sync) == 1 and sync[0].required is False
+
+
+def test_snapshot_served_catalog_is_not_warmed_again(tmp_path) -> None:
+    keyed = AppSettings().model_copy(update={"supabase_url": None, "composio_api_key": "test-key"})
+    dependencies = resolve_control_plane_dependencies(keyed)
+    served = SnapshotCatalogService(CatalogSnapshot(tmp_path / "catalog.json"), source=dependencies.catalog_service)
+
+    names = [step.name for step in control_plane_warmup_steps(replace(dependencies, catalog_service=served))]
+
+    assert "catalog" not in names and "catalog_sync" not in names
+    assert "objectives" in names
+
+
+class _RecordingPolicies(PolicyService):
+    def __init__(self) -> None:
+        self.slugs: list[str] = []
+
+    def get_effective_policies(self, *, tenant_id, tool_slugs):
+        self.slugs.extend(tool_slugs)
+        return {}
+
+
+def test_policy_and_guardrail_caches_are_warmed() -> None:
+    settings = AppSettings().model_copy(update={"supabase_url": None, "composio_api_key": None})
+    policies = _RecordingPolicies()
+    dependencies = replace(resolve_control_plane_dependencies(settings), policy_service=policies)
+
+    warmup = StartupWarmup(control_plane_warmup_steps(dependencies))
+    warmup.run()
+
+    assert warmup.ready
+    assert {"policies", "guardrails"} <= warmup.snapshot()["steps"].keys()
+    catalog_slugs = [entry.slug for entry in dependencies.catalog_service.list_tools(settings.tenant_id)]
+    assert policies.slugs == catalog_slugs
+
+
+def test_readyz_reports_503_until_warm(monkeypatch) -> None:
+    import agent.app as app_module
+
+    release = threading.Event()
+    warmup = StartupWarmup([WarmupStep("catalog", lambda: release.wait(5))])
+    monkeypatch.setattr(app_module, "warmup", warmup)
+
+    with TestClient(app_module.app) as client:
+        assert client.get("/healthz").status_code == 200
+
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["steps"]["catalog"]["status"] in {WarmupStatus.PENDING, WarmupStatus.RUNNING}
+
+        release.set()
+        warmup.start().join(timeout=5)
+
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert response.json()["status"] == WarmupStatus.READY
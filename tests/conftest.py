@@ -1,9 +1,60 @@
 """Test configuration shared across suites."""
 
+from __future__ import annotations
+
 import sys
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Any
+
+import pytest
 
 ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+
+class FakeClock:
+    """Manually advanced clock.
+
+    Calling it returns an aware `datetime` (for services that take a wall clock);
+    `monotonic` returns the same instant as float seconds (for `time.monotonic`-style
+    clocks such as the circuit breaker's).
+    """
+
+    def __init__(self, start: datetime = datetime(2025, 1, 1, tzinfo=timezone.utc)) -> None:
+        self.now = start
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now.timestamp()
+
+    def advance(self, seconds: float) -> None:
+        self.now += timedelta(seconds=seconds)
+
+
+class RecordingAuditLogger:
+    """Audit logger double that keeps `log_envelope` calls as `(status, fields)` pairs."""
+
+    def __init__(self) -> None:
+        self.events: list[tuple[str, dict[str, Any]]] = []
+
+    def log_envelope(self, *, tenant_id: str, envelope_id: str, tool_slug: str, status: str, metadata=None) -> None:
+        self.events.append((status, {
+            "tenant_id": tenant_id,
+            "envelope_id": envelope_id,
+            "tool_slug": tool_slug,
+            "metadata": metadata,
+        }))
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def audit_logger() -> RecordingAuditLogger:
+    return RecordingAuditLogger()
@@ -0,0 +1,49 @@
+"""Fixtures for tests that run the SQL migrations against a real Postgres.
+
+Set `AI_EMPLOYEE_TEST_DATABASE_URL` to an empty, disposable database and install
+`psycopg` to run them; they are skipped otherwise. Supabase's `auth.role()` and the
+`service_role` role are stubbed when missing. Each module applies every migration in
+one transaction that is rolled back afterwards, so the database is left as it was.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "db" / "migrations"
+DATABASE_URL = os.getenv("AI_EMPLOYEE_TEST_DATABASE_URL")
+
+_SUPABASE_STUBS = """
+do $$
+begin
+    if not exists (select 1 from pg_roles where rolname = 'service_role') then
+        create role service_role;
+    end if;
+end;
+$$;
+create schema if not exists auth;
+create or replace function auth.role() returns text
+language sql stable
+as $$ select coalesce(current_setting('request.jwt.claim.role', true), 'service_role') $$;
+"""
+
+
+@pytest.fixture(scope="module")
+def migrated_connection() -> Iterator[Any]:
+    if not DATABASE_URL:
+        pytest.skip("AI_EMPLOYEE_TEST_DATABASE_URL is not set")
+    psycopg = pytest.importorskip("psycopg")
+    with psycopg.connect(DATABASE_URL) as conn:
+        if conn.execute("select to_regclass('public.outbox')").fetchone()[0] is not None:
+            pytest.skip("AI_EMPLOYEE_TEST_DATABASE_URL must point at an empty database")
+        try:
+            conn.execute(_SUPABASE_STUBS)
+            for path in sorted(MIGRATIONS.glob("*.sql")):
+                conn.execute(path.read_text())
+            yield conn
+        finally:
+            conn.rollback()
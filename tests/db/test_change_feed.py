@@ -0,0 +1,51 @@
+"""Behavioural tests for the change-feed triggers (migration 009)."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "db" / "migrations"
+
+TENANT = "22222222-2222-2222-2222-222222222222"
+
+
+def _seed_tenant(conn: Any) -> None:
+    conn.execute(
+        f"insert into tenants (id, name, plan) values ('{TENANT}', 'Change feed', 'free') on conflict (id) do nothing"
+    )
+
+
+def _events_since(conn: Any, last_id: int) -> list[tuple[Any, ...]]:
+    rows = conn.execute("select source, key, op from change_log where id > %s order by id", (last_id,)).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def _last_event_id(conn: Any) -> int:
+    return conn.execute("select coalesce(max(id), 0) from change_log").fetchone()[0]
+
+
+def test_policy_writes_publish_old_and_new_slugs(migrated_connection) -> None:
+    conn = migrated_connection
+    _seed_tenant(conn)
+    start = _last_event_id(conn)
+
+    conn.execute(f"insert into tool_policies (tenant_id, composio_app, tool_key) values ('{TENANT}', 'SLACK', 'chat')")
+    conn.execute(f"update tool_policies set tool_key = 'post' where tenant_id = '{TENANT}' and tool_key = 'chat'")
+
+    assert _events_since(conn, start) == [
+        ("tool_policies", "SLACK.chat", "INSERT"),
+        ("tool_policies", "SLACK.post", "UPDATE"),
+        ("tool_policies", "SLACK.chat", "UPDATE"),
+    ]
+
+
+def test_migration_can_be_reapplied(migrated_connection) -> None:
+    conn = migrated_connection
+    _seed_tenant(conn)
+
+    conn.execute((MIGRATIONS / "009_change_feed.sql").read_text())
+    start = _last_event_id(conn)
+    conn.execute(f"insert into objectives (tenant_id, title, metric) values ('{TENANT}', 'Reapplied', 'replies')")
+
+    assert _events_since(conn, start) == [("objectives", None, "INSERT")]
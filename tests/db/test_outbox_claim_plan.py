@@ -0,0 +1,150 @@
+"""EXPLAIN regression tests for the outbox claim indexes (migration 007).
+
+Runs against a disposable Postgres named by `AI_EMPLOYEE_TEST_DATABASE_URL` and needs
+`psycopg`; skipped otherwise. Everything happens in a scratch schema inside a
+transaction that is rolled back, so the target database is left untouched.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+MIGRATION = Path(__file__).resolve().parents[2] / "db" / "migrations" / "007_outbox_claim_index.sql"
+DATABASE_URL = os.getenv("AI_EMPLOYEE_TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="AI_EMPLOYEE_TEST_DATABASE_URL is not set")
+
+TENANT_COUNT = 20
+
+_OUTBOX_TABLE = """
+create table outbox (
+    id uuid primary key,
+    tenant_id uuid not null,
+    tool_slug text not null,
+    arguments jsonb not null default '{}'::jsonb,
+    connected_account_id text,
+    risk text not null default 'medium',
+    external_id text,
+    trust_context jsonb default '{}'::jsonb,
+    metadata jsonb default '{}'::jsonb,
+    status text not null default 'pending',
+    attempts integer not null default 0,
+    rate_bucket text,
+    must_run_before timestamptz,
+    result jsonb,
+    next_run_at timestamptz,
+    last_error text,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+)
+"""
+
+# 20k pending envelopes (a quarter scheduled into the future) behind 80k terminal rows.
+_FIXTURE_ROWS = """
+insert into outbox (id, tenant_id, tool_slug, status, next_run_at, created_at)
+select md5('row-' || g)::uuid,
+       ('00000000-0000-0000-0000-' || lpad((g % {tenants})::text, 12, '0'))::uuid,
+       'GMAIL__drafts.create',
+       case when g % 5 = 0 then 'pending' else 'success' end,
+       case when g % 20 = 0 then now() + interval '1 hour'
+            when g % 10 = 0 then now() - interval '1 minute' end,
+       now() - make_interval(secs => g)
+from generate_series(1, 100000) as g
+""".format(tenants=TENANT_COUNT)
+
+
+def _migration_sql() -> str:
+    return MIGRATION.read_text().replace("public.", "")
+
+
+def _function_body(sql: str, name: str, params: tuple[str, ...]) -> str:
+    match = re.search(rf"function {name}\(.*?as \$\$(.*?)\$\$;", sql, re.DOTALL)
+    assert match, f"{name} not found in migration"
+    body = match.group(1)
+    for position, param in enumerate(params, start=1):
+        body = re.sub(rf"\b{param}\b", f"${position}", body)
+    return body
+
+
+@pytest.fixture(scope="module")
+def connection() -> Iterator[Any]:
+    psycopg = pytest.importorskip("psycopg")
+    sql = _migration_sql()
+    with psycopg.connect(DATABASE_URL) as conn:
+        schema = f"claim_plan_{uuid.uuid4().hex[:12]}"
+        conn.execute(f"create schema {schema}")
+        conn.execute(f"set local search_path = {schema}")
+        conn.execute("set local plan_cache_mode = force_custom_plan")
+        conn.execute(_OUTBOX_TABLE)
+        for statement in re.findall(r"create index if not exists .*?;", sql, re.DOTALL):
+            conn.execute(statement)
+        view = re.search(r"create or replace view outbox_pending_view as.*?;", sql, re.DOTALL)
+        assert view, "outbox_pending_view not found in migration"
+        conn.execute(view.group(0))
+        conn.execute(_FIXTURE_ROWS)
+        conn.execute("analyze outbox")
+        claim = _function_body(sql, "outbox_pending_due", ("p_tenant_id", "p_limit"))
+        fair = _function_body(sql, "outbox_pending_fair", ("p_per_tenant", "p_limit"))
+        conn.execute(f"prepare claim(uuid, integer) as {claim}")
+        conn.execute(f"prepare fair_claim(integer, integer) as {fair}")
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+
+
+def _plan_nodes(conn: Any, statement: str) -> list[dict[str, Any]]:
+    raw = conn.execute(f"explain (format json) {statement}").fetchone()[0]
+    plan = raw if isinstance(raw, list) else json.loads(raw)
+    nodes: list[dict[str, Any]] = []
+    pending = [plan[0]["Plan"]]
+    while pending:
+        node = pending.pop()
+        nodes.append(node)
+        pending.extend(node.get("Plans", []))
+    return nodes
+
+
+def _assert_index_without_sort(nodes: list[dict[str, Any]], index_name: str) -> None:
+    node_types = [node["Node Type"] for node in nodes]
+    assert "Sort" not in node_types, node_types
+    assert any(node.get("Index Name") == index_name for node in nodes), node_types
+
+
+def test_claim_reads_pending_due_index_without_sorting(connection) -> None:
+    nodes = _plan_nodes(connection, "execute claim(null, 50)")
+
+    _assert_index_without_sort(nodes, "outbox_pending_due_idx")
+
+
+def test_tenant_claim_reads_tenant_due_index_without_sorting(connection) -> None:
+    nodes = _plan_nodes(connection, "execute claim('00000000-0000-0000-0000-000000000003', 50)")
+
+    _assert_index_without_sort(nodes, "outbox_pending_tenant_due_idx")
+
+
+def test_pending_view_ordered_by_due_at_uses_index(connection) -> None:
+    nodes = _plan_nodes(connection, "select * from outbox_pending_view order by due_at limit 50")
+
+    _assert_index_without_sort(nodes, "outbox_pending_due_idx")
+
+
+def test_fair_claim_reads_tenant_due_index_per_tenant(connection) -> None:
+    nodes = _plan_nodes(connection, "execute fair_claim(5, 50)")
+
+    node_types = [node["Node Type"] for node in nodes]
+    assert "Seq Scan" not in node_types, node_types
+    assert any(node.get("Index Name") == "outbox_pending_tenant_due_idx" for node in nodes), node_types
+    due_tenants = connection.execute(
+        "select count(distinct tenant_id) from outbox"
+        " where status = 'pending' and coalesce(next_run_at, created_at) <= now()"
+    ).fetchone()[0]
+    rows = connection.execute("execute fair_claim(5, 200)").fetchall()
+    assert due_tenants and len(rows) == due_tenants * 5
@@ -0,0 +1,106 @@
+"""Behavioural tests for partitioning, archival, and retention (migration 006)."""
+
+from __future__ import annotations
+
+from typing import Any
+
+TENANT = "11111111-1111-1111-1111-111111111111"
+
+
+def _scalar(conn: Any, sql: str) -> Any:
+    return conn.execute(sql).fetchone()[0]
+
+
+def _seed_tenant(conn: Any) -> None:
+    conn.execute(
+        f"insert into tenants (id, name, plan) values ('{TENANT}', 'Retention', 'free') on conflict (id) do nothing"
+    )
+
+
+def test_writes_outside_created_months_land_in_default_and_move_out(migrated_connection) -> None:
+    conn = migrated_connection
+    _seed_tenant(conn)
+    conn.execute(
+        f"insert into audit_log (tenant_id, category, created_at) "
+        f"values ('{TENANT}', 'future', date_trunc('month', now()) + interval '6 months')"
+    )
+
+    assert _scalar(conn, "select tableoid::regclass::text from audit_log where category = 'future'") == (
+        "audit_log_default"
+    )
+
+    assert _scalar(conn, "select public.ensure_monthly_partitions('audit_log', current_date, 6)") >= 1
+    partition = _scalar(conn, "select tableoid::regclass::text from audit_log where category = 'future'")
+    assert partition.startswith("audit_log_") and partition != "audit_log_default"
+
+
+def test_actions_deduplicate_on_external_id_and_created_at(migrated_connection) -> None:
+    conn = migrated_connection
+    _seed_tenant(conn)
+    for _ in range(2):
+        conn.execute(
+            f"insert into actions (tenant_id, external_id, tool, args, created_at) "
+            f"values ('{TENANT}', 'ext-dedupe', '{{}}', '{{}}', '2026-01-15T10:00:00Z') "
+            f"on conflict (external_id, created_at) do nothing"
+        )
+
+    assert _scalar(conn, "select count(*) from actions where external_id = 'ext-dedupe'") == 1
+
+
+def test_archive_moves_only_old_terminal_rows(migrated_connection) -> None:
+    conn = migrated_connection
+    _seed_tenant(conn)
+    conn.execute(
+        f"""
+        insert into outbox (tenant_id, tool_slug, arguments, external_id, status, created_at, updated_at)
+        values
+            ('{TENANT}', 'GMAIL__send', '{{}}', 'old-success', 'success', now() - interval '9 days', now() - interval '8 days'),
+            ('{TENANT}', 'GMAIL__send', '{{}}', 'new-success', 'success', now() - interval '1 day', now() - interval '1 day'),
+            ('{TENANT}', 'GMAIL__send', '{{}}', 'old-pending', 'pending', now() - interval '9 days', now() - interval '8 days')
+        """
+    )
+
+    assert _scalar(conn, "select public.outbox_archive_terminal()") == 1
+    assert _scalar(conn, "select count(*) from outbox_history where external_id = 'old-success'") == 1
+    assert _scalar(conn, "select count(*) from outbox where external_id = 'old-success'") == 0
+    assert _scalar(conn, "select count(*) from outbox where external_id in ('new-success', 'old-pending')") == 2
+    assert _scalar(conn, f"select count(*) from outbox_history_view where tenant_id = '{TENANT}'") == 2
+
+
+def test_archived_external_ids_stay_reserved(migrated_connection) -> None:
+    conn = migrated_connection
+    _seed_tenant(conn)
+    conn.execute(
+        f"insert into outbox (tenant_id, tool_slug, arguments, external_id, status, created_at, updated_at) "
+        f"values ('{TENANT}', 'GMAIL__send', '{{}}', 'retried-late', 'success', "
+        f"now() - interval '9 days', now() - interval '8 days')"
+    )
+    assert _scalar(conn, "select public.outbox_archive_terminal()") >= 1
+
+    inserted = conn.execute(
+        f"insert into outbox (tenant_id, tool_slug, arguments, external_id) "
+        f"values ('{TENANT}', 'GMAIL__send', '{{}}', 'retried-late') "
+        f"on conflict (external_id) do nothing returning id"
+    ).fetchall()
+
+    assert inserted == []
+    assert _scalar(conn, "select count(*) from outbox where external_id = 'retried-late'") == 0
+    assert _scalar(conn, "select status from public.outbox_archived_lookup(array['retried-late'])") == "success"
+
+
+def test_retention_deletes_rows_past_the_plan_window(migrated_connection) -> None:
+    conn = migrated_connection
+    _seed_tenant(conn)
+    conn.execute(
+        f"""
+        insert into audit_log (tenant_id, category, created_at)
+        values ('{TENANT}', 'expired', now() - interval '40 days'),
+               ('{TENANT}', 'kept', now() - interval '10 days')
+        """
+    )
+
+    deleted = dict(conn.execute("select table_name, deleted from public.apply_retention()").fetchall())
+
+    assert deleted["audit_log"] >= 1
+    assert _scalar(conn, "select count(*) from audit_log where category = 'expired'") == 0
+    assert _scalar(conn, "select count(*) from audit_log where category = 'kept'") == 1
@@ -0,0 +1,67 @@
+"""Behavioural tests for the precomputed tool policies (migration 008)."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "db" / "migrations"
+
+TENANT = "33333333-3333-3333-3333-333333333333"
+
+
+def _seed_tenant(conn: Any) -> None:
+    conn.execute(
+        f"insert into tenants (id, name, plan) values ('{TENANT}', 'Policies', 'free') on conflict (id) do nothing"
+    )
+
+
+def _effective(conn: Any, slug: str) -> Any:
+    return conn.execute(
+        "select display_name, effective_risk, effective_approval from tool_effective_policy "
+        "where tenant_id = %s and tool_slug = %s",
+        (TENANT, slug),
+    ).fetchone()
+
+
+def test_triggers_merge_catalog_defaults_and_overrides(migrated_connection) -> None:
+    conn = migrated_connection
+    _seed_tenant(conn)
+    conn.execute(
+        f"""
+        insert into tool_catalog (tenant_id, tool_slug, display_name, version, risk_default, approval_default, updated_at)
+        values ('{TENANT}', 'SLACK.chat', 'Chat v1', 'v1', 'low', 'auto', now() - interval '1 day'),
+               ('{TENANT}', 'SLACK.chat', 'Chat v2', 'v2', 'low', 'auto', now())
+        """
+    )
+    assert tuple(_effective(conn, "SLACK.chat")) == ("Chat v2", "low", "auto")
+
+    conn.execute(
+        f"insert into tool_policies (tenant_id, composio_app, tool_key, risk) values ('{TENANT}', 'SLACK', 'chat', 'high')"
+    )
+    assert tuple(_effective(conn, "SLACK.chat")) == ("Chat v2", "high", "auto")
+
+    conn.execute(f"update tool_policies set approval = 'required' where tenant_id = '{TENANT}'")
+    assert tuple(_effective(conn, "SLACK.chat")) == ("Chat v2", "high", "required")
+
+    conn.execute(f"delete from tool_policies where tenant_id = '{TENANT}'")
+    assert tuple(_effective(conn, "SLACK.chat")) == ("Chat v2", "low", "auto")
+
+    conn.execute(f"delete from tool_catalog where tenant_id = '{TENANT}' and version = 'v2'")
+    assert tuple(_effective(conn, "SLACK.chat")) == ("Chat v1", "low", "auto")
+
+    conn.execute(f"delete from tool_catalog where tenant_id = '{TENANT}'")
+    assert _effective(conn, "SLACK.chat") is None
+
+
+def test_migration_can_be_reapplied(migrated_connection) -> None:
+    conn = migrated_connection
+    _seed_tenant(conn)
+
+    conn.execute((MIGRATIONS / "008_tool_effective_policy.sql").read_text())
+    conn.execute(
+        f"insert into tool_catalog (tenant_id, tool_slug, display_name, risk_default) "
+        f"values ('{TENANT}', 'GMAIL.send', 'Send', 'medium')"
+    )
+
+    assert tuple(_effective(conn, "GMAIL.send")) == ("Send", "medium", "required")
@@ -0,0 +1,174 @@
+"""Tests for compiled guardrail plans and the per-tenant engine."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from agent.callbacks import guardrails as callbacks
+from agent.guardrails.engine import (
+    EVIDENCE_REQUIREMENT,
+    QUIET_HOURS,
+    SCOPE_VALIDATION,
+    TRUST_THRESHOLD,
+    GuardrailConfig,
+    GuardrailEngine,
+    GuardrailInput,
+    compile_plan,
+)
+from agent.services import AppSettings
+
+
+def _at(hour: int) -> datetime:
+    return datetime(2024, 1, 1, hour, 0, tzinfo=timezone.utc)
+
+
+def _state() -> dict:
+    return {
+        "trust": {"score": 0.9, "source": "ledger"},
+        "requested_scopes": ["chat:write"],
+        "enabled_scopes": ["chat:write"],
+        "proposal": {"summary": "Post update", "evidence": ["ticket-1"]},
+    }
+
+
+class _Source:
+    def __init__(self, config: GuardrailConfig | None) -> None:
+        self.config = config
+        self.calls = 0
+
+    def get_config(self, tenant_id: str) -> GuardrailConfig | None:
+        self.calls += 1
+        return self.config
+
+
+def test_compiled_plan_matches_callback_guardrails(monkeypatch) -> None:
+    settings = AppSettings().model_copy(update={"quiet_hours_start_hour": 22, "quiet_hours_end_hour": 6})
+    monkeypatch.setattr(callbacks, "_utc_now", lambda: _at(12))
+    context = SimpleNamespace(state=_state())
+
+    legacy = (
+        callbacks.enforce_quiet_hours(context, settings=settings),
+        callbacks.enforce_trust_threshold(context, settings=settings),
+        callbacks.enforce_scope_validation(context, settings=settings),
+        callbacks.ensure_evidence_present(context, settings=settings),
+    )
+    compiled = callbacks.run_guardrails(context, settings=settings)
+
+    assert [(r.name, r.allowed, r.reason) for r in compiled] == [(r.name, r.allowed, r.reason) for r in legacy]
+    monkeypatch.setattr(callbacks, "_utc_now", lambda: _at(23))
+    assert not callbacks.enforce_quiet_hours(context, settings=settings).allowed
+    invalid = settings.model_copy(update={"trust_threshold": 80})
+    assert not callbacks.enforce_trust_threshold(context, settings=invalid).allowed
+    assert compile_plan(GuardrailConfig.from_settings(settings)).rule_names == (
+        QUIET_HOURS,
+        TRUST_THRESHOLD,
+        SCOPE_VALIDATION,
+        EVIDENCE_REQUIREMENT,
+    )
+
+
+def test_short_circuit_stops_at_first_block() -> None:
+    plan = compile_plan(GuardrailConfig(trust_threshold=0.8))
+    facts = GuardrailInput(trust_score=0.1, requested_scopes=["chat:write"], enabled_scopes=[])
+
+    full = plan.evaluate(facts, now=_at(12))
+    short = plan.evaluate(facts, now=_at(12), short_circuit=True)
+
+    assert [r.allowed for r in full] == [True, False, False, True]
+    assert [r.name for r in short] == [QUIET_HOURS, TRUST_THRESHOLD]
+
+
+def test_quiet_hours_decides_whole_batch() -> None:
+    plan = compile_plan(GuardrailConfig(quiet_start_hour=22, quiet_end_hour=6))
+    batch = [GuardrailInput(trust_score=0.9), GuardrailInput(trust_score=0.1)]
+
+    quiet = plan.evaluate_many(batch, now=_at(23))
+    assert [[r.name for r in results] for results in quiet] == [[QUIET_HOURS], [QUIET_HOURS]]
+    assert quiet[0][0] is quiet[1][0]
+
+    daytime = plan.evaluate_many(batch, now=_at(12))
+    assert [len(results) for results in daytime] == [4, 2]
+    assert daytime[1][-1].name == TRUST_THRESHOLD and not daytime[1][-1].allowed
+
+
+def test_from_record_overrides_defaults_per_column() -> None:
+    defaults = GuardrailConfig(trust_threshold=0.8, require_evidence=True)
+
+    config = GuardrailConfig.from_record(
+        {
+            "quiet_hours": {"start": "21:30", "end": "07:00"},
+            "trust_threshold": 0.6,
+            "scopes": {"enforce": True, "enabled": ["Chat:Write", ""]},
+            "require_evidence": None,
+        },
+        defaults=defaults,
+    )
+
+    assert (config.quiet_start_hour, config.quiet_end_hour) == (21, 7)
+    assert config.trust_threshold == 0.6
+    assert config.enabled_scopes == frozenset({"chat:write"})
+    assert config.require_evidence is True
+
+    equivalent = GuardrailConfig.from_record(
+        {"quiet_hours": {"start_hour": 21, "end_hour": 7}, "trust_threshold": 0.6, "scopes": {"enabled": ["chat:write"]}},
+        defaults=defaults,
+    )
+    assert compile_plan(config) is compile_plan(equivalent)
+
+
+def test_from_record_keeps_defaults_for_missing_keys_and_bad_thresholds() -> None:
+    defaults = GuardrailConfig(quiet_start_hour=22, quiet_end_hour=6, trust_threshold=0.8)
+
+    zoned = GuardrailConfig.from_record(
+        {"quiet_hours": {"timezone": "America/New_York"}, "trust_threshold": "high"}, defaults=defaults
+    )
+    start_only = GuardrailConfig.from_record({"quiet_hours": {"start": "20:00"}}, defaults=defaults)
+
+    assert (zoned.quiet_start_hour, zoned.quiet_end_hour, zoned.timezone) == (22, 6, "America/New_York")
+    assert zoned.trust_threshold == 0.8
+    assert (start_only.quiet_start_hour, start_only.quiet_end_hour) == (20, 6)
+
+
+def test_engine_caches_plans_until_ttl_or_invalidate() -> None:
+    now = [0.0]
+    source = _Source(GuardrailConfig(trust_threshold=0.5))
+    engine = GuardrailEngine(defaults=GuardrailConfig(), source=source, ttl_seconds=60, clock=lambda: now[0])
+
+    first = engine.plan_for("tenant-a")
+    assert engine.plan_for("tenant-a") is first
+    assert source.calls == 1
+
+    source.config = None
+    engine.invalidate("tenant-a")
+    assert engine.plan_for("tenant-a").config == GuardrailConfig()
+    assert source.calls == 2
+
+    source.config = GuardrailConfig(trust_threshold=0.5)
+    now[0] = 61.0
+    assert engine.plan_for("tenant-a") is first
+    assert source.calls == 3
+
+
+class _FailingSource:
+    def get_config(self, tenant_id: str) -> GuardrailConfig | None:
+        raise RuntimeError("supabase timeout")
+
+
+def test_out_of_range_threshold_blocks_instead_of_raising() -> None:
+    defaults = GuardrailConfig(trust_threshold=0.8)
+    tenant_config = GuardrailConfig.from_record({"trust_threshold": 80}, defaults=defaults)
+    engine = GuardrailEngine(defaults=defaults, source=_Source(tenant_config))
+
+    results = engine.evaluate("tenant-a", GuardrailInput(trust_score=1.0), now=_at(12))
+
+    trust_result = next(r for r in results if r.name == TRUST_THRESHOLD)
+    assert trust_result.allowed is False
+    assert "invalid trust threshold" in (trust_result.reason or "")
+
+
+def test_source_errors_fall_back_to_the_default_plan() -> None:
+    defaults = GuardrailConfig(trust_threshold=0.7)
+    engine = GuardrailEngine(defaults=defaults, source=_FailingSource())
+
+    assert engine.plan_for("tenant-a").config == defaults
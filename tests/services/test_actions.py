@@ -0,0 +1,48 @@
+"""Tests for the actions history projection."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from agent.schemas.envelope import Envelope
+from agent.services import SupabaseActionsService
+from agent.services.outbox import OutboxRecord
+
+
+class _TableRecorder:
+    def __init__(self) -> None:
+        self.calls: list[tuple[dict[str, object], dict[str, object]]] = []
+
+    def upsert(self, payload, **kwargs):
+        self.calls.append((payload, kwargs))
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=[])
+
+
+def test_record_success_keys_rows_on_envelope_creation_time() -> None:
+    table = _TableRecorder()
+    client = SimpleNamespace(table=lambda *_args, **_kwargs: table)
+    created_at = datetime(2026, 3, 31, 23, 59, tzinfo=timezone.utc)
+    envelope = Envelope(
+        envelope_id="env-1",
+        tenant_id="tenant-demo",
+        tool_slug="SLACK__chat.postMessage",
+        arguments={"channel": "#general"},
+        connected_account_id=None,
+        risk="low",
+        external_id="ext-1",
+        created_at=created_at,
+    )
+    service = SupabaseActionsService(client)
+
+    service.record_success(tenant_id="tenant-demo", record=OutboxRecord(envelope=envelope), result=None)
+    service.record_success(tenant_id="tenant-demo", record=OutboxRecord(envelope=envelope), result=None)
+
+    (first, kwargs), (second, _) = table.calls
+    assert kwargs == {"on_conflict": "external_id,created_at"}
+    assert first["created_at"] == second["created_at"] == created_at.isoformat()
+    assert first["tool"] == {"name": "chat.postMessage", "composio_app": "SLACK"}
+    assert first["result"] == {"status": "sent"}
@@ -0,0 +1,138 @@
+"""Tests for the shared multi-worker catalog snapshot."""
+
+from __future__ import annotations
+
+import threading
+
+from agent.services import InMemoryCatalogService, ToolCatalogEntry
+from agent.services.snapshot import CatalogSnapshot, SnapshotCatalogService, write_catalog_snapshot
+
+
+def _entry(slug: str, description: str = "Post a message") -> ToolCatalogEntry:
+    return ToolCatalogEntry(
+        slug=slug,
+        name=slug,
+        description=description,
+        version="1.0",
+        schema={"type": "object", "properties": {"text": {"type": "string"}}},
+        required_scopes=["chat:write"],
+        risk="low",
+    )
+
+
+def test_snapshot_round_trip_keeps_rendered_prompts(tmp_path) -> None:
+    source = InMemoryCatalogService(entries_by_tenant={"tenant-a": [_entry("SLACK__chat.postMessage")]})
+
+    snapshot = write_catalog_snapshot(tmp_path / "catalog.json", source, ["tenant-a"])
+    loaded = snapshot.read()
+
+    assert loaded is not None
+    [entry] = loaded["tenant-a"]
+    assert entry == _entry("SLACK__chat.postMessage")
+    assert entry.cached_prompt == _entry("SLACK__chat.postMessage").prompt_snippet()
+    assert entry.prompt_snippet() is entry.cached_prompt
+
+
+def test_workers_share_snapshot_and_reload_after_sync(tmp_path, clock) -> None:
+    path = tmp_path / "catalog.json"
+    source = InMemoryCatalogService(entries_by_tenant={"tenant-a": [_entry("SLACK__chat.postMessage")]})
+    write_catalog_snapshot(path, source, ["tenant-a"])
+
+    fallback = InMemoryCatalogService(entries_by_tenant={"tenant-b": [_entry("GMAIL__drafts.create")]})
+    worker_one = SnapshotCatalogService(CatalogSnapshot(path), source=fallback, refresh_interval=5, clock=clock.monotonic)
+    worker_two = SnapshotCatalogService(CatalogSnapshot(path), source=fallback, refresh_interval=5, clock=clock.monotonic)
+
+    assert [e.slug for e in worker_two.list_tools("tenant-a")] == ["SLACK__chat.postMessage"]
+    assert [e.slug for e in worker_two.list_tools("tenant-b")] == ["GMAIL__drafts.create"]
+
+    worker_one.sync_entries("tenant-a", [_entry("SLACK__chat.postMessage", "v2"), _entry("SLACK__reactions.add")])
+
+    # Within the refresh window the second worker keeps serving its current view.
+    assert len(worker_two.list_tools("tenant-a")) == 1
+
+    clock.advance(6)
+    entries = worker_two.list_tools("tenant-a")
+    assert [e.slug for e in entries] == ["SLACK__chat.postMessage", "SLACK__reactions.add"]
+    assert entries[0].description == "v2"
+    assert worker_two.get_tool("tenant-a", "slack__reactions.add") is not None
+    assert fallback.list_tools("tenant-a")[0].description == "v2"
+
+
+def test_missing_or_corrupt_snapshot_falls_back_to_source(tmp_path) -> None:
+    path = tmp_path / "catalog.json"
+    source = InMemoryCatalogService(entries_by_tenant={"tenant-a": [_entry("SLACK__chat.postMessage")]})
+    service = SnapshotCatalogService(CatalogSnapshot(path), source=source, refresh_interval=0)
+
+    assert [e.slug for e in service.list_tools("tenant-a")] == ["SLACK__chat.postMessage"]
+
+    path.write_bytes(b"{not json")
+    assert service.reload(force=True)
+    assert [e.slug for e in service.list_tools("tenant-a")] == ["SLACK__chat.postMessage"]
+
+
+class _CachingSource(InMemoryCatalogService):
+    """Source that, like the Composio catalog, serves a cached view until invalidated."""
+
+    def __init__(self, entries_by_tenant) -> None:
+        super().__init__(entries_by_tenant=entries_by_tenant)
+        self.invalidated: list[str | None] = []
+
+    def invalidate(self, tenant_id: str | None = None) -> None:
+        self.invalidated.append(tenant_id)
+
+
+def test_invalidate_republishes_tenant_from_source(tmp_path, clock) -> None:
+    path = tmp_path / "catalog.json"
+    source = _CachingSource({"tenant-a": [_entry("SLACK__chat.postMessage")], "tenant-b": [_entry("GMAIL__drafts.create")]})
+    write_catalog_snapshot(path, source, ["tenant-a", "tenant-b"])
+    worker_one = SnapshotCatalogService(CatalogSnapshot(path), source=source, refresh_interval=5, clock=clock.monotonic)
+    worker_two = SnapshotCatalogService(CatalogSnapshot(path), source=source, refresh_interval=5, clock=clock.monotonic)
+    assert len(worker_two.list_tools("tenant-a")) == 1
+
+    # A change made outside the service (e.g. in the database) only reaches the source.
+    source.sync_entries("tenant-a", [_entry("SLACK__chat.postMessage"), _entry("SLACK__reactions.add")])
+    assert len(worker_one.list_tools("tenant-a")) == 1
+
+    worker_one.invalidate("tenant-a")
+
+    assert source.invalidated == ["tenant-a"]
+    assert len(worker_one.list_tools("tenant-a")) == 2
+    clock.advance(6)
+    assert [e.slug for e in worker_two.list_tools("tenant-a")] == ["SLACK__chat.postMessage", "SLACK__reactions.add"]
+    assert [e.slug for e in worker_two.list_tools("tenant-b")] == ["GMAIL__drafts.create"]
+
+
+def test_resync_invalidation_republishes_every_snapshot_tenant(tmp_path) -> None:
+    path = tmp_path / "catalog.json"
+    source = _CachingSource({"tenant-a": [_entry("SLACK__chat.postMessage")], "tenant-b": [_entry("GMAIL__drafts.create")]})
+    write_catalog_snapshot(path, source, ["tenant-a", "tenant-b"])
+    service = SnapshotCatalogService(CatalogSnapshot(path), source=source, refresh_interval=0)
+
+    source.sync_entries("tenant-b", [_entry("GMAIL__drafts.create", "v2")])
+    service.invalidate()
+
+    assert source.invalidated == [None]
+    assert service.get_tool("tenant-b", "GMAIL__drafts.create").description == "v2"
+    assert set(CatalogSnapshot(path).read()) == {"tenant-a", "tenant-b"}
+
+
+def test_concurrent_tenant_updates_keep_every_tenant(tmp_path) -> None:
+    snapshot = CatalogSnapshot(tmp_path / "catalog.json")
+    snapshot.write({})
+    tenants = [f"tenant-{index}" for index in range(8)]
+
+    def _update(tenant_id: str) -> None:
+        # Each thread opens its own snapshot, as a sibling worker process would.
+        writer = CatalogSnapshot(tmp_path / "catalog.json")
+        for version in range(5):
+            writer.update_tenant(tenant_id, [_entry("SLACK__chat.postMessage", f"v{version}")])
+
+    threads = [threading.Thread(target=_update, args=(tenant_id,)) for tenant_id in tenants]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    loaded = snapshot.read()
+    assert loaded is not None and sorted(loaded) == sorted(tenants)
+    assert all(entries[0].description == "v4" for entries in loaded.values())
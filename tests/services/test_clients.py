@@ -0,0 +1,72 @@
+"""Tests for the shared, pooled network clients."""
+
+from __future__ import annotations
+
+import pytest
+
+from agent.services import AppSettings, get_http_client, reset_client_caches
+from agent.services import clients as clients_module
+from agent.services import supabase as supabase_module
+
+
+@pytest.fixture(autouse=True)
+def _reset_clients():
+    reset_client_caches()
+    supabase_module.reset_supabase_client_cache()
+    yield
+    reset_client_caches()
+    supabase_module.reset_supabase_client_cache()
+
+
+def test_http_client_is_pooled_and_reused() -> None:
+    settings = AppSettings().model_copy(
+        update={"http_max_connections": 7, "http_max_keepalive_connections": 3, "http_timeout_seconds": 12.0}
+    )
+
+    client = get_http_client(settings)
+
+    assert get_http_client(settings.model_copy()) is client
+    pool = client._transport._pool  # type: ignore[attr-defined]
+    assert pool._max_connections == 7
+    assert pool._max_keepalive_connections == 3
+    assert client.timeout.read == 12.0
+    assert pool._http2 == clients_module.http2_available()
+
+
+def test_http2_can_be_disabled_and_cache_reset_closes_clients() -> None:
+    settings = AppSettings().model_copy(update={"http2_enabled": False})
+
+    client = get_http_client(settings)
+    assert client._transport._pool._http2 is False  # type: ignore[attr-defined]
+
+    reset_client_caches()
+    assert client.is_closed
+    assert get_http_client(settings) is not client
+
+
+def test_http2_falls_back_to_http11_without_h2(monkeypatch) -> None:
+    monkeypatch.setattr(clients_module.importlib.util, "find_spec", lambda name: None)
+
+    client = get_http_client(AppSettings().model_copy(update={"http2_enabled": True}))
+
+    assert client._transport._pool._http2 is False  # type: ignore[attr-defined]
+
+
+def test_supabase_clients_share_the_pooled_transport(monkeypatch) -> None:
+    created: list[tuple[str, str, object]] = []
+
+    def _fake_create_client(url: str, key: str, options=None):
+        created.append((url, key, options))
+        return object()
+
+    monkeypatch.setattr(supabase_module, "create_client", _fake_create_client)
+    settings = AppSettings().model_copy(
+        update={"supabase_url": "https://example.supabase.co", "supabase_service_key": "service-key"}
+    )
+
+    first = supabase_module.get_supabase_client(settings)
+    assert supabase_module.get_supabase_client(settings.model_copy()) is first
+    assert len(created) == 1
+
+    options = created[0][2]
+    assert getattr(options, "httpx_client", None) is get_http_client(settings)
@@ -0,0 +1,119 @@
+"""Tests for per-tenant guardrail configuration loading and caching."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from agent.guardrails.engine import QUIET_HOURS, GuardrailConfig, GuardrailEngine, GuardrailInput
+from agent.services import InMemoryGuardrailConfigService, SupabaseGuardrailConfigService
+
+
+class _GuardrailsTable:
+    def __init__(self, rows: dict[str, dict[str, object]]) -> None:
+        self.rows = rows
+        self.reads = 0
+        self._tenant_id: str | None = None
+
+    def select(self, columns: str):
+        return self
+
+    def eq(self, column: str, value: str):
+        self._tenant_id = value
+        return self
+
+    def limit(self, value: int):
+        return self
+
+    def execute(self):
+        self.reads += 1
+        row = self.rows.get(self._tenant_id or "")
+        return SimpleNamespace(data=[row] if row else [])
+
+
+class _Client:
+    def __init__(self, table: _GuardrailsTable) -> None:
+        self._table = table
+
+    def table(self, name: str, schema: str | None = None):
+        assert name == "guardrails"
+        return self._table
+
+
+def _service(table: _GuardrailsTable, clock) -> SupabaseGuardrailConfigService:
+    return SupabaseGuardrailConfigService(
+        _Client(table),
+        defaults=GuardrailConfig(trust_threshold=0.8),
+        ttl_seconds=60,
+        clock=clock,
+    )
+
+
+def test_supabase_service_parses_rows_and_caches_per_tenant() -> None:
+    now = [0.0]
+    table = _GuardrailsTable(
+        {
+            "tenant-a": {
+                "quiet_hours": {"start": 22, "end": 6, "timezone": "America/New_York"},
+                "trust_threshold": 0.6,
+                "scopes": {},
+                "require_evidence": False,
+            }
+        }
+    )
+    service = _service(table, lambda: now[0])
+
+    config = service.get_config("tenant-a")
+    assert config == GuardrailConfig(
+        quiet_start_hour=22,
+        quiet_end_hour=6,
+        timezone="America/New_York",
+        trust_threshold=0.6,
+        require_evidence=False,
+    )
+    assert service.get_config("tenant-b") is None
+    assert service.get_config("tenant-a") is config
+    assert service.get_config("tenant-b") is None
+    assert table.reads == 2
+
+    now[0] = 61.0
+    service.get_config("tenant-a")
+    assert table.reads == 3
+
+
+def test_engine_invalidation_reloads_changed_row() -> None:
+    table = _GuardrailsTable({"tenant-a": {"trust_threshold": 0.6}})
+    service = _service(table, lambda: 0.0)
+    engine = GuardrailEngine(defaults=GuardrailConfig(), source=service, ttl_seconds=60, clock=lambda: 0.0)
+
+    assert engine.plan_for("tenant-a").config.trust_threshold == 0.6
+
+    table.rows["tenant-a"] = {"trust_threshold": 0.9}
+    assert engine.plan_for("tenant-a").config.trust_threshold == 0.6
+
+    engine.invalidate("tenant-a")
+    assert engine.plan_for("tenant-a").config.trust_threshold == 0.9
+    assert table.reads == 2
+
+
+def test_quiet_hours_follow_tenant_timezone() -> None:
+    service = InMemoryGuardrailConfigService(
+        configs_by_tenant={
+            "tenant-ny": GuardrailConfig(quiet_start_hour=22, quiet_end_hour=6, timezone="America/New_York"),
+            "tenant-bad": GuardrailConfig(quiet_start_hour=22, quiet_end_hour=6, timezone="Mars/Olympus"),
+        }
+    )
+    engine = GuardrailEngine(defaults=GuardrailConfig(), source=service)
+    # 03:00 UTC is 22:00 the previous evening in New York (EST).
+    moment = datetime(2024, 1, 2, 3, 0, tzinfo=timezone.utc)
+
+    [quiet] = engine.evaluate("tenant-ny", GuardrailInput(), now=moment, short_circuit=True)
+    assert quiet.name == QUIET_HOURS and not quiet.allowed
+    assert quiet.metadata["window"] == "22:00-06:00 America/New_York (overnight)"
+    assert quiet.metadata["currentTime"] == "22:00:00 America/New_York"
+
+    [misconfigured, *_] = engine.evaluate("tenant-bad", GuardrailInput(), now=moment)
+    assert misconfigured.allowed and misconfigured.reason == "invalid quiet hours timezone; allowing"
+
+    [utc, *_] = engine.evaluate("tenant-other", GuardrailInput(), now=moment)
+    assert utc.metadata == {"configured": False}
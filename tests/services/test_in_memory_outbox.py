@@ -0,0 +1,178 @@
+"""Behavioural tests for the indexed in-memory outbox."""
+
+from __future__ import annotations
+
+import threading
+from datetime import timedelta
+
+from agent.schemas.envelope import Envelope
+import pytest
+
+from agent.services.outbox import InMemoryOutboxService, OutboxEnqueueError, OutboxStatus
+
+
+def _envelope(envelope_id: str, tenant_id: str = "tenant-demo") -> Envelope:
+    return Envelope(
+        envelope_id=envelope_id,
+        tenant_id=tenant_id,
+        tool_slug="SLACK__chat.postMessage",
+        arguments={"channel": "#ops", "text": envelope_id},
+        connected_account_id=None,
+        risk="low",
+        external_id=f"ext-{envelope_id}",
+    )
+
+
+def test_deferred_envelopes_wait_for_next_run_at(clock) -> None:
+    outbox = InMemoryOutboxService(clock=clock)
+    outbox.enqueue(_envelope("env-1"))
+    outbox.enqueue(_envelope("env-2"))
+
+    outbox.defer("env-1", retry_in=30)
+
+    assert [r.envelope.envelope_id for r in outbox.list_pending()] == ["env-2"]
+
+    clock.advance(31)
+    assert [r.envelope.envelope_id for r in outbox.list_pending()] == ["env-2", "env-1"]
+
+
+def test_pending_and_dlq_are_indexed_per_tenant() -> None:
+    outbox = InMemoryOutboxService()
+    outbox.enqueue(_envelope("a-1", tenant_id="tenant-a"))
+    outbox.enqueue(_envelope("b-1", tenant_id="tenant-b"))
+    outbox.enqueue(_envelope("b-2", tenant_id="tenant-b"))
+    outbox.mark_failure("b-2", error="boom", move_to_dlq=True)
+    outbox.mark_in_progress("a-1")
+
+    assert outbox.list_pending(tenant_id="tenant-a") == ()
+    assert [r.envelope.envelope_id for r in outbox.list_pending(tenant_id="tenant-b")] == ["b-1"]
+    assert [r.envelope.envelope_id for r in outbox.list_dlq(tenant_id="tenant-b")] == ["b-2"]
+    assert outbox.list_dlq(tenant_id="tenant-a") == ()
+
+    outbox.requeue_from_dlq("b-2")
+    assert outbox.list_dlq() == ()
+    assert [r.envelope.envelope_id for r in outbox.list_pending(tenant_id="tenant-b")] == ["b-1", "b-2"]
+
+
+def test_terminal_records_are_compacted_by_count_and_age(clock) -> None:
+    outbox = InMemoryOutboxService(
+        clock=clock,
+        terminal_retention=timedelta(minutes=5),
+        max_terminal_records=2,
+    )
+    for idx in range(4):
+        outbox.enqueue(_envelope(f"env-{idx}"))
+        outbox.mark_success(f"env-{idx}", result={"ok": True})
+        clock.advance(1)
+
+    assert outbox.get("env-0") is None
+    assert outbox.get("env-1") is None
+    assert outbox.get("env-3") is not None
+
+    clock.advance(600)
+    assert outbox.compact() == 2
+    assert len(outbox) == 0
+
+
+def test_compacted_external_ids_still_deduplicate() -> None:
+    outbox = InMemoryOutboxService(max_terminal_records=0)
+    outbox.enqueue(_envelope("env-1"))
+    outbox.mark_success("env-1", result={"ok": True})
+
+    assert outbox.get("env-1") is None
+    retried = outbox.enqueue(_envelope("env-1"))
+
+    assert (retried.envelope.envelope_id, retried.status) == ("env-1", OutboxStatus.SUCCESS)
+    assert retried.envelope.arguments == {}
+    assert outbox.list_pending() == ()
+
+
+def test_external_ids_are_owned_by_one_tenant() -> None:
+    outbox = InMemoryOutboxService()
+    outbox.enqueue(_envelope("env-1", tenant_id="tenant-a"))
+
+    with pytest.raises(OutboxEnqueueError):
+        outbox.enqueue(_envelope("env-1", tenant_id="tenant-b"))
+    with pytest.raises(OutboxEnqueueError):
+        outbox.enqueue_many([_envelope("env-1", tenant_id="tenant-b")])
+    assert [r.tenant_id for r in outbox.list_pending()] == ["tenant-a"]
+
+
+def test_dlq_records_are_never_compacted() -> None:
+    outbox = InMemoryOutboxService(max_terminal_records=0)
+    outbox.enqueue(_envelope("env-dlq"))
+    outbox.mark_failure("env-dlq", error="boom", move_to_dlq=True)
+
+    assert outbox.compact() == 0
+    assert outbox.get("env-dlq") is not None
+
+
+def test_concurrent_enqueue_and_completion_keeps_indexes_consistent() -> None:
+    outbox = InMemoryOutboxService()
+
+    def _producer(worker_id: int) -> None:
+        for idx in range(200):
+            envelope_id = f"w{worker_id}-{idx}"
+            outbox.enqueue(_envelope(envelope_id, tenant_id=f"tenant-{worker_id % 3}"))
+            if idx % 2 == 0:
+                outbox.mark_in_progress(envelope_id)
+                outbox.mark_success(envelope_id)
+
+    threads = [threading.Thread(target=_producer, args=(worker_id,)) for worker_id in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    pending = outbox.list_pending(limit=10_000)
+    assert len(pending) == 600
+    assert all(record.status == OutboxStatus.PENDING for record in pending)
+
+
+def test_enqueue_many_skips_known_external_ids() -> None:
+    outbox = InMemoryOutboxService()
+    first = outbox.enqueue(_envelope("env-1"))
+
+    duplicate = Envelope(
+        envelope_id="env-1-replay",
+        tenant_id="tenant-demo",
+        tool_slug="SLACK__chat.postMessage",
+        arguments={"channel": "#ops", "text": "again"},
+        connected_account_id=None,
+        risk="low",
+        external_id="ext-env-1",
+    )
+    records = outbox.enqueue_many([duplicate, _envelope("env-2")])
+
+    assert records[0] is first
+    assert [r.envelope.envelope_id for r in outbox.list_pending()] == ["env-1", "env-2"]
+
+
+def test_summaries_and_counts_follow_status_indexes(clock) -> None:
+    outbox = InMemoryOutboxService(clock=clock)
+    outbox.enqueue(_envelope("a-1", tenant_id="tenant-a"), metadata={"title": "Post standup"})
+    outbox.enqueue(_envelope("a-2", tenant_id="tenant-a"))
+    outbox.enqueue(_envelope("b-1", tenant_id="tenant-b"))
+    outbox.defer("a-2", retry_in=60)
+    outbox.mark_failure("b-1", error="boom", move_to_dlq=True)
+
+    summaries = outbox.list_summaries(status=OutboxStatus.PENDING, tenant_id="tenant-a")
+
+    assert [summary.envelope_id for summary in summaries] == ["a-1", "a-2"]
+    assert summaries[0].to_shared_state() == outbox.get("a-1").to_shared_state()
+    assert summaries[0].title == "Post standup"
+    assert outbox.count(status=OutboxStatus.PENDING) == 2
+    assert outbox.count(status=OutboxStatus.DLQ, tenant_id="tenant-b") == 1
+    assert outbox.count(status=OutboxStatus.DLQ, tenant_id="tenant-a") == 0
+
+
+def test_requeue_many_from_dlq_skips_unknown_ids() -> None:
+    outbox = InMemoryOutboxService()
+    outbox.enqueue(_envelope("env-1"))
+    outbox.enqueue(_envelope("env-2"))
+    outbox.mark_failure("env-1", error="boom", move_to_dlq=True)
+    outbox.mark_failure("env-2", error="boom", move_to_dlq=True)
+
+    assert outbox.requeue_many_from_dlq(["env-1", "env-2", "missing"]) == 2
+    assert outbox.count(status=OutboxStatus.DLQ) == 0
+    assert outbox.count(status=OutboxStatus.PENDING) == 2
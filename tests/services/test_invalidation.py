@@ -0,0 +1,135 @@
+"""Tests for the change-feed cache invalidation bus."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from agent.services import (
+    AppSettings,
+    ChangeEvent,
+    ChangeLogPoller,
+    ComposioCatalogService,
+    InvalidationBus,
+    build_change_feed,
+    register_cache_handlers,
+)
+from agent.services import invalidation as invalidation_module
+from agent.services.invalidation import RESYNC
+
+
+class _Evictions:
+    def __init__(self) -> None:
+        self.calls: list[tuple] = []
+
+    def invalidate(self, *args) -> None:
+        self.calls.append(args)
+
+
+def test_handlers_evict_precisely_and_resync_clears_everything() -> None:
+    policy, guardrails, objectives = _Evictions(), _Evictions(), object()
+    bus = register_cache_handlers(InvalidationBus(), policy=policy, guardrails=guardrails, objectives=objectives)
+
+    assert bus.publish(ChangeEvent(source="tool_policies", tenant_id="t-1", key="SLACK.chat")) == 1
+    assert bus.publish(ChangeEvent(source="guardrails", tenant_id="t-2")) == 1
+    assert bus.publish(ChangeEvent(source="objectives", tenant_id="t-2")) == 0
+
+    assert policy.calls == [("t-1", "SLACK.chat")]
+    assert guardrails.calls == [("t-2",)]
+
+    bus.publish(ChangeEvent(source=RESYNC))
+
+    assert policy.calls[-1] == (None, None)
+    assert guardrails.calls[-1] == (None,)
+
+
+def test_composio_catalog_cache_is_evicted_per_tenant() -> None:
+    fetched: list[str] = []
+
+    def get(*, user_id, toolkits):
+        fetched.append(user_id)
+        return []
+
+    catalog = ComposioCatalogService(api_key="test", client=SimpleNamespace(tools=SimpleNamespace(get=get)))
+    bus = register_cache_handlers(InvalidationBus(), catalog=catalog)
+
+    catalog.list_tools("t-1")
+    catalog.list_tools("t-2")
+    bus.publish(ChangeEvent(source="tool_catalog", tenant_id="t-1", key="GMAIL.send"))
+    catalog.list_tools("t-1")
+    catalog.list_tools("t-2")
+
+    assert fetched == ["t-1", "t-2", "t-1"]
+
+
+class _ChangeLogTable:
+    def __init__(self, rows: list[dict[str, object]]) -> None:
+        self.rows = rows
+        self._after = 0
+        self._desc = False
+        self._limit = len(rows)
+
+    def select(self, columns: str):
+        self._after, self._desc = 0, False
+        return self
+
+    def gt(self, column: str, value: int):
+        self._after = value
+        return self
+
+    def order(self, column: str, desc: bool = False):
+        self._desc = desc
+        return self
+
+    def limit(self, value: int):
+        self._limit = value
+        return self
+
+    def execute(self):
+        rows = sorted((row for row in self.rows if row["id"] > self._after), key=lambda row: row["id"])
+        if self._desc:
+            rows.reverse()
+        return SimpleNamespace(data=rows[: self._limit])
+
+
+def test_poller_skips_history_and_publishes_new_rows_in_order() -> None:
+    table = _ChangeLogTable([{"id": 7, "source": "guardrails", "tenant_id": "t-1", "key": None, "op": "UPDATE"}])
+    client = SimpleNamespace(table=lambda name, schema=None: table)
+    received: list[ChangeEvent] = []
+    bus = InvalidationBus()
+    bus.subscribe("guardrails", received.append)
+    poller = ChangeLogPoller(client, bus, batch_size=2)
+
+    assert poller.poll_once() == 0
+    assert [event.source for event in received] == [RESYNC]
+
+    table.rows += [
+        {"id": 9, "source": "guardrails", "tenant_id": "t-2", "key": None, "op": "DELETE"},
+        {"id": 8, "source": "tool_policies", "tenant_id": "t-1", "key": "SLACK.chat", "op": "INSERT"},
+        {"id": 10, "source": "guardrails", "tenant_id": "t-3", "key": None, "op": "INSERT"},
+    ]
+
+    assert poller.poll_once() == 2
+    assert poller.poll_once() == 1
+    assert poller.poll_once() == 0
+    assert [(event.id, event.tenant_id) for event in received[1:]] == [(9, "t-2"), (10, "t-3")]
+
+
+def test_build_change_feed_prefers_listen_and_respects_disable(monkeypatch) -> None:
+    monkeypatch.setattr(invalidation_module, "listen_available", lambda: True)
+    client = SimpleNamespace(table=lambda name, schema=None: None)
+    bus = InvalidationBus()
+
+    assert build_change_feed(AppSettings(), bus) is None
+    assert build_change_feed(AppSettings(change_feed_poll_seconds=0), bus, client=client) is None
+    assert isinstance(build_change_feed(AppSettings(), bus, client=client), ChangeLogPoller)
+    listener = build_change_feed(AppSettings(change_feed_database_url="postgresql://localhost/db"), bus)
+    assert type(listener).__name__ == "PgNotifyListener"
+
+
+def test_build_change_feed_polls_when_psycopg_is_missing(monkeypatch) -> None:
+    monkeypatch.setattr(invalidation_module, "listen_available", lambda: False)
+    client = SimpleNamespace(table=lambda name, schema=None: None)
+    settings = AppSettings(change_feed_database_url="postgresql://localhost/db")
+
+    assert isinstance(build_change_feed(settings, InvalidationBus(), client=client), ChangeLogPoller)
+    assert build_change_feed(settings, InvalidationBus()) is None
@@ -0,0 +1,207 @@
+"""Tests for the content-addressed payload store and outbox offloading."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from agent.schemas.envelope import Envelope
+from agent.services import (
+    AppSettings,
+    InMemoryOutboxService,
+    LocalPayloadStore,
+    PayloadIntegrityError,
+    PayloadOffloader,
+    PayloadStoreError,
+)
+from agent.services.outbox import OutboxRecord, OutboxStatus, SupabaseOutboxService
+from agent.services.payloads import PAYLOAD_REF_KEY, build_payload_offloader, is_payload_ref
+from worker.circuit_breaker import CircuitBreakerRegistry
+from worker.outbox import OutboxWorker
+
+
+def _large_arguments() -> dict[str, object]:
+    return {"to": "user@example.com", "attachment": "A" * 4096}
+
+
+def test_small_payloads_stay_inline(tmp_path) -> None:
+    offloader = PayloadOffloader(LocalPayloadStore(tmp_path), threshold_bytes=1024)
+    payload = {"to": "user@example.com"}
+
+    assert offloader.offload(payload) is payload
+    assert not any(tmp_path.iterdir())
+
+
+def test_large_payloads_are_content_addressed(tmp_path) -> None:
+    offloader = PayloadOffloader(LocalPayloadStore(tmp_path), threshold_bytes=1024)
+
+    first = offloader.offload(_large_arguments())
+    second = offloader.offload(_large_arguments())
+
+    assert is_payload_ref(first)
+    assert first == second
+    assert offloader.offload(first) is first
+    assert len(list(tmp_path.rglob("*.json"))) == 1
+    assert offloader.resolve(first) == _large_arguments()
+
+
+def test_resolve_detects_tampered_payloads(tmp_path) -> None:
+    offloader = PayloadOffloader(LocalPayloadStore(tmp_path), threshold_bytes=1024)
+    reference = offloader.offload(_large_arguments())
+    (stored,) = tmp_path.rglob("*.json")
+    stored.write_bytes(b'{"to": "attacker@example.com"}')
+
+    with pytest.raises(PayloadIntegrityError):
+        offloader.resolve(reference)
+
+    with pytest.raises(PayloadStoreError) as missing:
+        offloader.resolve({PAYLOAD_REF_KEY: "sha256:" + "0" * 64})
+    assert not isinstance(missing.value, PayloadIntegrityError)
+
+
+def test_build_payload_offloader_uses_configured_backend(tmp_path) -> None:
+    assert build_payload_offloader(AppSettings()) is None
+
+    settings = AppSettings(payload_store_path=str(tmp_path), payload_offload_threshold_bytes=1024)
+    offloader = build_payload_offloader(settings)
+
+    assert offloader is not None
+    assert is_payload_ref(offloader.offload(_large_arguments()))
+
+
+class _UpsertRecorder:
+    def __init__(self) -> None:
+        self.rows: list[dict[str, object]] = []
+
+    def upsert(self, payload, **_: object):
+        self.rows.append(payload)
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=list(self.rows))
+
+
+class _OffloadingOutbox(SupabaseOutboxService):
+    def __init__(self, offloader: PayloadOffloader, record: OutboxRecord | None = None) -> None:
+        super().__init__(object(), payloads=offloader)
+        self.table = _UpsertRecorder()
+        self.updated: list[dict[str, object]] = []
+        self._record = record
+
+    def get(self, envelope_id: str) -> OutboxRecord | None:  # type: ignore[override]
+        return self._record
+
+    def _table_ref(self):  # type: ignore[override]
+        return self.table
+
+    def _update(self, envelope_id: str, payload) -> None:  # type: ignore[override]
+        self.updated.append(dict(payload))
+
+
+def test_supabase_outbox_offloads_arguments_and_results(tmp_path) -> None:
+    offloader = PayloadOffloader(LocalPayloadStore(tmp_path), threshold_bytes=1024)
+    envelope = Envelope.from_payload(
+        payload={"tool_slug": "GMAIL__drafts.create", "arguments": _large_arguments(), "external_id": "ext-1"},
+        tenant_id="tenant-demo",
+    )
+    service = _OffloadingOutbox(offloader, OutboxRecord(envelope=envelope, metadata={"title": "Draft"}))
+
+    record = service.enqueue(envelope)
+    service.mark_success(envelope.envelope_id, result={"data": "B" * 4096})
+
+    assert is_payload_ref(service.table.rows[0]["arguments"])
+    assert is_payload_ref(record.envelope.arguments)
+    metadata = service.updated[-1]["metadata"]
+    assert metadata["title"] == "Draft"
+    assert offloader.resolve(metadata["result"]) == {"data": "B" * 4096}
+
+
+def test_record_result_reads_inline_and_offloaded_results(tmp_path) -> None:
+    offloader = PayloadOffloader(LocalPayloadStore(tmp_path), threshold_bytes=1024)
+    envelope = Envelope.from_payload(
+        payload={"tool_slug": "GMAIL__drafts.create", "arguments": {}, "external_id": "ext-1"},
+        tenant_id="tenant-demo",
+    )
+    service = _OffloadingOutbox(offloader, OutboxRecord(envelope=envelope))
+
+    service.mark_success(envelope.envelope_id, result={"id": "draft-1"})
+    service.mark_success(envelope.envelope_id, result={"data": "B" * 4096})
+    inline, offloaded = (OutboxRecord(envelope=envelope, metadata=row["metadata"]) for row in service.updated)
+
+    assert inline.result() == inline.result(offloader) == {"id": "draft-1"}
+    assert offloaded.result(offloader) == {"data": "B" * 4096}
+    with pytest.raises(PayloadStoreError):
+        offloaded.result()
+    assert OutboxRecord(envelope=envelope).result() == {}
+
+
+def test_worker_resolves_offloaded_arguments(tmp_path) -> None:
+    offloader = PayloadOffloader(LocalPayloadStore(tmp_path), threshold_bytes=1024)
+    settings = AppSettings()
+    outbox = InMemoryOutboxService()
+    envelope = Envelope.from_record(
+        {
+            "id": "env-1",
+            "tenant_id": settings.tenant_id,
+            "tool_slug": "GMAIL__drafts.create",
+            "arguments": offloader.offload(_large_arguments()),
+            "external_id": "ext-1",
+        }
+    )
+    outbox.enqueue(envelope)
+    executed: list[dict[str, object]] = []
+    composio = SimpleNamespace(tools=SimpleNamespace(execute=lambda **kwargs: executed.append(kwargs) or {}))
+    audit = SimpleNamespace(log_envelope=lambda **_: None)
+
+    worker = OutboxWorker(
+        settings=settings,
+        outbox_service=outbox,
+        audit_logger=audit,
+        composio_client=composio,
+        payloads=offloader,
+    )
+
+    assert worker.process_once() == 1
+    assert executed[0]["arguments"] == _large_arguments()
+    assert outbox.get("env-1").status == OutboxStatus.SUCCESS
+
+
+def test_unavailable_payloads_do_not_trip_the_breaker_or_spend_attempts(tmp_path) -> None:
+    offloader = PayloadOffloader(LocalPayloadStore(tmp_path), threshold_bytes=1024)
+    settings = AppSettings()
+    outbox = InMemoryOutboxService()
+    arguments = {"missing": {PAYLOAD_REF_KEY: "sha256:" + "0" * 64}, "corrupt": offloader.offload(_large_arguments())}
+    (stored,) = tmp_path.rglob("*.json")
+    stored.write_bytes(b'{"to": "attacker@example.com"}')
+    for envelope_id, reference in arguments.items():
+        outbox.enqueue(
+            Envelope.from_record(
+                {
+                    "id": envelope_id,
+                    "tenant_id": settings.tenant_id,
+                    "tool_slug": "GMAIL__drafts.create",
+                    "arguments": reference,
+                    "external_id": f"ext-{envelope_id}",
+                }
+            )
+        )
+    executed: list[dict[str, object]] = []
+    composio = SimpleNamespace(tools=SimpleNamespace(execute=lambda **kwargs: executed.append(kwargs) or {}))
+    breakers = CircuitBreakerRegistry(failure_threshold=1)
+
+    worker = OutboxWorker(
+        settings=settings,
+        outbox_service=outbox,
+        audit_logger=SimpleNamespace(log_envelope=lambda **_: None),
+        composio_client=composio,
+        payloads=offloader,
+        circuit_breakers=breakers,
+    )
+
+    assert worker.process_once() == 2
+    assert executed == []
+    assert breakers.allow("GMAIL__drafts.create")
+    missing, corrupt = outbox.get("missing"), outbox.get("corrupt")
+    assert missing.status == OutboxStatus.PENDING and missing.attempts == 0 and missing.next_run_at is not None
+    assert corrupt.status == OutboxStatus.DLQ
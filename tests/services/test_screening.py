@@ -0,0 +1,182 @@
+"""Tests for batch pre-screening of planned envelopes."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from agent.guardrails.engine import GuardrailConfig, GuardrailEngine
+from agent.services import EffectiveToolPolicy, EnvelopeScreener, InMemoryCatalogService, PolicyService, ToolCatalogEntry
+from agent.services.policy import SupabasePolicyService
+
+TENANT = "tenant-a"
+NOON = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _entry(slug: str, scopes: list[str] | None = None) -> ToolCatalogEntry:
+    return ToolCatalogEntry(
+        slug=slug,
+        name=slug,
+        description="",
+        version="1.0",
+        schema={"type": "object", "properties": {"to": {"type": "string"}}, "required": ["to"]},
+        required_scopes=scopes or [],
+        risk="medium",
+    )
+
+
+class _CountingCatalog(InMemoryCatalogService):
+    def __init__(self) -> None:
+        super().__init__(
+            entries_by_tenant={
+                TENANT: [
+                    _entry("GMAIL__drafts.create", ["gmail.compose"]),
+                    _entry("SLACK__chat.postMessage", ["chat:write"]),
+                ]
+            }
+        )
+        self.list_calls = 0
+
+    def list_tools(self, tenant_id: str):
+        self.list_calls += 1
+        return super().list_tools(tenant_id)
+
+
+class _Policies(PolicyService):
+    def __init__(self, policies: dict[str, EffectiveToolPolicy]) -> None:
+        self.policies = policies
+        self.batches: list[list[str]] = []
+
+    def get_effective_policies(self, *, tenant_id: str, tool_slugs):
+        slugs = list(tool_slugs)
+        self.batches.append(slugs)
+        return {slug: self.policies[slug] for slug in slugs if slug in self.policies}
+
+
+def _screener(catalog, policies=None, config: GuardrailConfig | None = None) -> EnvelopeScreener:
+    return EnvelopeScreener(
+        catalog_service=catalog,
+        guardrail_engine=GuardrailEngine(defaults=config or GuardrailConfig()),
+        policy_service=policies,
+        rate_horizon_seconds=10,
+    )
+
+
+def _payload(slug: str, **arguments) -> dict:
+    return {"tool_slug": slug, "arguments": arguments or {"to": "a@example.com"}}
+
+
+def test_batch_uses_one_catalog_and_policy_lookup_with_per_envelope_verdicts() -> None:
+    catalog = _CountingCatalog()
+    policies = _Policies(
+        {
+            "GMAIL__drafts.create": EffectiveToolPolicy(write_allowed=False, rate_bucket=None),
+            "SLACK__chat.postMessage": EffectiveToolPolicy(write_allowed=True, rate_bucket="slack.minute"),
+        }
+    )
+    payloads = [
+        _payload("SLACK__chat.postMessage"),
+        _payload("GMAIL__drafts.create"),
+        _payload("SLACK__chat.postMessage", subject="missing recipient"),
+        _payload("UNKNOWN__tool"),
+        *[_payload("slack__chat.postMessage") for _ in range(3)],
+    ]
+
+    verdicts = _screener(catalog, policies).screen(TENANT, payloads, now=NOON)
+
+    assert catalog.list_calls == 1
+    assert len(policies.batches) == 1
+    assert [list(verdict.reasons) for verdict in verdicts] == [
+        [],
+        ["write_allowed"],
+        ["schema"],
+        ["catalog"],
+        [],
+        [],
+        ["rate_bucket"],
+    ]
+    # slack.minute has a 5s gap, so a 10s horizon leaves room for three sends.
+    assert "headroom for 3" in verdicts[-1].message()
+    assert verdicts[0].allowed and verdicts[0].envelope is not None
+
+
+def test_quiet_hours_scopes_and_evidence_are_screened() -> None:
+    catalog = _CountingCatalog()
+    payloads = [_payload("SLACK__chat.postMessage"), _payload("GMAIL__drafts.create")]
+
+    quiet = _screener(catalog, config=GuardrailConfig(quiet_start_hour=22, quiet_end_hour=6))
+    overnight = quiet.screen(TENANT, payloads, now=datetime(2024, 1, 1, 23, 0, tzinfo=timezone.utc))
+    assert all(list(verdict.reasons) == ["quiet_hours"] for verdict in overnight)
+
+    screener = _screener(catalog)
+    # Without known enabled scopes, missing scopes are left to the approval flow.
+    assert all(verdict.allowed for verdict in screener.screen(TENANT, payloads, state={}, now=NOON))
+
+    verdicts = screener.screen(
+        TENANT,
+        payloads,
+        state={"enabled_scopes": ["chat:write"]},
+        proposal={"summary": "Announce launch", "evidence": []},
+        now=NOON,
+    )
+    assert list(verdicts[0].reasons) == ["evidence_requirement"]
+    assert list(verdicts[1].reasons) == ["scope_validation", "evidence_requirement"]
+
+
+class _ViewQuery:
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+        self.filters: list[tuple] = []
+
+    def select(self, columns: str):
+        return self
+
+    def eq(self, column: str, value: str):
+        self.filters.append(("eq", column, value))
+        return self
+
+    def in_(self, column: str, values: list[str]):
+        self.filters.append(("in", column, tuple(values)))
+        return self
+
+    def limit(self, value: int):
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self.rows)
+
+
+def test_supabase_policy_batch_fetch_uses_single_in_query() -> None:
+    query = _ViewQuery(
+        [{"tool_slug": "SLACK__chat.postMessage", "effective_write_allowed": True, "effective_rate_bucket": "slack.minute"}]
+    )
+    service = SupabasePolicyService(SimpleNamespace(table=lambda name, schema=None: query))
+
+    policies = service.get_effective_policies(
+        tenant_id=TENANT, tool_slugs=["SLACK__chat.postMessage", "SLACK__chat.postMessage", "GMAIL__drafts.create"]
+    )
+
+    assert query.filters == [
+        ("eq", "tenant_id", TENANT),
+        ("in", "tool_slug", ("SLACK__chat.postMessage", "GMAIL__drafts.create")),
+    ]
+    assert policies == {"SLACK__chat.postMessage": EffectiveToolPolicy(write_allowed=True, rate_bucket="slack.minute")}
+
+
+def test_supabase_policy_caches_hits_and_misses_until_invalidated() -> None:
+    query = _ViewQuery(
+        [{"tool_slug": "SLACK__chat.postMessage", "effective_write_allowed": False, "effective_rate_bucket": None}]
+    )
+    service = SupabasePolicyService(SimpleNamespace(table=lambda name, schema=None: query))
+    slugs = ["SLACK__chat.postMessage", "GMAIL__drafts.create"]
+
+    first = service.get_effective_policies(tenant_id=TENANT, tool_slugs=slugs)
+    assert service.get_effective_policies(tenant_id=TENANT, tool_slugs=slugs) == first
+    assert service.get_effective_policy(tenant_id=TENANT, tool_slug="GMAIL__drafts.create") is None
+    assert len(query.filters) == 2
+
+    service.invalidate(TENANT, "SLACK__chat.postMessage")
+    policy = service.get_effective_policy(tenant_id=TENANT, tool_slug="SLACK__chat.postMessage")
+
+    assert policy == EffectiveToolPolicy(write_allowed=False, rate_bucket=None)
+    assert query.filters[2:] == [("eq", "tenant_id", TENANT), ("eq", "tool_slug", "SLACK__chat.postMessage")]
@@ -2,10 +2,21 @@
 
 from __future__ import annotations
 
+import re
+from pathlib import Path
 from types import SimpleNamespace
 
+import pytest
+
 from agent.schemas.envelope import Envelope
-from agent.services.outbox import OutboxRecord, OutboxStatus, SupabaseOutboxService
+from agent.services.outbox import (
+    SUMMARY_COLUMNS,
+    ExternalIdCache,
+    OutboxEnqueueError,
+    OutboxRecord,
+    OutboxStatus,
+    SupabaseOutboxService,
+)
 
 
 def _envelope() -> Envelope:
@@ -88,11 +99,12 @@ class _RecordingSupabaseOutbox(SupabaseOutboxService):
 
 
 class _QueryRecordingOutbox(SupabaseOutboxService):
-    def __init__(self):
-        self._client = object()
+    def __init__(self, archived: list[dict[str, object]] | None = None):
+        self._client = _RpcRecorder(archived or [])
         self._schema = "public"
         self._table = "outbox"
         self._dlq_table = "outbox_dlq"
+        self._recent = ExternalIdCache(0)
         self.recorder = _QueryRecorder()
 
     def _table_ref(self):  # type: ignore[override]
@@ -102,7 +114,7 @@ class _QueryRecordingOutbox(SupabaseOutboxService):
         return _DummyTable([])
 
 
-def test_mark_success_merges_metadata() -> None:
+def test_mark_success_stores_result_under_result_key() -> None:
     record = OutboxRecord(
         envelope=_envelope(),
         status=OutboxStatus.PENDING,
@@ -116,7 +128,7 @@ def test_mark_success_merges_metadata() -> None:
     assert service.updated
     _, payload = service.updated[-1]
     assert payload["status"] == OutboxStatus.SUCCESS
-    assert payload["metadata"] == {"seed": "value", "result": "ok"}
+    assert payload["metadata"] == {"seed": "value", "result": {"result": "ok"}}
     assert payload["attempts"] == 1
     assert payload["next_run_at"] is None
 
@@ -134,13 +146,24 @@ def test_mark_failure_increments_attempts_and_preserves_metadata() -> None:
 
     assert service.updated
     _, payload = service.updated[-1]
-    assert payload["status"] == OutboxStatus.FAILED
+    assert payload["status"] == OutboxStatus.PENDING
     assert payload["attempts"] == 3
     assert payload["metadata"] == {"seed": "value"}
     assert payload["next_run_at"] is not None
 
 
-def test_mark_failure_moves_to_dlq() -> None:
+def test_result_reads_rows_written_with_merged_metadata() -> None:
+    envelope = _envelope()
+    legacy = OutboxRecord(envelope=envelope, status=OutboxStatus.SUCCESS, metadata={"seed": "value", "result": "ok"})
+    nested = OutboxRecord(envelope=envelope, status=OutboxStatus.SUCCESS, metadata={"seed": "value", "result": {"id": 1}})
+    pending = OutboxRecord(envelope=envelope, metadata={"seed": "value"})
+
+    assert legacy.result() == {"seed": "value", "result": "ok"}
+    assert nested.result() == {"id": 1}
+    assert pending.result() == {}
+
+
+def test_mark_failure_moves_to_dlq_in_one_rpc() -> None:
     record = OutboxRecord(
         envelope=_envelope(),
         status=OutboxStatus.PENDING,
@@ -148,39 +171,345 @@ def test_mark_failure_moves_to_dlq() -> None:
         metadata={"seed": "value"},
     )
     service = _RecordingSupabaseOutbox(record)
+    service._client = _RpcRecorder([{"outbox_move_to_dlq": True}])
 
     service.mark_failure("env-123", error="conflict", retry_in=None, move_to_dlq=True)
 
-    assert service.updated
-    _, payload = service.updated[-1]
-    assert payload["status"] == OutboxStatus.DLQ
-    assert payload["attempts"] == 1
-    assert payload["metadata"] == {"seed": "value"}
-    assert not payload.get("next_run_at")
+    assert service._client.calls == [("outbox_move_to_dlq", {"p_id": "env-123", "p_error": "conflict"})]
+    assert not service.updated
+    assert not service.dlq
 
-    assert service.dlq
-    dlq_payload = service.dlq[-1]
-    assert dlq_payload["status"] == OutboxStatus.DLQ
-    assert dlq_payload["attempts"] == 1
-    assert dlq_payload["metadata"] == {"seed": "value"}
 
+class _RpcRecorder:
+    def __init__(self, rows: list[dict[str, object]]):
+        self.calls: list[tuple[str, dict[str, object]]] = []
+        self._rows = rows
 
-def test_list_pending_filters_next_run_and_orders():
-    service = _QueryRecordingOutbox()
+    def rpc(self, name: str, params: dict[str, object]):
+        self.calls.append((name, params))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=self._rows))
+
+
+def test_list_pending_calls_due_claim_function():
+    row = {**_envelope().to_record(), "status": OutboxStatus.PENDING, "attempts": 0}
+    client = _RpcRecorder([row])
+    service = SupabaseOutboxService(client)
 
     result = service.list_pending(tenant_id="tenant-demo", limit=25)
 
-    assert result == ()
-    ops = service.recorder.operations
-    assert ("select", "*") in ops
-    assert ("eq", ("status", OutboxStatus.PENDING)) in ops
-    assert ("eq", ("tenant_id", "tenant-demo")) in ops
+    assert client.calls == [("outbox_pending_due", {"p_tenant_id": "tenant-demo", "p_limit": 25})]
+    assert [record.envelope.envelope_id for record in result] == ["env-123"]
+
+
+def test_list_pending_fair_calls_claim_function():
+    row = {**_envelope().to_record(), "status": OutboxStatus.PENDING, "attempts": 0}
+    client = _RpcRecorder([row])
+    service = SupabaseOutboxService(client)
+
+    result = service.list_pending_fair(per_tenant=5, limit=20)
+
+    assert client.calls == [("outbox_pending_fair", {"p_per_tenant": 5, "p_limit": 20})]
+    assert [record.envelope.envelope_id for record in result] == ["env-123"]
+
+
+class _UpsertRecorder:
+    def __init__(self, existing: list[dict[str, object]]):
+        self.upserts: list[tuple[object, dict[str, object]]] = []
+        self.selects: list[tuple[str, list[str]]] = []
+        self._existing = existing
+        self._mode = None
+        self._in: tuple[str, list[str]] = ("", [])
+
+    def upsert(self, payload, **kwargs):
+        self.upserts.append((payload, kwargs))
+        self._mode = "upsert"
+        self._payload = payload
+        return self
+
+    def select(self, columns: str):
+        self._mode = "select"
+        return self
+
+    def in_(self, column: str, values):
+        self._in = (column, list(values))
+        self.selects.append(self._in)
+        return self
+
+    def execute(self):
+        if self._mode == "upsert":
+            inserted = [row for row in self._payload if row["external_id"] not in {r["external_id"] for r in self._existing}]
+            self._existing.extend(inserted)
+            return SimpleNamespace(data=inserted)
+        column, values = self._in
+        return SimpleNamespace(data=[row for row in self._existing if row[column] in values])
+
+
+def test_enqueue_many_uses_single_upsert_and_returns_existing_rows():
+    existing_row = {**_envelope().to_record(), "status": OutboxStatus.SUCCESS, "attempts": 1}
+    recorder = _UpsertRecorder([existing_row])
+    service = _QueryRecordingOutbox()
+    service.recorder = recorder  # type: ignore[assignment]
+
+    fresh = Envelope(
+        envelope_id="env-456",
+        tenant_id="tenant-demo",
+        tool_slug="SLACK__chat.postMessage",
+        arguments={"channel": "#ops"},
+        connected_account_id=None,
+        risk="low",
+        external_id="ext-2",
+    )
+    records = service.enqueue_many([_envelope(), fresh])
+
+    assert len(recorder.upserts) == 1
+    payload, kwargs = recorder.upserts[0]
+    assert kwargs == {"on_conflict": "external_id", "ignore_duplicates": True}
+    assert [row["external_id"] for row in payload] == ["ext-1", "ext-2"]
+    assert recorder.selects == [("external_id", ["ext-1"])]
+    assert [record.status for record in records] == [OutboxStatus.SUCCESS, OutboxStatus.PENDING]
+
+
+def test_enqueue_many_rereads_cached_envelopes_by_id():
+    existing_row = {**_envelope().to_record(), "status": OutboxStatus.PENDING, "attempts": 0}
+    recorder = _UpsertRecorder([existing_row])
+    service = _QueryRecordingOutbox()
+    service._recent = ExternalIdCache(8)  # type: ignore[attr-defined]
+    service.recorder = recorder  # type: ignore[assignment]
+
+    service.enqueue_many([_envelope()])
+    existing_row["status"] = OutboxStatus.SUCCESS
+    records = service.enqueue_many([_envelope(), _envelope()])
+
+    assert len(recorder.upserts) == 1
+    assert recorder.selects == [("external_id", ["ext-1"]), ("id", ["env-123"])]
+    assert [record.status for record in records] == [OutboxStatus.SUCCESS, OutboxStatus.SUCCESS]
+
+
+class _EnqueueRecorder:
+    def __init__(self, existing: dict[str, object] | None, *, visible: bool = True):
+        self.calls: list[str] = []
+        self.filters: list[tuple[str, object]] = []
+        self._existing = existing
+        self._visible = visible
+        self._mode = ""
+
+    def upsert(self, payload, **kwargs):
+        self.calls.append("upsert")
+        self._mode = "upsert"
+        self._payload = payload
+        self.upsert_kwargs = kwargs
+        return self
+
+    def select(self, columns: str):
+        self.calls.append("select")
+        self._mode = "select"
+        return self
+
+    def eq(self, column: str, value: object):
+        self.filters.append((column, value))
+        return self
+
+    def limit(self, value: int):
+        return self
+
+    def execute(self):
+        if self._mode == "upsert":
+            return SimpleNamespace(data=[] if self._existing else [self._payload])
+        return SimpleNamespace(data=[dict(self._existing)] if self._existing and self._visible else [])
+
+
+def test_enqueue_returns_existing_row_on_duplicate_external_id_and_caches_its_id():
+    existing = {**_envelope().to_record(), "id": "env-original", "status": OutboxStatus.IN_PROGRESS, "attempts": 0}
+    recorder = _EnqueueRecorder(existing)
+    service = _QueryRecordingOutbox()
+    service._recent = ExternalIdCache(8)  # type: ignore[attr-defined]
+    service.recorder = recorder  # type: ignore[assignment]
+
+    first = service.enqueue(_envelope())
+    existing["status"] = OutboxStatus.SUCCESS
+    second = service.enqueue(_envelope())
+
+    assert recorder.upsert_kwargs == {"on_conflict": "external_id", "ignore_duplicates": True}
+    assert first.envelope.envelope_id == second.envelope.envelope_id == "env-original"
+    assert (first.status, second.status) == (OutboxStatus.IN_PROGRESS, OutboxStatus.SUCCESS)
+    assert recorder.calls == ["upsert", "select", "select"]
+    assert recorder.filters == [("tenant_id", "tenant-demo"), ("external_id", "ext-1"), ("id", "env-original")]
+
+
+def test_enqueue_raises_when_the_ignored_insert_has_no_row_for_the_tenant():
+    existing = {**_envelope().to_record(), "id": "env-other", "tenant_id": "tenant-other"}
+    service = _QueryRecordingOutbox(archived=[existing])
+    service._recent = ExternalIdCache(8)  # type: ignore[attr-defined]
+    service.recorder = _EnqueueRecorder(existing, visible=False)  # type: ignore[assignment]
+
+    with pytest.raises(OutboxEnqueueError):
+        service.enqueue(_envelope())
+    assert len(service._recent) == 0  # type: ignore[attr-defined]
+
+
+def test_enqueue_resolves_archived_external_ids_instead_of_rerunning():
+    archived = {**_envelope().to_record(), "id": "env-archived", "status": OutboxStatus.SUCCESS, "attempts": 1}
+    service = _QueryRecordingOutbox(archived=[archived])
+    service._recent = ExternalIdCache(8)  # type: ignore[attr-defined]
+    service.recorder = _EnqueueRecorder(archived, visible=False)  # type: ignore[assignment]
+
+    record = service.enqueue(_envelope())
+
+    assert (record.envelope.envelope_id, record.status) == ("env-archived", OutboxStatus.SUCCESS)
+    assert service._client.calls == [("outbox_archived_lookup", {"p_external_ids": ["ext-1"]})]  # type: ignore[attr-defined]
+
+
+def test_external_id_cache_is_tenant_scoped_and_evicts_least_recently_used():
+    cache = ExternalIdCache(2)
+
+    cache.put("tenant-demo", "ext-0", "env-0")
+    cache.put("tenant-demo", "ext-1", "env-1")
+    assert cache.get("tenant-demo", "ext-0") == "env-0"
+    assert cache.get("tenant-other", "ext-0") is None
+    cache.put("tenant-other", "ext-0", "env-2")
+
+    assert cache.get("tenant-demo", "ext-1") is None
+    assert cache.get("tenant-demo", "ext-0") == "env-0"
+    assert cache.get("tenant-other", "ext-0") == "env-2"
+    assert len(cache) == 2
+
+
+class _ProjectionRecorder:
+    def __init__(self, rows: list[dict[str, object]], count: int | None = None) -> None:
+        self.operations: list[tuple[str, object]] = []
+        self._rows = rows
+        self._count = count
+
+    def select(self, *columns: str, **kwargs: object):
+        self.operations.append(("select", (columns, kwargs)))
+        return self
+
+    def eq(self, column: str, value: object):
+        self.operations.append(("eq", (column, value)))
+        return self
+
+    def order(self, column: str, desc: bool = False, nullsfirst: bool = False):
+        self.operations.append(("order", column))
+        return self
+
+    def limit(self, value: int):
+        self.operations.append(("limit", value))
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=self._rows, count=self._count)
+
+
+class _ProjectionOutbox(SupabaseOutboxService):
+    def __init__(self, outbox: _ProjectionRecorder, dlq: _ProjectionRecorder) -> None:
+        super().__init__(object())
+        self.outbox = outbox
+        self.dlq = dlq
+
+    def _table_ref(self):  # type: ignore[override]
+        return self.outbox
+
+    def _dlq_table_ref(self):  # type: ignore[override]
+        return self.dlq
+
+
+def test_list_summaries_projects_scalar_columns() -> None:
+    row = {
+        "id": "env-123",
+        "tenant_id": "tenant-demo",
+        "tool_slug": "GMAIL__drafts.create",
+        "status": OutboxStatus.PENDING,
+        "risk": "medium",
+        "attempts": 1,
+        "last_error": None,
+        "created_at": "2025-01-01T00:00:00Z",
+        "next_run_at": None,
+        "title": "Draft outreach",
+    }
+    service = _ProjectionOutbox(_ProjectionRecorder([row]), _ProjectionRecorder([]))
+
+    (summary,) = service.list_summaries(status=OutboxStatus.PENDING, tenant_id="tenant-demo", limit=25)
+
+    (columns, kwargs), = [value for op, value in service.outbox.operations if op == "select"]
+    assert columns == (SUMMARY_COLUMNS,)
+    assert "*" not in SUMMARY_COLUMNS and "arguments" not in SUMMARY_COLUMNS
+    assert ("eq", ("tenant_id", "tenant-demo")) in service.outbox.operations
+    assert ("limit", 25) in service.outbox.operations
+    assert summary.envelope_id == "env-123"
+    assert summary.to_shared_state()["title"] == "Draft outreach"
+
+
+MIGRATIONS = Path(__file__).resolve().parents[2] / "db" / "migrations"
+_CONSTRAINTS = {"primary", "unique", "constraint", "foreign", "check"}
+
+
+def _schema_columns(table: str) -> set[str]:
+    """Column names of `table` as declared (and later altered) by the migrations."""
+
+    columns: set[str] = set()
+    for path in sorted(MIGRATIONS.glob("*.sql")):
+        sql = path.read_text()
+        match = re.search(rf"create table if not exists {table} \((.*?)\n\)", sql, re.DOTALL)
+        if match:
+            for line in match.group(1).splitlines():
+                word = line.strip().split(" ", 1)[0]
+                if word and not word.startswith("--") and word not in _CONSTRAINTS:
+                    columns.add(word)
+        columns.update(re.findall(rf"alter table {table}\s+add column (?:if not exists )?(\w+)", sql))
+    return columns
+
+
+def _selected_columns(select: str) -> set[str]:
+    return {part.split(":")[-1].split("->")[0].strip() for part in select.split(",")}
+
+
+@pytest.mark.parametrize(
+    ("status", "table"),
+    [(OutboxStatus.PENDING, "outbox"), (OutboxStatus.DLQ, "outbox_dlq")],
+)
+def test_list_summaries_selects_columns_that_exist_on_the_status_table(status: str, table: str) -> None:
+    service = _ProjectionOutbox(_ProjectionRecorder([]), _ProjectionRecorder([]))
+
+    service.list_summaries(status=status)
+
+    recorder = service.dlq if status == OutboxStatus.DLQ else service.outbox
+    ((columns,), _), = [value for op, value in recorder.operations if op == "select"]
+    schema = _schema_columns(table)
+    assert schema, f"{table} not found in migrations"
+    assert _selected_columns(columns) <= schema
+
+
+def test_count_issues_head_only_exact_count_against_status_table() -> None:
+    service = _ProjectionOutbox(_ProjectionRecorder([], count=7), _ProjectionRecorder([], count=2))
+
+    assert service.count(status=OutboxStatus.PENDING) == 7
+    assert service.count(status=OutboxStatus.DLQ, tenant_id="tenant-demo") == 2
+
+    (_, kwargs), = [value for op, value in service.outbox.operations if op == "select"]
+    assert kwargs == {"count": "exact", "head": True}
+    assert ("eq", ("tenant_id", "tenant-demo")) in service.dlq.operations
+
+
+def test_requeue_from_dlq_uses_server_side_functions() -> None:
+    row = {**_envelope().to_record(), "status": OutboxStatus.PENDING, "attempts": 0}
+    service = _RecordingSupabaseOutbox(None)
+    service._client = _RpcRecorder([row])
+
+    record = service.requeue_from_dlq("env-123")
+
+    assert record is not None and record.status == OutboxStatus.PENDING
+    assert service._client.calls == [("outbox_requeue", {"p_id": "env-123"})]
+
 
-    or_ops = [value for op, value in ops if op == "or"]
-    assert any(value.startswith("next_run_at.is.null") for value in or_ops)
+def test_requeue_many_from_dlq_batches_ids(monkeypatch) -> None:
+    monkeypatch.setattr("agent.services.outbox._RPC_ID_BATCH", 2)
+    service = _RecordingSupabaseOutbox(None)
+    service._client = _RpcRecorder(["env-requeued"])
 
-    order_ops = [value for op, value in ops if op == "order"]
-    assert ("next_run_at", False, True) in order_ops
-    assert any(entry[0] == "created_at" for entry in order_ops)
+    requeued = service.requeue_many_from_dlq(["env-1", "env-2", "env-3"])
 
-    assert ("limit", 25) in ops
+    assert service._client.calls == [
+        ("outbox_requeue_many", {"p_ids": ["env-1", "env-2"]}),
+        ("outbox_requeue_many", {"p_ids": ["env-3"]}),
+    ]
+    assert requeued == 2
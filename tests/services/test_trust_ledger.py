@@ -0,0 +1,119 @@
+"""Tests for the trust ledger and its guardrail integration."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from agent.callbacks.before import _sync_trust_ledger
+from agent.services import (
+    APPROVAL_MODAL_KEY,
+    InMemoryTrustLedgerService,
+    SupabaseTrustLedgerService,
+    TrustEventKind,
+    TrustScore,
+)
+
+DAY = 86400.0
+
+
+def test_in_memory_ledger_decays_history_incrementally() -> None:
+    now = [0.0]
+    ledger = InMemoryTrustLedgerService(half_life_seconds=30 * DAY, clock=lambda: now[0])
+
+    for _ in range(3):
+        ledger.record_event("tenant-a", TrustEventKind.REJECTED)
+    now[0] = 60 * DAY  # two half-lives: the three rejections now weigh 0.75
+    ledger.record_event("tenant-a", TrustEventKind.APPROVED, employee_id="emp-1")
+
+    tenant = ledger.get_score("tenant-a")
+    assert tenant is not None and tenant.events == 4
+    assert tenant.score == pytest.approx(1 / 1.75)
+    assert ledger.get_score("tenant-a", employee_id="emp-1") == TrustScore(1.0, 0.0, 1)
+    assert ledger.get_score("tenant-b") is None
+
+    with pytest.raises(ValueError):
+        ledger.record_event("tenant-a", "escalated")
+
+
+class _Table:
+    def __init__(self, name: str, store: dict) -> None:
+        self.name = name
+        self.store = store
+
+    def insert(self, payload):
+        self.store.setdefault("inserts", []).append(payload)
+        return self
+
+    def select(self, columns: str):
+        return self
+
+    def eq(self, column: str, value: str):
+        return self
+
+    def limit(self, value: int):
+        return self
+
+    def execute(self):
+        if self.name == "trust_scores":
+            self.store["reads"] = self.store.get("reads", 0) + 1
+            return SimpleNamespace(data=self.store.get("rows", []))
+        return SimpleNamespace(data=[])
+
+
+def test_supabase_ledger_caches_score_and_invalidates_on_write() -> None:
+    store: dict = {"rows": [{"positive": 3, "negative": 1, "events": 4}]}
+    client = SimpleNamespace(table=lambda name, schema=None: _Table(name, store))
+    ledger = SupabaseTrustLedgerService(client, ttl_seconds=30, clock=lambda: 0.0)
+
+    assert ledger.get_score("tenant-a") == TrustScore(3.0, 1.0, 4)
+    ledger.get_score("tenant-a")
+    assert store["reads"] == 1
+
+    ledger.record_event("tenant-a", TrustEventKind.SUCCEEDED, envelope_id="env-1")
+    ledger.get_score("tenant-a")
+    assert store["reads"] == 2
+    assert store["inserts"][0]["kind"] == TrustEventKind.SUCCEEDED
+
+
+def test_callback_records_decision_once_and_exposes_ledger_score() -> None:
+    ledger = InMemoryTrustLedgerService()
+    state = {APPROVAL_MODAL_KEY: {"envelopeId": "env-1", "approvalState": "authorized"}}
+
+    _sync_trust_ledger(state, ledger, tenant_id="tenant-a")
+    _sync_trust_ledger(state, ledger, tenant_id="tenant-a")
+
+    assert [event["kind"] for event in ledger.events] == [TrustEventKind.APPROVED]
+    assert state["trust"] == {"score": 1.0, "source": "ledger"}
+
+
+class _FlakyLedger(InMemoryTrustLedgerService):
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self.failures = failures
+
+    def record_event(self, tenant_id, kind, **kwargs) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("ledger unavailable")
+        super().record_event(tenant_id, kind, **kwargs)
+
+
+def test_callback_retries_unrecorded_decisions_and_credits_the_employee() -> None:
+    ledger = _FlakyLedger(failures=1)
+    state = {
+        "employee_id": "emp-1",
+        APPROVAL_MODAL_KEY: {"envelopeId": "env-1", "approvalState": "denied"},
+    }
+
+    _sync_trust_ledger(state, ledger, tenant_id="tenant-a")
+    assert ledger.events == []
+    assert not state[APPROVAL_MODAL_KEY].get("decisionRecorded")
+
+    _sync_trust_ledger(state, ledger, tenant_id="tenant-a")
+    _sync_trust_ledger(state, ledger, tenant_id="tenant-a")
+
+    assert [(event["kind"], event["employee_id"]) for event in ledger.events] == [(TrustEventKind.REJECTED, "emp-1")]
+    assert state[APPROVAL_MODAL_KEY]["decisionRecorded"] is True
+    assert ledger.get_score("tenant-a", employee_id="emp-1") is not None
@@ -0,0 +1,112 @@
+"""Tests for AIMD batch sizing and backpressure in the outbox worker."""
+
+from types import SimpleNamespace
+
+from agent.schemas.envelope import Envelope
+from agent.services import AppSettings
+from agent.services.outbox import InMemoryOutboxService
+from worker.adaptive import AdaptiveBatchController, BatchDecision, BatchOutcome
+from worker.circuit_breaker import CircuitBreakerRegistry
+from worker.metrics import WorkerMetrics
+from worker.outbox import OutboxWorker
+
+
+def test_controller_grows_additively_while_batches_are_full() -> None:
+    controller = AdaptiveBatchController(initial=4, maximum=6)
+
+    for _ in range(5):
+        controller.record(BatchOutcome(claimed=controller.batch_size, executed=controller.batch_size, latency_seconds=0.1))
+
+    assert controller.batch_size == 6
+
+
+def test_controller_cuts_batch_on_latency_or_errors() -> None:
+    controller = AdaptiveBatchController(initial=20, latency_target_seconds=1.0)
+
+    decision = controller.record(BatchOutcome(claimed=20, executed=20, latency_seconds=2.5))
+    assert decision == BatchDecision.DECREASE
+    assert controller.batch_size == 10
+
+    decision = controller.record(BatchOutcome(claimed=10, executed=10, errors=5, latency_seconds=0.1))
+    assert decision == BatchDecision.DECREASE
+    assert controller.batch_size == 5
+
+
+def test_controller_backs_off_polling_when_rate_buckets_defer() -> None:
+    metrics = WorkerMetrics()
+    controller = AdaptiveBatchController(
+        initial=8,
+        poll_interval=2.0,
+        max_poll_interval=5.0,
+        metrics=metrics,
+    )
+
+    assert controller.record(BatchOutcome(claimed=8, deferred=6)) == BatchDecision.BACKOFF
+    assert controller.poll_interval == 4.0
+    controller.record(BatchOutcome(claimed=4, deferred=4))
+    assert controller.poll_interval == 5.0
+    assert controller.batch_size == 2
+
+    controller.record(BatchOutcome(claimed=0))
+    assert controller.poll_interval == 2.0
+    assert metrics.counter("outbox_batch_decisions", decision=BatchDecision.BACKOFF) == 2
+    assert metrics.gauge("outbox_batch_size") == 2
+
+
+def test_worker_resizes_claim_batch_from_outcomes(audit_logger) -> None:
+    settings = AppSettings().model_copy(update={"outbox_batch_size": 2, "outbox_batch_max": 3})
+    outbox = InMemoryOutboxService()
+    for idx in range(10):
+        outbox.enqueue(
+            Envelope.from_payload(
+                payload={
+                    "tool_slug": "SLACK__chat.postMessage",
+                    "arguments": {"channel": "#general", "text": f"msg-{idx}"},
+                    "external_id": f"adaptive-{idx}",
+                },
+                tenant_id="tenant-demo",
+            )
+        )
+
+    composio = SimpleNamespace(tools=SimpleNamespace(execute=lambda **_kwargs: {"ok": True}))
+    worker = OutboxWorker(
+        settings=settings,
+        outbox_service=outbox,
+        audit_logger=audit_logger,
+        composio_client=composio,
+    )
+
+    assert worker.process_once() == 2
+    assert worker.process_once() == 3
+    assert worker.process_once() == 3
+    assert worker.metrics.gauge("outbox_batch_size") == 3
+    summary = worker.metrics.summary("outbox_execute_seconds", tool_slug="SLACK__chat.postMessage")
+    assert summary is not None and summary.count == 8
+
+
+def test_open_circuits_do_not_back_off_the_whole_worker(audit_logger) -> None:
+    settings = AppSettings().model_copy(update={"outbox_batch_size": 4})
+    outbox = InMemoryOutboxService()
+    for idx, slug in enumerate(["SLACK__chat.postMessage"] * 3 + ["GMAIL__drafts.create"]):
+        outbox.enqueue(
+            Envelope.from_payload(
+                payload={"tool_slug": slug, "arguments": {"text": str(idx)}, "external_id": f"open-{idx}"},
+                tenant_id="tenant-demo",
+            )
+        )
+    breakers = CircuitBreakerRegistry(failure_threshold=1)
+    breakers.record_failure("SLACK__chat.postMessage")
+    composio = SimpleNamespace(tools=SimpleNamespace(execute=lambda **_kwargs: {"ok": True}))
+    worker = OutboxWorker(
+        settings=settings,
+        outbox_service=outbox,
+        audit_logger=audit_logger,
+        composio_client=composio,
+        circuit_breakers=breakers,
+    )
+
+    assert worker.process_once() == 4
+
+    assert worker.metrics.counter("outbox_deferred", reason="circuit_open", tool_slug="SLACK__chat.postMessage") == 3
+    assert worker.metrics.counter("outbox_batch_decisions", decision=BatchDecision.BACKOFF) == 0
+    assert worker.metrics.gauge("outbox_batch_defer_ratio") == 0.0
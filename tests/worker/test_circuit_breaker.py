@@ -0,0 +1,145 @@
+"""Tests for per-toolkit circuit breakers in the outbox worker."""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from agent.schemas.envelope import Envelope
+from agent.services import AppSettings
+from agent.services.outbox import InMemoryOutboxService, OutboxStatus
+from worker.circuit_breaker import BreakerState, CircuitBreakerRegistry, toolkit_for
+from worker.metrics import WorkerMetrics
+from worker.outbox import OutboxWorker
+
+
+def test_toolkit_for_uses_slug_prefix() -> None:
+    assert toolkit_for("SLACK__chat.postMessage") == "SLACK"
+    assert toolkit_for("gmail__drafts.create") == "GMAIL"
+    assert toolkit_for("standalone") == "STANDALONE"
+
+
+def test_breaker_opens_then_admits_single_half_open_probe(clock) -> None:
+    metrics = WorkerMetrics()
+    registry = CircuitBreakerRegistry(failure_threshold=2, reset_timeout_seconds=10, clock=clock.monotonic, metrics=metrics)
+
+    registry.record_failure("SLACK__chat.postMessage")
+    assert registry.allow("SLACK__chat.postMessage")
+    registry.record_failure("SLACK__conversations.list")
+
+    assert registry.state("SLACK__chat.postMessage") == BreakerState.OPEN
+    assert not registry.allow("SLACK__chat.postMessage")
+    assert registry.allow("GMAIL__drafts.create")
+    assert registry.retry_after("SLACK__chat.postMessage") == 10
+
+    clock.advance(11)
+    assert registry.allow("SLACK__chat.postMessage")
+    assert registry.state("SLACK__chat.postMessage") == BreakerState.HALF_OPEN
+    assert not registry.allow("SLACK__chat.postMessage")
+
+    registry.record_failure("SLACK__chat.postMessage")
+    assert registry.state("SLACK__chat.postMessage") == BreakerState.OPEN
+
+    clock.advance(11)
+    assert registry.allow("SLACK__chat.postMessage")
+    registry.record_success("SLACK__chat.postMessage")
+    assert registry.state("SLACK__chat.postMessage") == BreakerState.CLOSED
+    assert metrics.gauge("outbox_circuit_state", toolkit="SLACK") == 0
+    assert metrics.counter("outbox_circuit_rejected", toolkit="SLACK") == 2
+
+
+def test_half_open_probe_is_exclusive_across_threads(clock) -> None:
+    registry = CircuitBreakerRegistry(failure_threshold=1, reset_timeout_seconds=1, clock=clock.monotonic)
+    registry.record_failure("SLACK__chat.postMessage")
+    clock.advance(2)
+
+    admitted: list[bool] = []
+    barrier = threading.Barrier(8)
+
+    def _probe() -> None:
+        barrier.wait()
+        admitted.append(registry.allow("SLACK__chat.postMessage"))
+
+    threads = [threading.Thread(target=_probe) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert admitted.count(True) == 1
+
+
+def test_worker_defers_open_toolkit_and_keeps_others_flowing(audit_logger) -> None:
+    settings = AppSettings().model_copy(
+        update={
+            "outbox_batch_size": 10,
+            "outbox_adaptive_batching": False,
+            "outbox_circuit_failure_threshold": 2,
+        }
+    )
+    outbox = InMemoryOutboxService()
+    envelopes = []
+    for idx in range(3):
+        for slug in ("SLACK__chat.postMessage", "GMAIL__drafts.create"):
+            envelope = Envelope.from_payload(
+                payload={"tool_slug": slug, "arguments": {"text": str(idx)}, "external_id": f"{slug}-{idx}"},
+                tenant_id="tenant-demo",
+            )
+            outbox.enqueue(envelope)
+            envelopes.append(envelope)
+
+    calls: list[str] = []
+
+    def _execute(**kwargs):
+        calls.append(kwargs["tool_slug"])
+        if kwargs["tool_slug"].startswith("SLACK"):
+            raise RuntimeError("Slack unavailable")
+        return {"ok": True}
+
+    worker = OutboxWorker(
+        settings=settings,
+        outbox_service=outbox,
+        audit_logger=audit_logger,
+        composio_client=SimpleNamespace(tools=SimpleNamespace(execute=_execute)),
+    )
+
+    worker.process_once()
+
+    assert calls.count("SLACK__chat.postMessage") == 2
+    assert calls.count("GMAIL__drafts.create") == 3
+    gmail = [outbox.get(e.envelope_id) for e in envelopes if e.tool_slug.startswith("GMAIL")]
+    assert all(record.status == OutboxStatus.SUCCESS for record in gmail)
+    slack = [outbox.get(e.envelope_id) for e in envelopes if e.tool_slug.startswith("SLACK")]
+    assert all(record.status == OutboxStatus.PENDING for record in slack)
+    assert worker.metrics.counter("outbox_deferred", reason="circuit_open", tool_slug="SLACK__chat.postMessage") == 1
+
+
+class _FlakyOutbox(InMemoryOutboxService):
+    def mark_in_progress(self, envelope_id: str) -> None:
+        raise RuntimeError("supabase timeout")
+
+
+def test_probe_is_released_when_processing_raises_before_the_outcome(clock, audit_logger) -> None:
+    registry = CircuitBreakerRegistry(failure_threshold=1, reset_timeout_seconds=1, clock=clock.monotonic)
+    registry.record_failure("SLACK__chat.postMessage")
+    clock.advance(2)
+    outbox = _FlakyOutbox()
+    record = outbox.enqueue(
+        Envelope.from_payload(
+            payload={"tool_slug": "SLACK__chat.postMessage", "arguments": {}, "external_id": "probe-1"},
+            tenant_id="tenant-demo",
+        )
+    )
+    worker = OutboxWorker(
+        settings=AppSettings(),
+        outbox_service=outbox,
+        audit_logger=audit_logger,
+        composio_client=SimpleNamespace(tools=SimpleNamespace(execute=lambda **_: {"ok": True})),
+        circuit_breakers=registry,
+    )
+
+    with pytest.raises(RuntimeError):
+        worker._process_record(record)
+
+    assert registry.state("SLACK__chat.postMessage") == BreakerState.HALF_OPEN
+    assert registry.allow("SLACK__chat.postMessage")
@@ -0,0 +1,102 @@
+"""Tests for weighted fair-share dequeuing across tenants."""
+
+from types import SimpleNamespace
+
+from agent.schemas.envelope import Envelope
+from agent.services import AppSettings, InMemoryTenantPlanService
+from agent.services.outbox import InMemoryOutboxService, OutboxRecord
+from worker.fair_share import FairShareScheduler
+from worker.outbox import OutboxWorker
+
+
+def _envelope(tenant_id: str, index: int, *, employee_id: str | None = None) -> Envelope:
+    metadata = {"employee_id": employee_id} if employee_id else {}
+    return Envelope.from_payload(
+        payload={
+            "tool_slug": "SLACK__chat.postMessage",
+            "arguments": {"channel": "#general", "text": f"msg-{index}"},
+            "external_id": f"{tenant_id}-{employee_id}-{index}",
+            "metadata": metadata,
+        },
+        tenant_id=tenant_id,
+    )
+
+
+def _records(tenant_id: str, count: int, *, employee_id: str | None = None) -> list[OutboxRecord]:
+    return [OutboxRecord(envelope=_envelope(tenant_id, idx, employee_id=employee_id)) for idx in range(count)]
+
+
+def test_scheduler_does_not_starve_small_tenant() -> None:
+    scheduler = FairShareScheduler()
+    candidates = _records("noisy", 20) + _records("quiet", 2)
+
+    selected = scheduler.select(candidates, limit=4)
+
+    tenants = [record.tenant_id for record in selected]
+    assert tenants.count("quiet") == 2
+    assert tenants.count("noisy") == 2
+
+
+def test_scheduler_applies_plan_weights() -> None:
+    scheduler = FairShareScheduler(plan_weights={"free": 1.0, "enterprise": 3.0})
+    candidates = _records("big", 10) + _records("small", 10)
+
+    selected = scheduler.select(candidates, limit=8, plans={"big": "enterprise", "small": "free"})
+
+    tenants = [record.tenant_id for record in selected]
+    assert tenants.count("big") == 6
+    assert tenants.count("small") == 2
+
+
+def test_scheduler_splits_tenant_share_across_employees() -> None:
+    scheduler = FairShareScheduler(by_employee=True)
+    candidates = (
+        _records("tenant-a", 5, employee_id="emp-1")
+        + _records("tenant-a", 5, employee_id="emp-2")
+        + _records("tenant-b", 5)
+    )
+
+    selected = scheduler.select(candidates, limit=4)
+
+    tenants = [record.tenant_id for record in selected]
+    assert tenants.count("tenant-a") == 2
+    assert tenants.count("tenant-b") == 2
+    employees = {record.envelope.metadata.get("employee_id") for record in selected if record.tenant_id == "tenant-a"}
+    assert employees == {"emp-1", "emp-2"}
+
+
+def test_in_memory_fair_window_caps_rows_per_tenant() -> None:
+    outbox = InMemoryOutboxService()
+    for idx in range(10):
+        outbox.enqueue(_envelope("noisy", idx))
+    outbox.enqueue(_envelope("quiet", 0))
+
+    window = outbox.list_pending_fair(per_tenant=3, limit=10)
+
+    tenants = [record.tenant_id for record in window]
+    assert tenants.count("noisy") == 3
+    assert tenants[:2] == ["noisy", "quiet"]
+
+
+def test_worker_process_once_serves_every_tenant_and_records_wait(audit_logger) -> None:
+    settings = AppSettings().model_copy(update={"outbox_batch_size": 2})
+    outbox = InMemoryOutboxService()
+    for idx in range(10):
+        outbox.enqueue(_envelope("noisy", idx))
+    outbox.enqueue(_envelope("quiet", 0))
+
+    executed: list[dict] = []
+    composio = SimpleNamespace(tools=SimpleNamespace(execute=lambda **kwargs: executed.append(kwargs) or {"ok": True}))
+    worker = OutboxWorker(
+        settings=settings,
+        outbox_service=outbox,
+        audit_logger=audit_logger,
+        composio_client=composio,
+        tenant_plans=InMemoryTenantPlanService(plans_by_tenant={"noisy": "free", "quiet": "free"}),
+    )
+
+    assert worker.process_once() == 2
+    assert {call["user_id"] for call in executed} == {"noisy", "quiet"}
+
+    wait = worker.metrics.summary("outbox_queue_wait_seconds", tenant_id="quiet")
+    assert wait is not None and wait.count == 1
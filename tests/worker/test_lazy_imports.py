@@ -0,0 +1,51 @@
+"""Cold-start guards: the worker CLI must not import vendor SDKs it does not use."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import agent.services as services
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _loaded_after(code: str) -> set[str]:
+    probe = (
+        f"{code}\n"
+        "import json, sys\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return set(json.loads(output.strip().splitlines()[-1]))
+
+
+def test_worker_cli_import_skips_composio_adk_and_jsonschema() -> None:
+    loaded = _loaded_after("import worker.outbox as cli; cli.parse_args(['status'])")
+
+    assert "agent.services.outbox" in loaded
+    for heavy in ("composio", "composio_google_adk", "google.adk", "jsonschema", "agent.services.catalog"):
+        assert heavy not in loaded
+
+
+def test_replay_cli_import_skips_composio_adk_and_jsonschema() -> None:
+    loaded = _loaded_after(
+        "import worker.outbox as cli; cli.parse_args(['replay', '--since', '2025-01-01T00:00:00Z', '--dry-run'])"
+    )
+
+    assert "worker.replay" in loaded
+    for heavy in ("composio", "composio_google_adk", "google.adk", "jsonschema", "agent.services.catalog"):
+        assert heavy not in loaded
+
+
+def test_service_exports_resolve_lazily() -> None:
+    assert set(services.__all__) <= set(dir(services))
+    assert services.ComposioCatalogService.__module__ == "agent.services.catalog"
+    services.get_http_client
+    assert "get_http_client" in vars(services)
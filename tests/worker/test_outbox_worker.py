@@ -3,24 +3,11 @@
 from types import SimpleNamespace
 
 from agent.schemas.envelope import Envelope
-from agent.services import AppSettings
+from agent.services import AppSettings, InMemoryTrustLedgerService, TrustEventKind
 from agent.services.outbox import InMemoryOutboxService, OutboxStatus
 from worker.outbox import OutboxWorker
 
 
-class DummyAuditLogger:
-    def __init__(self) -> None:
-        self.events: list[tuple[str, dict]] = []
-
-    def log_envelope(self, *, tenant_id: str, envelope_id: str, tool_slug: str, status: str, metadata):
-        self.events.append((status, {
-            "tenant_id": tenant_id,
-            "envelope_id": envelope_id,
-            "tool_slug": tool_slug,
-            "metadata": metadata,
-        }))
-
-
 class DummyComposioClient:
     def __init__(self, *, raise_conflict: bool = False, raise_error: bool = False) -> None:
         self.raise_conflict = raise_conflict
@@ -49,10 +36,9 @@ def _enqueue_sample(outbox: InMemoryOutboxService, tenant_id: str = "tenant-demo
     return envelope
 
 
-def test_worker_process_success() -> None:
+def test_worker_process_success(audit_logger) -> None:
     settings = AppSettings()
     outbox = InMemoryOutboxService()
-    audit = DummyAuditLogger()
     composio = DummyComposioClient()
 
     envelope = _enqueue_sample(outbox, tenant_id=settings.tenant_id)
@@ -60,7 +46,7 @@ def test_worker_process_success() -> None:
     worker = OutboxWorker(
         settings=settings,
         outbox_service=outbox,
-        audit_logger=audit,
+        audit_logger=audit_logger,
         composio_client=composio,
     )
 
@@ -73,10 +59,9 @@ def test_worker_process_success() -> None:
     assert composio.executed != []
 
 
-def test_worker_process_conflict_routes_to_conflict() -> None:
+def test_worker_process_conflict_routes_to_conflict(audit_logger) -> None:
     settings = AppSettings()
     outbox = InMemoryOutboxService()
-    audit = DummyAuditLogger()
     composio = DummyComposioClient(raise_conflict=True)
 
     envelope = _enqueue_sample(outbox, tenant_id=settings.tenant_id)
@@ -84,7 +69,7 @@ def test_worker_process_conflict_routes_to_conflict() -> None:
     worker = OutboxWorker(
         settings=settings,
         outbox_service=outbox,
-        audit_logger=audit,
+        audit_logger=audit_logger,
         composio_client=composio,
     )
 
@@ -95,17 +80,16 @@ def test_worker_process_conflict_routes_to_conflict() -> None:
     assert record.status == OutboxStatus.CONFLICT
 
 
-def test_worker_retry_dlq_requeues() -> None:
-    settings = AppSettings()
+def test_worker_retry_dlq_requeues(audit_logger) -> None:
+    settings = AppSettings().model_copy(update={"outbox_max_attempts": 1})
     outbox = InMemoryOutboxService()
-    audit = DummyAuditLogger()
     composio = DummyComposioClient(raise_error=True)
 
     envelope = _enqueue_sample(outbox, tenant_id=settings.tenant_id)
     worker = OutboxWorker(
         settings=settings,
         outbox_service=outbox,
-        audit_logger=audit,
+        audit_logger=audit_logger,
         composio_client=composio,
     )
 
@@ -118,3 +102,68 @@ def test_worker_retry_dlq_requeues() -> None:
     record = outbox.get(envelope.envelope_id)
     assert record is not None
     assert record.status == OutboxStatus.PENDING
+
+
+def test_worker_schedules_retries_in_queue_until_max_attempts(audit_logger) -> None:
+    settings = AppSettings().model_copy(update={"outbox_max_attempts": 3})
+    outbox = InMemoryOutboxService()
+    composio = DummyComposioClient(raise_error=True)
+
+    envelope = _enqueue_sample(outbox, tenant_id=settings.tenant_id)
+    worker = OutboxWorker(
+        settings=settings,
+        outbox_service=outbox,
+        audit_logger=audit_logger,
+        composio_client=composio,
+    )
+
+    worker.process_once()
+    record = outbox.get(envelope.envelope_id)
+    assert record is not None
+    assert record.status == OutboxStatus.PENDING
+    assert record.attempts == 1
+    assert record.next_run_at is not None
+    assert outbox.list_pending() == ()
+    assert len(composio.executed) == 1
+
+    # Simulate the backoff elapsing (or a restarted worker picking the row up later).
+    for expected_attempts in (2, 3):
+        outbox.defer(envelope.envelope_id, retry_in=0)
+        worker.process_once()
+        assert record.attempts == expected_attempts
+
+    assert record.status == OutboxStatus.DLQ
+    assert len(composio.executed) == 3
+    assert audit_logger.events[-1][0] == OutboxStatus.DLQ
+
+
+def test_worker_records_outcomes_in_trust_ledger(audit_logger) -> None:
+    settings = AppSettings().model_copy(update={"outbox_max_attempts": 1})
+    outbox = InMemoryOutboxService()
+    ledger = InMemoryTrustLedgerService()
+    _enqueue_sample(outbox, tenant_id=settings.tenant_id)
+
+    OutboxWorker(
+        settings=settings,
+        outbox_service=outbox,
+        audit_logger=audit_logger,
+        composio_client=DummyComposioClient(),
+        trust_ledger=ledger,
+    ).process_once()
+
+    failing = Envelope.from_payload(
+        payload={"tool_slug": "GMAIL__drafts.create", "arguments": {}, "external_id": "ext-456"},
+        tenant_id=settings.tenant_id,
+    )
+    outbox.enqueue(failing)
+    OutboxWorker(
+        settings=settings,
+        outbox_service=outbox,
+        audit_logger=audit_logger,
+        composio_client=DummyComposioClient(raise_error=True),
+        trust_ledger=ledger,
+    ).process_once()
+
+    assert [event["kind"] for event in ledger.events] == [TrustEventKind.SUCCEEDED, TrustEventKind.FAILED]
+    score = ledger.get_score(settings.tenant_id)
+    assert score is not None and score.events == 2 and round(score.score, 3) == 0.5
@@ -0,0 +1,107 @@
+"""Tests for the throttled DLQ replay engine."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from agent.schemas.envelope import Envelope
+from agent.services.outbox import InMemoryOutboxService, OutboxStatus
+from agent.services.policy import EffectiveToolPolicy, PolicyService, rate_bucket_gap_seconds
+from worker.outbox import parse_args
+from worker.replay import DlqReplayer, ReplaySelection
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class _BucketPolicies(PolicyService):
+    def __init__(self, buckets: dict[str, str]) -> None:
+        self._buckets = buckets
+
+    def get_effective_policy(self, *, tenant_id: str, tool_slug: str) -> EffectiveToolPolicy | None:
+        bucket = self._buckets.get(tool_slug)
+        return EffectiveToolPolicy(write_allowed=True, rate_bucket=bucket) if bucket else None
+
+
+def _dead_letter(outbox: InMemoryOutboxService, envelope_id: str, tool_slug: str, error: str, tenant_id: str = "tenant-a") -> None:
+    outbox.enqueue(
+        Envelope(
+            envelope_id=envelope_id,
+            tenant_id=tenant_id,
+            tool_slug=tool_slug,
+            arguments={},
+            connected_account_id=None,
+            risk="low",
+            external_id=f"ext-{envelope_id}",
+            created_at=START,
+        )
+    )
+    outbox.mark_failure(envelope_id, error=error, move_to_dlq=True)
+
+
+def _outbox(clock: Callable[[], datetime]) -> InMemoryOutboxService:
+    outbox = InMemoryOutboxService(clock=clock)
+    for index in range(3):
+        _dead_letter(outbox, f"slack-{index}", "SLACK__chat.postMessage", "429 rate limited")
+    _dead_letter(outbox, "mail-0", "GMAIL__send", "429 rate limited")
+    _dead_letter(outbox, "mail-1", "GMAIL__send", "invalid recipient")
+    _dead_letter(outbox, "other-0", "SLACK__chat.postMessage", "429 rate limited", tenant_id="tenant-b")
+    return outbox
+
+
+def test_dry_run_estimates_per_bucket_without_requeueing(clock) -> None:
+    outbox = _outbox(clock)
+    replayer = DlqReplayer(
+        outbox,
+        policy_service=_BucketPolicies({"SLACK__chat.postMessage": "slack.minute", "GMAIL__send": "email.daily"}),
+        clock=clock,
+    )
+
+    plan = replayer.replay(ReplaySelection(tenant_id="tenant-a", error_contains="RATE LIMITED"), dry_run=True)
+
+    assert plan.selected == 4
+    assert plan.requeued == 0
+    assert plan.by_bucket == {"slack.minute": 3, "email.daily": 1}
+    assert plan.estimated_seconds == 2 * rate_bucket_gap_seconds("slack.minute")
+    assert outbox.count(status=OutboxStatus.DLQ) == 6
+
+
+def test_replay_staggers_next_run_at_within_each_bucket(clock) -> None:
+    outbox = _outbox(clock)
+    replayer = DlqReplayer(
+        outbox,
+        policy_service=_BucketPolicies({"SLACK__chat.postMessage": "slack.minute"}),
+        throughput_per_second=10.0,
+        clock=clock,
+    )
+
+    plan = replayer.replay(ReplaySelection(tenant_id="tenant-a", tool_slug="SLACK__chat.postMessage"))
+
+    gap = timedelta(seconds=rate_bucket_gap_seconds("slack.minute"))
+    assert plan.requeued == 3
+    assert [outbox.get(f"slack-{index}").next_run_at for index in range(3)] == [START, START + gap, START + 2 * gap]
+    assert [record.envelope.envelope_id for record in outbox.list_pending()] == ["slack-0"]
+    assert outbox.count(status=OutboxStatus.DLQ) == 3
+
+
+def test_replay_filters_by_queue_window_and_falls_back_to_throughput_estimate(clock) -> None:
+    outbox = _outbox(clock)
+    replayer = DlqReplayer(outbox, throughput_per_second=0.5, clock=clock)
+
+    tomorrow = datetime.now(timezone.utc) + timedelta(days=1)
+    empty = replayer.replay(ReplaySelection(queued_after=tomorrow), dry_run=True)
+    everything = replayer.replay(ReplaySelection(queued_before=tomorrow), dry_run=True)
+
+    assert empty.selected == 0
+    assert everything.selected == 6
+    assert everything.by_bucket == {"-": 6}
+    assert everything.estimated_seconds == 12.0
+
+
+def test_replay_cli_parses_filters() -> None:
+    args = parse_args(["replay", "--tool", "GMAIL__send", "--since", "2025-01-01T00:00:00", "--dry-run"])
+
+    assert args.command == "replay"
+    assert args.tool == "GMAIL__send"
+    assert args.since == START
+    assert args.dry_run is True
@@ -0,0 +1,132 @@
+"""AIMD controller for the outbox worker's claim batch size and poll cadence."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+from worker.metrics import WorkerMetrics
+
+
+class BatchDecision:
+    """Enumeration of controller decisions (also used as metric labels)."""
+
+    INCREASE = "increase"
+    DECREASE = "decrease"
+    BACKOFF = "backoff"
+    HOLD = "hold"
+
+
+@dataclass(slots=True)
+class BatchOutcome:
+    """Summary of one claim cycle fed back into the controller.
+
+    `deferred` counts rate-bucket deferrals only; envelopes skipped because their
+    toolkit's circuit is open are counted in `circuit_open` and do not trigger a backoff.
+    """
+
+    claimed: int
+    executed: int = 0
+    errors: int = 0
+    deferred: int = 0
+    circuit_open: int = 0
+    latency_seconds: Optional[float] = None
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.executed if self.executed else 0.0
+
+    @property
+    def defer_ratio(self) -> float:
+        return self.deferred / self.claimed if self.claimed else 0.0
+
+
+class AdaptiveBatchController:
+    """Additive-increase / multiplicative-decrease control of the claim batch.
+
+    The batch grows by `increase_step` while the queue keeps filling whole batches and
+    Composio latency and error rates are healthy. It is cut by `decrease_factor` when
+    latency exceeds the target or errors climb. When too many claimed envelopes are being
+    deferred by rate buckets the batch is cut and the poll interval doubles (up to
+    `max_poll_interval`) so the worker stops spinning on rows it cannot send yet.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 50,
+        increase_step: int = 1,
+        decrease_factor: float = 0.5,
+        latency_target_seconds: float = 5.0,
+        error_rate_threshold: float = 0.2,
+        defer_ratio_threshold: float = 0.5,
+        poll_interval: float = 5.0,
+        max_poll_interval: float = 60.0,
+        metrics: WorkerMetrics | None = None,
+    ) -> None:
+        self._minimum = max(1, minimum)
+        self._maximum = max(self._minimum, maximum)
+        self._increase_step = max(1, increase_step)
+        self._decrease_factor = min(max(decrease_factor, 0.05), 0.95)
+        self._latency_target = latency_target_seconds
+        self._error_threshold = error_rate_threshold
+        self._defer_threshold = defer_ratio_threshold
+        self._base_poll = max(0.0, poll_interval)
+        self._max_poll = max(self._base_poll, max_poll_interval)
+        self._metrics = metrics
+        self._batch_size = self._clamp(initial)
+        self._poll_interval = self._base_poll
+        self._publish(None)
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @property
+    def poll_interval(self) -> float:
+        return self._poll_interval
+
+    def record(self, outcome: BatchOutcome) -> str:
+        """Update the controller from a finished cycle and return the decision taken."""
+
+        if outcome.claimed and outcome.defer_ratio > self._defer_threshold:
+            decision = BatchDecision.BACKOFF
+            self._batch_size = self._decrease(self._batch_size)
+            self._poll_interval = min(self._max_poll, max(self._poll_interval * 2, 1.0))
+        elif outcome.executed and (
+            outcome.error_rate > self._error_threshold
+            or (outcome.latency_seconds is not None and outcome.latency_seconds > self._latency_target)
+        ):
+            decision = BatchDecision.DECREASE
+            self._batch_size = self._decrease(self._batch_size)
+            self._poll_interval = self._base_poll
+        elif outcome.claimed >= self._batch_size:
+            decision = BatchDecision.INCREASE
+            self._batch_size = self._clamp(self._batch_size + self._increase_step)
+            self._poll_interval = self._base_poll
+        else:
+            decision = BatchDecision.HOLD
+            self._poll_interval = self._base_poll
+
+        self._publish(decision, outcome)
+        return decision
+
+    def _decrease(self, value: int) -> int:
+        return self._clamp(math.floor(value * self._decrease_factor))
+
+    def _clamp(self, value: int) -> int:
+        return max(self._minimum, min(self._maximum, int(value)))
+
+    def _publish(self, decision: Optional[str], outcome: Optional[BatchOutcome] = None) -> None:
+        if self._metrics is None:
+            return
+        self._metrics.set_gauge("outbox_batch_size", self._batch_size)
+        self._metrics.set_gauge("outbox_poll_interval_seconds", self._poll_interval)
+        if decision is not None:
+            self._metrics.incr("outbox_batch_decisions", decision=decision)
+        if outcome is not None:
+            self._metrics.set_gauge("outbox_batch_error_rate", outcome.error_rate)
+            self._metrics.set_gauge("outbox_batch_defer_ratio", outcome.defer_ratio)
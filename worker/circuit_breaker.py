@@ -0,0 +1,146 @@
+"""Per-toolkit circuit breakers for Composio execution."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from worker.metrics import WorkerMetrics
+
+
+class BreakerState:
+    """Enumeration of breaker states (also used as metric labels)."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+_STATE_GAUGE = {BreakerState.CLOSED: 0, BreakerState.HALF_OPEN: 1, BreakerState.OPEN: 2}
+
+
+def toolkit_for(tool_slug: str) -> str:
+    """Return the toolkit prefix of a Composio slug (`SLACK__chat.postMessage` -> `SLACK`)."""
+
+    toolkit, _, _ = tool_slug.partition("__")
+    return (toolkit or tool_slug).upper()
+
+
+@dataclass(slots=True)
+class _Breaker:
+    state: str = BreakerState.CLOSED
+    failures: int = 0
+    opened_at: float = 0.0
+    probe_in_flight: bool = False
+
+
+class CircuitBreakerRegistry:
+    """Closed / open / half-open breakers keyed by toolkit, shared across worker threads.
+
+    A toolkit opens after `failure_threshold` consecutive failures. While open, `allow`
+    returns False so callers can defer envelopes without calling the provider. Once
+    `reset_timeout_seconds` has elapsed the breaker goes half-open and admits exactly one
+    probe: success closes it, failure re-opens it for another timeout.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        metrics: WorkerMetrics | None = None,
+    ) -> None:
+        self._failure_threshold = max(1, failure_threshold)
+        self._reset_timeout = max(0.0, reset_timeout_seconds)
+        self._clock = clock
+        self._metrics = metrics
+        self._lock = threading.Lock()
+        self._breakers: dict[str, _Breaker] = {}
+
+    def allow(self, tool_slug: str) -> bool:
+        """Return True when a call for `tool_slug` may proceed."""
+
+        toolkit = toolkit_for(tool_slug)
+        with self._lock:
+            breaker = self._breakers.get(toolkit)
+            if breaker is None or breaker.state == BreakerState.CLOSED:
+                return True
+            if breaker.state == BreakerState.OPEN:
+                if self._clock() - breaker.opened_at < self._reset_timeout:
+                    self._reject(toolkit)
+                    return False
+                self._transition(toolkit, breaker, BreakerState.HALF_OPEN)
+            if breaker.probe_in_flight:
+                self._reject(toolkit)
+                return False
+            breaker.probe_in_flight = True
+            return True
+
+    def retry_after(self, tool_slug: str) -> float:
+        """Seconds until an open breaker for `tool_slug` will admit a probe."""
+
+        toolkit = toolkit_for(tool_slug)
+        with self._lock:
+            breaker = self._breakers.get(toolkit)
+            if breaker is None or breaker.state == BreakerState.CLOSED:
+                return 0.0
+            if breaker.state == BreakerState.HALF_OPEN:
+                return self._reset_timeout
+            return max(0.0, self._reset_timeout - (self._clock() - breaker.opened_at))
+
+    def record_success(self, tool_slug: str) -> None:
+        toolkit = toolkit_for(tool_slug)
+        with self._lock:
+            breaker = self._breakers.get(toolkit)
+            if breaker is None:
+                return
+            breaker.failures = 0
+            breaker.probe_in_flight = False
+            if breaker.state != BreakerState.CLOSED:
+                self._transition(toolkit, breaker, BreakerState.CLOSED)
+
+    def release(self, tool_slug: str) -> None:
+        """Free a half-open probe slot without recording an outcome (idempotent)."""
+
+        toolkit = toolkit_for(tool_slug)
+        with self._lock:
+            breaker = self._breakers.get(toolkit)
+            if breaker is not None:
+                breaker.probe_in_flight = False
+
+    def record_failure(self, tool_slug: str) -> None:
+        toolkit = toolkit_for(tool_slug)
+        with self._lock:
+            breaker = self._breakers.setdefault(toolkit, _Breaker())
+            breaker.failures += 1
+            breaker.probe_in_flight = False
+            if breaker.state == BreakerState.HALF_OPEN or (
+                breaker.state == BreakerState.CLOSED and breaker.failures >= self._failure_threshold
+            ):
+                breaker.opened_at = self._clock()
+                self._transition(toolkit, breaker, BreakerState.OPEN)
+
+    def state(self, tool_slug: str) -> str:
+        toolkit = toolkit_for(tool_slug)
+        with self._lock:
+            breaker = self._breakers.get(toolkit)
+            return breaker.state if breaker is not None else BreakerState.CLOSED
+
+    def snapshot(self) -> dict[str, str]:
+        with self._lock:
+            return {toolkit: breaker.state for toolkit, breaker in self._breakers.items()}
+
+    def _transition(self, toolkit: str, breaker: _Breaker, state: str) -> None:
+        breaker.state = state
+        if self._metrics is None:
+            return
+        self._metrics.set_gauge("outbox_circuit_state", _STATE_GAUGE[state], toolkit=toolkit)
+        self._metrics.incr("outbox_circuit_transitions", toolkit=toolkit, state=state)
+
+    def _reject(self, toolkit: str) -> None:
+        if self._metrics is not None:
+            self._metrics.incr("outbox_circuit_rejected", toolkit=toolkit)
+
@@ -0,0 +1,115 @@
+"""Weighted fair-share selection of outbox records across tenants."""
+
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from typing import Deque, Mapping, Optional, Sequence
+
+from agent.services.outbox import OutboxRecord
+
+
+FlowKey = tuple[str, Optional[str]]
+
+
+class FairShareScheduler:
+    """Deficit round robin over per-tenant (optionally per-employee) flows.
+
+    Each flow earns its weight in credits per round and spends one credit per record it
+    is allowed to send. Weights come from the tenant plan, so an enterprise tenant gets a
+    larger share of every claim cycle without being able to starve a free tenant.
+    Deficits of flows that remain backlogged carry over between cycles.
+    """
+
+    def __init__(
+        self,
+        *,
+        plan_weights: Mapping[str, float] | None = None,
+        default_weight: float = 1.0,
+        by_employee: bool = False,
+    ) -> None:
+        self._plan_weights = {str(plan).lower(): float(weight) for plan, weight in (plan_weights or {}).items()}
+        self._default_weight = max(float(default_weight), 0.01)
+        self._by_employee = by_employee
+        self._deficits: dict[FlowKey, float] = {}
+        self._rotation = 0
+
+    def weight_for(self, plan: Optional[str]) -> float:
+        if plan is None:
+            return self._default_weight
+        weight = self._plan_weights.get(str(plan).lower(), self._default_weight)
+        return max(weight, 0.01)
+
+    def select(
+        self,
+        candidates: Sequence[OutboxRecord],
+        *,
+        limit: int,
+        plans: Mapping[str, str] | None = None,
+    ) -> tuple[OutboxRecord, ...]:
+        """Pick up to `limit` records from `candidates` honouring plan weights."""
+
+        if limit <= 0 or not candidates:
+            return ()
+
+        flows: "OrderedDict[FlowKey, Deque[OutboxRecord]]" = OrderedDict()
+        for record in candidates:
+            flows.setdefault(self._flow_key(record), deque()).append(record)
+
+        flows = self._rotate(flows)
+        weights = self._flow_weights(flows, plans or {})
+        # Forget deficits for flows that are no longer backlogged.
+        self._deficits = {key: value for key, value in self._deficits.items() if key in flows}
+
+        selected: list[OutboxRecord] = []
+        while flows and len(selected) < limit:
+            for key in list(flows):
+                queue = flows[key]
+                deficit = self._deficits.get(key, 0.0) + weights[key]
+                while queue and deficit >= 1.0 and len(selected) < limit:
+                    selected.append(queue.popleft())
+                    deficit -= 1.0
+                if not queue:
+                    flows.pop(key)
+                    self._deficits.pop(key, None)
+                else:
+                    self._deficits[key] = deficit
+                if len(selected) >= limit:
+                    break
+
+        self._rotation += 1
+        return tuple(selected)
+
+    def _flow_key(self, record: OutboxRecord) -> FlowKey:
+        if not self._by_employee:
+            return (record.tenant_id, None)
+        metadata = record.envelope.metadata if isinstance(record.envelope.metadata, Mapping) else {}
+        employee = metadata.get("employee_id")
+        return (record.tenant_id, str(employee) if employee else None)
+
+    def _flow_weights(
+        self,
+        flows: Mapping[FlowKey, Deque[OutboxRecord]],
+        plans: Mapping[str, str],
+    ) -> dict[FlowKey, float]:
+        flows_per_tenant: dict[str, int] = {}
+        for tenant_id, _employee in flows:
+            flows_per_tenant[tenant_id] = flows_per_tenant.get(tenant_id, 0) + 1
+
+        weights: dict[FlowKey, float] = {}
+        for key in flows:
+            tenant_id = key[0]
+            # Employees split their tenant's share so adding employees never buys extra throughput.
+            weights[key] = self.weight_for(plans.get(tenant_id)) / flows_per_tenant[tenant_id]
+        return weights
+
+    def _rotate(
+        self,
+        flows: "OrderedDict[FlowKey, Deque[OutboxRecord]]",
+    ) -> "OrderedDict[FlowKey, Deque[OutboxRecord]]":
+        # Start each cycle at a different flow so ties don't always favour the oldest tenant.
+        if len(flows) < 2:
+            return flows
+        keys = list(flows)
+        offset = self._rotation % len(keys)
+        ordered = keys[offset:] + keys[:offset]
+        return OrderedDict((key, flows[key]) for key in ordered)
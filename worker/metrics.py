@@ -0,0 +1,133 @@
+"""In-process metrics registry for the outbox worker."""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: Mapping[str, Any]) -> LabelKey:
+    return tuple(sorted((str(key), str(value)) for key, value in labels.items() if value is not None))
+
+
+@dataclass(slots=True)
+class Summary:
+    """Running count/sum/max for an observed value."""
+
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class WorkerMetrics:
+    """Thread-safe counters, gauges, and summaries keyed by name and labels.
+
+    The registry is intentionally small: values are logged by the worker loop and can be
+    rendered in Prometheus text format for scraping via a sidecar.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, LabelKey], float] = {}
+        self._gauges: dict[tuple[str, LabelKey], float] = {}
+        self._summaries: dict[tuple[str, LabelKey], Summary] = {}
+
+    def incr(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._gauges[key] = float(value)
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = Summary()
+            summary.observe(float(value))
+
+    def counter(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0.0)
+
+    def gauge(self, name: str, **labels: Any) -> float | None:
+        with self._lock:
+            return self._gauges.get((name, _label_key(labels)))
+
+    def summary(self, name: str, **labels: Any) -> Summary | None:
+        with self._lock:
+            summary = self._summaries.get((name, _label_key(labels)))
+            if summary is None:
+                return None
+            return Summary(count=summary.count, total=summary.total, maximum=summary.maximum)
+
+    def snapshot(self) -> Mapping[str, Any]:
+        """Return a JSON-serialisable view of every metric."""
+
+        with self._lock:
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self._counters.items()
+                ],
+                "gauges": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self._gauges.items()
+                ],
+                "summaries": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "count": summary.count,
+                        "sum": round(summary.total, 6),
+                        "max": round(summary.maximum, 6),
+                    }
+                    for (name, labels), summary in self._summaries.items()
+                ],
+            }
+
+    def render_prometheus(self) -> str:
+        """Render the registry using the Prometheus text exposition format."""
+
+        lines: list[str] = []
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(f"{name}_total{_format_labels(labels)} {value}")
+            for (name, labels), value in sorted(self._gauges.items()):
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+            for (name, labels), summary in sorted(self._summaries.items(), key=lambda item: item[0]):
+                lines.append(f"{name}_count{_format_labels(labels)} {summary.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {summary.total}")
+                lines.append(f"{name}_max{_format_labels(labels)} {summary.maximum}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+def _format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    rendered = ",".join(f'{key}="{value}"' for key, value in labels)
+    return "{" + rendered + "}"
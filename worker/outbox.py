@@ -3,34 +3,50 @@
 from __future__ import annotations
 
 import argparse
+import math
+import random
 import signal
 import sys
 import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from typing import Any, Mapping, Optional, Sequence
 
 import structlog
-from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 from agent.schemas.envelope import Envelope
 from agent.services import (
     AppSettings,
     ActionsService,
+    ChangeFeed,
+    InvalidationBus,
     OutboxService,
     OutboxStatus,
+    PayloadIntegrityError,
+    PayloadOffloader,
+    PayloadStoreError,
     PolicyService,
     SupabaseAuditLogger,
     SupabaseNotConfiguredError,
     SupabaseOutboxService,
+    SupabaseTenantPlanService,
+    SupabaseTrustLedgerService,
+    TenantPlanService,
+    TrustEventKind,
+    TrustLedgerService,
+    build_change_feed,
+    build_payload_offloader,
+    get_composio_client,
     get_settings,
     get_supabase_client,
+    register_cache_handlers,
 )
-
-try:  # pragma: no cover - optional dependency during tests
-    from composio import Composio
-    from composio_google_adk import GoogleAdkProvider
-except ImportError:  # pragma: no cover - graceful degradation when Composio not available
-    Composio = None  # type: ignore[assignment]
-    GoogleAdkProvider = None  # type: ignore[assignment]
+from agent.services.policy import rate_bucket_gap_seconds
+from worker.adaptive import AdaptiveBatchController, BatchDecision, BatchOutcome
+from worker.circuit_breaker import CircuitBreakerRegistry
+from worker.fair_share import FairShareScheduler
+from worker.metrics import WorkerMetrics
+from worker.replay import DlqReplayer, ReplayPlan, ReplaySelection
 
 
 logger = structlog.get_logger("outbox.worker")
@@ -40,8 +56,18 @@ class OutboxConflictError(RuntimeError):
     """Raised when Composio reports a provider conflict (HTTP 409)."""
 
 
-def _should_retry(exception: BaseException) -> bool:
-    return not isinstance(exception, OutboxConflictError)
+DEFERRED = "deferred"
+CIRCUIT_OPEN = "circuit_open"
+RETRY_SCHEDULED = "retry_scheduled"
+PAYLOAD_UNAVAILABLE = "payload_unavailable"
+
+
+@dataclass(slots=True)
+class RecordOutcome:
+    """Result of processing a single claimed record."""
+
+    status: str
+    latency_seconds: Optional[float] = None
 
 
 class OutboxWorker:
@@ -56,6 +82,12 @@ class OutboxWorker:
         composio_client: Any | None,
         policy_service: PolicyService | None = None,
         actions_service: ActionsService | None = None,
+        tenant_plans: TenantPlanService | None = None,
+        metrics: WorkerMetrics | None = None,
+        circuit_breakers: CircuitBreakerRegistry | None = None,
+        trust_ledger: TrustLedgerService | None = None,
+        payloads: PayloadOffloader | None = None,
+        change_feed: ChangeFeed | None = None,
     ) -> None:
         self._settings = settings
         self._outbox = outbox_service
@@ -64,9 +96,53 @@ class OutboxWorker:
         self._poll_interval = settings.outbox_poll_interval_seconds
         self._batch_size = settings.outbox_batch_size
         self._max_attempts = max(1, settings.outbox_max_attempts)
+        self._retry_base = max(1, settings.outbox_retry_base_seconds)
+        self._retry_max = max(self._retry_base, settings.outbox_retry_max_seconds)
         self._policy = policy_service
         self._actions = actions_service
+        self._trust = trust_ledger
+        self._payloads = payloads
+        self._change_feed = change_feed
         self._rate_last_sent: dict[str, float] = {}
+        self._tenant_plans = tenant_plans
+        self._metrics = metrics or WorkerMetrics()
+        self._fair_share = (
+            FairShareScheduler(
+                plan_weights=settings.outbox_plan_weights,
+                by_employee=settings.outbox_fair_share_by_employee,
+            )
+            if settings.outbox_fair_share_enabled
+            else None
+        )
+        self._controller = (
+            AdaptiveBatchController(
+                initial=settings.outbox_batch_size,
+                minimum=settings.outbox_batch_min,
+                maximum=settings.outbox_batch_max,
+                increase_step=settings.outbox_aimd_increase_step,
+                decrease_factor=settings.outbox_aimd_decrease_factor,
+                latency_target_seconds=settings.outbox_latency_target_seconds,
+                error_rate_threshold=settings.outbox_error_rate_threshold,
+                defer_ratio_threshold=settings.outbox_defer_ratio_threshold,
+                poll_interval=settings.outbox_poll_interval_seconds,
+                max_poll_interval=settings.outbox_poll_interval_max_seconds,
+                metrics=self._metrics,
+            )
+            if settings.outbox_adaptive_batching
+            else None
+        )
+        self._last_decision: Optional[str] = None
+        if circuit_breakers is None and settings.outbox_circuit_breaker_enabled:
+            circuit_breakers = CircuitBreakerRegistry(
+                failure_threshold=settings.outbox_circuit_failure_threshold,
+                reset_timeout_seconds=settings.outbox_circuit_reset_seconds,
+                metrics=self._metrics,
+            )
+        self._breakers = circuit_breakers
+
+    @property
+    def metrics(self) -> WorkerMetrics:
+        return self._metrics
 
     def run_forever(self) -> None:
         logger.info("worker.start", poll_interval=self._poll_interval)
@@ -80,40 +156,107 @@ class OutboxWorker:
         signal.signal(signal.SIGINT, _handle_signal)
         signal.signal(signal.SIGTERM, _handle_signal)
 
-        while not stop:
-            processed = self.process_once()
-            if processed == 0:
-                time.sleep(self._poll_interval)
+        if self._change_feed is not None:
+            self._change_feed.start()
+        last_metrics_log = time.monotonic()
+        try:
+            while not stop:
+                processed = self.process_once()
+                if time.monotonic() - last_metrics_log >= self._settings.outbox_metrics_log_interval_seconds:
+                    logger.info("worker.metrics", **self._metrics.snapshot())
+                    last_metrics_log = time.monotonic()
+                if processed == 0 or self._last_decision == BatchDecision.BACKOFF:
+                    time.sleep(self._current_poll_interval())
+        finally:
+            if self._change_feed is not None:
+                self._change_feed.stop()
 
         logger.info("worker.stopped")
 
     def process_once(self) -> int:
-        records = self._outbox.list_pending(limit=self._batch_size)
-        count = 0
+        records = self._claim_batch()
+        outcome = BatchOutcome(claimed=len(records))
+        latencies: list[float] = []
         for record in records:
-            self._process_record(record)
-            count += 1
-        return count
+            self._observe_queue_wait(record)
+            result = self._process_record(record)
+            if result.status == DEFERRED:
+                outcome.deferred += 1
+            elif result.status == CIRCUIT_OPEN:
+                # One unhealthy toolkit must not slow the worker down for everyone else.
+                outcome.circuit_open += 1
+            elif result.latency_seconds is not None:
+                outcome.executed += 1
+                latencies.append(result.latency_seconds)
+                if result.status not in (OutboxStatus.SUCCESS, OutboxStatus.CONFLICT):
+                    outcome.errors += 1
+        if latencies:
+            outcome.latency_seconds = sum(latencies) / len(latencies)
+
+        if self._controller is not None:
+            self._last_decision = self._controller.record(outcome)
+            if self._controller.batch_size != self._batch_size:
+                logger.info(
+                    "worker.batch_resized",
+                    decision=self._last_decision,
+                    previous=self._batch_size,
+                    batch_size=self._controller.batch_size,
+                )
+            self._batch_size = self._controller.batch_size
+        return outcome.claimed
+
+    def _current_poll_interval(self) -> float:
+        if self._controller is not None:
+            return self._controller.poll_interval
+        return self._poll_interval
+
+    def _claim_batch(self) -> Sequence[Any]:
+        if self._fair_share is None:
+            return self._outbox.list_pending(limit=self._batch_size)
+
+        window = self._batch_size * max(1, self._settings.outbox_fair_share_window)
+        candidates = self._outbox.list_pending_fair(per_tenant=self._batch_size, limit=window)
+        if not candidates:
+            return ()
+
+        plans: Mapping[str, str] = {}
+        if self._tenant_plans is not None:
+            try:
+                plans = self._tenant_plans.get_plans({record.tenant_id for record in candidates})
+            except Exception:  # pragma: no cover - fall back to equal weights
+                logger.warning("worker.tenant_plans_unavailable")
+        return self._fair_share.select(candidates, limit=self._batch_size, plans=plans)
+
+    def _observe_queue_wait(self, record) -> None:
+        ready_at = record.next_run_at or record.queued_at
+        wait = max(0.0, (datetime.now(timezone.utc) - ready_at).total_seconds())
+        self._metrics.observe("outbox_queue_wait_seconds", wait, tenant_id=record.tenant_id)
+        self._metrics.incr("outbox_claimed", tenant_id=record.tenant_id)
 
     def status(self, *, tenant_id: Optional[str] = None) -> Mapping[str, int]:
-        pending = self._outbox.list_pending(tenant_id=tenant_id, limit=1000)
-        dlq = self._outbox.list_dlq(tenant_id=tenant_id, limit=1000)
         stats = {
-            "pending": len(pending),
-            "dlq": len(dlq),
+            "pending": self._outbox.count(status=OutboxStatus.PENDING, tenant_id=tenant_id),
+            "dlq": self._outbox.count(status=OutboxStatus.DLQ, tenant_id=tenant_id),
         }
         logger.info("worker.status", tenant_id=tenant_id, **stats)
         return stats
 
     def drain_dlq(self, *, tenant_id: Optional[str], limit: int) -> int:
-        drained = 0
-        records = self._outbox.list_dlq(tenant_id=tenant_id, limit=limit)
-        for record in records:
-            if self._outbox.requeue_from_dlq(record.envelope.envelope_id):
-                drained += 1
+        summaries = self._outbox.list_summaries(status=OutboxStatus.DLQ, tenant_id=tenant_id, limit=limit)
+        drained = self._outbox.requeue_many_from_dlq([summary.envelope_id for summary in summaries])
         logger.info("worker.drain", tenant_id=tenant_id, drained=drained)
         return drained
 
+    def replay_dlq(self, selection: ReplaySelection, *, dry_run: bool = False) -> ReplayPlan:
+        """Requeue matching DLQ envelopes, staggered per rate bucket (see `worker.replay`)."""
+
+        replayer = DlqReplayer(
+            self._outbox,
+            policy_service=self._policy,
+            throughput_per_second=self._batch_size / max(self._poll_interval, 1),
+        )
+        return replayer.replay(selection, dry_run=dry_run)
+
     def retry_dlq(self, *, tenant_id: str, envelope_id: str) -> bool:
         record = self._outbox.requeue_from_dlq(envelope_id)
         if record is None:
@@ -122,7 +265,7 @@ class OutboxWorker:
         logger.info("worker.retry_dlq", tenant_id=tenant_id, envelope_id=envelope_id)
         return True
 
-    def _process_record(self, record) -> None:
+    def _process_record(self, record) -> RecordOutcome:
         envelope_id = record.envelope.envelope_id
         # Policy gate: allowed writes?
         policy = None
@@ -139,7 +282,7 @@ class OutboxWorker:
                     metadata={"error": reason},
                 )
                 logger.warning("worker.writes_disabled", envelope_id=envelope_id)
-                return
+                return RecordOutcome(OutboxStatus.FAILED)
 
         # Rate limiting per bucket (simple defer based on last sent timestamps)
         bucket = None
@@ -154,8 +297,36 @@ class OutboxWorker:
                 # Defer without failure; keep status pending with a next_run_at
                 self._outbox.defer(envelope_id, retry_in=int(wait_for))
                 logger.info("worker.defer_rate_bucket", envelope_id=envelope_id, rate_bucket=rate_bucket, retry_in=int(wait_for))
-                return
+                self._metrics.incr("outbox_deferred", reason="rate_bucket", rate_bucket=rate_bucket)
+                return RecordOutcome(DEFERRED)
+
+        # Load offloaded arguments before admission: a payload store outage says nothing
+        # about the toolkit, so it must neither trip the breaker nor spend attempts.
+        try:
+            arguments = self._resolve_arguments(record)
+        except PayloadStoreError as exc:
+            return self._payload_unavailable(record, exc)
+
+        # Fail fast while the toolkit's circuit is open; half-open admits a single probe
+        tool_slug = record.envelope.tool_slug
+        if self._breakers is not None and not self._breakers.allow(tool_slug):
+            retry_in = max(1, math.ceil(self._breakers.retry_after(tool_slug)))
+            self._outbox.defer(envelope_id, retry_in=retry_in)
+            logger.info("worker.defer_circuit_open", envelope_id=envelope_id, tool=tool_slug, retry_in=retry_in)
+            self._metrics.incr("outbox_deferred", reason="circuit_open", tool_slug=tool_slug)
+            return RecordOutcome(CIRCUIT_OPEN)
 
+        try:
+            return self._execute_admitted(record, rate_bucket, arguments)
+        finally:
+            # Outcomes already settle the breaker; this frees a half-open probe when
+            # anything between admission and the outcome raised.
+            if self._breakers is not None:
+                self._breakers.release(tool_slug)
+
+    def _execute_admitted(self, record, rate_bucket: Optional[str], arguments: dict[str, Any]) -> RecordOutcome:
+        envelope_id = record.envelope.envelope_id
+        tool_slug = record.envelope.tool_slug
         self._outbox.mark_in_progress(envelope_id)
         logger.info(
             "worker.process",
@@ -163,9 +334,12 @@ class OutboxWorker:
             tool=record.envelope.tool_slug,
             tenant=record.tenant_id,
         )
+        started = time.perf_counter()
         try:
-            result = self._execute_with_retry(record)
+            result = self._execute_once(record, arguments)
         except OutboxConflictError as exc:
+            # A 409 is a well-formed provider answer, so it counts as a healthy call
+            self._record_breaker(tool_slug, healthy=True)
             reason = str(exc)
             self._outbox.mark_conflict(envelope_id, reason=reason)
             self._audit.log_envelope(
@@ -176,8 +350,23 @@ class OutboxWorker:
                 metadata={"reason": reason},
             )
             logger.warning("worker.conflict", envelope_id=envelope_id, reason=reason)
-        except Exception as exc:  # pragma: no cover - defensive path
+            return self._finish(record, OutboxStatus.CONFLICT, started)
+        except Exception as exc:
+            self._record_breaker(tool_slug, healthy=False)
             reason = str(exc)
+            attempts = record.attempts + 1
+            if attempts < self._max_attempts:
+                retry_in = self._retry_delay(attempts)
+                self._outbox.mark_failure(envelope_id, error=reason, retry_in=retry_in, move_to_dlq=False)
+                logger.warning(
+                    "worker.retry_scheduled",
+                    envelope_id=envelope_id,
+                    attempts=attempts,
+                    max_attempts=self._max_attempts,
+                    retry_in=retry_in,
+                    error=reason,
+                )
+                return self._finish(record, RETRY_SCHEDULED, started)
             self._outbox.mark_failure(
                 envelope_id,
                 error=reason,
@@ -189,10 +378,13 @@ class OutboxWorker:
                 envelope_id=envelope_id,
                 tool_slug=record.envelope.tool_slug,
                 status=OutboxStatus.DLQ,
-                metadata={"error": reason},
+                metadata={"error": reason, "attempts": attempts},
             )
-            logger.exception("worker.failure", envelope_id=envelope_id)
+            logger.exception("worker.failure", envelope_id=envelope_id, attempts=attempts)
+            self._record_trust(record, TrustEventKind.FAILED)
+            return self._finish(record, OutboxStatus.DLQ, started)
         else:
+            self._record_breaker(tool_slug, healthy=True)
             metadata = result if isinstance(result, Mapping) else {"result": result}
             self._outbox.mark_success(envelope_id, result=metadata)
             # Project into actions history for analytics
@@ -209,18 +401,81 @@ class OutboxWorker:
                 metadata=metadata,
             )
             logger.info("worker.success", envelope_id=envelope_id)
+            self._record_trust(record, TrustEventKind.SUCCEEDED)
             # Update last-sent for this bucket
             if rate_bucket:
                 self._rate_last_sent[rate_bucket] = time.time()
+            return self._finish(record, OutboxStatus.SUCCESS, started)
+
+    def _record_breaker(self, tool_slug: str, *, healthy: bool) -> None:
+        if self._breakers is None:
+            return
+        if healthy:
+            self._breakers.record_success(tool_slug)
+        else:
+            self._breakers.record_failure(tool_slug)
 
-    def _execute_once(self, record) -> Mapping[str, Any] | Any:
+    def _record_trust(self, record, kind: str) -> None:
+        if self._trust is None:
+            return
+        metadata = record.envelope.metadata if isinstance(record.envelope.metadata, Mapping) else {}
+        employee_id = metadata.get("employee_id")
+        try:
+            self._trust.record_event(
+                record.tenant_id,
+                kind,
+                employee_id=str(employee_id) if employee_id else None,
+                envelope_id=record.envelope.envelope_id,
+            )
+        except Exception:  # pragma: no cover - don't block outcomes on the trust ledger
+            logger.warning("worker.trust_ledger_failed", envelope_id=record.envelope.envelope_id, kind=kind)
+
+    def _finish(self, record, status: str, started: float) -> RecordOutcome:
+        latency = time.perf_counter() - started
+        self._metrics.observe("outbox_execute_seconds", latency, tool_slug=record.envelope.tool_slug)
+        self._metrics.incr("outbox_processed", status=status, tenant_id=record.tenant_id)
+        return RecordOutcome(status, latency)
+
+    def _resolve_arguments(self, record) -> dict[str, Any]:
+        # The one copy between fetch and execution: Composio rewrites file-upload
+        # arguments in place, so it gets its own dict (offloaded arguments are decoded
+        # straight into one).
+        if self._payloads is not None:
+            return self._payloads.resolve(record.envelope.arguments)
+        return dict(record.envelope.arguments)
+
+    def _payload_unavailable(self, record, exc: PayloadStoreError) -> RecordOutcome:
+        envelope_id = record.envelope.envelope_id
+        reason = str(exc)
+        if isinstance(exc, PayloadIntegrityError):
+            # Retrying cannot repair a corrupt payload, so park it for an operator.
+            self._outbox.mark_failure(envelope_id, error=reason, retry_in=None, move_to_dlq=True)
+            self._audit.log_envelope(
+                tenant_id=record.tenant_id,
+                envelope_id=envelope_id,
+                tool_slug=record.envelope.tool_slug,
+                status=OutboxStatus.DLQ,
+                metadata={"error": reason},
+            )
+            logger.error("worker.payload_corrupt", envelope_id=envelope_id, error=reason)
+            self._metrics.incr("outbox_payload_unavailable", reason="corrupt")
+            return RecordOutcome(OutboxStatus.DLQ)
+        # The store is unreachable or the object is missing: try again later without
+        # touching `attempts`, which count toolkit executions.
+        retry_in = self._retry_delay(record.attempts + 1)
+        self._outbox.defer(envelope_id, retry_in=retry_in)
+        logger.warning("worker.payload_unavailable", envelope_id=envelope_id, retry_in=retry_in, error=reason)
+        self._metrics.incr("outbox_payload_unavailable", reason="store")
+        return RecordOutcome(PAYLOAD_UNAVAILABLE)
+
+    def _execute_once(self, record, arguments: dict[str, Any]) -> Mapping[str, Any] | Any:
         if self._composio is None:
             raise RuntimeError("Composio client is not configured")
 
         kwargs: dict[str, Any] = {
             "user_id": record.tenant_id,
             "tool_slug": record.envelope.tool_slug,
-            "arguments": dict(record.envelope.arguments),
+            "arguments": arguments,
             "external_id": record.envelope.external_id,
         }
         if record.envelope.connected_account_id:
@@ -233,30 +488,23 @@ class OutboxWorker:
                 raise OutboxConflictError(str(exc)) from exc
             raise
 
-    def _execute_with_retry(self, record):
-        @retry(
-            reraise=True,
-            retry=retry_if_exception(_should_retry),
-            stop=stop_after_attempt(self._max_attempts),
-            wait=wait_exponential(multiplier=1, min=1, max=30),
-        )
-        def _runner():
-            return self._execute_once(record)
+    def _retry_delay(self, attempts: int) -> int:
+        """Return a jittered exponential backoff (seconds) for the given attempt count.
 
-        return _runner()
+        The delay is persisted as `next_run_at`, so the worker moves straight on to the
+        next envelope instead of sleeping, and the schedule survives restarts.
+        """
+
+        ceiling = min(self._retry_max, self._retry_base * 2 ** max(0, attempts - 1))
+        return max(1, int(random.uniform(ceiling / 2, ceiling)))
 
     def _rate_wait_seconds(self, bucket: str, now: float) -> float:
         """Return required wait time to respect a coarse bucket cadence.
 
-        Buckets are human-readable identifiers (e.g., 'slack.minute', 'email.daily').
-        We translate them into conservative minimum gaps between sends per process.
+        Buckets translate into conservative minimum gaps between sends per process
+        (see `agent.services.policy.RATE_BUCKET_MIN_GAP_SECONDS`).
         """
-        gaps = {
-            "slack.minute": 5.0,
-            "tickets.api": 2.0,
-            "email.daily": 60.0,
-        }
-        min_gap = gaps.get(bucket, 1.0)
+        min_gap = rate_bucket_gap_seconds(bucket)
         last = self._rate_last_sent.get(bucket, 0.0)
         elapsed = now - last
         return max(0.0, min_gap - elapsed)
@@ -271,13 +519,17 @@ def _is_conflict(exc: Exception) -> bool:
 
 
 def build_composio_client(settings: AppSettings) -> Any | None:
-    if not settings.composio_api_key or Composio is None or GoogleAdkProvider is None:
-        if not settings.composio_api_key:
-            logger.warning("worker.composio_not_configured")
-        return None
+    client = get_composio_client(settings)
+    if client is None:
+        logger.warning("worker.composio_not_configured")
+    return client
+
 
-    provider = GoogleAdkProvider()
-    return Composio(provider=provider, api_key=settings.composio_api_key)
+def _parse_cli_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed
 
 
 def parse_args(argv: Sequence[str]) -> argparse.Namespace:
@@ -294,6 +546,15 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
     drain_parser.add_argument("--tenant", default=None)
     drain_parser.add_argument("--limit", type=int, default=50)
 
+    replay_parser = subparsers.add_parser("replay", help="Replay DLQ envelopes throttled per rate bucket")
+    replay_parser.add_argument("--tenant", default=None)
+    replay_parser.add_argument("--tool", default=None, help="Only envelopes for this tool slug")
+    replay_parser.add_argument("--error", default=None, help="Only envelopes whose last error contains this text")
+    replay_parser.add_argument("--since", type=_parse_cli_time, default=None, help="Queued at or after (ISO 8601)")
+    replay_parser.add_argument("--until", type=_parse_cli_time, default=None, help="Queued before (ISO 8601)")
+    replay_parser.add_argument("--limit", type=int, default=1000)
+    replay_parser.add_argument("--dry-run", action="store_true", help="Estimate the replay without requeueing")
+
     retry_parser = subparsers.add_parser("retry-dlq", help="Retry a specific DLQ envelope")
     retry_parser.add_argument("--tenant", required=True)
     retry_parser.add_argument("--envelope", required=True)
@@ -301,14 +562,22 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
     return parser.parse_args(argv)
 
 
-def build_worker(settings: AppSettings) -> OutboxWorker:
+def build_worker(settings: AppSettings, *, with_composio: bool = True) -> OutboxWorker:
+    """Wire the worker against Supabase.
+
+    Queue-management commands (`status`, `drain`, `replay`, `retry-dlq`) pass
+    `with_composio=False` so they never import the Composio SDK and its Google ADK
+    dependency graph.
+    """
+
     if not settings.supabase_enabled():
         raise SupabaseNotConfiguredError("Supabase credentials are required for the worker")
 
     client = get_supabase_client(settings)
-    outbox_service = SupabaseOutboxService(client, schema=settings.supabase_schema)
+    payloads = build_payload_offloader(settings, client)
+    outbox_service = SupabaseOutboxService(client, schema=settings.supabase_schema, payloads=payloads)
     audit_logger = SupabaseAuditLogger(client, schema=settings.supabase_schema, actor_type="worker", actor_id="outbox")
-    composio_client = build_composio_client(settings)
+    composio_client = build_composio_client(settings) if with_composio else None
     # Policy + actions services
     try:
         from agent.services import SupabasePolicyService, SupabaseActionsService  # local import to avoid cycles
@@ -316,8 +585,23 @@ def build_worker(settings: AppSettings) -> OutboxWorker:
         SupabasePolicyService = None  # type: ignore
         SupabaseActionsService = None  # type: ignore
 
-    policy_service = SupabasePolicyService(client, schema=settings.supabase_schema) if SupabasePolicyService else None
-    actions_service = SupabaseActionsService(client, schema=settings.supabase_schema) if SupabaseActionsService else None
+    policy_service = (
+        SupabasePolicyService(client, schema=settings.supabase_schema, ttl_seconds=settings.tool_policy_ttl_seconds)
+        if SupabasePolicyService
+        else None
+    )
+    actions_service = (
+        SupabaseActionsService(client, schema=settings.supabase_schema, payloads=payloads)
+        if SupabaseActionsService
+        else None
+    )
+    tenant_plans = SupabaseTenantPlanService(client, schema=settings.supabase_schema)
+    trust_ledger = SupabaseTrustLedgerService(client, schema=settings.supabase_schema)
+    change_feed = build_change_feed(
+        settings,
+        register_cache_handlers(InvalidationBus(), policy=policy_service),
+        client=client,
+    )
 
     return OutboxWorker(
         settings=settings,
@@ -326,6 +610,10 @@ def build_worker(settings: AppSettings) -> OutboxWorker:
         composio_client=composio_client,
         policy_service=policy_service,
         actions_service=actions_service,
+        tenant_plans=tenant_plans,
+        trust_ledger=trust_ledger,
+        payloads=payloads,
+        change_feed=change_feed,
     )
 
 
@@ -334,7 +622,7 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
     settings = get_settings()
 
     try:
-        worker = build_worker(settings)
+        worker = build_worker(settings, with_composio=args.command == "start")
     except SupabaseNotConfiguredError as exc:
         logger.error("worker.supabase_missing", error=str(exc))
         return 1
@@ -357,6 +645,23 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         print(f"drained={drained}")
         return 0
 
+    if args.command == "replay":
+        selection = ReplaySelection(
+            tenant_id=args.tenant,
+            tool_slug=args.tool,
+            error_contains=args.error,
+            queued_after=args.since,
+            queued_before=args.until,
+            limit=args.limit,
+        )
+        plan = worker.replay_dlq(selection, dry_run=args.dry_run)
+        buckets = ",".join(f"{bucket}={count}" for bucket, count in sorted(plan.by_bucket.items()))
+        print(
+            f"selected={plan.selected} requeued={plan.requeued} "
+            f"estimated_seconds={plan.estimated_seconds:.0f} buckets={buckets or '-'}"
+        )
+        return 0
+
     if args.command == "retry-dlq":
         success = worker.retry_dlq(tenant_id=args.tenant, envelope_id=args.envelope)
         return 0 if success else 2
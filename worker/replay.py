@@ -0,0 +1,171 @@
+"""Throttled bulk replay of dead-lettered envelopes."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Mapping, Optional, Sequence
+
+import structlog
+
+from agent.services.outbox import OutboxRecordSummary, OutboxService, OutboxStatus
+from agent.services.policy import PolicyService, rate_bucket_gap_seconds
+
+
+logger = structlog.get_logger("outbox.replay")
+
+UNBUCKETED = "-"
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass(slots=True)
+class ReplaySelection:
+    """Which DLQ envelopes to replay."""
+
+    tenant_id: Optional[str] = None
+    tool_slug: Optional[str] = None
+    error_contains: Optional[str] = None
+    queued_after: Optional[datetime] = None
+    queued_before: Optional[datetime] = None
+    limit: int = 1000
+
+
+@dataclass(slots=True)
+class ScheduledReplay:
+    envelope_id: str
+    tenant_id: str
+    tool_slug: str
+    rate_bucket: Optional[str]
+    run_at: datetime
+
+
+@dataclass(slots=True)
+class ReplayPlan:
+    """Per-envelope release times and the resulting duration estimate."""
+
+    scheduled: tuple[ScheduledReplay, ...] = ()
+    by_bucket: dict[str, int] = field(default_factory=dict)
+    estimated_seconds: float = 0.0
+    requeued: int = 0
+    dry_run: bool = True
+
+    @property
+    def selected(self) -> int:
+        return len(self.scheduled)
+
+
+class DlqReplayer:
+    """Selects DLQ envelopes and requeues them with staggered `next_run_at` values.
+
+    Envelopes sharing a rate bucket are released one bucket gap apart (scaled by
+    `spacing`), so a replay reaches the provider no faster than the worker would send
+    fresh traffic; buckets are independent and release in parallel. Requeues are sent in
+    bulk batches, each a single server-side call, and the schedule lives in the queue, so
+    the replay keeps trickling in after this process exits. The duration estimate is the
+    longest bucket schedule or the worker's drain rate, whichever is slower.
+    """
+
+    def __init__(
+        self,
+        outbox: OutboxService,
+        *,
+        policy_service: PolicyService | None = None,
+        throughput_per_second: Optional[float] = None,
+        spacing: float = 1.0,
+        batch_size: int = 1000,
+        clock: Callable[[], datetime] = _utc_now,
+    ) -> None:
+        self._outbox = outbox
+        self._policy = policy_service
+        self._throughput = throughput_per_second
+        self._spacing = max(spacing, 0.0)
+        self._batch_size = max(1, batch_size)
+        self._clock = clock
+
+    def plan(self, selection: ReplaySelection) -> ReplayPlan:
+        summaries = self._outbox.list_summaries(
+            status=OutboxStatus.DLQ,
+            tenant_id=selection.tenant_id,
+            limit=selection.limit,
+            tool_slug=selection.tool_slug,
+            error_contains=selection.error_contains,
+            queued_after=selection.queued_after,
+            queued_before=selection.queued_before,
+        )
+        buckets = self._rate_buckets(summaries)
+        start = self._clock()
+
+        released: dict[str, int] = defaultdict(int)
+        scheduled: list[ScheduledReplay] = []
+        span = 0.0
+        for summary in summaries:
+            bucket = buckets.get((summary.tenant_id, summary.tool_slug))
+            key = bucket or UNBUCKETED
+            offset = 0.0
+            if bucket:
+                offset = released[key] * rate_bucket_gap_seconds(bucket) * self._spacing
+                span = max(span, offset)
+            released[key] += 1
+            scheduled.append(
+                ScheduledReplay(
+                    envelope_id=summary.envelope_id,
+                    tenant_id=summary.tenant_id,
+                    tool_slug=summary.tool_slug,
+                    rate_bucket=bucket,
+                    run_at=start + timedelta(seconds=offset),
+                )
+            )
+
+        estimate = span
+        if self._throughput and scheduled:
+            estimate = max(estimate, len(scheduled) / self._throughput)
+        return ReplayPlan(scheduled=tuple(scheduled), by_bucket=dict(released), estimated_seconds=estimate)
+
+    def replay(self, selection: ReplaySelection, *, dry_run: bool = False) -> ReplayPlan:
+        plan = self.plan(selection)
+        if dry_run or not plan.scheduled:
+            logger.info(
+                "replay.planned",
+                selected=plan.selected,
+                by_bucket=plan.by_bucket,
+                estimated_seconds=round(plan.estimated_seconds, 1),
+                dry_run=dry_run,
+            )
+            return plan
+
+        requeued = 0
+        for start in range(0, len(plan.scheduled), self._batch_size):
+            batch = plan.scheduled[start : start + self._batch_size]
+            requeued += self._outbox.requeue_many_from_dlq(
+                [item.envelope_id for item in batch],
+                run_at=[item.run_at for item in batch],
+            )
+        plan.requeued = requeued
+        plan.dry_run = False
+        logger.info(
+            "replay.requeued",
+            selected=plan.selected,
+            requeued=requeued,
+            by_bucket=plan.by_bucket,
+            estimated_seconds=round(plan.estimated_seconds, 1),
+        )
+        return plan
+
+    def _rate_buckets(self, summaries: Sequence[OutboxRecordSummary]) -> Mapping[tuple[str, str], Optional[str]]:
+        if self._policy is None:
+            return {}
+        slugs_by_tenant: dict[str, set[str]] = defaultdict(set)
+        for summary in summaries:
+            slugs_by_tenant[summary.tenant_id].add(summary.tool_slug)
+
+        buckets: dict[tuple[str, str], Optional[str]] = {}
+        for tenant_id, slugs in slugs_by_tenant.items():
+            policies = self._policy.get_effective_policies(tenant_id=tenant_id, tool_slugs=sorted(slugs))
+            for slug, policy in policies.items():
+                if policy is not None and policy.rate_bucket:
+                    buckets[(tenant_id, slug)] = str(policy.rate_bucket)
+        return buckets